@@ -3,7 +3,6 @@ import pandas as pd
 import altair as alt
 import os
 import yfinance as yf
-import requests
 from bs4 import BeautifulSoup
 from google import genai
 from google.genai import types
@@ -17,7 +16,8 @@ import html
 import time
 from textwrap import dedent
 from email.utils import parsedate_to_datetime
-from db_utils import migrate_csv_to_sqlite_once, table_exists, csv_exists
+from db_utils import as_numeric, migrate_csv_to_sqlite_once, table_exists, csv_exists
+from services.http_client import http_get, http_put
 from gpt_prompt_tab import render_gpt_prompt_tab
 from portfolio_assistant_tab import render_portfolio_assistant_tab
 from strategy_dashboard_tab import render_strategy_dashboard_tab
@@ -140,7 +140,7 @@ def get_macro_data():
         try:
             encoded_symbol = urllib.parse.quote(symbol, safe="")
             url = f"https://query1.finance.yahoo.com/v8/finance/chart/{encoded_symbol}?range=10d&interval=1d"
-            res = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=6)
+            res = http_get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=6)
             if res.status_code != 200:
                 return None
             payload = res.json()
@@ -1118,7 +1118,7 @@ def _github_get_json(path, default_obj):
         "Accept": "application/vnd.github+json",
     }
     try:
-        resp = requests.get(url, headers=headers, params={"ref": cfg["branch"]}, timeout=8)
+        resp = http_get(url, headers=headers, params={"ref": cfg["branch"]}, timeout=8)
         if resp.status_code == 404:
             return default_obj
         resp.raise_for_status()
@@ -1141,7 +1141,7 @@ def _github_put_json(path, payload_obj, commit_message):
     }
     try:
         sha = None
-        get_resp = requests.get(url, headers=headers, params={"ref": cfg["branch"]}, timeout=8)
+        get_resp = http_get(url, headers=headers, params={"ref": cfg["branch"]}, timeout=8)
         if get_resp.status_code == 200:
             sha = get_resp.json().get("sha")
         body = {
@@ -1153,7 +1153,7 @@ def _github_put_json(path, payload_obj, commit_message):
         }
         if sha:
             body["sha"] = sha
-        put_resp = requests.put(url, headers=headers, json=body, timeout=10)
+        put_resp = http_put(url, headers=headers, json=body, timeout=10)
         put_resp.raise_for_status()
         return True
     except Exception as e:
@@ -1609,7 +1609,7 @@ def fetch_yahoo_chart_history(ticker_symbol, range_period="2y", interval="1d"):
     try:
         encoded_symbol = urllib.parse.quote(ticker_symbol, safe="")
         url = f"https://query1.finance.yahoo.com/v8/finance/chart/{encoded_symbol}?range={range_period}&interval={interval}"
-        res = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=8)
+        res = http_get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=8)
         if res.status_code != 200:
             return pd.DataFrame()
         payload = res.json()
@@ -1813,7 +1813,7 @@ def _request_html(url, headers, timeout=4, retries=2):
     """가벼운 재시도로 일시적 네트워크 실패를 완화합니다."""
     for attempt in range(retries + 1):
         try:
-            return requests.get(url, headers=headers, timeout=timeout)
+            return http_get(url, headers=headers, timeout=timeout, retry=False)
         except Exception:
             if attempt == retries:
                 return None
@@ -2193,21 +2193,21 @@ if df_summary.empty:
     st.warning("⏳ 시장 데이터를 집계 중입니다.")
 else:
     if "신호신뢰도" in df_summary.columns:
-        df_summary["신호신뢰도"] = pd.to_numeric(df_summary["신호신뢰도"], errors="coerce").fillna(0.0)
+        df_summary["신호신뢰도"] = df_summary["신호신뢰도"].fillna(0.0)
     else:
         df_summary["신호신뢰도"] = 0.0
     if "신호등급" not in df_summary.columns:
         df_summary["신호등급"] = "-"
     if "점수변화(안정화)" in df_summary.columns:
-        df_summary["점수변화(안정화)"] = pd.to_numeric(df_summary["점수변화(안정화)"], errors="coerce").fillna(0.0)
+        df_summary["점수변화(안정화)"] = df_summary["점수변화(안정화)"].fillna(0.0)
     else:
         df_summary["점수변화(안정화)"] = 0.0
 
     df_summary['AI순위'] = df_summary['AI수급점수'].rank(method='first', ascending=False).astype(int)
     if "스윙우선순위" in df_summary.columns:
-        df_summary["스윙우선순위"] = pd.to_numeric(df_summary["스윙우선순위"], errors="coerce").fillna(0.0)
+        df_summary["스윙우선순위"] = df_summary["스윙우선순위"].fillna(0.0)
     else:
-        df_summary["스윙우선순위"] = pd.to_numeric(df_summary["AI수급점수"], errors="coerce").fillna(0.0)
+        df_summary["스윙우선순위"] = df_summary["AI수급점수"].fillna(0.0)
     if "매수후보" not in df_summary.columns:
         df_summary["매수후보"] = "관찰"
     if "진입유형" not in df_summary.columns:
@@ -2230,8 +2230,9 @@ else:
     }.items():
         if supply_col not in df_summary.columns:
             df_summary[supply_col] = default_value
+    # data.csv 숫자 컬럼은 read_table 스키마(db_utils.TABLE_SCHEMAS)로 이미 숫자이므로 결측만 채웁니다.
     for numeric_col in ["수급품질점수", "주도주점수", "수급흡수율", "수급지속일수", "거래대금활력", "20일평균거래대금(억)"]:
-        df_summary[numeric_col] = pd.to_numeric(df_summary[numeric_col], errors="coerce").fillna(0.0)
+        df_summary[numeric_col] = df_summary[numeric_col].fillna(0.0)
     for ma_col in ["MA5", "MA10", "MA20"]:
         if ma_col not in df_summary.columns:
             df_summary[ma_col] = 0.0
@@ -2256,8 +2257,8 @@ else:
             if "스윙우선순위" in yday_slice.columns:
                 if "매수후보" not in yday_slice.columns:
                     yday_slice["매수후보"] = "관찰"
-                yday_slice["스윙우선순위"] = pd.to_numeric(yday_slice["스윙우선순위"], errors="coerce").fillna(0.0)
-                yday_slice["AI수급점수"] = pd.to_numeric(yday_slice["AI수급점수"], errors="coerce").fillna(0.0)
+                yday_slice["스윙우선순위"] = as_numeric(yday_slice["스윙우선순위"]).fillna(0.0)
+                yday_slice["AI수급점수"] = as_numeric(yday_slice["AI수급점수"]).fillna(0.0)
                 yday_slice = yday_slice.sort_values(
                     ["스윙우선순위", "AI수급점수"],
                     ascending=[False, False],
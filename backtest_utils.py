@@ -2,11 +2,13 @@ from services.portfolio_simulator_service import (
     CLOSED_COLS,
     PERF_COLS,
     POSITION_COLS,
+    SwingSimConfig,
     build_capital_limited_swing_sim,
     build_portfolio_summary,
     compute_trade_quality_metrics,
     empty_capital_limited_result,
     simulate_portfolio,
+    simulate_portfolio_sweep,
 )
 from services.strategy_evaluation_service import (
     build_adaptive_threshold_sensitivity,
@@ -21,6 +23,7 @@ __all__ = [
     "CLOSED_COLS",
     "PERF_COLS",
     "POSITION_COLS",
+    "SwingSimConfig",
     "build_adaptive_threshold_sensitivity",
     "build_capital_limited_swing_sim",
     "build_portfolio_summary",
@@ -30,5 +33,6 @@ __all__ = [
     "empty_capital_limited_result",
     "evaluate_strategy_modes",
     "simulate_portfolio",
+    "simulate_portfolio_sweep",
     "summarize_simulation_result",
 ]
@@ -0,0 +1 @@
+"""합성 데이터 기반 오프라인 파이프라인 벤치마크."""
@@ -0,0 +1,210 @@
+"""
+스크레이퍼 이후 리플레이 → 스윙 백테스트 → 자본제한 시뮬 → 추천 검증 단계를 합성 데이터로 오프라인 측정합니다.
+
+    python -m benchmarks.run_pipeline --size 300x120 --size 1000x250
+    python -m benchmarks.run_pipeline --preset all --trace-memory --compare benchmarks/results/<이전>.json
+
+크기별로 새 프로세스에서 실행하므로 캐시/최대 RSS가 크기 사이에 섞이지 않습니다.
+결과는 benchmarks/results/pipeline_<시각>.json (같은 스키마라 실행 간 비교 가능)에 씁니다.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic_market import parse_size, write_synthetic_market
+
+
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+REPORT_VERSION = 1
+PRESETS = {
+    "small": ["300x120"],
+    "medium": ["1000x250"],
+    "large": ["2000x500"],
+    "all": ["300x120", "1000x250", "2000x500"],
+}
+STAGES = ["replay_score_trend", "swing_backtest", "capital_limited_sim", "recommendation_validation"]
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _row_count(result):
+    if isinstance(result, tuple):
+        return sum(_row_count(part) for part in result)
+    return int(len(result)) if hasattr(result, "__len__") else None
+
+
+def _measure(name, func, trace_memory):
+    rss_before = _max_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    traced_peak = None
+    if trace_memory:
+        traced_peak = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    rss_after = _max_rss_mb()
+    return result, {
+        "stage": name,
+        "seconds": round(seconds, 4),
+        "rows": _row_count(result),
+        "max_rss_mb": rss_after,
+        "max_rss_growth_mb": round(rss_after - rss_before, 1) if rss_after is not None else None,
+        "traced_peak_mb": traced_peak,
+    }
+
+
+def _run_size(n_stocks, n_days, seed, trace_memory, keep_dir=None):
+    """한 크기를 독립 프로세스에서 실행합니다(작업 디렉터리 안의 data/만 읽고 씁니다)."""
+    work = Path(keep_dir) if keep_dir else Path(tempfile.mkdtemp(prefix=f"bench_{n_stocks}x{n_days}_"))
+    work.mkdir(parents=True, exist_ok=True)
+    try:
+        return _run_stages(work, n_stocks, n_days, seed, trace_memory, keep_dir)
+    finally:
+        os.chdir(REPO_ROOT)
+        if not keep_dir:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+def _run_stages(work, n_stocks, n_days, seed, trace_memory, keep_dir):
+    started = time.perf_counter()
+    row_counts = write_synthetic_market(work, n_stocks, n_days, seed=seed)
+    generate_seconds = round(time.perf_counter() - started, 3)
+    os.chdir(work)
+
+    import scraper
+    from db_utils import read_table
+    from services.portfolio_simulator_service import build_capital_limited_swing_sim
+    from services.recommendation_validation_service import build_recommendation_validation
+
+    stages = []
+    _, rec = _measure("replay_score_trend", lambda: scraper.build_replay_score_trend(top_n=3), trace_memory)
+    stages.append(rec)
+    (trades, _perf), rec = _measure("swing_backtest", lambda: scraper.build_swing_backtest_files(), trace_memory)
+    stages.append(rec)
+    history = read_table("history.csv", "history.csv")
+    score_trend = read_table("score_trend.csv", "score_trend.csv")
+    _, rec = _measure("capital_limited_sim", lambda: build_capital_limited_swing_sim(trades, history), trace_memory)
+    stages.append(rec)
+    _, rec = _measure(
+        "recommendation_validation",
+        lambda: build_recommendation_validation(score_trend=score_trend, swing_trades=trades, history=history),
+        trace_memory,
+    )
+    stages.append(rec)
+    return {
+        "stocks": int(n_stocks),
+        "days": int(n_days),
+        "seed": int(seed),
+        "rows": row_counts,
+        "generate_seconds": generate_seconds,
+        "work_dir": str(work) if keep_dir else None,
+        "stages": stages,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare_reports(current, previous):
+    """같은 (종목 수, 거래일 수, 단계) 기준 소요 시간 비교 줄 목록."""
+    prev_index = {
+        (run["stocks"], run["days"], stage["stage"]): stage["seconds"]
+        for run in previous.get("runs", [])
+        for stage in run.get("stages", [])
+    }
+    lines = []
+    for run in current.get("runs", []):
+        for stage in run["stages"]:
+            before = prev_index.get((run["stocks"], run["days"], stage["stage"]))
+            if before is None:
+                continue
+            ratio = before / stage["seconds"] if stage["seconds"] > 0 else float("inf")
+            lines.append(
+                f"{run['stocks']}x{run['days']} {stage['stage']}: {before:.3f}s → {stage['seconds']:.3f}s (x{ratio:.2f})"
+            )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 데이터로 리플레이/백테스트/시뮬/검증 단계를 측정합니다.")
+    parser.add_argument("--size", action="append", default=[], help="종목수x거래일수 (예: 300x120). 여러 번 지정 가능")
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="미리 정한 크기 묶음")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc 최대 할당량도 기록(소요 시간이 늘어남)")
+    parser.add_argument("--keep-data", help="합성 데이터를 지울 위치 대신 이 디렉터리 아래에 크기별로 남깁니다")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: benchmarks/results/pipeline_<시각>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    sizes = (PRESETS[args.preset] if args.preset else []) + list(args.size)
+    sizes = sizes or PRESETS["small"]
+
+    runs = []
+    for size in sizes:
+        n_stocks, n_days = parse_size(size)
+        keep_dir = str(Path(args.keep_data) / f"{n_stocks}x{n_days}") if args.keep_data else None
+        # 크기마다 새 프로세스: 모듈 캐시와 최대 RSS가 이전 크기에 영향받지 않게 합니다.
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            run = pool.submit(_run_size, n_stocks, n_days, args.seed, args.trace_memory, keep_dir).result()
+        runs.append(run)
+        stage_text = ", ".join(f"{s['stage']} {s['seconds']:.3f}s" for s in run["stages"])
+        print(f"⏱️ {n_stocks}x{n_days}: 생성 {run['generate_seconds']:.1f}s | {stage_text}")
+
+    report = {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "trace_memory": bool(args.trace_memory),
+        "runs": runs,
+    }
+    out_path = Path(args.out) if args.out else RESULTS_DIR / f"pipeline_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"📝 벤치마크 결과 저장: {out_path}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        for line in compare_reports(report, previous):
+            print(line)
+    return report
+
+
+if __name__ == "__main__":
+    main()
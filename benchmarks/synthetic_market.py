@@ -0,0 +1,133 @@
+"""
+벤치마크용 합성 시장 데이터 생성기.
+같은 (종목 수, 거래일 수, seed)면 항상 같은 history.csv / data.csv / score_trend.csv를 만듭니다.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+SECTORS = ["반도체", "2차전지", "바이오", "자동차", "조선", "방산", "화학", "금융", "인터넷", "게임", "유통", "건설"]
+THEMES = {
+    "반도체": "반도체;AI", "2차전지": "2차전지;전기차", "바이오": "바이오;헬스케어", "자동차": "자동차;전기차",
+    "조선": "조선;해운", "방산": "방산;우주항공", "화학": "화학소재;산업재", "금융": "금융;밸류업",
+    "인터넷": "플랫폼;AI", "게임": "게임;콘텐츠", "유통": "유통;소비재", "건설": "건설;인프라",
+}
+ENTRY_TYPES = ["눌림목", "돌파", "주도눌림", "주도돌파", "관찰", "과열주의", "회피"]
+SCORE_TREND_DAYS = 60
+SCORE_TREND_TOP = 30
+
+
+def parse_size(text):
+    """'300x120' → (300, 120)"""
+    stocks, days = str(text).lower().split("x")
+    return int(stocks), int(days)
+
+
+def generate_history(n_stocks, n_days, seed=7, end_date="2026-06-30"):
+    """종목×거래일 일봉/수급 이력. 일부 종목은 늦게 상장하고, 약 2% 행은 결측일로 빠집니다."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end_date, periods=int(n_days))
+    names = np.array([f"합성{i:04d}" for i in range(int(n_stocks))], dtype=object)
+
+    base_price = np.round(rng.lognormal(mean=10.0, sigma=0.9, size=n_stocks), -1) + 1000.0
+    drift = rng.normal(0.0003, 0.0008, size=n_stocks)
+    shocks = rng.normal(0.0, 0.022, size=(n_stocks, n_days)) + drift[:, None]
+    close = np.maximum(np.round(base_price[:, None] * np.exp(np.cumsum(shocks, axis=1)), -1), 100.0)
+
+    volume = rng.integers(5_000, 3_000_000, size=(n_stocks, n_days)).astype(float)
+    trade_value = volume * close / 1e8
+    # 수급(억원): 거래대금 대비 비율로 만들어 종목 규모와 맞춥니다.
+    foreign = trade_value * rng.normal(0.0, 0.08, size=(n_stocks, n_days))
+    pension = trade_value * rng.normal(0.01, 0.05, size=(n_stocks, n_days))
+    trust = trade_value * rng.normal(0.0, 0.04, size=(n_stocks, n_days))
+    pef = trade_value * rng.normal(0.0, 0.03, size=(n_stocks, n_days))
+
+    listed_from = np.where(rng.random(n_stocks) < 0.1, rng.integers(0, max(1, n_days // 3), size=n_stocks), 0)
+    keep = (np.arange(n_days)[None, :] >= listed_from[:, None]) & (rng.random((n_stocks, n_days)) >= 0.02)
+    stock_idx, day_idx = np.nonzero(keep)
+
+    hist = pd.DataFrame({
+        "종목명": names[stock_idx],
+        "일자": dates.strftime("%Y%m%d").to_numpy()[day_idx],
+        "종가": close[stock_idx, day_idx],
+        "외인": foreign[stock_idx, day_idx],
+        "연기금": pension[stock_idx, day_idx],
+        "투신": trust[stock_idx, day_idx],
+        "사모": pef[stock_idx, day_idx],
+        "거래량": volume[stock_idx, day_idx],
+        "거래대금(억)": trade_value[stock_idx, day_idx],
+    })
+    # 실제 history.csv처럼 최신일 우선으로 저장합니다.
+    return hist.sort_values(["일자", "종목명"], ascending=[False, True]).reset_index(drop=True)
+
+
+def generate_meta(hist, seed=7):
+    """data.csv 최신 스냅샷(리플레이 메타로 쓰는 종목 고정값 위주)."""
+    rng = np.random.default_rng(seed + 1)
+    last = hist.drop_duplicates("종목명", keep="first").sort_values("종목명").reset_index(drop=True)
+    n = len(last)
+    sectors = np.array(SECTORS, dtype=object)[rng.integers(0, len(SECTORS), size=n)]
+    avg_value_20d = (
+        hist.groupby("종목명", sort=True)["거래대금(억)"].apply(lambda s: s.head(20).mean()).reindex(last["종목명"]).to_numpy()
+    )
+    return pd.DataFrame({
+        "종목명": last["종목명"],
+        "종목코드": [f"{900000 + i:06d}" for i in range(n)],
+        "소속": np.where(rng.random(n) < 0.45, "KOSPI", "KOSDAQ"),
+        "섹터": sectors,
+        "테마": [THEMES[s] for s in sectors],
+        "AI수급점수": np.round(rng.uniform(20, 90, size=n), 2),
+        "현재가": last["종가"].to_numpy(),
+        "시가총액": np.round(last["종가"].to_numpy() * rng.uniform(2e4, 3e6, size=n) / 1e8, 0),
+        "PER": np.round(rng.uniform(3, 60, size=n), 2),
+        "ROE": np.round(rng.normal(8, 6, size=n), 2),
+        "20일평균거래대금(억)": np.round(avg_value_20d, 1),
+    })
+
+
+def generate_score_trend(hist, meta, seed=7, days=SCORE_TREND_DAYS, top=SCORE_TREND_TOP):
+    """최근 days 거래일의 일일 상위 top 스냅샷(score_trend.csv)."""
+    rng = np.random.default_rng(seed + 2)
+    trade_days = sorted(hist["일자"].unique())[-int(days):]
+    meta = meta.set_index("종목명")
+    rows = []
+    for day in trade_days:
+        picked = rng.choice(meta.index.to_numpy(), size=min(int(top), len(meta)), replace=False)
+        ai = np.sort(np.round(rng.uniform(40, 90, size=len(picked)), 2))[::-1]
+        swing = np.round(ai * rng.uniform(0.6, 1.0, size=len(picked)), 2)
+        entry = np.array(ENTRY_TYPES, dtype=object)[rng.integers(0, len(ENTRY_TYPES), size=len(picked))]
+        candidate = np.where(np.isin(entry, ["회피"]), "제외", "관찰").astype(object)
+        candidate[: int(rng.integers(0, 4))] = "신규후보"
+        frame = pd.DataFrame({
+            "종목명": picked,
+            "종목코드": meta.loc[picked, "종목코드"].to_numpy(),
+            "AI수급점수": ai,
+            "매수후보": candidate,
+            "진입유형": entry,
+            "스윙우선순위": swing,
+            "테마": meta.loc[picked, "테마"].to_numpy(),
+            "20일평균거래대금(억)": meta.loc[picked, "20일평균거래대금(억)"].to_numpy(),
+            "정배열": rng.random(len(picked)) < 0.6,
+            "추세품질점수": rng.choice([20.0, 40.0, 60.0, 80.0, 100.0], size=len(picked)),
+            "AI순위": np.arange(1, len(picked) + 1),
+        })
+        frame = frame.sort_values(["스윙우선순위", "AI수급점수"], ascending=[False, False]).reset_index(drop=True)
+        frame["순위"] = np.arange(1, len(frame) + 1)
+        frame["날짜"] = pd.Timestamp(day).strftime("%Y-%m-%d")
+        rows.append(frame)
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+def write_synthetic_market(work_dir, n_stocks, n_days, seed=7):
+    """work_dir/data 아래에 세 CSV를 씁니다. 반환: 파일별 행 수."""
+    data_dir = Path(work_dir) / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    hist = generate_history(n_stocks, n_days, seed=seed)
+    meta = generate_meta(hist, seed=seed)
+    score_trend = generate_score_trend(hist, meta, seed=seed)
+    hist.to_csv(data_dir / "history.csv", index=False, encoding="utf-8-sig")
+    meta.to_csv(data_dir / "data.csv", index=False, encoding="utf-8-sig")
+    score_trend.to_csv(data_dir / "score_trend.csv", index=False, encoding="utf-8-sig")
+    return {"history.csv": len(hist), "data.csv": len(meta), "score_trend.csv": len(score_trend)}
@@ -1,11 +1,135 @@
+import csv
+import json
 import os
 import shutil
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow.parquet as pq
+except Exception:
+    pq = None
+
 
 DATA_DIR = "data"
+COLUMNAR_DIR = os.path.join(DATA_DIR, "columnar")
+# 컬럼형(Parquet) 저장소를 쓰는 테이블. 월 단위 파티션 + 파싱된 날짜 컬럼(일자_dt)을 함께 저장합니다.
+COLUMNAR_TABLES = {
+    "history": {"date_col": "일자", "text_cols": ["종목명"]},
+}
+COLUMNAR_DATE_SUFFIX = "_dt"
+# 컬럼형 저장소가 어떤 CSV 상태와 같은 내용인지 남기는 파일(테이블 디렉터리 안, SQLite의 _quantbot_sync와 같은 역할)
+COLUMNAR_STAMP_FILE = "_csv_stamp.json"
+# 파티션에 함께 저장하는 원래 행 번호. 월 파티션으로 나눠도 CSV 행 순서 그대로 읽기 위해 씁니다.
+# CSV가 파티션 순서(최신 월 우선)로 묶여 있으면 파티션 안에서만 번호를 매겨("partition"), 한 달 치가 바뀌어도
+# 다른 월 파티션 내용이 그대로 남습니다. 월이 섞인 CSV만 전체 행 번호("global")를 씁니다.
+COLUMNAR_ROW_COL = "__row__"
+# 컬럼형 저장소에서 읽을 때 CSV와 같은 결과를 낼 수 있는 read_csv 인자. 이외 인자가 오면 CSV로 읽습니다.
+_COLUMNAR_READ_KWARGS = {"encoding", "on_bad_lines", "dtype", "usecols", "keep_default_na", "low_memory"}
+# SQLite(quantbot.db)에 함께 저장하는 테이블.
+# - key: 기본키(upsert 기준), partition: 같은 값의 행을 통째로 교체하는 upsert 기준(예: 날짜)
+# - date_col/date_format: date_range 조회 시 텍스트 비교에 쓰는 날짜 컬럼과 저장 형식
+# - order_by: 전체 조회 순서(없으면 입력 순서 = rowid)
+SQLITE_TABLES = {
+    "history": {
+        "key": ["종목명", "일자"], "indexes": [["일자"]], "date_col": "일자", "date_format": "%Y%m%d",
+        "order_by": ['"일자" DESC', '"종목명" ASC'],
+    },
+    "score_trend": {"partition": "날짜", "indexes": [["날짜"], ["종목명"]], "date_col": "날짜", "date_format": "%Y-%m-%d"},
+    "replay_score_trend": {"partition": "날짜", "indexes": [["날짜"], ["종목명"]], "date_col": "날짜", "date_format": "%Y-%m-%d"},
+    "swing_trades": {"partition": "진입일", "indexes": [["진입일"], ["종목명"]], "date_col": "진입일", "date_format": "%Y-%m-%d"},
+}
+# 테이블별 컬럼 스키마. read_table이 읽을 때(파싱 단계) 적용합니다.
+# - text: 문자열로 파싱할 컬럼(종목코드 앞자리 0 보존, 종목명 숫자 추론 방지)
+# - numeric: 숫자 컬럼. C 엔진 추론 결과가 숫자면 그대로 두고, 깨진 값이 섞여 문자열로 남았을 때만
+#   숫자로 강제 변환(실패 값 NaN)합니다. 정수 컬럼은 정수로 유지됩니다.
+# - categorical: read_table(categories=True)일 때 category dtype으로 바꾸는 반복 문자열 컬럼
+# - dates: 날짜 컬럼과 저장 형식(parse_table_dates가 <컬럼>_dt를 만듭니다)
+_TREND_NUMERIC = [
+    "AI수급점수", "스윙우선순위", "기관동행점수", "수급품질점수", "주도주점수", "수급흡수율", "수급지속일수",
+    "거래대금활력", "20일평균거래대금(억)", "추세품질점수", "MA5", "MA10", "MA20", "AI순위", "순위",
+]
+_PERF_NUMERIC = ["일간수익률", "누적수익률", "최대낙폭(%)"]
+TABLE_SCHEMAS = {
+    "history": {
+        "text": ["종목명"],
+        "numeric": ["종가", "외인", "연기금", "투신", "사모", "거래량", "거래대금(억)"],
+        "categorical": ["종목명"],
+        "dates": {"일자": "%Y%m%d"},
+    },
+    "data": {
+        "text": ["종목명", "종목코드"],
+        "numeric": [
+            "AI수급점수", "Quant점수", "정성점수", "정성보정치", "현재가", "등락률", "외인강도(%)", "연기금강도(%)",
+            "투신강도(%)", "사모강도(%)", "외인연속", "연기금연속", "이격도(%)", "손바뀜(%)", "RSI", "거래급증(%)",
+            "거래대금(억)", "5일평균거래대금(억)", "20일평균거래대금(억)", "거래대금활력", "추세품질점수",
+            "MA5", "MA10", "MA20", "음봉매집률", "시가총액", "PER", "ROE", "뉴스테마가점", "뉴스톤계수",
+            "뉴스부정키워드수", "테마가점완화", "눌림목가감", "점수변화(안정화)", "신호신뢰도", "연기금5일강도(%)",
+            "연기금10일강도(%)", "기관10일동행강도(%)", "수급흡수율", "수급지속일수", "수급품질점수", "주도주점수",
+            "기관동행점수", "스윙우선순위",
+        ],
+        "categorical": ["종목명", "테마", "진입유형"],
+        "dates": {},
+    },
+    "score_trend": {
+        "text": ["종목명", "종목코드"],
+        "numeric": _TREND_NUMERIC,
+        "categorical": ["종목명", "테마", "진입유형"],
+        "dates": {"날짜": "%Y-%m-%d"},
+    },
+    "replay_score_trend": {
+        "text": ["종목명", "종목코드"],
+        "numeric": _TREND_NUMERIC,
+        "categorical": ["종목명", "테마", "진입유형"],
+        "dates": {"날짜": "%Y-%m-%d"},
+    },
+    "swing_trades": {
+        "text": [
+            "거래ID", "진입일", "종목명", "종목코드", "진입유형", "추천소스", "진입코멘트", "청산방식", "청산사유",
+            "청산일", "상태",
+        ],
+        "numeric": ["진입순위", "AI수급점수", "스윙우선순위", "보유일수", "진입가", "청산가", "수익률"],
+        "categorical": ["종목명", "진입유형"],
+        "dates": {"진입일": "%Y-%m-%d", "청산일": "%Y-%m-%d"},
+    },
+    "swing_performance": {
+        "text": [],
+        "numeric": _PERF_NUMERIC + ["평가금액", "현금", "투자금액", "보유종목수", "종료거래수", "승률(%)"],
+        "categorical": [],
+        "dates": {"날짜": "%Y-%m-%d"},
+    },
+    "performance_trend": {"text": [], "numeric": _PERF_NUMERIC, "categorical": [], "dates": {"날짜": "%Y-%m-%d"}},
+    "legacy_performance_trend": {"text": [], "numeric": _PERF_NUMERIC, "categorical": [], "dates": {"날짜": "%Y-%m-%d"}},
+    "theme_quality_trend": {
+        "text": [],
+        "numeric": ["상위N", "평균테마가점", "P90테마가점", "지배테마비중", "완화강도", "완화종목수", "VIX"],
+        "categorical": [],
+        "dates": {"날짜": "%Y-%m-%d"},
+    },
+    "portfolio": {"text": ["종목명"], "numeric": ["매수가"], "categorical": [], "dates": {"날짜": "%Y-%m-%d"}},
+}
+_SYNC_TABLE = "_quantbot_sync"
+# read_csv 기본 결측 표기. SQLite에서 읽은 값도 CSV와 같은 규칙으로 NaN 처리합니다.
+_CSV_NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+# write_table 호출마다 증가하는 테이블별 버전. 프로세스 내 캐시 무효화 판단에 사용합니다.
+_TABLE_VERSIONS: dict[str, int] = {}
+# git 머지 충돌 표식(줄 시작). 원자적 쓰기로는 생기지 않고 저장소 머지에서만 들어옵니다.
+CONFLICT_MARKERS = (b"<<<<<<<", b"=======", b">>>>>>>")
+# (경로, mtime_ns, size) → 충돌 표식 포함 여부
+_MARKER_CACHE: dict[tuple, bool] = {}
+# 테이블별 쓰기 잠금(append_by_date와 백그라운드 압축이 같은 CSV를 동시에 바꾸지 않도록)
+_TABLE_LOCKS: dict[str, threading.Lock] = {}
+_TABLE_LOCKS_GUARD = threading.Lock()
+_COMPACTIONS: list[threading.Thread] = []
 
 
 def resolve_csv_path(csv_path: str, migrate_legacy_root: bool = True) -> str:
@@ -29,21 +153,627 @@ def resolve_csv_path(csv_path: str, migrate_legacy_root: bool = True) -> str:
 def csv_exists(csv_path: str) -> bool:
     resolved = Path(resolve_csv_path(csv_path))
     legacy = Path(csv_path)
-    return resolved.exists() or legacy.exists()
+    return resolved.exists() or legacy.exists() or columnar_exists(csv_path)
 
 
-def table_exists(table_name: str, db_path: str = "quantbot.db") -> bool:
+def _columnar_key(table_name: str | None) -> str:
+    return Path(str(table_name or "")).stem
+
+
+def columnar_enabled(table_name: str) -> bool:
+    """
+    pyarrow가 설치돼 있고 QUANTBOT_COLUMNAR=0 으로 끄지 않은 경우에만 컬럼형 저장소를 사용합니다.
+    """
+    if pq is None or _columnar_key(table_name) not in COLUMNAR_TABLES:
+        return False
+    return os.environ.get("QUANTBOT_COLUMNAR", "1").strip() != "0"
+
+
+def csv_mirror_enabled() -> bool:
+    """컬럼형 테이블의 CSV 사본 유지 여부 (QUANTBOT_CSV_MIRROR=0 이면 끔)."""
+    return os.environ.get("QUANTBOT_CSV_MIRROR", "1").strip() != "0"
+
+
+def columnar_table_dir(table_name: str) -> Path:
+    return Path(COLUMNAR_DIR) / _columnar_key(table_name)
+
+
+def _columnar_parts(table_name: str) -> list[Path]:
+    table_dir = columnar_table_dir(table_name)
+    if not table_dir.exists():
+        return []
+    # 파티션 키(YYYYMM) 내림차순 = 최신 월 우선. CSV의 일자 내림차순 행 순서를 그대로 재현합니다.
+    return sorted(table_dir.glob("part-*.parquet"), reverse=True)
+
+
+def columnar_exists(table_name: str) -> bool:
+    return columnar_enabled(table_name) and bool(_columnar_parts(table_name))
+
+
+def has_parsed_dates(df: pd.DataFrame, dt_col: str = "일자_dt") -> bool:
+    """컬럼형 저장소에서 읽어 날짜 컬럼이 이미 datetime으로 들어온 경우 True."""
+    return df is not None and dt_col in df.columns and pd.api.types.is_datetime64_any_dtype(df[dt_col])
+
+
+def table_version(table_name: str) -> int:
+    return _TABLE_VERSIONS.get(_columnar_key(table_name), 0)
+
+
+def parse_date_values(values: pd.Series) -> pd.Series:
+    """YYYYMMDD / YYYY-MM-DD / 20250102.0 형태의 일자 값을 datetime으로 변환합니다."""
+    raw = values.astype(str).str.replace("-", "", regex=False).str.replace(".0", "", regex=False).str.strip()
+    parsed = pd.to_datetime(raw, format="%Y%m%d", errors="coerce")
+    if parsed.notna().sum() == 0:
+        parsed = pd.to_datetime(values, errors="coerce")
+    return parsed
+
+
+def as_numeric(values):
+    """pd.to_numeric(values, errors="coerce")와 같은 결과. 이미 숫자 dtype이면 변환 없이 그대로 돌려줍니다."""
+    if isinstance(values, pd.Series) and pd.api.types.is_numeric_dtype(values.dtype):
+        return values
+    return pd.to_numeric(values, errors="coerce")
+
+
+def _schema_read_kwargs(table_name: str, read_csv_kwargs: dict | None) -> tuple[dict, bool]:
+    """
+    read_csv 인자에 스키마의 text 컬럼 dtype을 합칩니다(호출부 dtype이 우선). 반환: (인자, 스키마 적용 여부).
+    dtype=str 전체 지정이나 keep_default_na=False처럼 원문 그대로 읽으려는 호출은 건드리지 않습니다.
+    """
+    kwargs = dict(read_csv_kwargs or {})
+    schema = TABLE_SCHEMAS.get(_columnar_key(table_name))
+    caller_dtype = kwargs.get("dtype")
+    if schema is None or kwargs.get("keep_default_na", True) is False:
+        return kwargs, False
+    if caller_dtype is not None and not isinstance(caller_dtype, dict):
+        return kwargs, False
+    kwargs["dtype"] = {**{c: str for c in schema["text"]}, **(caller_dtype or {})}
+    return kwargs, True
+
+
+def apply_table_schema(df: pd.DataFrame, table_name: str, categories: bool = False) -> pd.DataFrame:
+    """
+    TABLE_SCHEMAS의 numeric 컬럼 중 문자열로 남은 컬럼만 숫자로 바꾸고,
+    categories=True면 categorical 컬럼을 category dtype으로 바꿉니다(제자리 변경 후 반환).
+    """
+    schema = TABLE_SCHEMAS.get(_columnar_key(table_name))
+    if schema is None or df is None or df.empty:
+        return df
+    for col in schema["numeric"]:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col].dtype):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if categories:
+        for col in schema["categorical"]:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+    return df
+
+
+def parse_table_dates(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    """스키마의 날짜 컬럼마다 <컬럼>_dt(datetime)를 만듭니다. 이미 파싱된 컬럼(컬럼형 저장소)은 그대로 둡니다."""
+    schema = TABLE_SCHEMAS.get(_columnar_key(table_name))
+    if schema is None or df is None:
+        return df
+    for col, fmt in schema["dates"].items():
+        dt_col = f"{col}{COLUMNAR_DATE_SUFFIX}"
+        if col not in df.columns or has_parsed_dates(df, dt_col):
+            continue
+        if fmt == "%Y%m%d":
+            df[dt_col] = parse_date_values(df[col])
+            continue
+        parsed = pd.to_datetime(df[col], format=fmt, errors="coerce")
+        # 형식과 다른 값(시각 포함 등)만 일반 파싱으로 한 번 더 시도합니다.
+        retry = parsed.isna() & df[col].notna()
+        if retry.any():
+            parsed[retry] = pd.to_datetime(df.loc[retry, col].astype(str), errors="coerce", format="mixed")
+        df[dt_col] = parsed
+    return df
+
+
+def _normalize_date_range(date_range) -> tuple:
+    if not date_range:
+        return None, None
+    start, end = date_range
+    start = pd.to_datetime(start, errors="coerce") if start is not None else None
+    end = pd.to_datetime(end, errors="coerce") if end is not None else None
+    start = start.normalize() if start is not None and pd.notna(start) else None
+    end = end.normalize() if end is not None and pd.notna(end) else None
+    return start, end
+
+
+def _columnar_frame(table_name: str, df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """파티션에 저장할 형태(문자열 컬럼, CSV 원문 날짜, 파싱 날짜)로 바꾼 복사본과 행별 파티션 키(YYYYMM)."""
+    spec = COLUMNAR_TABLES[_columnar_key(table_name)]
+    date_col = spec["date_col"]
+    dt_col = f"{date_col}{COLUMNAR_DATE_SUFFIX}"
+    out = df.copy()
+    for col in spec.get("text_cols", []):
+        if col in out.columns:
+            out[col] = out[col].astype(str)
+    out[dt_col] = out[dt_col] if has_parsed_dates(out, dt_col) else parse_date_values(out[date_col])
+    # 날짜 원문은 CSV에 쓰이는 텍스트 그대로 저장합니다(읽을 때 CSV와 같은 추론 결과가 나오도록).
+    out[date_col] = [v if isinstance(v, str) else _csv_text(v) for v in out[date_col].tolist()]
+    return out, out[dt_col].dt.strftime("%Y%m").fillna("unknown")
+
+
+def _write_columnar(table_name: str, df: pd.DataFrame):
+    out, part_keys = _columnar_frame(table_name, df)
+    # _columnar_parts 읽기 순서(파일명 내림차순)대로 파티션이 이어져 있는지 확인합니다.
+    rank = {key: i for i, key in enumerate(sorted(part_keys.unique(), reverse=True))}
+    ranks = part_keys.map(rank).to_numpy()
+    row_order = "partition" if len(ranks) < 2 or bool((np.diff(ranks) >= 0).all()) else "global"
+    if row_order == "partition":
+        out[COLUMNAR_ROW_COL] = out.groupby(part_keys, sort=False).cumcount().astype(np.int64)
+    else:
+        out[COLUMNAR_ROW_COL] = np.arange(len(out), dtype=np.int64)
+
+    table_dir = columnar_table_dir(table_name)
+    table_dir.mkdir(parents=True, exist_ok=True)
+    written = set()
+    for key, part in out.groupby(part_keys, sort=False):
+        _write_columnar_part(table_dir / f"part-{key}.parquet", part)
+        written.add(f"part-{key}.parquet")
+    for stale in table_dir.glob("part-*.parquet"):
+        if stale.name not in written:
+            stale.unlink()
+    return row_order
+
+
+def _write_columnar_part(target: Path, part: pd.DataFrame):
+    """파티션 하나를 임시 파일에 쓰고, 기존 파일과 바이트가 같으면 교체하지 않습니다(안 바뀐 월은 mtime도 유지)."""
+    tmp = target.with_suffix(".parquet.tmp")
+    part.to_parquet(tmp, index=False)
+    try:
+        if target.exists() and target.stat().st_size == tmp.stat().st_size and target.read_bytes() == tmp.read_bytes():
+            return
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _drop_columnar(table_name: str):
+    table_dir = columnar_table_dir(table_name)
+    if table_dir.exists():
+        shutil.rmtree(table_dir, ignore_errors=True)
+
+
+def _columnar_stamp_path(table_name: str) -> Path:
+    return columnar_table_dir(table_name) / COLUMNAR_STAMP_FILE
+
+
+def _record_columnar_sync(table_name: str, csv_path: str | None, row_order: str):
+    """
+    컬럼형 저장소가 어떤 CSV 상태와 같은 내용인지(CSV가 밖에서 바뀌면 오래된 것으로 봄)와
+    행 번호 방식(row_order: "partition"/"global")을 기록합니다.
+    """
+    stamp = _csv_stamp(csv_path) or (None, None)
+    target = _columnar_stamp_path(table_name)
+    tmp = target.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({"csv_mtime_ns": stamp[0], "csv_size": stamp[1], "row_order": row_order}), encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def _columnar_row_order(table_name: str) -> str:
+    """기록된 행 번호 방식. 기록이 없으면 이전 버전과 같은 전체 행 번호("global")로 봅니다."""
+    try:
+        recorded = json.loads(_columnar_stamp_path(table_name).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return "global"
+    return recorded.get("row_order", "global")
+
+
+def columnar_fresh(table_name: str, csv_path: str | None = None) -> bool:
+    """
+    컬럼형 저장소가 있고 마지막 기록 이후 CSV 사본이 바뀌지 않았으면 True.
+    기록이 없는 저장소(이전 버전이 만든 파티션)나 손으로 고치거나 git 머지된 CSV는 오래된 것으로 봅니다.
+    """
+    if not columnar_exists(table_name):
+        return False
+    try:
+        recorded = json.loads(_columnar_stamp_path(table_name).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if not csv_path:
+        return True
+    return (recorded.get("csv_mtime_ns"), recorded.get("csv_size")) == (_csv_stamp(csv_path) or (None, None))
+
+
+def _columnar_readable(read_csv_kwargs: dict | None) -> bool:
+    return set(read_csv_kwargs or {}) <= _COLUMNAR_READ_KWARGS
+
+
+def _like_csv_read(df: pd.DataFrame, read_csv_kwargs: dict | None, parse_dates: bool) -> pd.DataFrame:
     """
-    CSV 단일 운영 모드에서는 DB 테이블 존재를 사용하지 않습니다.
-    기존 호출부 호환을 위해 항상 False를 반환합니다.
+    컬럼형 저장소에서 읽은 프레임을 같은 인자로 CSV를 읽은 결과와 맞춥니다.
+    usecols/dtype/keep_default_na를 적용하고 read_csv 추론 규칙으로 컬럼 타입을 맞추며,
+    파싱된 날짜 컬럼(<날짜>_dt)은 parse_dates=True일 때만 남깁니다.
     """
-    _ = (table_name, db_path)
-    return False
+    kwargs = read_csv_kwargs or {}
+    dt_cols = [c for c in df.columns if str(c).endswith(COLUMNAR_DATE_SUFFIX)]
+    parsed = df[dt_cols] if parse_dates else None
+    out = df.drop(columns=dt_cols)
+    usecols = kwargs.get("usecols")
+    if usecols is not None:
+        keep = [c for c in out.columns if usecols(c)] if callable(usecols) else [c for c in out.columns if c in set(usecols)]
+        out = out[keep]
+    dtype = kwargs.get("dtype")
+    out = _infer_like_csv(out, dtype=dtype, keep_default_na=kwargs.get("keep_default_na", True))
+    if isinstance(dtype, dict):
+        for col, kind in dtype.items():
+            if col in out.columns and kind is not str:
+                out[col] = out[col].astype(kind)
+    if parsed is not None:
+        for col in dt_cols:
+            out[col] = parsed[col]
+    return out
+
+
+def _read_columnar(table_name: str, columns: list[str] | None = None, date_range=None) -> pd.DataFrame:
+    spec = COLUMNAR_TABLES[_columnar_key(table_name)]
+    dt_col = f"{spec['date_col']}{COLUMNAR_DATE_SUFFIX}"
+    start, end = _normalize_date_range(date_range)
+    start_key = start.strftime("%Y%m") if start is not None else None
+    end_key = end.strftime("%Y%m") if end is not None else None
+    filters = []
+    if start is not None:
+        filters.append((dt_col, ">=", start))
+    if end is not None:
+        filters.append((dt_col, "<", end + pd.Timedelta(days=1)))
+
+    wanted = set(columns) if columns is not None else None
+    partition_rows = _columnar_row_order(table_name) == "partition"
+    frames = []
+    for part in _columnar_parts(table_name):
+        key = part.stem.replace("part-", "", 1)
+        if key == "unknown" and filters:
+            continue
+        if (start_key and key < start_key) or (end_key and key > end_key):
+            continue
+        names = pq.ParquetFile(part).schema_arrow.names
+        cols = None if wanted is None else [c for c in names if c in wanted or c in (dt_col, COLUMNAR_ROW_COL)]
+        frame = pq.read_table(part, columns=cols, filters=filters or None).to_pandas()
+        if partition_rows and COLUMNAR_ROW_COL in frame.columns:
+            frame = frame.sort_values(COLUMNAR_ROW_COL, kind="stable")
+        frames.append(frame)
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames, ignore_index=True, sort=False)
+    if COLUMNAR_ROW_COL in out.columns:
+        if not partition_rows:
+            out = out.sort_values(COLUMNAR_ROW_COL, kind="stable")
+        out = out.drop(columns=[COLUMNAR_ROW_COL]).reset_index(drop=True)
+    return out
+
+
+def sqlite_enabled(table_name: str) -> bool:
+    """SQLITE_TABLES에 등록된 테이블이고 QUANTBOT_SQLITE=0 으로 끄지 않은 경우 SQLite에도 저장합니다."""
+    if _columnar_key(table_name) not in SQLITE_TABLES:
+        return False
+    return os.environ.get("QUANTBOT_SQLITE", "1").strip() != "0"
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _connect(db_path: str):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def table_exists(table_name: str, db_path: str = "quantbot.db") -> bool:
+    if not os.path.exists(db_path):
+        return False
+    try:
+        with closing(sqlite3.connect(db_path, timeout=30)) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (_columnar_key(table_name),)
+            ).fetchone()
+        return row is not None
+    except sqlite3.Error:
+        return False
 
 
 def table_columns(table_name: str, db_path: str = "quantbot.db") -> list[str]:
-    _ = (table_name, db_path)
-    return []
+    if not table_exists(table_name, db_path):
+        return []
+    with closing(sqlite3.connect(db_path, timeout=30)) as conn:
+        return [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(_columnar_key(table_name))})")]
+
+
+def _sqlite_values(series: pd.Series, as_text: bool = False) -> np.ndarray:
+    """
+    CSV로 썼다가 읽은 것과 같은 값이 되도록 저장 값을 맞춥니다.
+    결측 → NULL, bool → 'True'/'False', 날짜 → to_csv와 같은 문자열. as_text면 모든 값을 문자열로 저장합니다.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.astype(str).to_numpy(dtype=object)
+        values[series.isna().to_numpy()] = None
+        return values
+    values = series.to_numpy(dtype=object, na_value=None) if series.dtype.kind in "biufc" else series.to_numpy(dtype=object)
+    out = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        if v is None or (isinstance(v, float) and v != v) or v is pd.NaT or v is pd.NA:
+            out[i] = None
+        elif isinstance(v, (bool, np.bool_)):
+            out[i] = "True" if v else "False"
+        elif isinstance(v, (np.integer, int)):
+            out[i] = str(int(v)) if as_text else int(v)
+        elif isinstance(v, (np.floating, float)):
+            out[i] = repr(float(v)) if as_text else float(v)
+        else:
+            out[i] = str(v)
+    return out
+
+
+def _sqlite_rows(spec: dict, df: pd.DataFrame) -> list[tuple]:
+    # 키/날짜 컬럼은 문자열로 저장해 20250102와 '20250102'가 같은 키로 비교되게 합니다.
+    text_cols = set(spec.get("key", [])) | {spec.get("partition"), spec.get("date_col")}
+    columns = [_sqlite_values(df[c], as_text=c in text_cols) for c in df.columns]
+    return list(zip(*columns)) if columns else []
+
+
+def _create_sqlite_table(conn, table: str, spec: dict, columns: list[str]):
+    # 선언 타입 없는 컬럼(BLOB 친화도): 넣은 값 그대로 보관하고 읽을 때 CSV와 같은 규칙으로 추론합니다.
+    col_sql = ", ".join(_quote(c) for c in columns)
+    key = [c for c in spec.get("key", []) if c in columns]
+    if key and len(key) == len(spec["key"]):
+        col_sql += f", PRIMARY KEY ({', '.join(_quote(c) for c in key)})"
+    conn.execute(f"CREATE TABLE {_quote(table)} ({col_sql})")
+    for idx_cols in spec.get("indexes", []):
+        if all(c in columns for c in idx_cols):
+            idx_name = f"idx_{table}_{'_'.join(idx_cols)}"
+            conn.execute(f"CREATE INDEX {_quote(idx_name)} ON {_quote(table)} ({', '.join(_quote(c) for c in idx_cols)})")
+
+
+def _insert_sql(table: str, columns: list[str]) -> str:
+    return f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _write_sqlite(table_name: str, df: pd.DataFrame, db_path: str):
+    """테이블 전체 교체(스키마 포함)."""
+    table = _columnar_key(table_name)
+    spec = SQLITE_TABLES[table]
+    columns = [str(c) for c in df.columns]
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+        _create_sqlite_table(conn, table, spec, columns)
+        conn.executemany(_insert_sql(table, columns), _sqlite_rows(spec, df))
+
+
+def _upsert_sqlite(table_name: str, df: pd.DataFrame, db_path: str):
+    """
+    key 테이블: 기본키 충돌 시 나머지 컬럼 갱신(ON CONFLICT DO UPDATE).
+    partition 테이블: 새 프레임에 있는 partition 값(예: 날짜)의 기존 행을 지우고 덧붙입니다.
+    """
+    table = _columnar_key(table_name)
+    spec = SQLITE_TABLES[table]
+    columns = [str(c) for c in df.columns]
+    with closing(_connect(db_path)) as conn, conn:
+        existing = [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+        if not existing:
+            _create_sqlite_table(conn, table, spec, columns)
+            existing = columns
+        for col in columns:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)}")
+        rows = _sqlite_rows(spec, df)
+        key = spec.get("key", [])
+        partition = spec.get("partition")
+        sql = _insert_sql(table, columns)
+        if key and all(c in columns for c in key):
+            updates = [c for c in columns if c not in key]
+            conflict = ", ".join(_quote(c) for c in key)
+            if updates:
+                sql += f" ON CONFLICT ({conflict}) DO UPDATE SET " + ", ".join(f"{_quote(c)}=excluded.{_quote(c)}" for c in updates)
+            else:
+                sql += f" ON CONFLICT ({conflict}) DO NOTHING"
+        elif partition and partition in columns:
+            keys = sorted({r[columns.index(partition)] for r in rows if r[columns.index(partition)] is not None})
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                conn.execute(
+                    f"DELETE FROM {_quote(table)} WHERE {_quote(partition)} IN ({', '.join('?' * len(chunk))})", chunk
+                )
+        conn.executemany(sql, rows)
+
+
+def _csv_stamp(csv_path: str | None):
+    if not csv_path:
+        return None
+    try:
+        stat = Path(resolve_csv_path(csv_path, migrate_legacy_root=False)).stat()
+    except OSError:
+        return None
+    return int(stat.st_mtime_ns), int(stat.st_size)
+
+
+def _record_sync(table_name: str, csv_path: str | None, db_path: str):
+    """SQLite 테이블이 어떤 CSV 상태와 같은 내용인지 기록합니다(CSV가 밖에서 바뀌면 SQLite는 오래된 것으로 봄)."""
+    stamp = _csv_stamp(csv_path) or (None, None)
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {_SYNC_TABLE} (name TEXT PRIMARY KEY, csv_mtime_ns INTEGER, csv_size INTEGER)"
+        )
+        conn.execute(f"INSERT OR REPLACE INTO {_SYNC_TABLE} VALUES (?, ?, ?)", (_columnar_key(table_name), *stamp))
+
+
+def sqlite_fresh(table_name: str, csv_path: str | None = None, db_path: str = "quantbot.db") -> bool:
+    """SQLite 테이블이 있고 마지막 기록 이후 CSV 사본이 바뀌지 않았으면 True."""
+    if not os.path.exists(db_path):
+        return False
+    try:
+        with closing(sqlite3.connect(db_path, timeout=30)) as conn:
+            row = conn.execute(
+                f"SELECT csv_mtime_ns, csv_size FROM {_SYNC_TABLE} WHERE name=?", (_columnar_key(table_name),)
+            ).fetchone()
+    except sqlite3.Error:
+        return False
+    if row is None:
+        return False
+    if not csv_path:
+        return True
+    # CSV가 지워졌거나(기록 당시엔 있었음) 밖에서 바뀌었으면 오래된 것으로 봅니다.
+    return tuple(row) == (_csv_stamp(csv_path) or (None, None))
+
+
+def _drop_sqlite(table_name: str, db_path: str):
+    if not os.path.exists(db_path):
+        return
+    try:
+        with closing(_connect(db_path)) as conn, conn:
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(_columnar_key(table_name))}")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {_SYNC_TABLE} (name TEXT PRIMARY KEY, csv_mtime_ns INTEGER, csv_size INTEGER)")
+            conn.execute(f"DELETE FROM {_SYNC_TABLE} WHERE name=?", (_columnar_key(table_name),))
+    except sqlite3.Error:
+        pass
+
+
+def _csv_text(v) -> str:
+    if isinstance(v, (float, np.floating)):
+        return repr(float(v))
+    if isinstance(v, np.integer):
+        return str(int(v))
+    return str(v)
+
+
+def _infer_like_csv(df: pd.DataFrame, dtype=None, keep_default_na: bool = True) -> pd.DataFrame:
+    """
+    SQLite에서 읽은 컬럼을 read_csv 기본 추론과 같게 맞춥니다.
+    결측 표기 → NaN, 'True'/'False' → bool, 전부 숫자로 읽히면 숫자 컬럼, 아니면 CSV 원문 문자열.
+    dtype=str(또는 컬럼별 str) 지정 컬럼은 원문 문자열로, keep_default_na=False면 결측을 빈 문자열로 둡니다.
+    """
+    if dtype is str:
+        str_cols = set(df.columns)
+    elif isinstance(dtype, dict):
+        str_cols = {c for c, t in dtype.items() if t is str}
+    else:
+        str_cols = set()
+    na_values = _CSV_NA_VALUES if keep_default_na else set()
+    for col in df.columns:
+        series = df[col]
+        if series.dtype.kind in "if" and col not in str_cols and (keep_default_na or not series.isna().any()):
+            continue
+        values = series.to_numpy(dtype=object).copy()
+        null = np.fromiter((v is None or (isinstance(v, float) and v != v) for v in values), dtype=bool, count=len(values))
+        if keep_default_na:
+            na_mask = null | np.fromiter((isinstance(v, str) and v in na_values for v in values), dtype=bool, count=len(values))
+            values[na_mask] = np.nan
+        else:
+            values[null] = ""
+            na_mask = np.zeros(len(values), dtype=bool)
+        present = values[~na_mask]
+        if col not in str_cols and not len(present):
+            df[col] = np.full(len(values), np.nan)
+            continue
+        if col not in str_cols and all(isinstance(v, str) and v in ("True", "False") for v in present):
+            flags = pd.Series(values, index=df.index, dtype=object).map({"True": True, "False": False})
+            df[col] = flags.astype(bool) if not na_mask.any() else flags
+            continue
+        if col not in str_cols:
+            try:
+                df[col] = pd.to_numeric(pd.Series(values, index=df.index, dtype=object))
+                continue
+            except (ValueError, TypeError):
+                pass
+        for i in np.flatnonzero(~na_mask):
+            if not isinstance(values[i], str):
+                values[i] = _csv_text(values[i])
+        df[col] = pd.Series(values, index=df.index, dtype=object)
+    return df
+
+
+def _read_sqlite(
+    table_name: str,
+    db_path: str,
+    columns: list[str] | None = None,
+    date_range=None,
+    stocks=None,
+    dtype=None,
+    keep_default_na: bool = True,
+) -> pd.DataFrame:
+    table = _columnar_key(table_name)
+    spec = SQLITE_TABLES[table]
+    with closing(sqlite3.connect(db_path, timeout=30)) as conn:
+        names = [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+        if not names:
+            return pd.DataFrame()
+        wanted = names if columns is None else [c for c in names if c in set(columns)]
+        if not wanted:
+            return pd.DataFrame()
+        where, params = [], []
+        start, end = _normalize_date_range(date_range)
+        date_col = spec.get("date_col")
+        if date_col in names and (start is not None or end is not None):
+            fmt = spec.get("date_format", "%Y-%m-%d")
+            if start is not None:
+                where.append(f"{_quote(date_col)} >= ?")
+                params.append(start.strftime(fmt))
+            if end is not None:
+                where.append(f"{_quote(date_col)} <= ?")
+                params.append(end.strftime(fmt))
+        if stocks is not None and "종목명" in names:
+            stock_list = [str(s) for s in stocks]
+            if not stock_list:
+                return pd.DataFrame(columns=wanted)
+            where.append(f"{_quote('종목명')} IN (SELECT value FROM json_each(?))")
+            params.append(pd.Series(stock_list).to_json(orient="values", force_ascii=False))
+        sql = f"SELECT {', '.join(_quote(c) for c in wanted)} FROM {_quote(table)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        order_by = [o for o in spec.get("order_by", []) if o.split(" ")[0].strip('"') in names]
+        sql += " ORDER BY " + ", ".join(order_by + ["rowid"])
+        cursor = conn.execute(sql, params)
+        rows = cursor.fetchall()
+    df = pd.DataFrame.from_records(rows, columns=wanted, coerce_float=False)
+    if df.empty:
+        return df
+    return _infer_like_csv(df, dtype=dtype, keep_default_na=keep_default_na)
+
+
+def _read_csv_projected(path: str, table_name: str, read_csv_kwargs: dict | None, columns, date_range) -> pd.DataFrame:
+    kwargs = dict(read_csv_kwargs or {})
+    kwargs.setdefault("encoding", "utf-8-sig")
+    if columns is not None and "usecols" not in kwargs:
+        wanted = set(columns)
+        kwargs["usecols"] = lambda c: c in wanted
+    df = pd.read_csv(path, **kwargs)
+    start, end = _normalize_date_range(date_range)
+    if start is None and end is None:
+        return df
+    spec = COLUMNAR_TABLES.get(_columnar_key(table_name))
+    sqlite_spec = SQLITE_TABLES.get(_columnar_key(table_name), {})
+    if spec and spec["date_col"] in df.columns:
+        day = parse_date_values(df[spec["date_col"]]).dt.normalize()
+        mask = day.notna()
+        if start is not None:
+            mask &= day >= start
+        if end is not None:
+            mask &= day <= end
+        df = df[mask].reset_index(drop=True)
+    elif sqlite_spec.get("date_col") in df.columns:
+        # _read_sqlite와 같은 규칙: 저장 형식 문자열끼리 비교하고 결측은 제외합니다.
+        col = df[sqlite_spec["date_col"]]
+        fmt = sqlite_spec.get("date_format", "%Y-%m-%d")
+        text = col.map(_csv_text)
+        mask = col.notna()
+        if start is not None:
+            mask &= text >= start.strftime(fmt)
+        if end is not None:
+            mask &= text <= end.strftime(fmt)
+        df = df[mask].reset_index(drop=True)
+    return df
+
+
+def _filter_stocks(df: pd.DataFrame, stocks) -> pd.DataFrame:
+    if stocks is None or df.empty or "종목명" not in df.columns:
+        return df
+    wanted = {str(x) for x in stocks}
+    return df[df["종목명"].astype(str).isin(wanted)].reset_index(drop=True)
 
 
 def read_table(
@@ -51,27 +781,103 @@ def read_table(
     csv_fallback: str | None = None,
     read_csv_kwargs: dict | None = None,
     db_path: str = "quantbot.db",
+    columns: list[str] | None = None,
+    date_range: tuple | None = None,
+    stocks=None,
+    categories: bool = False,
+    parse_dates: bool = False,
 ) -> pd.DataFrame:
-    _ = (table_name, db_path)
+    """
+    columns: 필요한 컬럼만 읽습니다(없는 컬럼은 무시).
+    date_range: (시작일, 종료일) 포함 구간. 컬럼형 테이블은 월 파티션/행 그룹 단위로 걸러 읽습니다.
+    stocks: 종목명 목록. SQLite 테이블은 인덱스로 해당 종목 행만 조회합니다.
+    categories: TABLE_SCHEMAS의 categorical 컬럼(종목명/테마/진입유형)을 category dtype으로 돌려줍니다.
+    parse_dates: 스키마 날짜 컬럼의 <컬럼>_dt(datetime)를 붙여 돌려줍니다(컬럼형 저장소는 저장된 값을 그대로 사용).
+    TABLE_SCHEMAS에 등록된 테이블은 text 컬럼을 문자열로 파싱하고 numeric 컬럼을 숫자로 맞춰 돌려줍니다.
+    어느 저장소에서 읽어도 같은 인자면 같은 프레임을 돌려줍니다.
+    읽는 순서: 컬럼형(CSV와 같은 상태이고 종목 조회가 아니면) → SQLite(CSV와 같은 상태일 때) → CSV.
+    """
+    kwargs, use_schema = _schema_read_kwargs(table_name, read_csv_kwargs)
+    df = _read_table_raw(table_name, csv_fallback, kwargs, db_path, columns, date_range, stocks, parse_dates)
+    if use_schema:
+        df = apply_table_schema(df, table_name, categories=categories)
+    if parse_dates:
+        df = parse_table_dates(df, table_name)
+    return df
+
+
+def _read_table_raw(table_name, csv_fallback, read_csv_kwargs, db_path, columns, date_range, stocks, parse_dates=False) -> pd.DataFrame:
+    use_sqlite = sqlite_enabled(table_name) and sqlite_fresh(table_name, csv_fallback, db_path)
+    use_columnar = columnar_exists(table_name) and _columnar_readable(read_csv_kwargs) and not (use_sqlite and stocks is not None)
+    if use_columnar and not columnar_fresh(table_name, csv_fallback):
+        csv_available = bool(csv_fallback) and (os.path.exists(resolve_csv_path(csv_fallback)) or os.path.exists(csv_fallback))
+        # CSV가 밖에서 바뀌었으면(손 편집/git 머지) 오래된 파티션 대신 CSV를 읽습니다. CSV가 없으면 컬럼형이 유일한 원본입니다.
+        use_columnar = not csv_available
+    if use_columnar:
+        try:
+            df = _filter_stocks(_read_columnar(table_name, columns=columns, date_range=date_range), stocks)
+            # 빈 결과는 컬럼/타입을 정할 행이 없으므로, CSV가 있으면 CSV 결과(빈 프레임 + CSV 스키마)를 씁니다.
+            if not df.empty or not csv_fallback or not os.path.exists(resolve_csv_path(csv_fallback)):
+                return _like_csv_read(df, read_csv_kwargs, parse_dates)
+        except Exception as e:
+            print(f"[WARN] 컬럼형 저장소 읽기 실패({_columnar_key(table_name)}), CSV로 대체합니다: {e}")
+    if use_sqlite:
+        try:
+            return _read_sqlite(
+                table_name, db_path, columns=columns, date_range=date_range, stocks=stocks,
+                dtype=read_csv_kwargs.get("dtype"), keep_default_na=read_csv_kwargs.get("keep_default_na", True),
+            )
+        except Exception as e:
+            print(f"[WARN] SQLite 읽기 실패({_columnar_key(table_name)}), CSV로 대체합니다: {e}")
     resolved_csv = resolve_csv_path(csv_fallback) if csv_fallback else None
     if resolved_csv and os.path.exists(resolved_csv):
         try:
-            kwargs = read_csv_kwargs or {}
-            kwargs.setdefault("encoding", "utf-8-sig")
-            return pd.read_csv(resolved_csv, **kwargs)
+            return _filter_stocks(_read_csv_projected(resolved_csv, table_name, read_csv_kwargs, columns, date_range), stocks)
         except Exception:
             return pd.DataFrame()
     if csv_fallback and os.path.exists(csv_fallback):
         # 레거시 루트 fallback (이동 실패 시)
         try:
-            kwargs = read_csv_kwargs or {}
-            kwargs.setdefault("encoding", "utf-8-sig")
-            return pd.read_csv(csv_fallback, **kwargs)
+            return _filter_stocks(_read_csv_projected(csv_fallback, table_name, read_csv_kwargs, columns, date_range), stocks)
         except Exception:
             return pd.DataFrame()
     return pd.DataFrame()
 
 
+def _atomic_to_csv(df: pd.DataFrame, path: str, csv_kwargs: dict | None):
+    """임시 파일에 쓴 뒤 rename으로 교체합니다(중간에 죽어도 반쯤 쓴 CSV가 남지 않음)."""
+    tmp = f"{path}.tmp"
+    try:
+        df.to_csv(tmp, **(csv_kwargs or {}))
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_files(table_name: str, df: pd.DataFrame, csv_path: str | None, csv_kwargs: dict | None):
+    """컬럼형 저장소와 CSV 사본을 씁니다."""
+    columnar_written = False
+    if columnar_enabled(table_name):
+        try:
+            row_order = _write_columnar(table_name, df)
+            columnar_written = True
+        except Exception as e:
+            print(f"[WARN] 컬럼형 저장소 쓰기 실패({_columnar_key(table_name)}), CSV만 갱신합니다: {e}")
+    if not columnar_written and _columnar_key(table_name) in COLUMNAR_TABLES:
+        # pyarrow 없는 환경에서 CSV만 갱신하면 기존 Parquet이 오래된 값으로 남으므로 제거
+        _drop_columnar(table_name)
+    if csv_path:
+        resolved_csv = resolve_csv_path(csv_path)
+        if columnar_written and not csv_mirror_enabled():
+            if os.path.exists(resolved_csv):
+                os.remove(resolved_csv)
+        else:
+            _atomic_to_csv(df, resolved_csv, csv_kwargs)
+    if columnar_written:
+        _record_columnar_sync(table_name, csv_path, row_order)
+
+
 def write_table(
     table_name: str,
     df: pd.DataFrame,
@@ -79,28 +885,471 @@ def write_table(
     csv_kwargs: dict | None = None,
     db_path: str = "quantbot.db",
 ):
-    _ = (table_name, db_path)
-    if csv_path:
-        kwargs = csv_kwargs or {}
+    key = _columnar_key(table_name)
+    _TABLE_VERSIONS[key] = _TABLE_VERSIONS.get(key, 0) + 1
+    _write_files(table_name, df, csv_path, csv_kwargs)
+    if sqlite_enabled(table_name):
+        try:
+            _write_sqlite(table_name, df, db_path)
+            _record_sync(table_name, csv_path, db_path)
+        except Exception as e:
+            print(f"[WARN] SQLite 쓰기 실패({key}), CSV/컬럼형 저장소만 갱신합니다: {e}")
+            _drop_sqlite(table_name, db_path)
+
+
+def _order_columns(spec: dict) -> list[tuple[str, bool]]:
+    """SQLITE_TABLES order_by → [(컬럼, 오름차순 여부)]."""
+    return [(o.split(" ")[0].strip('"'), o.endswith("ASC")) for o in spec.get("order_by", [])]
+
+
+def _sort_rows(rows: list, order: list[tuple[int, bool]]) -> list:
+    """
+    (필드 목록, ...) 행을 order [(필드 위치, 오름차순)]의 문자열 비교로 안정 정렬합니다.
+    _merge_upsert의 sort_values(key=astype(str), kind="stable")와 같은 순서입니다.
+    """
+    out = list(rows)
+    for idx, asc in reversed(order):
+        out.sort(key=lambda row: row[0][idx], reverse=not asc)
+    return out
+
+
+def _merge_upsert(spec: dict, existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """SQLite를 못 쓸 때 같은 upsert 결과를 pandas로 만듭니다."""
+    if existing is None or existing.empty:
+        merged = new.copy()
+    else:
+        # 컬럼형 저장소에서 읽은 파싱 날짜(일자_dt)는 새 행에 없으므로 버리고 저장 시 다시 만듭니다.
+        existing = existing.drop(
+            columns=[c for c in existing.columns if str(c).endswith(COLUMNAR_DATE_SUFFIX) and c not in new.columns]
+        )
+        key = spec.get("key", [])
+        partition = spec.get("partition")
+        if key and set(key).issubset(existing.columns) and set(key).issubset(new.columns):
+            new_keys = pd.MultiIndex.from_frame(new[key].astype(str))
+            keep = ~pd.MultiIndex.from_frame(existing[key].astype(str)).isin(new_keys)
+        elif partition and partition in existing.columns and partition in new.columns:
+            keep = ~existing[partition].astype(str).isin(set(new[partition].astype(str)))
+        else:
+            keep = np.ones(len(existing), dtype=bool)
+        merged = pd.concat([existing[keep], new], ignore_index=True, sort=False)
+    order = [(c, asc) for c, asc in _order_columns(spec) if c in merged.columns]
+    if order:
+        merged = merged.sort_values(
+            [c for c, _ in order], ascending=[asc for _, asc in order], key=lambda col: col.astype(str), kind="stable"
+        )
+    return merged.reset_index(drop=True)
+
+
+def _formatted_date(value: str, fmt: str) -> bool:
+    try:
+        return datetime.strptime(value, fmt).strftime(fmt) == value
+    except ValueError:
+        return False
+
+
+def _csv_upsert_bytes(resolved_csv: str, df: pd.DataFrame, spec: dict, csv_kwargs: dict) -> bytes | None:
+    """
+    날짜 내림차순으로 정렬된 key 테이블 CSV(history)에 df 행을 반영한 새 파일 내용을 만듭니다.
+    df의 가장 이른 날짜 이상인 앞부분만 다시 정렬해 만들고, 그 뒤 바이트는 그대로 이어 붙입니다(기존 행 재직렬화 없음).
+    정렬/헤더/날짜 형식이 맞지 않아 안전하게 못 하면 None.
+    """
+    key = spec.get("key", [])
+    date_col = spec.get("date_col")
+    fmt = spec.get("date_format", "%Y-%m-%d")
+    order = _order_columns(spec)
+    if not key or not order or order[0] != (date_col, False) or csv_kwargs.get("index", True) is not False:
+        return None
+    with open(resolved_csv, "rb") as f:
+        data = f.read()
+    if not data.endswith(b"\n"):
+        return None
+    header_end = data.find(b"\n") + 1
+    header_line = data[:header_end]
+    try:
+        header = next(csv.reader([header_line.decode("utf-8-sig").rstrip("\r\n")]))
+    except (UnicodeDecodeError, StopIteration, csv.Error):
+        return None
+    needed = set(key) | {c for c, _ in order}
+    if len(set(header)) != len(header) or not needed.issubset(header) or not {str(c) for c in df.columns}.issubset(header):
+        return None
+
+    def _fields(line: bytes):
+        try:
+            fields = next(csv.reader([line.decode("utf-8")]))
+        except (UnicodeDecodeError, StopIteration, csv.Error):
+            return None
+        return fields if len(fields) == len(header) else None
+
+    kwargs = {k: v for k, v in csv_kwargs.items() if k not in ("index", "header", "encoding")}
+    terminator = "\r\n" if header_line.endswith(b"\r\n") else "\n"
+    text = df.reindex(columns=header).to_csv(index=False, header=False, lineterminator=terminator, **kwargs)
+    new_rows = []
+    for line in text.encode("utf-8").split(terminator.encode("utf-8"))[:-1]:
+        fields = _fields(line)
+        if fields is None:
+            return None
+        new_rows.append((fields, line + terminator.encode("utf-8")))
+    date_idx = header.index(date_col)
+    if len(new_rows) != len(df) or not all(_formatted_date(f[date_idx], fmt) for f, _ in new_rows):
+        return None
+    min_date = min(f[date_idx] for f, _ in new_rows)
+
+    head, pos = [], header_end
+    while pos < len(data):
+        end = data.find(b"\n", pos) + 1
+        fields = _fields(data[pos:end].rstrip(b"\r\n"))
+        if fields is None or not _formatted_date(fields[date_idx], fmt):
+            return None
+        if fields[date_idx] < min_date:
+            break
+        head.append((fields, data[pos:end]))
+        pos = end
+    sort_order = [(header.index(c), asc) for c, asc in order]
+    # 기존 앞부분이 이미 정렬돼 있어야 뒷부분을 그대로 둔 결과가 전체 병합 결과와 같습니다.
+    if [line for _, line in _sort_rows(head, sort_order)] != [line for _, line in head]:
+        return None
+    key_idx = [header.index(c) for c in key]
+    new_keys = {tuple(f[i] for i in key_idx) for f, _ in new_rows}
+    kept = [row for row in head if tuple(row[0][i] for i in key_idx) not in new_keys]
+    merged = _sort_rows(kept + new_rows, sort_order)
+    return b"".join([header_line, *(line for _, line in merged), data[pos:]])
+
+
+def _columnar_upsert_parts(table_name: str, df: pd.DataFrame, spec: dict) -> list | None:
+    """
+    df 행이 닿는 월 파티션만 [(경로, 새 파티션 프레임)]으로 만듭니다. 다른 월 파티션은 건드리지 않습니다.
+    파티션 안 행 번호 방식이 아니거나 스키마가 맞지 않으면 None.
+    """
+    key = spec.get("key", [])
+    order = _order_columns(spec)
+    if not key or not columnar_exists(table_name) or _columnar_row_order(table_name) != "partition":
+        return None
+    new, part_keys = _columnar_frame(table_name, df)
+    if (part_keys == "unknown").any():
+        return None
+    table_dir = columnar_table_dir(table_name)
+    columns = pq.ParquetFile(_columnar_parts(table_name)[0]).schema_arrow.names
+    if not set(new.columns).issubset(columns):
+        return None
+    parts = []
+    for month, rows in new.groupby(part_keys, sort=False):
+        target = table_dir / f"part-{month}.parquet"
+        existing = pd.read_parquet(target) if target.exists() else pd.DataFrame(columns=columns)
+        if list(existing.columns) != columns:
+            return None
+        existing = existing.sort_values(COLUMNAR_ROW_COL, kind="stable")
+        new_keys = pd.MultiIndex.from_frame(rows[key].astype(str))
+        keep = ~pd.MultiIndex.from_frame(existing[key].astype(str)).isin(new_keys)
+        frames = [f for f in (existing[keep], rows.reindex(columns=columns)) if not f.empty]
+        part = pd.concat(frames, ignore_index=True, sort=False)
+        part = part.sort_values(
+            [c for c, _ in order], ascending=[asc for _, asc in order], key=lambda col: col.astype(str), kind="stable"
+        ).reset_index(drop=True)
+        part[COLUMNAR_ROW_COL] = np.arange(len(part), dtype=np.int64)
+        parts.append((target, part))
+    return parts
+
+
+def _upsert_files(table_name: str, df: pd.DataFrame, csv_path: str | None, csv_kwargs: dict | None, spec: dict) -> bool:
+    """
+    CSV/컬럼형 사본에 df 행만 반영합니다. CSV는 df의 가장 이른 날짜 이후 앞부분만, 컬럼형은 df가 닿는 월 파티션만 다시 씁니다.
+    두 사본의 새 내용을 모두 만든 뒤에만 파일을 바꾸며, 하나라도 부분 갱신이 안 되면 아무것도 바꾸지 않고 False.
+    """
+    csv_kwargs = dict(csv_kwargs or {})
+    use_columnar = columnar_enabled(table_name)
+    resolved_csv = resolve_csv_path(csv_path) if csv_path else None
+    keep_csv = resolved_csv is not None and not (use_columnar and not csv_mirror_enabled())
+    csv_bytes = None
+    if keep_csv:
+        if not os.path.exists(resolved_csv) or csv_has_conflict_markers(resolved_csv):
+            return False
+        csv_bytes = _csv_upsert_bytes(resolved_csv, df, spec, csv_kwargs)
+        if csv_bytes is None:
+            return False
+    parts = []
+    if use_columnar:
+        parts = _columnar_upsert_parts(table_name, df, spec)
+        if parts is None:
+            return False
+    elif _columnar_key(table_name) in COLUMNAR_TABLES:
+        _drop_columnar(table_name)
+    for target, part in parts:
+        _write_columnar_part(target, part)
+    if csv_bytes is not None:
+        tmp = f"{resolved_csv}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(csv_bytes)
+            os.replace(tmp, resolved_csv)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    elif resolved_csv and os.path.exists(resolved_csv):
+        os.remove(resolved_csv)
+    if use_columnar:
+        _record_columnar_sync(table_name, csv_path, "partition")
+    return True
+
+
+def _sqlite_row_count(table_name: str, db_path: str) -> int:
+    with closing(sqlite3.connect(db_path, timeout=30)) as conn:
+        return int(conn.execute(f"SELECT COUNT(*) FROM {_quote(_columnar_key(table_name))}").fetchone()[0])
+
+
+def upsert_table(
+    table_name: str,
+    df: pd.DataFrame,
+    csv_path: str | None = None,
+    csv_kwargs: dict | None = None,
+    db_path: str = "quantbot.db",
+) -> int:
+    """
+    SQLITE_TABLES의 key/partition 기준으로 df 행을 반영하고 반영 후 전체 행 수를 돌려줍니다(같은 key가 여러 번이면 마지막 행).
+    SQLite가 CSV와 같은 상태면 DB에는 바뀐 행만 쓰고, 사본도 바뀐 부분만 고칩니다(_upsert_files).
+    사본을 부분 갱신할 수 없으면(정렬/스키마 불일치, 파티션 테이블 등) DB 내용으로 사본 전체를 다시 씁니다.
+    SQLite를 못 쓰면 기존 테이블을 읽어 pandas로 같은 규칙으로 병합한 뒤 write_table로 저장합니다.
+    """
+    key = _columnar_key(table_name)
+    spec = SQLITE_TABLES.get(key)
+    if spec is None:
+        raise ValueError(f"upsert 기준(key/partition)이 등록되지 않은 테이블입니다: {key}")
+    if df is None or df.empty:
+        return len(read_table(table_name, csv_fallback=csv_path, db_path=db_path))
+    if spec.get("key") and set(spec["key"]).issubset(df.columns):
+        df = df[~df[spec["key"]].astype(str).duplicated(keep="last")]
+    with _table_lock(table_name):
+        if sqlite_enabled(table_name) and sqlite_fresh(table_name, csv_path, db_path):
+            try:
+                mirrors_fresh = not columnar_enabled(table_name) or columnar_fresh(table_name, csv_path)
+                _upsert_sqlite(table_name, df, db_path)
+                _TABLE_VERSIONS[key] = _TABLE_VERSIONS.get(key, 0) + 1
+                if not (mirrors_fresh and _upsert_files(table_name, df, csv_path, csv_kwargs, spec)):
+                    _write_files(table_name, _read_sqlite(table_name, db_path), csv_path, csv_kwargs)
+                _record_sync(table_name, csv_path, db_path)
+                return _sqlite_row_count(table_name, db_path)
+            except Exception as e:
+                print(f"[WARN] SQLite upsert 실패({key}), 전체 병합 저장으로 대체합니다: {e}")
+                _drop_sqlite(table_name, db_path)
+        existing = read_table(table_name, csv_fallback=csv_path, read_csv_kwargs={"on_bad_lines": "skip"}, db_path=db_path)
+        merged = _merge_upsert(spec, existing, df)
+        write_table(table_name, merged, csv_path=csv_path, csv_kwargs=csv_kwargs, db_path=db_path)
+        return len(merged)
+
+
+def _table_lock(table_name: str) -> threading.Lock:
+    key = _columnar_key(table_name)
+    with _TABLE_LOCKS_GUARD:
+        return _TABLE_LOCKS.setdefault(key, threading.Lock())
+
+
+def csv_has_conflict_markers(csv_path: str) -> bool:
+    """CSV 원문에 머지 충돌 표식 줄이 있으면 True. 파일 상태(mtime/size)별로 캐시해 반복 조회는 비용이 없습니다."""
+    path = resolve_csv_path(csv_path, migrate_legacy_root=False)
+    stamp = _csv_stamp(path)
+    if stamp is None:
+        return False
+    cache_key = (path, *stamp)
+    if cache_key not in _MARKER_CACHE:
+        with open(path, "rb") as f:
+            data = f.read()
+        data = data[3:] if data.startswith(b"\xef\xbb\xbf") else data
+        _MARKER_CACHE[cache_key] = any(data.startswith(m) or b"\n" + m in data for m in CONFLICT_MARKERS)
+    return _MARKER_CACHE[cache_key]
+
+
+def _tail_start(data: bytes, header_end: int, date_idx: int, n_cols: int, dates: set[str]) -> int | None:
+    """
+    파일 끝에서부터 date_col 값이 dates에 속한 연속 행을 거슬러 올라가 그 시작 바이트 위치를 돌려줍니다.
+    필드 수가 헤더와 다른 줄(여러 줄 셀, 깨진 행)을 만나면 안전하게 None.
+    """
+    cut = len(data)
+    while cut > header_end:
+        nl = data.rfind(b"\n", header_end, cut - 1)
+        line_start = nl + 1 if nl >= 0 else header_end
+        line = data[line_start:cut].rstrip(b"\r\n")
+        try:
+            fields = next(csv.reader([line.decode("utf-8")]))
+        except (UnicodeDecodeError, StopIteration, csv.Error):
+            return None
+        if len(fields) != n_cols:
+            return None
+        if fields[date_idx] not in dates:
+            break
+        cut = line_start
+    return cut
+
+
+def _append_csv_tail(resolved_csv: str, df: pd.DataFrame, date_col: str, csv_kwargs: dict) -> bool:
+    """
+    date_col 값이 같은 기존 행(파일 끝에 연속으로 있어야 함)만 잘라내고 새 행을 덧붙여 임시 파일→rename으로 교체합니다.
+    앞부분은 바이트 그대로 복사하므로 기존 행을 다시 파싱/직렬화하지 않습니다. 조건이 안 맞으면 False.
+    """
+    if csv_kwargs.get("index", True) is not False:
+        return False
+    with open(resolved_csv, "rb") as f:
+        data = f.read()
+    if not data.endswith(b"\n"):
+        return False
+    header_end = data.find(b"\n") + 1
+    header_line = data[:header_end]
+    try:
+        header = next(csv.reader([header_line.decode("utf-8-sig").rstrip("\r\n")]))
+    except (UnicodeDecodeError, StopIteration, csv.Error):
+        return False
+    new_cols = [str(c) for c in df.columns]
+    if date_col not in header or len(set(header)) != len(header) or not set(new_cols).issubset(header):
+        return False
+    dates = set(df[date_col].astype(str))
+    cut = _tail_start(data, header_end, header.index(date_col), len(header), dates)
+    if cut is None:
+        return False
+    head = data[:cut]
+    # 같은 날짜가 앞부분에도 있으면(정렬이 깨진 파일) 통째로 다시 써야 합니다.
+    if any(d.encode("utf-8") in head[header_end:] for d in dates):
+        return False
+    kwargs = {k: v for k, v in csv_kwargs.items() if k not in ("index", "header", "encoding")}
+    kwargs["lineterminator"] = "\r\n" if header_line.endswith(b"\r\n") else "\n"
+    rows = df.reindex(columns=header).to_csv(index=False, header=False, **kwargs).encode("utf-8")
+    tmp = f"{resolved_csv}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(head)
+            f.write(rows)
+        os.replace(tmp, resolved_csv)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return True
+
+
+def append_by_date(
+    table_name: str,
+    df: pd.DataFrame,
+    csv_path: str,
+    date_col: str = "날짜",
+    csv_kwargs: dict | None = None,
+    db_path: str = "quantbot.db",
+    load_existing=None,
+) -> str:
+    """
+    date_col 값(보통 오늘 날짜) 단위로 행을 교체/추가합니다. 반환: "create" / "append" / "rewrite" / "skip"(빈 입력).
+    - append: 기존 CSV 끝의 같은 날짜 행만 잘라내고 새 행만 직렬화해 덧붙입니다(임시 파일→rename).
+      SQLite가 CSV와 같은 상태였으면 해당 날짜 파티션만 upsert합니다.
+    - rewrite: 충돌 표식/정렬 깨짐/스키마 변경 등으로 끝부분 교체가 안전하지 않을 때
+      load_existing()(없으면 read_table)으로 읽어 같은 날짜를 빼고 합친 전체를 write_table로 씁니다.
+    """
+    csv_kwargs = dict(csv_kwargs or {})
+    key = _columnar_key(table_name)
+    if df is None or df.empty or date_col not in df.columns:
+        return "skip"
+    with _table_lock(table_name):
         resolved_csv = resolve_csv_path(csv_path)
-        df.to_csv(resolved_csv, **kwargs)
+        if not csv_exists(csv_path):
+            write_table(table_name, df, csv_path=csv_path, csv_kwargs=csv_kwargs, db_path=db_path)
+            return "create"
+        if (
+            not columnar_enabled(table_name)
+            and os.path.exists(resolved_csv)
+            and not csv_has_conflict_markers(resolved_csv)
+        ):
+            was_fresh = sqlite_enabled(table_name) and sqlite_fresh(table_name, csv_path, db_path)
+            try:
+                appended = _append_csv_tail(resolved_csv, df, date_col, csv_kwargs)
+            except Exception as e:
+                print(f"[WARN] {key} 끝부분 추가 실패, 전체 저장으로 대체합니다: {e}")
+                appended = False
+            if appended:
+                _TABLE_VERSIONS[key] = _TABLE_VERSIONS.get(key, 0) + 1
+                if was_fresh:
+                    try:
+                        _upsert_sqlite(table_name, df, db_path)
+                        _record_sync(table_name, csv_path, db_path)
+                    except Exception as e:
+                        print(f"[WARN] SQLite upsert 실패({key}), 다음 실행에서 CSV로 다시 적재합니다: {e}")
+                        _drop_sqlite(table_name, db_path)
+                return "append"
+        if load_existing is not None:
+            existing = load_existing()
+        else:
+            existing = read_table(table_name, csv_fallback=csv_path, read_csv_kwargs={"on_bad_lines": "skip"}, db_path=db_path)
+        if existing is not None and not existing.empty and date_col in existing.columns:
+            existing = existing[~existing[date_col].astype(str).isin(set(df[date_col].astype(str)))]
+            merged = pd.concat([existing, df], ignore_index=True)
+        else:
+            merged = df
+        write_table(table_name, merged, csv_path=csv_path, csv_kwargs=csv_kwargs, db_path=db_path)
+        return "rewrite"
+
+
+def _compact(table_name: str, csv_path: str, load_existing, csv_kwargs: dict | None, db_path: str):
+    key = _columnar_key(table_name)
+    with _table_lock(table_name):
+        if not csv_has_conflict_markers(csv_path):
+            return
+        try:
+            df = load_existing()
+            write_table(table_name, df, csv_path=csv_path, csv_kwargs=csv_kwargs, db_path=db_path)
+            print(f"🧹 {key} 정리 완료: 충돌 표식 제거 후 {len(df):,}행 재저장")
+        except Exception as e:
+            print(f"[WARN] {key} 백그라운드 정리 실패: {e}")
+
+
+def compact_in_background(
+    table_name: str,
+    csv_path: str,
+    load_existing,
+    csv_kwargs: dict | None = None,
+    db_path: str = "quantbot.db",
+) -> threading.Thread | None:
+    """
+    CSV에 머지 충돌 표식이 있으면 load_existing()으로 정리해 읽은 내용을 백그라운드 스레드에서 다시 씁니다.
+    같은 테이블의 append_by_date는 정리가 끝날 때까지 기다리므로, 정리 후에는 다시 끝부분 추가 경로를 탑니다.
+    """
+    if not csv_exists(csv_path) or not csv_has_conflict_markers(csv_path):
+        return None
+    thread = threading.Thread(
+        target=_compact,
+        args=(table_name, csv_path, load_existing, csv_kwargs, db_path),
+        name=f"compact-{_columnar_key(table_name)}",
+    )
+    thread.start()
+    _COMPACTIONS.append(thread)
+    return thread
+
+
+def wait_for_compactions(timeout: float | None = None):
+    for thread in list(_COMPACTIONS):
+        thread.join(timeout)
+        if not thread.is_alive():
+            _COMPACTIONS.remove(thread)
 
 
 def migrate_csv_to_sqlite_once(table_csv_pairs: list[tuple[str, str]], db_path: str = "quantbot.db"):
     """
-    CSV 단일 운영 모드:
     - legacy 루트 CSV를 data/로 정리
-    - 기존 호출부 호환을 위해 함수명/시그니처 유지
+    - 컬럼형 테이블은 저장소가 없거나 CSV가 밖에서 바뀌었으면 CSV로 다시 생성
+    - SQLite 테이블은 없거나 CSV가 밖에서 바뀌었으면(git pull 등) CSV로 다시 적재
     """
-    _ = db_path
     for table_name, csv_path in table_csv_pairs:
-        _ = table_name
         resolved_csv = resolve_csv_path(csv_path)
-        if os.path.exists(resolved_csv):
-            continue
-        if os.path.exists(csv_path):
+        if not os.path.exists(resolved_csv) and os.path.exists(csv_path):
             try:
                 Path(resolved_csv).parent.mkdir(parents=True, exist_ok=True)
                 shutil.move(csv_path, resolved_csv)
             except Exception:
                 continue
+        if columnar_enabled(table_name) and os.path.exists(resolved_csv) and not columnar_fresh(table_name, csv_path):
+            try:
+                row_order = _write_columnar(table_name, pd.read_csv(resolved_csv, encoding="utf-8-sig", on_bad_lines="skip"))
+                _record_columnar_sync(table_name, csv_path, row_order)
+            except Exception as e:
+                print(f"[WARN] 컬럼형 저장소 초기 생성 실패({_columnar_key(table_name)}): {e}")
+        if sqlite_enabled(table_name) and os.path.exists(resolved_csv) and not sqlite_fresh(table_name, csv_path, db_path):
+            try:
+                # CSV 원문 그대로 적재해야 읽을 때 read_csv와 같은 추론 결과(앞자리 0 등 포함)가 나옵니다.
+                raw = pd.read_csv(resolved_csv, encoding="utf-8-sig", on_bad_lines="skip", dtype=str, keep_default_na=False)
+                _write_sqlite(table_name, raw, db_path)
+                _record_sync(table_name, csv_path, db_path)
+            except Exception as e:
+                print(f"[WARN] SQLite 초기 적재 실패({_columnar_key(table_name)}): {e}")
+                _drop_sqlite(table_name, db_path)
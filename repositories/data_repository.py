@@ -1,8 +1,20 @@
 import os
 
+import numpy as np
 import pandas as pd
 
-from db_utils import read_table, write_table, table_exists, csv_exists, resolve_csv_path
+from db_utils import (
+    TABLE_SCHEMAS,
+    append_by_date,
+    csv_exists,
+    csv_has_conflict_markers,
+    parse_table_dates,
+    read_table,
+    resolve_csv_path,
+    table_exists,
+    upsert_table,
+    write_table,
+)
 
 
 def _table_name_for(csv_path):
@@ -10,11 +22,14 @@ def _table_name_for(csv_path):
     return os.path.basename(base)
 
 
-def read_table_prefer_db(csv_path, **kwargs):
+def read_table_prefer_db(csv_path, columns=None, date_range=None, stocks=None, **kwargs):
     return read_table(
         _table_name_for(csv_path),
         csv_fallback=csv_path,
         read_csv_kwargs=kwargs,
+        columns=columns,
+        date_range=date_range,
+        stocks=stocks,
     )
 
 
@@ -27,9 +42,36 @@ def write_table_dual(df, csv_path, **kwargs):
     )
 
 
+def upsert_table_dual(df, csv_path, **kwargs):
+    """키/날짜 기준 upsert 후 반영된 전체 행 수를 돌려줍니다(db_utils.SQLITE_TABLES 등록 테이블만)."""
+    return upsert_table(
+        _table_name_for(csv_path),
+        df,
+        csv_path=csv_path,
+        csv_kwargs=kwargs,
+    )
+
+
+def append_table_by_date(df, csv_path, date_col="날짜", load_existing=None, **kwargs):
+    """date_col 값 단위로 기존 행을 교체/추가합니다(가능하면 CSV 끝부분만 원자적으로 갱신)."""
+    return append_by_date(
+        _table_name_for(csv_path),
+        df,
+        csv_path=csv_path,
+        date_col=date_col,
+        csv_kwargs=kwargs,
+        load_existing=load_existing,
+    )
+
+
+def load_history_table():
+    """대시보드/에이전트/텔레그램이 시뮬레이션에 넘기는 이력 프레임. 같은 프레임이어야 시뮬레이션 캐시 키가 일치합니다."""
+    return read_table_prefer_db("history.csv")
+
+
 def load_data():
     df_summary = read_table_prefer_db("data.csv")
-    df_hist = read_table_prefer_db("history.csv")
+    df_hist = load_history_table()
     return df_summary, df_hist
 
 
@@ -43,16 +85,20 @@ def load_score_trend_safe():
         return pd.DataFrame(columns=base_cols)
 
     df.columns = [str(c).replace("\ufeff", "").strip() for c in df.columns]
-    bad_cols = [c for c in df.columns if any(x in str(c) for x in ["<<<<<<<", "=======", ">>>>>>>"])]
-    if bad_cols:
-        df = df.drop(columns=bad_cols, errors="ignore")
+    # 원자적 쓰기로 저장되므로 충돌 표식은 git 머지에서만 생깁니다. 원문에 표식이 있을 때만 걸러냅니다.
+    has_markers = csv_has_conflict_markers("score_trend.csv")
+    if has_markers:
+        bad_cols = [c for c in df.columns if any(x in str(c) for x in ["<<<<<<<", "=======", ">>>>>>>"])]
+        if bad_cols:
+            df = df.drop(columns=bad_cols, errors="ignore")
 
     if not set(base_cols).issubset(df.columns):
         return pd.DataFrame(columns=base_cols)
 
-    marker_pat = r"^(?:<<<<<<<|=======|>>>>>>>)"
-    df = df[~df["날짜"].astype(str).str.contains(marker_pat, regex=True, na=False)]
-    df = df[~df["종목명"].astype(str).str.contains(marker_pat, regex=True, na=False)]
+    if has_markers:
+        marker_pat = r"^(?:<<<<<<<|=======|>>>>>>>)"
+        df = df[~df["날짜"].astype(str).str.contains(marker_pat, regex=True, na=False)]
+        df = df[~df["종목명"].astype(str).str.contains(marker_pat, regex=True, na=False)]
     df["날짜"] = df["날짜"].astype(str).str.strip()
     df = df.dropna(subset=["날짜", "종목명", "순위"])
     return df
@@ -77,8 +123,6 @@ def load_performance_trend_safe():
 
     marker_pat = r"^(?:<<<<<<<|=======|>>>>>>>)"
     df = df[~df["날짜"].astype(str).str.contains(marker_pat, regex=True, na=False)]
-    for c in ["일간수익률", "누적수익률"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
     df = df.dropna(subset=["날짜"])
     return df[base_cols]
 
@@ -94,15 +138,11 @@ def load_swing_trades_safe():
     if df is None or df.empty:
         return pd.DataFrame(columns=base_cols)
     df.columns = [str(c).replace("\ufeff", "").strip() for c in df.columns]
+    numeric = set(TABLE_SCHEMAS["swing_trades"]["numeric"])
     for c in base_cols:
         if c not in df.columns:
-            df[c] = None
-    for c in ["진입순위", "보유일수"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    for c in ["AI수급점수", "스윙우선순위", "진입가", "청산가", "수익률"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    df["진입일_dt"] = pd.to_datetime(df["진입일"], errors="coerce")
-    df["청산일_dt"] = pd.to_datetime(df["청산일"], errors="coerce")
+            df[c] = np.nan if c in numeric else None
+    df = parse_table_dates(df, "swing_trades")
     return df.dropna(subset=["진입일_dt"])[base_cols + ["진입일_dt", "청산일_dt"]]
 
 
@@ -114,12 +154,11 @@ def load_swing_performance_safe():
     if df is None or df.empty:
         return pd.DataFrame(columns=base_cols)
     df.columns = [str(c).replace("\ufeff", "").strip() for c in df.columns]
+    numeric = set(TABLE_SCHEMAS["swing_performance"]["numeric"])
     for c in base_cols:
         if c not in df.columns:
-            df[c] = None
-    for c in ["일간수익률", "누적수익률", "최대낙폭(%)", "종료거래수", "승률(%)"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    df["날짜_dt"] = pd.to_datetime(df["날짜"], errors="coerce")
+            df[c] = np.nan if c in numeric else None
+    df = parse_table_dates(df, "swing_performance")
     return df.dropna(subset=["날짜_dt"])[base_cols + ["날짜_dt"]]
 
 
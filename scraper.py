@@ -14,7 +14,21 @@ from pathlib import Path
 import tomllib
 import argparse
 import io
-from db_utils import read_table, write_table, migrate_csv_to_sqlite_once, csv_exists, resolve_csv_path
+from concurrent.futures import ThreadPoolExecutor, wait
+from db_utils import (
+    TABLE_SCHEMAS,
+    append_by_date,
+    as_numeric,
+    compact_in_background,
+    csv_exists,
+    csv_has_conflict_markers,
+    has_parsed_dates,
+    migrate_csv_to_sqlite_once,
+    read_table,
+    resolve_csv_path,
+    upsert_table,
+    write_table,
+)
 from news_utils import (
     normalize_text as _normalize_text,
     extract_source as _extract_source,
@@ -24,22 +38,65 @@ from news_utils import (
     score_news_candidate as _score_news_candidate_base,
 )
 from services.kis_client import (
+    KIS_MAX_RPS,
+    KIS_MAX_WORKERS,
     URL_BASE,
-    collect_kis_history_backfill as _collect_kis_history_backfill,
+    build_kis_rate_limiter,
+    collect_kis_history_backfill_many,
+    fetch_kis_investor_daily,
     get_kis_access_token,
     resolve_kis_credentials,
     safe_api_float,
 )
 from services.backtest_generation_service import build_backtest_candidate_scores
+from services.replay_feature_service import REPLAY_FLOW_COLS, build_replay_feature_panel
+from services.history_frame_service import get_history_frame
+from services.flow_aggregate_service import build_flow_aggregates
+from services.candidate_pipeline_service import (
+    PipelineStage,
+    format_stage_timings,
+    run_single_stage,
+    run_stage_pipeline,
+    sorted_order,
+    sorted_order_by,
+)
+from services.indicator_service import TREND_WINDOW, last_window_positions, trend_quality_arrays
+from services.price_matrix_service import PriceMatrix
+from services.swing_exit_service import build_hold_state_arrays, build_signal_state_arrays, resolve_signal_exits
+from services.swing_backtest_state_service import (
+    SIGNAL_FINGERPRINT_COLS,
+    clear_swing_state,
+    dirty_stocks,
+    encode_positions,
+    incremental_backtest_enabled,
+    load_swing_state,
+    merge_fingerprints,
+    save_swing_state,
+    settled_date,
+    stock_fingerprints,
+)
+from services.http_client import format_http_metrics, http_get, request_deadline
+from services.http_cache_service import cached_get, format_http_cache_metrics, http_cache_only
+from services.run_metrics_service import RunMetrics
+from services.stock_universe_service import get_stock_universe
 from services.scoring_service import (
-    blend_quant_qual_score,
-    calculate_dynamic_score,
-    calculate_qualitative_score,
+    blend_quant_qual_scores,
+    calculate_dynamic_scores,
+    calculate_qualitative_scores,
     calculate_rsi,
     calculate_trend_quality,
     score_disclosures_and_reports,
 )
-from services.telegram_service import build_telegram_action_message, send_telegram_message
+from services.telegram_service import build_intraday_delta_message, build_telegram_action_message, send_telegram_message
+from services.intraday_service import (
+    INTRADAY_TOP_N,
+    build_intraday_delta,
+    load_intraday_state,
+    load_scoring_context,
+    mark_open_positions,
+    save_intraday_state,
+    save_scoring_context,
+)
 
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 
@@ -99,11 +156,14 @@ def _table_name_for(csv_path):
     return Path(csv_path).stem
 
 
-def read_table_prefer_db(csv_path, **kwargs):
+def read_table_prefer_db(csv_path, columns=None, date_range=None, stocks=None, **kwargs):
     return read_table(
         _table_name_for(csv_path),
         csv_fallback=csv_path,
         read_csv_kwargs=kwargs,
+        columns=columns,
+        date_range=date_range,
+        stocks=stocks,
     )
 
 
@@ -116,6 +176,28 @@ def write_table_dual(df, csv_path, **kwargs):
     )
 
 
+def upsert_table_dual(df, csv_path, **kwargs):
+    """키/날짜 기준 upsert 후 반영된 전체 행 수를 돌려줍니다(db_utils.SQLITE_TABLES 등록 테이블만)."""
+    return upsert_table(
+        _table_name_for(csv_path),
+        df,
+        csv_path=csv_path,
+        csv_kwargs=kwargs,
+    )
+
+
+def append_table_by_date(df, csv_path, date_col="날짜", load_existing=None, **kwargs):
+    """date_col 값 단위로 기존 행을 교체/추가합니다(가능하면 CSV 끝부분만 원자적으로 갱신)."""
+    return append_by_date(
+        _table_name_for(csv_path),
+        df,
+        csv_path=csv_path,
+        date_col=date_col,
+        csv_kwargs=kwargs,
+        load_existing=load_existing,
+    )
+
+
 SWING_HORIZONS = (5, 10)
 PRIMARY_SWING_HORIZON = 10
 DEFAULT_INITIAL_CASH = 5_000_000.0
@@ -137,10 +219,11 @@ def _normalize_history_frame(df):
     if "종목명" not in out.columns or "일자" not in out.columns:
         return pd.DataFrame()
     out["종목명"] = out["종목명"].astype(str).str.strip()
-    raw_dates = out["일자"].astype(str).str.replace("-", "", regex=False).str.replace(".0", "", regex=False).str.strip()
-    out["일자_dt"] = pd.to_datetime(raw_dates, format="%Y%m%d", errors="coerce")
-    if out["일자_dt"].notna().sum() == 0:
-        out["일자_dt"] = pd.to_datetime(out["일자"], errors="coerce")
+    if not has_parsed_dates(out):
+        raw_dates = out["일자"].astype(str).str.replace("-", "", regex=False).str.replace(".0", "", regex=False).str.strip()
+        out["일자_dt"] = pd.to_datetime(raw_dates, format="%Y%m%d", errors="coerce")
+        if out["일자_dt"].notna().sum() == 0:
+            out["일자_dt"] = pd.to_datetime(out["일자"], errors="coerce")
     out = out.dropna(subset=["일자_dt"])
     out = out[out["종목명"] != ""]
     out["일자"] = out["일자_dt"].dt.strftime("%Y%m%d")
@@ -150,34 +233,23 @@ def _normalize_history_frame(df):
     return out
 
 
-def merge_history_snapshot(new_history):
+def upsert_history_snapshot(new_history):
     """
     KIS 일봉 응답은 최근 구간만 내려오므로 history.csv를 덮어쓰면 백테스트 시작점이 계속 흔들립니다.
-    기존 누적분과 새 수집분을 종목명+일자 기준으로 병합해 과거 구간을 보존합니다.
+    새 수집분만 종목명+일자 기본키로 upsert해 과거 구간을 보존하고, 반영 후 누적 행 수를 돌려줍니다(0이면 반영 없음).
+    기존 누적분은 다시 읽거나 쓰지 않고 새 행이 닿는 CSV 앞부분/월 파티션만 갱신합니다(db_utils.upsert_table).
     """
-    new_norm = _normalize_history_frame(new_history)
-    if new_norm.empty:
-        return pd.DataFrame()
-
-    frames = []
-    if csv_exists("history.csv"):
-        try:
-            old_norm = _normalize_history_frame(read_table_prefer_db("history.csv", on_bad_lines="skip"))
-            if not old_norm.empty:
-                frames.append(old_norm)
-        except Exception as e:
-            print(f"[WARN] 기존 history.csv 로드 실패, 새 수집분만 사용합니다: {e}")
-    frames.append(new_norm)
-
-    merged = pd.concat(frames, ignore_index=True, sort=False)
-    merged = merged.dropna(subset=["종목명", "일자_dt"])
-    merged = merged.sort_values(["종목명", "일자_dt"])
-    merged = merged.drop_duplicates(subset=["종목명", "일자"], keep="last")
+    rows = _normalize_history_frame(new_history)
+    if rows.empty:
+        return 0
+    rows = rows.sort_values(["종목명", "일자_dt"], kind="stable")
+    rows = rows.drop_duplicates(subset=["종목명", "일자"], keep="last")
 
     preferred_cols = ["종목명", "일자", "종가", "외인", "연기금", "투신", "사모", "거래량", "거래대금(억)"]
-    other_cols = [c for c in merged.columns if c not in preferred_cols + ["일자_dt"]]
-    merged = merged[preferred_cols + other_cols]
-    return merged.sort_values(["일자", "종목명"], ascending=[False, True]).reset_index(drop=True)
+    other_cols = [c for c in rows.columns if c not in preferred_cols + ["일자_dt"]]
+    rows = rows.reindex(columns=preferred_cols + other_cols)
+    rows = rows.sort_values(["일자", "종목명"], ascending=[False, True]).reset_index(drop=True)
+    return upsert_table_dual(rows, "history.csv", index=False, encoding="utf-8-sig")
 
 
 def _risk_state_from_mdd(mdd):
@@ -185,45 +257,160 @@ def _risk_state_from_mdd(mdd):
 
 
 def _load_history_prices():
-    if not csv_exists("history.csv"):
-        return pd.DataFrame(columns=["종목명", "일자_dt", "종가"])
-    hist = read_table_prefer_db("history.csv")
-    if hist.empty or not {"종목명", "일자", "종가"}.issubset(hist.columns):
+    """종목명/일자_dt/종가 정렬 이력. 프로세스 공유 캐시이므로 수정하지 말 것."""
+    return get_history_frame().view("prices", _build_history_prices)
+
+
+def _build_history_prices():
+    hist = get_history_frame().dated()
+    if hist.empty or "종가" not in hist.columns:
         return pd.DataFrame(columns=["종목명", "일자_dt", "종가"])
-    out = hist[["종목명", "일자", "종가"]].copy()
-    raw_dates = out["일자"].astype(str).str.replace("-", "", regex=False).str.strip()
-    out["일자_dt"] = pd.to_datetime(raw_dates, format="%Y%m%d", errors="coerce")
-    if out["일자_dt"].notna().sum() == 0:
-        out["일자_dt"] = pd.to_datetime(out["일자"], errors="coerce")
-    out["종가"] = pd.to_numeric(out["종가"], errors="coerce")
-    out["종목명"] = out["종목명"].astype(str).str.strip()
+    out = hist[["종목명", "일자", "종가", "일자_dt"]]
     out = out.dropna(subset=["일자_dt", "종가"])
     out = out[out["종목명"] != ""]
     return out.sort_values(["종목명", "일자_dt"]).drop_duplicates(["종목명", "일자_dt"], keep="last")
 
 
 def _load_history_for_replay():
-    if not csv_exists("history.csv"):
-        return pd.DataFrame()
-    hist = read_table_prefer_db("history.csv")
+    """replay/보유연장 판단용 가격·수급 이력. 프로세스 공유 캐시이므로 수정하지 말 것."""
+    return get_history_frame().view("replay", _build_history_for_replay)
+
+
+def _build_history_for_replay():
+    hist = get_history_frame().dated()
     required = {"종목명", "일자", "종가", "외인", "연기금", "투신", "사모"}
     if hist.empty or not required.issubset(hist.columns):
         return pd.DataFrame()
     hist = hist.copy()
-    raw_dates = hist["일자"].astype(str).str.replace("-", "", regex=False).str.strip()
-    hist["일자_dt"] = pd.to_datetime(raw_dates, format="%Y%m%d", errors="coerce")
-    if hist["일자_dt"].notna().sum() == 0:
-        hist["일자_dt"] = pd.to_datetime(hist["일자"], errors="coerce")
     for col in ["종가", "외인", "연기금", "투신", "사모", "거래량", "거래대금(억)"]:
         if col not in hist.columns:
             hist[col] = 0.0
-        hist[col] = pd.to_numeric(hist[col], errors="coerce").fillna(0.0)
-    hist["종목명"] = hist["종목명"].astype(str).str.strip()
+        hist[col] = hist[col].fillna(0.0)
     hist = hist.dropna(subset=["일자_dt", "종목명", "종가"])
     hist = hist[(hist["종목명"] != "") & (hist["종가"] > 0)]
     return hist.sort_values(["종목명", "일자_dt"]).drop_duplicates(["종목명", "일자_dt"], keep="last")
 
 
+def _build_history_flow():
+    hist = get_history_frame().dated()
+    if hist.empty or not {"연기금", "투신", "사모", "외인"}.issubset(hist.columns):
+        return pd.DataFrame()
+    return hist.dropna(subset=["일자_dt"]).sort_values(["종목명", "일자_dt"])
+
+
+def _load_flow_aggregates():
+    """종목×일자별 최근 5/10일 수급 합계(FlowAggregates). 이력이 바뀔 때만 다시 계산합니다."""
+    return get_history_frame().view("flow_aggregates", lambda: build_flow_aggregates(_build_history_flow()))
+
+
+def _replay_meta_attrs(meta, name):
+    """data.csv 메타에서 replay 행에 쓰는 종목 고정값을 기존 scalar 규칙 그대로 꺼냅니다."""
+    meta_row = meta.loc[name] if name in meta.index else pd.Series(dtype=object)
+    has_meta = not meta_row.empty
+    marcap = pd.to_numeric(meta_row.get("시가총액", 0.0), errors="coerce")
+    marcap = 0.0 if pd.isna(marcap) else float(marcap)
+    meta_avg_value_20d = pd.to_numeric(meta_row.get("20일평균거래대금(억)", 0.0), errors="coerce")
+    meta_avg_value_20d = 0.0 if pd.isna(meta_avg_value_20d) else float(meta_avg_value_20d)
+    return {
+        "종목코드": str(meta_row.get("종목코드", "") or "").zfill(6) if has_meta else "",
+        "소속": meta_row.get("소속", "") if has_meta else "",
+        "섹터": meta_row.get("섹터", "분류안됨") if has_meta else "분류안됨",
+        "테마": meta_row.get("테마", "") if has_meta else "",
+        "시가총액": marcap,
+        "PER": meta_row.get("PER", 0.0) if has_meta else 0.0,
+        "ROE": meta_row.get("ROE", 0.0) if has_meta else 0.0,
+        "per_num": pd.to_numeric(meta_row.get("PER", 0.0), errors="coerce") if has_meta else 0.0,
+        "roe_num": pd.to_numeric(meta_row.get("ROE", 0.0), errors="coerce") if has_meta else 0.0,
+        "meta_avg_value_20d": meta_avg_value_20d,
+    }
+
+
+def _build_replay_rows(panel, meta):
+    """
+    build_replay_feature_panel 결과에 종목 메타를 붙여 날짜별 replay 입력 행을 한 번에 만듭니다.
+    컬럼 구성/반올림은 과거 날짜×종목 루프의 day_rows와 동일하게 유지합니다.
+    """
+    if panel is None or panel.empty:
+        return pd.DataFrame()
+    names = panel["종목명"].tolist()
+    attrs = {name: _replay_meta_attrs(meta, name) for name in dict.fromkeys(names)}
+    attr_col = lambda key: [attrs[name][key] for name in names]
+
+    marcap = np.asarray(attr_col("시가총액"), dtype=float)
+    marcap_won = marcap * 100_000_000
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strengths = {
+            col: np.where(marcap_won != 0, panel[f"{col}_sum"].to_numpy() * 1_000_000 / marcap_won * 100.0, 0.0)
+            for col in REPLAY_FLOW_COLS
+        }
+        trade_value_5d = panel["trade_value_5d"].to_numpy()
+        avg_value_5d = trade_value_5d / panel["latest5_len"].to_numpy()
+        avg_value_20d = panel["trade_value_20d"].to_numpy() / np.minimum(20, panel["window_len"].to_numpy())
+        avg_value_20d = np.where(avg_value_20d <= 0, np.asarray(attr_col("meta_avg_value_20d"), dtype=float), avg_value_20d)
+        avg_value_5d = np.where(avg_value_5d <= 0, avg_value_20d, avg_value_5d)
+        turnover_rate = np.where((marcap > 0) & (trade_value_5d > 0), trade_value_5d / marcap * 100.0, 0.0)
+
+    current_price = panel["current_price"].tolist()
+    ma5 = [round(x, 2) for x in panel["ma5_raw"].tolist()]
+    ma10 = [round(x, 2) for x in panel["ma10_raw"].tolist()]
+    ma20 = [round(x, 2) for x in panel["ma20_raw"].tolist()]
+    trend_score = [round(float(x), 2) for x in panel["trend_score"].tolist()]
+    gap_20 = []
+    for price, ma20_val in zip(current_price, ma20):
+        ma20_val = float(ma20_val or price)
+        gap_20.append((price / ma20_val * 100.0) if ma20_val else 100.0)
+    is_ma20_rising = [bool(s >= 55 and m5 >= m20) for s, m5, m20 in zip(trend_score, ma5, ma20)]
+    foreign_streak = panel["외인_streak"].astype(int).tolist()
+    pension_streak = panel["연기금_streak"].astype(int).tolist()
+    rsi_val = panel["rsi"].tolist()
+    vol_surge = panel["vol_surge"].tolist()
+    f_str, p_str, t_str, pef_str = (strengths[col].tolist() for col in REPLAY_FLOW_COLS)
+    turnover_list = turnover_rate.tolist()
+    per_num = attr_col("per_num")
+    roe_num = attr_col("roe_num")
+    quant_scores = calculate_dynamic_scores(
+        f_str, p_str, t_str, pef_str, vol_surge, rsi_val, gap_20,
+        foreign_streak, pension_streak, turnover_list, is_ma20_rising,
+        per_num, roe_num,
+        current_vix=20.0,
+        dip_buying_ratio=0.0,
+    ).astype(float).tolist()
+
+    return pd.DataFrame({
+        "날짜_dt": panel["날짜_dt"].to_numpy(),
+        "종목명": names,
+        "종목코드": attr_col("종목코드"),
+        "소속": attr_col("소속"),
+        "섹터": attr_col("섹터"),
+        "테마": attr_col("테마"),
+        "AI수급점수": quant_scores,
+        "현재가": current_price,
+        "등락률": 0.0,
+        "외인강도(%)": f_str,
+        "연기금강도(%)": p_str,
+        "투신강도(%)": t_str,
+        "사모강도(%)": pef_str,
+        "외인연속": foreign_streak,
+        "연기금연속": pension_streak,
+        "이격도(%)": [round(x, 1) for x in gap_20],
+        "손바뀜(%)": [round(x, 1) for x in turnover_list],
+        "RSI": [round(x, 1) for x in rsi_val],
+        "거래급증(%)": [round(x, 1) for x in vol_surge],
+        "5일평균거래대금(억)": [round(x, 1) for x in avg_value_5d.tolist()],
+        "20일평균거래대금(억)": [round(x, 1) for x in avg_value_20d.tolist()],
+        "추세상승": is_ma20_rising,
+        "정배열": panel["aligned"].astype(bool).tolist(),
+        "추세품질점수": trend_score,
+        "MA5": ma5,
+        "MA10": ma10,
+        "MA20": ma20,
+        "시가총액": marcap.tolist(),
+        "PER": attr_col("PER"),
+        "ROE": attr_col("ROE"),
+        "뉴스부정키워드수": 0,
+    })
+
+
 def build_replay_score_trend(top_n=3, min_lookback=10):
     """
     과거 각 날짜에 현재 가격/수급/추세 로직을 다시 적용합니다.
@@ -245,7 +432,8 @@ def build_replay_score_trend(top_n=3, min_lookback=10):
     force_rebuild = os.environ.get("FORCE_REPLAY_REBUILD", "").strip().lower() in {"1", "true", "yes"}
     if csv_exists("replay_score_trend.csv") and not force_rebuild:
         try:
-            existing = read_table_prefer_db("replay_score_trend.csv", on_bad_lines="skip")
+            # 종목코드 앞자리 0이 숫자 파싱으로 사라지지 않도록 문자열로 읽습니다(증분 추가분과 같은 표기 유지).
+            existing = read_table_prefer_db("replay_score_trend.csv", on_bad_lines="skip", dtype={"종목코드": str})
             if existing.empty or "날짜" not in existing.columns:
                 existing = pd.DataFrame(columns=replay_cols)
         except Exception as e:
@@ -261,118 +449,21 @@ def build_replay_score_trend(top_n=3, min_lookback=10):
         existing_dates = set(pd.to_datetime(existing["날짜"], errors="coerce").dropna().dt.strftime("%Y-%m-%d"))
         dates = [d for d in dates if pd.to_datetime(d).strftime("%Y-%m-%d") not in existing_dates]
     rows = []
-
-    for cur_date in dates:
-        day_rows = []
-        for name, grp in hist.groupby("종목명"):
-            g = grp[grp["일자_dt"].dt.normalize() <= cur_date].sort_values("일자_dt")
-            if len(g) < int(min_lookback):
-                continue
-            recent = g.tail(20)
-            recent_desc = recent.sort_values("일자_dt", ascending=False)
-            closes_desc = recent_desc["종가"].tolist()
-            trend_quality = calculate_trend_quality(closes_desc)
-            current_price = float(recent_desc.iloc[0]["종가"])
-            ma20 = float(trend_quality.get("ma20", current_price) or current_price)
-            gap_20 = (current_price / ma20 * 100.0) if ma20 else 100.0
-            rsi_val = calculate_rsi(list(recent["종가"].tail(15)))
-
-            meta_row = meta.loc[name] if name in meta.index else pd.Series(dtype=object)
-            marcap = pd.to_numeric(meta_row.get("시가총액", 0.0), errors="coerce")
-            marcap = 0.0 if pd.isna(marcap) else float(marcap)
-            marcap_won = marcap * 100_000_000
-            sums = {
-                col: float(pd.to_numeric(recent[col], errors="coerce").fillna(0.0).sum())
-                for col in ["외인", "연기금", "투신", "사모"]
-            }
-            f_str, p_str, t_str, pef_str = [
-                (sums[col] * 1_000_000 / marcap_won * 100.0) if marcap_won else 0.0
-                for col in ["외인", "연기금", "투신", "사모"]
-            ]
-
-            latest5 = recent.tail(5)
-            trade_value_5d = float(pd.to_numeric(latest5["거래대금(억)"], errors="coerce").fillna(0.0).sum())
-            trade_value_20d = float(pd.to_numeric(recent["거래대금(억)"], errors="coerce").fillna(0.0).sum())
-            avg_value_5d = trade_value_5d / min(5, len(latest5)) if len(latest5) else 0.0
-            avg_value_20d = trade_value_20d / min(20, len(recent)) if len(recent) else 0.0
-            if avg_value_20d <= 0:
-                avg_value_20d = pd.to_numeric(meta_row.get("20일평균거래대금(억)", 0.0), errors="coerce")
-                avg_value_20d = 0.0 if pd.isna(avg_value_20d) else float(avg_value_20d)
-            if avg_value_5d <= 0:
-                avg_value_5d = avg_value_20d
-            turnover_rate = (trade_value_5d / marcap * 100.0) if marcap > 0 and trade_value_5d > 0 else 0.0
-            volumes = pd.to_numeric(recent_desc["거래량"], errors="coerce").fillna(0.0).tolist()
-            if len(volumes) > 1 and sum(volumes[1:6]) > 0:
-                vol_surge = volumes[0] / (sum(volumes[1:6]) / len(volumes[1:6])) * 100.0
-            else:
-                vol_surge = 100.0
-
-            def _streak(col):
-                cnt = 0
-                for val in pd.to_numeric(recent_desc[col], errors="coerce").fillna(0.0).tolist():
-                    if val > 0:
-                        cnt += 1
-                    else:
-                        break
-                return cnt
-
-            is_ma20_rising = bool(trend_quality["score"] >= 55 and trend_quality["ma5"] >= trend_quality["ma20"])
-            quant_score = calculate_dynamic_score(
-                f_str, p_str, t_str, pef_str, vol_surge, rsi_val, gap_20,
-                _streak("외인"), _streak("연기금"), turnover_rate, is_ma20_rising,
-                pd.to_numeric(meta_row.get("PER", 0.0), errors="coerce") if not meta_row.empty else 0.0,
-                pd.to_numeric(meta_row.get("ROE", 0.0), errors="coerce") if not meta_row.empty else 0.0,
+    replay_rows = _build_replay_rows(build_replay_feature_panel(hist, dates, min_lookback=min_lookback), meta)
+    if not replay_rows.empty:
+        max_buy_candidates = resolve_max_buy_candidates(20.0)
+        for cur_date, day_df in replay_rows.groupby("날짜_dt", sort=True):
+            day_df = day_df.drop(columns=["날짜_dt"]).reset_index(drop=True)
+            day_df = apply_swing_strategy_overlay(
+                day_df,
                 current_vix=20.0,
-                dip_buying_ratio=0.0,
+                max_buy_candidates=max_buy_candidates,
+                as_of_date=cur_date,
             )
-            day_rows.append({
-                "종목명": name,
-                "종목코드": str(meta_row.get("종목코드", "") or "").zfill(6) if not meta_row.empty else "",
-                "소속": meta_row.get("소속", "") if not meta_row.empty else "",
-                "섹터": meta_row.get("섹터", "분류안됨") if not meta_row.empty else "분류안됨",
-                "테마": meta_row.get("테마", "") if not meta_row.empty else "",
-                "AI수급점수": float(quant_score),
-                "현재가": current_price,
-                "등락률": 0.0,
-                "외인강도(%)": f_str,
-                "연기금강도(%)": p_str,
-                "투신강도(%)": t_str,
-                "사모강도(%)": pef_str,
-                "외인연속": _streak("외인"),
-                "연기금연속": _streak("연기금"),
-                "이격도(%)": round(gap_20, 1),
-                "손바뀜(%)": round(turnover_rate, 1),
-                "RSI": round(rsi_val, 1),
-                "거래급증(%)": round(vol_surge, 1),
-                "5일평균거래대금(억)": round(avg_value_5d, 1),
-                "20일평균거래대금(억)": round(avg_value_20d, 1),
-                "추세상승": is_ma20_rising,
-                "정배열": bool(trend_quality["aligned"]),
-                "추세품질점수": trend_quality["score"],
-                "MA5": trend_quality["ma5"],
-                "MA10": trend_quality["ma10"],
-                "MA20": trend_quality["ma20"],
-                "시가총액": marcap,
-                "PER": meta_row.get("PER", 0.0) if not meta_row.empty else 0.0,
-                "ROE": meta_row.get("ROE", 0.0) if not meta_row.empty else 0.0,
-                "뉴스부정키워드수": 0,
-            })
-
-        if not day_rows:
-            continue
-        day_df = pd.DataFrame(day_rows)
-        max_buy_candidates = resolve_max_buy_candidates(20.0)
-        day_df = apply_swing_strategy_overlay(
-            day_df,
-            current_vix=20.0,
-            max_buy_candidates=max_buy_candidates,
-            as_of_date=cur_date,
-        )
-        day_df = day_df.sort_values(["스윙우선순위", "AI수급점수"], ascending=[False, False]).reset_index(drop=True)
-        day_df["순위"] = range(1, len(day_df) + 1)
-        day_df["날짜"] = pd.to_datetime(cur_date).strftime("%Y-%m-%d")
-        rows.append(day_df.head(max(20, int(top_n) * 8)))
-
+            day_df = day_df.sort_values(["스윙우선순위", "AI수급점수"], ascending=[False, False]).reset_index(drop=True)
+            day_df["순위"] = range(1, len(day_df) + 1)
+            day_df["날짜"] = pd.to_datetime(cur_date).strftime("%Y-%m-%d")
+            rows.append(day_df.head(max(20, int(top_n) * 8)))
     replay_new = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=replay_cols)
     frames = []
     if not existing.empty:
@@ -396,168 +487,105 @@ def build_replay_score_trend(top_n=3, min_lookback=10):
     return replay
 
 
-def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon=PRIMARY_SWING_HORIZON):
+SWING_TRADE_TEXT_DTYPES = {c: str for c in TABLE_SCHEMAS["swing_trades"]["text"]}
+
+
+def _swing_state_params(top_n, horizons, primary_horizon):
+    """증분 상태를 재사용해도 되는지 판단하는 백테스트 파라미터. 하나라도 바뀌면 전체 재계산합니다."""
+    return {
+        "top_n": int(top_n),
+        "horizons": [int(h) for h in horizons],
+        "primary_horizon": int(primary_horizon),
+        "max_hold_days": SIGNAL_MAX_HOLD_DAYS,
+        "stop_loss": STOP_LOSS_RETURN,
+        "soft_target": SOFT_TARGET_RETURN,
+        "hard_target": HARD_TARGET_RETURN,
+        "initial_cash": DEFAULT_INITIAL_CASH,
+        "max_positions": DEFAULT_MAX_POSITIONS,
+    }
+
+
+def _swing_data_fingerprints(prices, replay_hist, score, until):
+    return merge_fingerprints(
+        stock_fingerprints(prices, until, ["일자_dt", "종가"]),
+        stock_fingerprints(replay_hist, until, ["일자_dt", "종가", "외인", "연기금", "투신", "사모"]),
+        stock_fingerprints(score, until, SIGNAL_FINGERPRINT_COLS, date_col="날짜_dt"),
+    )
+
+
+def _load_swing_resume(params, backtest_start_date, prices, replay_hist, score):
     """
-    종가 진입 후 D+5/D+10 종가 청산 기준의 신호 성과 파일을 생성합니다.
-    GitHub Actions의 일일 실행에서도 기존 history/score_trend만으로 재현되도록 설계합니다.
+    직전 실행 상태로 이어서 계산할 수 있으면 재사용 정보를 돌려줍니다.
+    - 기준일 이하 데이터가 바뀐 종목(dirty)과 미청산/기준일 이후 청산 거래만 다시 계산 대상으로 표시
+    - dirty 종목이 없고 기존 자본곡선이 기준일까지 온전하면 시뮬레이션 상태(sim)도 재사용
     """
-    if not csv_exists("history.csv"):
-        return pd.DataFrame(), pd.DataFrame()
-
-    replay_score = build_replay_score_trend(top_n=top_n)
-    actual_score = pd.DataFrame()
-    if csv_exists("score_trend.csv"):
-        actual_score = load_score_trend_safe()
-    prices = _load_history_prices()
-    score, backtest_start_date = build_backtest_candidate_scores(actual_score, replay_score, top_n=top_n)
-    if score.empty or prices.empty:
-        return pd.DataFrame(), pd.DataFrame()
+    state = load_swing_state(params)
+    if state is None or not state.get("settled_date"):
+        return None
+    start_key = backtest_start_date.strftime("%Y-%m-%d") if backtest_start_date is not None else None
+    if state.get("backtest_start_date") != start_key:
+        return None
+    old_settled = pd.Timestamp(state["settled_date"])
+    trades = read_table_prefer_db(
+        "swing_trades.csv", dtype=SWING_TRADE_TEXT_DTYPES, keep_default_na=False, float_precision="round_trip"
+    )
+    if trades.empty or not set(SWING_TRADE_TEXT_DTYPES).issubset(trades.columns):
+        return None
 
-    price_by_stock = {
-        name: grp.sort_values("일자_dt").reset_index(drop=True)
-        for name, grp in prices.groupby("종목명")
+    dirty = dirty_stocks(state.get("fingerprints"), _swing_data_fingerprints(prices, replay_hist, score, old_settled))
+    settled_key = old_settled.strftime("%Y-%m-%d")
+    reopen = (
+        (trades["상태"] != "closed")
+        | (trades["청산일"] > settled_key)
+        | (trades["진입일"] > settled_key)
+        | trades["종목명"].isin(dirty)
+    )
+    reopen_keys = set(zip(trades.loc[reopen, "진입일"], trades.loc[reopen, "종목명"]))
+    entry_keys = pd.Series(list(zip(trades["진입일"], trades["종목명"])), index=trades.index)
+    kept = trades[~entry_keys.isin(reopen_keys)]
+
+    sim = None
+    if not dirty and state.get("sim") is not None:
+        perf = read_table_prefer_db("swing_performance.csv", float_precision="round_trip")
+        if not perf.empty and "날짜" in perf.columns:
+            perf = perf[perf["날짜"].astype(str) <= settled_key].drop(columns=["최대낙폭(%)", "리스크상태"], errors="ignore")
+            if len(perf) == int(state["sim"].get("days", -1)):
+                sim = {**state["sim"], "perf": perf}
+    return {
+        "settled": old_settled,
+        "dirty": dirty,
+        "reopen_keys": reopen_keys,
+        "kept_trades": kept,
+        "sim": sim,
+        "fingerprints": state.get("fingerprints") or {},
     }
-    replay_hist = _load_history_for_replay()
-    replay_hist_by_stock = {
-        name: grp.sort_values("일자_dt").reset_index(drop=True)
-        for name, grp in replay_hist.groupby("종목명")
-    } if not replay_hist.empty else {}
 
-    def _hold_extension_state(name, cur_date, fallback_prices):
-        hist_grp = replay_hist_by_stock.get(name)
-        if hist_grp is not None and not hist_grp.empty:
-            recent = hist_grp[hist_grp["일자_dt"].dt.normalize() <= cur_date].tail(20)
-            if recent.empty:
-                recent = hist_grp.tail(20)
-            closes = pd.to_numeric(recent["종가"], errors="coerce").dropna().tolist()
-            smart5 = (
-                pd.to_numeric(recent.tail(5)["연기금"], errors="coerce").fillna(0.0)
-                + pd.to_numeric(recent.tail(5)["투신"], errors="coerce").fillna(0.0)
-                + pd.to_numeric(recent.tail(5)["사모"], errors="coerce").fillna(0.0)
-                + pd.to_numeric(recent.tail(5)["외인"], errors="coerce").fillna(0.0) * 0.5
-            ).sum()
-        else:
-            recent_prices = fallback_prices[fallback_prices["일자_dt"].dt.normalize() <= cur_date].tail(20)
-            closes = pd.to_numeric(recent_prices["종가"], errors="coerce").dropna().tolist()
-            smart5 = 0.0
-        if not closes:
-            return {"trend_intact": False, "support_intact": False, "supply_intact": False}
-        current = float(closes[-1])
-        ma5 = sum(closes[-5:]) / min(5, len(closes))
-        ma10 = sum(closes[-10:]) / min(10, len(closes))
-        ma20 = sum(closes[-20:]) / min(20, len(closes))
-        trend_intact = current >= ma10 and ma5 >= ma10 and ma10 >= ma20
-        support_intact = current >= ma20 * 0.985
-        supply_intact = smart5 >= 0
-        return {
-            "trend_intact": bool(trend_intact),
-            "support_intact": bool(support_intact),
-            "supply_intact": bool(supply_intact),
-        }
 
-    rows = []
-    for _, sig in score.sort_values(["날짜_dt", "순위"]).iterrows():
-        name = str(sig["종목명"]).strip()
-        price_df = price_by_stock.get(name)
-        if price_df is None or price_df.empty:
-            continue
-        entry_date = pd.to_datetime(sig["날짜_dt"]).normalize()
-        exact_entry = price_df[price_df["일자_dt"].dt.normalize() == entry_date]
-        if exact_entry.empty:
-            continue
-        entry_idx = int(exact_entry.index[-1])
-        entry_price = float(exact_entry.iloc[-1]["종가"])
-        if entry_price <= 0:
-            continue
+def _build_entry_trade_rows(entry, price_df, signal_exit, horizons):
+    """한 진입의 D+N 고정 청산 행들과 시그널 청산 행을 만듭니다."""
+    sig = entry["sig"]
+    name = entry["name"]
+    entry_date = entry["entry_date"]
+    entry_idx = entry["entry_idx"]
+    entry_price = entry["entry_price"]
+    swing_priority_val = entry["swing_priority_val"]
 
-        entry_type_val = sig.get("진입유형", "랭킹Top3")
-        entry_type_val = "랭킹Top3" if pd.isna(entry_type_val) or not str(entry_type_val).strip() else str(entry_type_val)
-        swing_priority_val = pd.to_numeric(sig.get("스윙우선순위", 0.0), errors="coerce")
-        swing_priority_val = 0.0 if pd.isna(swing_priority_val) else float(swing_priority_val)
-        comment_val = sig.get("진입코멘트", "")
-        comment_val = "" if pd.isna(comment_val) else str(comment_val)
-
-        future_sig = score[
-            (score["종목명"].astype(str) == name)
-            & (score["날짜_dt"] > entry_date)
-            & (score["날짜_dt"] <= entry_date + pd.Timedelta(days=25))
-        ].sort_values("날짜_dt")
-
-        def _resolve_exit(max_horizon):
-            fallback_idx = min(entry_idx + int(max_horizon), len(price_df) - 1)
-            fallback_status = "closed" if entry_idx + int(max_horizon) < len(price_df) else "open"
-            fallback_reason = f"D+{int(max_horizon)}"
-            for step in range(1, int(max_horizon) + 1):
-                cur_idx = entry_idx + step
-                if cur_idx >= len(price_df):
-                    break
-                cur_row = price_df.iloc[cur_idx]
-                cur_date = pd.to_datetime(cur_row["일자_dt"]).normalize()
-                cur_price = float(cur_row["종가"])
-                cur_ret = ((cur_price - entry_price) / entry_price) * 100.0 if entry_price > 0 else 0.0
-                sig_rows = future_sig[future_sig["날짜_dt"].dt.normalize() <= cur_date]
-                latest_sig = sig_rows.iloc[-1] if not sig_rows.empty else None
-                sell_text = str(latest_sig.get("매도점검", "")) if latest_sig is not None else ""
-                candidate_state = str(latest_sig.get("매수후보", "")) if latest_sig is not None else ""
-                latest_swing = pd.to_numeric(latest_sig.get("스윙우선순위", swing_priority_val), errors="coerce") if latest_sig is not None else swing_priority_val
-                latest_swing = swing_priority_val if pd.isna(latest_swing) else float(latest_swing)
-                hold_state = _hold_extension_state(name, cur_date, price_df)
-                trend_intact = hold_state["trend_intact"]
-                support_intact = hold_state["support_intact"]
-                supply_intact = hold_state["supply_intact"]
-                if step >= 3 and cur_ret <= STOP_LOSS_RETURN:
-                    return cur_idx, "closed", "손절"
-                if step >= 5 and cur_ret >= HARD_TARGET_RETURN:
-                    return cur_idx, "closed", "목표수익+"
-                if step >= 5 and cur_ret >= SOFT_TARGET_RETURN and not (trend_intact and support_intact and supply_intact):
-                    return cur_idx, "closed", "목표수익"
-                if step >= 5 and not support_intact:
-                    return cur_idx, "closed", "지지이탈"
-                if step >= 5 and not supply_intact and latest_swing <= swing_priority_val:
-                    return cur_idx, "closed", "수급훼손"
-                if step >= 5 and ("축소" in sell_text or "주의" in sell_text or "청산" in sell_text or "이탈" in sell_text):
-                    return cur_idx, "closed", "매도점검"
-                if step >= 5 and candidate_state == "제외":
-                    return cur_idx, "closed", "후보제외"
-                if step >= 5 and latest_swing <= max(35.0, swing_priority_val - 10.0):
-                    return cur_idx, "closed", "스윙약화"
-            return fallback_idx, fallback_status, fallback_reason
-
-        signal_exit_idx, signal_status, signal_reason = _resolve_exit(SIGNAL_MAX_HOLD_DAYS)
-
-        for horizon in horizons:
-            exit_idx = entry_idx + int(horizon)
-            status = "closed" if exit_idx < len(price_df) else "open"
-            exit_row = price_df.iloc[exit_idx] if status == "closed" else price_df.iloc[-1]
-            exit_price = float(exit_row["종가"])
-            ret = ((exit_price - entry_price) / entry_price) * 100.0 if entry_price > 0 else 0.0
-            rows.append({
-                "거래ID": f"{entry_date.strftime('%Y%m%d')}_{name}_D{int(horizon)}",
-                "진입일": entry_date.strftime("%Y-%m-%d"),
-                "종목명": name,
-                "종목코드": str(sig.get("종목코드", "") or "").zfill(6),
-                "진입순위": int(sig["순위"]),
-                "AI수급점수": round(float(sig.get("AI수급점수", 0.0) or 0.0), 2),
-                "진입유형": entry_type_val,
-                "스윙우선순위": round(swing_priority_val, 2),
-                "추천소스": str(sig.get("추천소스", "") or ""),
-                "진입코멘트": comment_val,
-                "보유일수": int(horizon),
-                "청산방식": f"D+{int(horizon)}",
-                "청산사유": f"D+{int(horizon)}",
-                "진입가": round(entry_price, 2),
-                "청산일": pd.to_datetime(exit_row["일자_dt"]).strftime("%Y-%m-%d"),
-                "청산가": round(exit_price, 2),
-                "수익률": round(ret, 4),
-                "상태": status,
-            })
+    entry_type_val = sig.get("진입유형", "랭킹Top3")
+    entry_type_val = "랭킹Top3" if pd.isna(entry_type_val) or not str(entry_type_val).strip() else str(entry_type_val)
+    comment_val = sig.get("진입코멘트", "")
+    comment_val = "" if pd.isna(comment_val) else str(comment_val)
+
+    signal_exit_idx, signal_status, signal_reason = signal_exit
 
-        signal_exit_row = price_df.iloc[signal_exit_idx]
-        signal_exit_price = float(signal_exit_row["종가"])
-        signal_ret = ((signal_exit_price - entry_price) / entry_price) * 100.0 if entry_price > 0 else 0.0
-        signal_hold_days = max(1, int(signal_exit_idx - entry_idx))
+    rows = []
+    for horizon in horizons:
+        exit_idx = entry_idx + int(horizon)
+        status = "closed" if exit_idx < len(price_df) else "open"
+        exit_row = price_df.iloc[exit_idx] if status == "closed" else price_df.iloc[-1]
+        exit_price = float(exit_row["종가"])
+        ret = ((exit_price - entry_price) / entry_price) * 100.0 if entry_price > 0 else 0.0
         rows.append({
-            "거래ID": f"{entry_date.strftime('%Y%m%d')}_{name}_SIGNAL",
+            "거래ID": f"{entry_date.strftime('%Y%m%d')}_{name}_D{int(horizon)}",
             "진입일": entry_date.strftime("%Y-%m-%d"),
             "종목명": name,
             "종목코드": str(sig.get("종목코드", "") or "").zfill(6),
@@ -567,62 +595,62 @@ def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon
             "스윙우선순위": round(swing_priority_val, 2),
             "추천소스": str(sig.get("추천소스", "") or ""),
             "진입코멘트": comment_val,
-            "보유일수": signal_hold_days,
-            "청산방식": "시그널",
-            "청산사유": signal_reason,
+            "보유일수": int(horizon),
+            "청산방식": f"D+{int(horizon)}",
+            "청산사유": f"D+{int(horizon)}",
             "진입가": round(entry_price, 2),
-            "청산일": pd.to_datetime(signal_exit_row["일자_dt"]).strftime("%Y-%m-%d"),
-            "청산가": round(signal_exit_price, 2),
-            "수익률": round(signal_ret, 4),
-            "상태": signal_status,
+            "청산일": pd.to_datetime(exit_row["일자_dt"]).strftime("%Y-%m-%d"),
+            "청산가": round(exit_price, 2),
+            "수익률": round(ret, 4),
+            "상태": status,
         })
 
-    trades = pd.DataFrame(rows)
-    if trades.empty:
-        return pd.DataFrame(), pd.DataFrame()
-
-    trades = trades.sort_values(["진입일", "청산방식", "보유일수", "진입순위", "종목명"])
-    write_table_dual(trades, "swing_trades.csv", index=False, encoding="utf-8-sig")
-
-    signal = trades[(trades["청산방식"].astype(str) == "시그널")].copy()
-    if signal.empty:
-        signal = trades[(trades["보유일수"] == int(primary_horizon))].copy()
-    signal["진입일_dt"] = pd.to_datetime(signal["진입일"], errors="coerce")
-    signal["청산일_dt"] = pd.to_datetime(signal["청산일"], errors="coerce")
-    signal["진입가"] = pd.to_numeric(signal["진입가"], errors="coerce")
-    signal["스윙우선순위"] = pd.to_numeric(signal["스윙우선순위"], errors="coerce").fillna(0.0)
-    signal["진입순위"] = pd.to_numeric(signal["진입순위"], errors="coerce").fillna(999)
-    signal = signal.dropna(subset=["진입일_dt", "진입가"]).sort_values(
-        ["진입일_dt", "진입순위", "스윙우선순위"],
-        ascending=[True, True, False],
-    )
-    if signal.empty:
-        perf = pd.DataFrame(columns=["날짜", "일간수익률", "누적수익률", "최대낙폭(%)", "리스크상태", "종료거래수", "승률(%)"])
-        write_table_dual(perf, "swing_performance.csv", index=False, encoding="utf-8-sig")
-        return trades, perf
-
-    all_dates = sorted(prices["일자_dt"].dt.normalize().unique())
-    first_signal_date = signal["진입일_dt"].min().normalize()
-    first_sim_date = backtest_start_date if backtest_start_date is not None else first_signal_date
-    sim_dates = [pd.to_datetime(d).normalize() for d in all_dates if pd.to_datetime(d).normalize() >= first_sim_date]
+    signal_exit_row = price_df.iloc[signal_exit_idx]
+    signal_exit_price = float(signal_exit_row["종가"])
+    signal_ret = ((signal_exit_price - entry_price) / entry_price) * 100.0 if entry_price > 0 else 0.0
+    signal_hold_days = max(1, int(signal_exit_idx - entry_idx))
+    rows.append({
+        "거래ID": f"{entry_date.strftime('%Y%m%d')}_{name}_SIGNAL",
+        "진입일": entry_date.strftime("%Y-%m-%d"),
+        "종목명": name,
+        "종목코드": str(sig.get("종목코드", "") or "").zfill(6),
+        "진입순위": int(sig["순위"]),
+        "AI수급점수": round(float(sig.get("AI수급점수", 0.0) or 0.0), 2),
+        "진입유형": entry_type_val,
+        "스윙우선순위": round(swing_priority_val, 2),
+        "추천소스": str(sig.get("추천소스", "") or ""),
+        "진입코멘트": comment_val,
+        "보유일수": signal_hold_days,
+        "청산방식": "시그널",
+        "청산사유": signal_reason,
+        "진입가": round(entry_price, 2),
+        "청산일": pd.to_datetime(signal_exit_row["일자_dt"]).strftime("%Y-%m-%d"),
+        "청산가": round(signal_exit_price, 2),
+        "수익률": round(signal_ret, 4),
+        "상태": signal_status,
+    })
+    return rows
+
+
+def _simulate_swing_equity(signal, sim_dates, price_matrix, cash, positions, prev_equity, snapshot_date=None):
+    """
+    자본 제약(최대 보유 수, 교체 규칙) 스윙 시뮬레이션을 sim_dates 구간만 진행합니다.
+    cash/positions/prev_equity는 구간 시작 직전 상태이며, 반환 snapshot은 snapshot_date 이하 마지막 날짜 처리 직후 상태입니다.
+    """
     initial_cash = DEFAULT_INITIAL_CASH
     max_positions = DEFAULT_MAX_POSITIONS
-    cash = initial_cash
-    positions = []
+    positions = list(positions)
     perf_rows = []
     closed_pnls = {}
-    prev_equity = initial_cash
+    snapshot = {"cash": cash, "prev_equity": prev_equity, "positions": list(positions), "days": 0}
 
     def _mark_positions_value(cur_date):
-        total = 0.0
-        for pos in positions:
-            px = price_by_stock.get(pos["종목명"])
-            if px is not None and not px[px["일자_dt"].dt.normalize() <= cur_date].empty:
-                mark_price = float(px[px["일자_dt"].dt.normalize() <= cur_date].iloc[-1]["종가"])
-            else:
-                mark_price = float(pos["진입가"])
-            total += mark_price * pos["수량"]
-        return total
+        return price_matrix.mark_to_market(
+            [pos["종목명"] for pos in positions],
+            [pos["수량"] for pos in positions],
+            [pos["진입가"] for pos in positions],
+            cur_date,
+        )
 
     for cur_date in sim_dates:
         realized = []
@@ -631,8 +659,7 @@ def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon
         for pos in positions:
             exit_date = pd.to_datetime(pos["청산일_dt"]).normalize() if pd.notna(pos.get("청산일_dt")) else None
             if exit_date is not None and exit_date <= cur_date and str(pos.get("상태", "")).lower() == "closed":
-                px = price_by_stock.get(pos["종목명"])
-                exit_price = float(px[px["일자_dt"].dt.normalize() <= cur_date].iloc[-1]["종가"]) if px is not None and not px[px["일자_dt"].dt.normalize() <= cur_date].empty else float(pos["진입가"])
+                exit_price = price_matrix.last_price(pos["종목명"], cur_date, pos["진입가"])
                 exit_value = exit_price * pos["수량"]
                 pnl = exit_value - pos["매수금액"]
                 cash += exit_value
@@ -659,11 +686,7 @@ def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon
                 weakest_score = 0.0
                 weakest_ret = 0.0
                 for pos_idx, pos in enumerate(positions):
-                    px = price_by_stock.get(pos["종목명"])
-                    if px is not None and not px[px["일자_dt"].dt.normalize() <= cur_date].empty:
-                        mark_price = float(px[px["일자_dt"].dt.normalize() <= cur_date].iloc[-1]["종가"])
-                    else:
-                        mark_price = float(pos["진입가"])
+                    mark_price = price_matrix.last_price(pos["종목명"], cur_date, pos["진입가"])
                     pos_ret = ((mark_price - float(pos["진입가"])) / float(pos["진입가"]) * 100.0) if float(pos["진입가"]) > 0 else 0.0
                     pos_score = float(pos.get("스윙우선순위", 0.0) or 0.0)
                     if weakest_idx is None or (pos_ret, pos_score) < (weakest_ret, weakest_score):
@@ -676,11 +699,7 @@ def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon
                 if weakest_idx is None or not (new_is_strong and old_is_weak) or protect_winner:
                     continue
                 old_pos = positions.pop(weakest_idx)
-                px = price_by_stock.get(old_pos["종목명"])
-                if px is not None and not px[px["일자_dt"].dt.normalize() <= cur_date].empty:
-                    exit_price = float(px[px["일자_dt"].dt.normalize() <= cur_date].iloc[-1]["종가"])
-                else:
-                    exit_price = float(old_pos["진입가"])
+                exit_price = price_matrix.last_price(old_pos["종목명"], cur_date, old_pos["진입가"])
                 exit_value = exit_price * old_pos["수량"]
                 pnl = exit_value - old_pos["매수금액"]
                 cash += exit_value
@@ -698,6 +717,7 @@ def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon
             cash -= buy_amount
             held_names.add(name)
             positions.append({
+                "거래ID": sig.get("거래ID"),
                 "종목명": name,
                 "진입가": entry_price,
                 "수량": qty,
@@ -724,13 +744,210 @@ def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon
             "승률(%)": round((sum(1 for x in day_pnls if x > 0) / len(day_pnls) * 100.0), 2) if day_pnls else 0.0,
         })
         prev_equity = equity_value
+        if snapshot_date is not None and cur_date <= snapshot_date:
+            snapshot = {"cash": cash, "prev_equity": prev_equity, "positions": list(positions), "days": len(perf_rows)}
+    return perf_rows, snapshot
+
+
+def build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon=PRIMARY_SWING_HORIZON, incremental=False):
+    """
+    종가 진입 후 D+5/D+10 종가 청산 기준의 신호 성과 파일을 생성합니다.
+    GitHub Actions의 일일 실행에서도 기존 history/score_trend만으로 재현되도록 설계합니다.
+    incremental=True면 직전 실행이 저장한 기준일(최신 거래일 전날) 상태를 이어받아
+    신규 진입·미청산·기준일 이후 청산 거래와 과거 데이터가 바뀐 종목만 다시 계산하고, 자본곡선도 기준일 이후만 이어서 시뮬레이션합니다.
+    상태가 없거나 파라미터/백테스트 시작일이 다르면 전체 재계산과 같은 결과를 냅니다.
+    """
+    if not csv_exists("history.csv"):
+        return pd.DataFrame(), pd.DataFrame()
+
+    replay_score = build_replay_score_trend(top_n=top_n)
+    actual_score = pd.DataFrame()
+    if csv_exists("score_trend.csv"):
+        actual_score = load_score_trend_safe()
+    prices = _load_history_prices()
+    score, backtest_start_date = build_backtest_candidate_scores(actual_score, replay_score, top_n=top_n)
+    if score.empty or prices.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    replay_hist = _load_history_for_replay()
+    params = _swing_state_params(top_n, horizons, primary_horizon)
+    resume = _load_swing_resume(params, backtest_start_date, prices, replay_hist, score) if incremental else None
+
+    # 종목 조인/조회는 유니버스 정수 ID로 합니다(종목명 문자열 비교 제거).
+    universe = get_stock_universe()
+    price_by_stock = {
+        sid: grp.sort_values("일자_dt").reset_index(drop=True)
+        for sid, grp in prices.groupby(universe.register(prices["종목명"]))
+    }
+    replay_hist_by_stock = {
+        sid: grp.sort_values("일자_dt").reset_index(drop=True)
+        for sid, grp in replay_hist.groupby(universe.register(replay_hist["종목명"]))
+    } if not replay_hist.empty else {}
+
+    signal_state_by_stock = {
+        sid: build_signal_state_arrays(grp)
+        for sid, grp in score.groupby(universe.register(score["종목명"]), sort=False)
+    }
+
+    pending = score.sort_values(["날짜_dt", "순위"])
+    if resume is not None:
+        # 기준일 이하에서 이미 확정된 진입은 기존 거래 행을 그대로 씁니다.
+        pending_names = pending["종목명"].astype(str).str.strip()
+        pending_keys = pd.Series(
+            list(zip(pd.to_datetime(pending["날짜_dt"]).dt.strftime("%Y-%m-%d"), pending_names)), index=pending.index
+        )
+        pending = pending[
+            (pd.to_datetime(pending["날짜_dt"]).dt.normalize() > resume["settled"])
+            | pending_names.isin(resume["dirty"])
+            | pending_keys.isin(resume["reopen_keys"])
+        ]
+
+    # 시그널별 진입 행 위치를 (종목ID, 진입일) 키 조인 한 번으로 찾습니다. 같은 날 행이 여럿이면 마지막 행.
+    entry_keys = pd.DataFrame({
+        "sid": np.concatenate([np.full(len(df), sid, dtype=np.int64) for sid, df in price_by_stock.items()] or [np.zeros(0, dtype=np.int64)]),
+        "day": np.concatenate([df["일자_dt"].dt.normalize().to_numpy() for df in price_by_stock.values()] or [np.zeros(0, dtype="datetime64[ns]")]),
+        "entry_idx": np.concatenate([np.arange(len(df)) for df in price_by_stock.values()] or [np.zeros(0, dtype=np.int64)]),
+        "entry_price": np.concatenate([df["종가"].to_numpy(dtype=float) for df in price_by_stock.values()] or [np.zeros(0)]),
+    }).drop_duplicates(["sid", "day"], keep="last")
+    pending_keys = pd.DataFrame({
+        "sid": universe.register(pending["종목명"]),
+        "day": pd.to_datetime(pending["날짜_dt"]).dt.normalize().to_numpy(),
+        "swing_priority_val": as_numeric(pending["스윙우선순위"]).fillna(0.0).to_numpy(dtype=float)
+        if "스윙우선순위" in pending.columns else np.zeros(len(pending)),
+    })
+    matched = pending_keys.merge(entry_keys, on=["sid", "day"], how="left")
+    # 가격 결측(NaN)은 기존처럼 "0 이하"로 보지 않고 통과시킵니다.
+    usable = matched["entry_idx"].notna().to_numpy() & ~(matched["entry_price"].to_numpy() <= 0)
+
+    entries = []
+    for (_, sig), sid, entry_date, entry_idx, entry_price, swing_priority_val in zip(
+        pending[usable].iterrows(),
+        matched["sid"].to_numpy()[usable],
+        matched["day"].to_numpy()[usable],
+        matched["entry_idx"].to_numpy()[usable],
+        matched["entry_price"].to_numpy()[usable],
+        matched["swing_priority_val"].to_numpy()[usable],
+    ):
+        entries.append({
+            "sig": sig,
+            "sid": int(sid),
+            "name": str(sig["종목명"]).strip(),
+            "entry_date": pd.Timestamp(entry_date),
+            "entry_idx": int(entry_idx),
+            "entry_price": float(entry_price),
+            "swing_priority_val": float(swing_priority_val),
+        })
+
+    # 종목별로 모든 시그널 진입의 청산일/사유를 한 번에 계산합니다.
+    signal_exits = {}
+    entries_by_stock = {}
+    for entry_pos, entry in enumerate(entries):
+        entries_by_stock.setdefault(entry["sid"], []).append(entry_pos)
+    empty_signal_state = build_signal_state_arrays(score.iloc[0:0])
+    for sid, entry_positions in entries_by_stock.items():
+        price_df = price_by_stock[sid]
+        stock_entries = [entries[entry_pos] for entry_pos in entry_positions]
+        exit_idx, statuses, reasons = resolve_signal_exits(
+            price_df,
+            build_hold_state_arrays(price_df, replay_hist_by_stock.get(sid)),
+            signal_state_by_stock.get(sid, empty_signal_state),
+            [entry["entry_idx"] for entry in stock_entries],
+            [entry["entry_date"] for entry in stock_entries],
+            [entry["swing_priority_val"] for entry in stock_entries],
+            SIGNAL_MAX_HOLD_DAYS,
+            stop_loss=STOP_LOSS_RETURN,
+            soft_target=SOFT_TARGET_RETURN,
+            hard_target=HARD_TARGET_RETURN,
+        )
+        for entry_pos, idx, status, reason in zip(entry_positions, exit_idx, statuses, reasons):
+            signal_exits[entry_pos] = (int(idx), status, reason)
+
+    rows = []
+    for entry_pos, entry in enumerate(entries):
+        rows.extend(_build_entry_trade_rows(entry, price_by_stock[entry["sid"]], signal_exits[entry_pos], horizons))
+
+    trades = pd.DataFrame(rows)
+    if resume is not None and not resume["kept_trades"].empty:
+        trades = pd.concat([resume["kept_trades"], trades], ignore_index=True) if not trades.empty else resume["kept_trades"]
+    if trades.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    trades = trades.sort_values(["진입일", "청산방식", "보유일수", "진입순위", "종목명"])
+    write_table_dual(trades, "swing_trades.csv", index=False, encoding="utf-8-sig")
+
+    signal = trades[(trades["청산방식"].astype(str) == "시그널")].copy()
+    if signal.empty:
+        signal = trades[(trades["보유일수"] == int(primary_horizon))].copy()
+    signal["진입일_dt"] = pd.to_datetime(signal["진입일"], errors="coerce")
+    signal["청산일_dt"] = pd.to_datetime(signal["청산일"], errors="coerce")
+    signal["진입가"] = pd.to_numeric(signal["진입가"], errors="coerce")
+    signal["스윙우선순위"] = pd.to_numeric(signal["스윙우선순위"], errors="coerce").fillna(0.0)
+    signal["진입순위"] = pd.to_numeric(signal["진입순위"], errors="coerce").fillna(999)
+    signal = signal.dropna(subset=["진입일_dt", "진입가"]).sort_values(
+        ["진입일_dt", "진입순위", "스윙우선순위"],
+        ascending=[True, True, False],
+    )
+    if signal.empty:
+        perf = pd.DataFrame(columns=["날짜", "일간수익률", "누적수익률", "최대낙폭(%)", "리스크상태", "종료거래수", "승률(%)"])
+        write_table_dual(perf, "swing_performance.csv", index=False, encoding="utf-8-sig")
+        clear_swing_state()
+        return trades, perf
 
+    all_dates = sorted(prices["일자_dt"].dt.normalize().unique())
+    first_signal_date = signal["진입일_dt"].min().normalize()
+    first_sim_date = backtest_start_date if backtest_start_date is not None else first_signal_date
+    sim_dates = [pd.to_datetime(d).normalize() for d in all_dates if pd.to_datetime(d).normalize() >= first_sim_date]
+    new_settled = settled_date(all_dates)
+    price_matrix = PriceMatrix.from_history(prices)
+
+    prior_perf = None
+    start_cash, start_positions, start_equity = DEFAULT_INITIAL_CASH, [], DEFAULT_INITIAL_CASH
+    sim = resume["sim"] if resume is not None else None
+    if sim is not None:
+        exit_by_trade = {
+            trade_id: (exit_dt, status)
+            for trade_id, exit_dt, status in zip(signal["거래ID"], signal["청산일_dt"], signal["상태"])
+        }
+        if all(pos["거래ID"] in exit_by_trade for pos in sim["positions"]):
+            # 미청산 포지션의 청산일/상태는 이번 실행에서 다시 판정한 값으로 갱신합니다.
+            start_positions = [
+                {**pos, "청산일_dt": exit_by_trade[pos["거래ID"]][0], "상태": exit_by_trade[pos["거래ID"]][1]}
+                for pos in sim["positions"]
+            ]
+            start_cash, start_equity = float(sim["cash"]), float(sim["prev_equity"])
+            prior_perf = sim["perf"]
+            sim_dates = [d for d in sim_dates if d > resume["settled"]]
+
+    perf_rows, snapshot = _simulate_swing_equity(
+        signal, sim_dates, price_matrix, start_cash, start_positions, start_equity, snapshot_date=new_settled
+    )
     perf = pd.DataFrame(perf_rows)
+    if prior_perf is not None:
+        snapshot["days"] += len(prior_perf)
+        perf = pd.concat([prior_perf, perf], ignore_index=True) if not perf.empty else prior_perf.reset_index(drop=True)
     equity = 1.0 + (pd.to_numeric(perf["누적수익률"], errors="coerce").fillna(0.0) / 100.0)
     drawdown = ((equity / equity.cummax()) - 1.0) * 100.0
     perf["최대낙폭(%)"] = drawdown.round(2)
     perf["리스크상태"] = perf["최대낙폭(%)"].apply(_risk_state_from_mdd)
     write_table_dual(perf, "swing_performance.csv", index=False, encoding="utf-8-sig")
+
+    if new_settled is not None:
+        if resume is not None and not resume["dirty"] and new_settled == resume["settled"]:
+            fingerprints = resume["fingerprints"]
+        else:
+            fingerprints = _swing_data_fingerprints(prices, replay_hist, score, new_settled)
+        save_swing_state({
+            "params": params,
+            "backtest_start_date": backtest_start_date.strftime("%Y-%m-%d") if backtest_start_date is not None else None,
+            "settled_date": new_settled.strftime("%Y-%m-%d"),
+            "fingerprints": fingerprints,
+            "sim": {
+                "cash": snapshot["cash"],
+                "prev_equity": snapshot["prev_equity"],
+                "positions": encode_positions(snapshot["positions"]),
+                "days": snapshot["days"],
+            },
+        })
     return trades, perf
 
 
@@ -738,6 +955,13 @@ def _bytes_to_mb(n_bytes):
     return float(n_bytes) / (1024.0 * 1024.0)
 
 
+def _same_rows(a, b):
+    """컬럼 구성/순서와 값(문자열 표현)이 모두 같으면 True."""
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    return a.reset_index(drop=True).astype(str).equals(b.reset_index(drop=True).astype(str))
+
+
 def emit_weekly_storage_report():
     """
     주간 1회 저장소 용량 로그를 출력하고 data/storage_report.csv에 누적합니다.
@@ -784,12 +1008,7 @@ def emit_weekly_storage_report():
         "total_mb": round(_bytes_to_mb(total_size), 3),
     }])
 
-    if existing.empty:
-        out = row
-    else:
-        out = pd.concat([existing, row], ignore_index=True)
-        out = out.drop_duplicates(subset=["날짜"], keep="last")
-    write_table_dual(out, report_csv, index=False, encoding="utf-8-sig")
+    append_table_by_date(row, report_csv, date_col="날짜", index=False, encoding="utf-8-sig")
     print(f"[STORAGE] Weekly report updated -> {report_path}")
 
 def resolve_dart_api_key():
@@ -986,43 +1205,250 @@ def safe_float(text):
     try: return float(text.replace(',', '').replace('%', '').strip())
     except: return 0.0
 
+def _trend_quality_stage(out, order, ctx):
+    """history.csv 최근 20개 종가로 정배열/추세품질/MA를 다시 입힙니다(행 순서 불변)."""
+    if "종목명" not in out.columns:
+        return order
+    hist = _load_history_prices()
+    if hist.empty:
+        return order
+
+    hist = hist[hist["종목명"].notna()]
+    # 종목별 마지막 행 기준 최근 20개 종가 창을 한 번에 계산합니다(calculate_trend_quality와 같은 결과).
+    _, last_idx, lengths = last_window_positions(hist["종목명"].to_numpy(), window=TREND_WINDOW)
+    if not len(last_idx):
+        return order
+    trend = trend_quality_arrays(hist["종가"].to_numpy(dtype=float), last_idx, lengths)
+    trend_table = pd.DataFrame(
+        {
+            "aligned": trend["aligned"],
+            **{
+                key: pd.Series(trend[key]).map(lambda v: round(v, 2)).to_numpy()
+                for key in ("score", "ma5", "ma10", "ma20")
+            },
+        },
+        index=pd.Index(hist["종목명"].to_numpy()[last_idx]).astype(str),
+    )
+    trend_table = trend_table[~trend_table.index.duplicated(keep="last")]
+    matched = trend_table.reindex(out["종목명"].astype(str).str.strip().to_numpy())
+    matched.index = out.index
+
+    out["정배열"] = matched["aligned"].fillna(out["정배열"] if "정배열" in out.columns else False).astype(bool)
+    out["추세품질점수"] = pd.to_numeric(
+        matched["score"].fillna(out["추세품질점수"] if "추세품질점수" in out.columns else 50.0),
+        errors="coerce",
+    ).fillna(50.0).round(2)
+    out["MA5"] = pd.to_numeric(matched["ma5"].fillna(out["MA5"] if "MA5" in out.columns else 0.0), errors="coerce").fillna(0.0)
+    out["MA10"] = pd.to_numeric(matched["ma10"].fillna(out["MA10"] if "MA10" in out.columns else 0.0), errors="coerce").fillna(0.0)
+    out["MA20"] = pd.to_numeric(matched["ma20"].fillna(out["MA20"] if "MA20" in out.columns else 0.0), errors="coerce").fillna(0.0)
+    out["추세상승"] = (out["추세품질점수"] >= 55) & (out["MA5"] >= out["MA20"])
+    return order
+
+
 def enrich_trend_quality_from_history(df_final):
     """history.csv의 최근 종가로 정배열/추세품질을 재계산해 캐시 모드에서도 같은 필터를 적용."""
     if df_final.empty or "종목명" not in df_final.columns:
         return df_final
-    hist = _load_history_prices()
-    if hist.empty:
-        return df_final
+    return run_single_stage(df_final, _trend_quality_stage)[0]
 
-    trend_map = {}
-    for name, grp in hist.groupby("종목명"):
-        closes = grp.sort_values("일자_dt", ascending=False)["종가"].tolist()[:20]
-        if not closes:
-            continue
-        trend_map[str(name)] = calculate_trend_quality(closes)
+EVENT_ENRICH_WORKERS = 8
+EVENT_ENRICH_DEADLINE_SEC = 45
 
-    if not trend_map:
-        return df_final
 
-    out = df_final.copy()
-    names = out["종목명"].astype(str).str.strip()
-    aligned = names.map(lambda x: trend_map.get(x, {}).get("aligned", pd.NA))
-    quality = names.map(lambda x: trend_map.get(x, {}).get("score", pd.NA))
-    ma5 = names.map(lambda x: trend_map.get(x, {}).get("ma5", pd.NA))
-    ma10 = names.map(lambda x: trend_map.get(x, {}).get("ma10", pd.NA))
-    ma20 = names.map(lambda x: trend_map.get(x, {}).get("ma20", pd.NA))
+def _fetch_event_qual(name, code):
+    disclosures = get_recent_disclosures(code, name, max_items=3)
+    reports = get_recent_analyst_reports(name, max_items=2)
+    return score_disclosures_and_reports(disclosures, reports)
 
-    out["정배열"] = aligned.fillna(out["정배열"] if "정배열" in out.columns else False).astype(bool)
-    out["추세품질점수"] = pd.to_numeric(
-        quality.fillna(out["추세품질점수"] if "추세품질점수" in out.columns else 50.0),
-        errors="coerce",
-    ).fillna(50.0).round(2)
-    out["MA5"] = pd.to_numeric(ma5.fillna(out["MA5"] if "MA5" in out.columns else 0.0), errors="coerce").fillna(0.0)
-    out["MA10"] = pd.to_numeric(ma10.fillna(out["MA10"] if "MA10" in out.columns else 0.0), errors="coerce").fillna(0.0)
-    out["MA20"] = pd.to_numeric(ma20.fillna(out["MA20"] if "MA20" in out.columns else 0.0), errors="coerce").fillna(0.0)
-    out["추세상승"] = (out["추세품질점수"] >= 55) & (out["MA5"] >= out["MA20"])
+
+def _collect_event_quals(targets, max_workers=EVENT_ENRICH_WORKERS, deadline_sec=EVENT_ENRICH_DEADLINE_SEC):
+    """
+    (종목명, 종목코드) 목록의 공시/리포트 이벤트 점수를 병렬 수집합니다.
+    호스트별 동시 요청 수는 http_client가 제한하고, 각 요청의 타임아웃은 남은 마감 시간으로 줄여 이 단계보다 오래 남는 요청이 없게 합니다.
+    마감을 넘기거나 실패한 종목은 HTTP 캐시만으로 다시 계산합니다(캐시에도 없으면 중립 50점).
+    """
+    results = [None] * len(targets)
+    deadline = time.monotonic() + deadline_sec
+
+    def _fetch_until_deadline(name, code):
+        with request_deadline(deadline):
+            return _fetch_event_qual(name, code)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)))
+    futures = {pool.submit(_fetch_until_deadline, name, code): i for i, (name, code) in enumerate(targets)}
+    done, _ = wait(futures, timeout=deadline_sec)
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:
+            name = targets[futures[future]][0]
+            print(f"[WARN] 공시/리포트 심화 수집 실패({name}): {e}")
+    # 진행 중인 요청은 타임아웃이 마감까지로 묶여 있고 마감 뒤 요청은 바로 실패하므로 잠깐만 기다리면 모두 끝납니다.
+    pool.shutdown(wait=True, cancel_futures=True)
+
+    late = [i for i, value in enumerate(results) if value is None]
+    if late:
+        print(f"[WARN] 공시/리포트 심화 수집 {len(late)}개 종목이 마감({deadline_sec}s)을 넘겨 캐시/중립 점수로 대체합니다.")
+        with http_cache_only():
+            for i in late:
+                try:
+                    results[i] = _fetch_event_qual(*targets[i])
+                except Exception:
+                    results[i] = score_disclosures_and_reports([], [])
+    return results
+
+
+SCORE_INPUT_COLS = [
+    "f_str", "p_str", "t_str", "pef_str", "vol_surge", "rsi_val", "gap_20", "foreign_streak",
+    "pension_streak", "turnover_rate", "is_ma20_rising", "per_val", "roe_val", "dip_buying_ratio",
+]
+
+
+def score_candidate_frame(inputs, current_vix, macro_news_text, macro_recency_score, repeated_topics_text):
+    """
+    종목별 점수 입력(SCORE_INPUT_COLS + sector_name)으로 정량/정성/블렌딩 점수를 열 단위로 한 번에 계산합니다.
+    반환 컬럼 순서는 data.csv 기존 컬럼 순서(Quant점수 → 뉴스부정키워드수)를 따릅니다.
+    """
+    quant = calculate_dynamic_scores(
+        *(inputs[col] for col in SCORE_INPUT_COLS[:-1]),
+        current_vix=current_vix,
+        dip_buying_ratio=inputs["dip_buying_ratio"],
+    )
+    qual = calculate_qualitative_scores(
+        inputs["sector_name"],
+        inputs["per_val"],
+        inputs["roe_val"],
+        inputs["foreign_streak"],
+        inputs["pension_streak"],
+        macro_news_text=macro_news_text,
+        macro_recency_score=macro_recency_score,
+        repeated_topics_text=repeated_topics_text,
+        return_details=True,
+    )
+    qual.index = inputs.index
+    quant = pd.Series(quant, index=inputs.index)
+    final_score, qual_adj, score_mode = blend_quant_qual_scores(quant.astype(float), qual["score"], current_vix)
+    return pd.DataFrame({
+        "Quant점수": quant.astype(int),
+        "정성점수": qual["score"].map(lambda v: round(v, 2)),
+        "정성보정치": qual_adj,
+        "점수모드": score_mode,
+        "AI수급점수": final_score,
+        "테마": inputs["sector_name"],
+        "뉴스테마가점": qual["theme_boost_applied"],
+        "뉴스톤계수": qual["theme_tone_mult"],
+        "뉴스부정키워드수": qual["negative_hits"],
+    }, index=inputs.index)
+
+
+LIVE_QUOTE_COLS = ["현재가", "등락률", "시가총액", "PER", "ROE"]
+
+
+def apply_live_quotes(df_cached, df_live):
+    """
+    data.csv 스냅샷에 get_target_stock_list() 시세를 종목 ID 키로 병합합니다(같은 종목이 여러 행이면 첫 행).
+    매칭된 종목은 LIVE_QUOTE_COLS를 실시간 값으로 바꾸고, 이격도(%)는 가격 변화 비율만큼 다시 맞춥니다(기존 가격이 0 이하/결측이면 유지).
+    """
+    out = df_cached.reset_index(drop=True)
+    if out.empty or df_live is None or df_live.empty or "종목명" not in out.columns:
+        return out
+
+    universe = get_stock_universe()
+    live_ids = universe.register(df_live["종목명"], codes=df_live.get("종목코드"))
+    live_pos = pd.Series(np.arange(len(live_ids))).groupby(live_ids).first()
+    pos = live_pos.reindex(universe.register(out["종목명"])).to_numpy()
+    matched = ~np.isnan(pos)
+    if not matched.any():
+        return out
+
+    live = df_live.iloc[pos[matched].astype(np.int64)]
+    rows = out.index[matched]
+    old_price = out.loc[rows, "현재가"].to_numpy() if "현재가" in out.columns else np.ones(len(rows))
+    old_gap = out.loc[rows, "이격도(%)"].to_numpy() if "이격도(%)" in out.columns else np.full(len(rows), 100)
+    new_price = live["현재가"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        new_gap = np.where(old_price > 0, old_gap * (new_price / old_price), old_gap)
+
+    updates = {col: live[col].to_numpy() for col in LIVE_QUOTE_COLS}
+    updates["이격도(%)"] = new_gap
+    for col, values in updates.items():
+        fresh = pd.Series(values, index=rows)
+        if col in out.columns and not matched.all():
+            # 이어 붙여 dtype을 두 쪽 값으로 정합니다(정수 가격은 정수로 남음).
+            fresh = pd.concat([out.loc[~matched, col], fresh])
+        out[col] = fresh.reindex(out.index)
     return out
 
+
+def remark_cached_scores(df_cached, df_live, current_vix, macro_news_text, macro_recency_score, repeated_topics_text):
+    """
+    장중 재평가: 정규 수집에서 확정된 AI수급점수(후처리 보정 포함)에 시세 변화로 생긴 기본 점수 차이만 더해 다시 정렬합니다.
+    df_live는 apply_live_quotes(df_cached, ...) 결과여야 합니다. 공시/리포트 심화·테마 쏠림·점수 안정화 같은 보정은 정규 수집 값을 유지합니다.
+    """
+    df_cached = df_cached.reset_index(drop=True)
+    out = df_live.reset_index(drop=True)
+    if out.empty:
+        return out
+    context = (current_vix, macro_news_text, macro_recency_score, repeated_topics_text)
+    before = score_candidate_frame(cached_score_inputs(df_cached), *context)
+    after = score_candidate_frame(cached_score_inputs(out), *context)
+    if "AI수급점수" in out.columns:
+        shifted = (as_numeric(out["AI수급점수"]) + (after["AI수급점수"] - before["AI수급점수"])).clip(lower=0, upper=100)
+        out["AI수급점수"] = shifted.map(lambda v: round(v, 2))
+    else:
+        out["AI수급점수"] = after["AI수급점수"]
+    out["Quant점수"] = after["Quant점수"]
+    return out.sort_values('AI수급점수', ascending=False)
+
+
+def cached_score_inputs(df_cached):
+    """data.csv 스냅샷 컬럼으로 score_candidate_frame 입력을 만듭니다(없는 컬럼은 수집 단계 기본값)."""
+    def cached_col(col, default):
+        return df_cached[col] if col in df_cached.columns else pd.Series(default, index=df_cached.index)
+
+    theme_names = [
+        resolve_theme_label(code, name, sector)
+        for code, name, sector in zip(cached_col('종목코드', ''), cached_col('종목명', ''), cached_col('섹터', '분류안됨'))
+    ]
+    return pd.DataFrame({
+        "f_str": cached_col('외인강도(%)', 0), "p_str": cached_col('연기금강도(%)', 0),
+        "t_str": cached_col('투신강도(%)', 0), "pef_str": cached_col('사모강도(%)', 0),
+        "vol_surge": cached_col('거래급증(%)', 0), "rsi_val": cached_col('RSI', 50),
+        "gap_20": cached_col('이격도(%)', 100), "foreign_streak": cached_col('외인연속', 0),
+        "pension_streak": cached_col('연기금연속', 0), "turnover_rate": cached_col('손바뀜(%)', 0),
+        "is_ma20_rising": cached_col('추세상승', True), "per_val": cached_col('PER', 0),
+        "roe_val": cached_col('ROE', 0), "dip_buying_ratio": cached_col('음봉매집률', 0.0),
+        "sector_name": theme_names,
+    }, index=df_cached.index)
+
+
+def _enhanced_qual_stage(out, order, ctx, current_vix, top_n=40):
+    """상위 top_n만 공시/리포트 점수를 섞어 정성/블렌딩 점수를 다시 계산하고 AI수급점수 순서를 돌려줍니다."""
+    if "AI수급점수" not in out.columns:
+        return order
+    top_index = sorted_order(out["AI수급점수"], order)[:top_n]
+    if not len(top_index):
+        return sorted_order(out["AI수급점수"], order)
+    top = out.loc[top_index]
+    load_dart_stock_to_corp_map()
+    names = top["종목명"] if "종목명" in top.columns else pd.Series("", index=top.index)
+    codes = top["종목코드"] if "종목코드" in top.columns else pd.Series("", index=top.index)
+    event_qual = pd.Series(_collect_event_quals(list(zip(names, codes))), index=top.index, dtype=float)
+
+    base_qual = pd.to_numeric(top["정성점수"], errors="coerce") if "정성점수" in top.columns else pd.Series(50.0, index=top.index)
+    quant_col = "Quant점수" if "Quant점수" in top.columns else "AI수급점수"
+    blended_qual = (base_qual * 0.7) + (event_qual * 0.3)
+    final_score, qual_adj, score_mode = blend_quant_qual_scores(
+        pd.to_numeric(top[quant_col], errors="coerce"), blended_qual, current_vix
+    )
+
+    out.loc[top.index, "정성점수"] = blended_qual.map(lambda v: round(v, 2))
+    out.loc[top.index, "정성보정치"] = qual_adj
+    out.loc[top.index, "점수모드"] = score_mode
+    out.loc[top.index, "AI수급점수"] = final_score
+    return sorted_order(out["AI수급점수"], order)
+
+
 def apply_enhanced_qual_for_top_candidates(df_final, current_vix, top_n=40):
     """
     전 종목 기본점수 이후 상위 후보(top_n)만 공시/리포트를 심화 반영.
@@ -1030,30 +1456,36 @@ def apply_enhanced_qual_for_top_candidates(df_final, current_vix, top_n=40):
     """
     if df_final.empty:
         return df_final
+    return run_single_stage(df_final, _enhanced_qual_stage, current_vix=current_vix, top_n=top_n)[0]
 
-    df_out = df_final.copy()
-    if "AI수급점수" not in df_out.columns:
-        return df_out
 
-    top_idx = df_out.sort_values("AI수급점수", ascending=False).head(top_n).index
-    for idx in top_idx:
-        row = df_out.loc[idx]
-        name = row.get("종목명", "")
-        code = row.get("종목코드", "")
-        disclosures = get_recent_disclosures(code, name, max_items=3)
-        reports = get_recent_analyst_reports(name, max_items=2)
-        event_qual = score_disclosures_and_reports(disclosures, reports)
+def _theme_crowding_stage(out, order, ctx, top_n=40, crowd_ratio=0.3):
+    """상위 top_n 대표 테마 비중이 crowd_ratio를 넘는 종목만 초과분 × 10(최대 3점)을 감점합니다."""
+    if "AI수급점수" not in out.columns:
+        return order
+    top_index = sorted_order(out["AI수급점수"], order)[:top_n]
+    if not len(top_index):
+        return order
+    theme_col = "테마" if "테마" in out.columns else ("섹터" if "섹터" in out.columns else None)
+    if not theme_col:
+        return order
 
-        base_qual = float(row.get("정성점수", 50))
-        blended_qual = (base_qual * 0.7) + (event_qual * 0.3)
-        final_score, qual_adj, score_mode = blend_quant_qual_score(float(row.get("Quant점수", row.get("AI수급점수", 0))), blended_qual, current_vix)
+    themes = out.loc[top_index, theme_col].fillna("").astype(str).str.split(";").str[0].str.strip()
+    counts = themes.value_counts()
+    if counts.empty:
+        return order
 
-        df_out.at[idx, "정성점수"] = round(blended_qual, 2)
-        df_out.at[idx, "정성보정치"] = qual_adj
-        df_out.at[idx, "점수모드"] = score_mode
-        df_out.at[idx, "AI수급점수"] = final_score
+    total = max(1, len(top_index))
+    ratio = themes.map(counts).fillna(0).astype(float) / total
+    crowded = (themes != "") & (ratio > crowd_ratio)
+    if crowded.any():
+        overload = (ratio[crowded] - crowd_ratio) * 10.0
+        penalty = np.where(overload < 3.0, overload, 3.0)
+        new_score = (pd.to_numeric(out.loc[crowded.index[crowded], "AI수급점수"], errors="coerce").astype(float) - penalty)
+        new_score = new_score.map(lambda v: round(v, 2))
+        out.loc[new_score.index, "AI수급점수"] = new_score.where(new_score > 0.0, 0.0)
+    return sorted_order(out["AI수급점수"], order)
 
-    return df_out.sort_values("AI수급점수", ascending=False)
 
 def apply_theme_crowding_penalty(df_final, top_n=40, crowd_ratio=0.3):
     """
@@ -1063,94 +1495,76 @@ def apply_theme_crowding_penalty(df_final, top_n=40, crowd_ratio=0.3):
     """
     if df_final.empty or "AI수급점수" not in df_final.columns:
         return df_final
-    df_out = df_final.copy()
-    top_slice = df_out.sort_values("AI수급점수", ascending=False).head(top_n).copy()
-    if top_slice.empty:
-        return df_out
+    return run_single_stage(df_final, _theme_crowding_stage, top_n=top_n, crowd_ratio=crowd_ratio)[0]
 
-    theme_col = "테마" if "테마" in top_slice.columns else ("섹터" if "섹터" in top_slice.columns else None)
-    if not theme_col:
-        return df_out
 
-    themes = top_slice[theme_col].fillna("").astype(str).str.split(";").str[0].str.strip()
-    counts = themes.value_counts()
-    if counts.empty:
-        return df_out
-
-    total = max(1, len(top_slice))
-    for idx, row in top_slice.iterrows():
-        key = str(row.get(theme_col, "") or "").split(";")[0].strip()
-        if not key:
-            continue
-        ratio = float(counts.get(key, 0)) / total
-        if ratio <= crowd_ratio:
-            continue
-        overload = ratio - crowd_ratio
-        penalty = min(3.0, overload * 10.0)
-        new_score = float(df_out.at[idx, "AI수급점수"]) - penalty
-        df_out.at[idx, "AI수급점수"] = max(0.0, round(new_score, 2))
-    return df_out.sort_values("AI수급점수", ascending=False)
-
-def apply_score_stability(df_final, today_date, max_daily_delta=8.0, smooth_alpha=0.7):
-    """
-    1) 점수 변동성 관리:
-    - 전일 점수와 EMA 블렌딩(smooth_alpha)
-    - 일일 점수 변화 상한(max_daily_delta) 적용
-    """
-    if df_final.empty or "AI수급점수" not in df_final.columns or "종목명" not in df_final.columns:
-        return df_final
+def _load_prev_score_map(today_date):
+    """score_trend.csv에서 today_date 직전 날짜의 종목별 AI수급점수. 없으면 None."""
     if not csv_exists("score_trend.csv"):
-        return df_final
+        return None
     try:
         df_tr = load_score_trend_safe()
     except Exception:
-        return df_final
+        return None
     if df_tr.empty or "날짜" not in df_tr.columns:
-        return df_final
+        return None
 
     dates = sorted(df_tr["날짜"].astype(str).unique(), reverse=True)
-    prev_date = None
-    for d in dates:
-        if str(d) != str(today_date):
-            prev_date = str(d)
-            break
+    prev_date = next((str(d) for d in dates if str(d) != str(today_date)), None)
     if not prev_date:
-        return df_final
+        return None
     prev_df = df_tr[df_tr["날짜"].astype(str) == prev_date][["종목명", "AI수급점수"]].copy()
     prev_df["AI수급점수"] = pd.to_numeric(prev_df["AI수급점수"], errors="coerce")
-    prev_map = dict(zip(prev_df["종목명"].astype(str), prev_df["AI수급점수"]))
-
-    out = df_final.copy()
-    smoothed = []
-    deltas = []
-    for _, row in out.iterrows():
-        name = str(row.get("종목명", ""))
-        cur = float(pd.to_numeric(row.get("AI수급점수"), errors="coerce") or 0.0)
-        prev = prev_map.get(name, None)
-        if prev is None or pd.isna(prev):
-            new_score = cur
-            delta = 0.0
-        else:
-            ema_score = (smooth_alpha * cur) + ((1.0 - smooth_alpha) * float(prev))
-            low = float(prev) - max_daily_delta
-            high = float(prev) + max_daily_delta
-            new_score = max(low, min(high, ema_score))
-            delta = new_score - float(prev)
-        smoothed.append(round(float(new_score), 2))
-        deltas.append(round(float(delta), 2))
-    out["AI수급점수"] = smoothed
-    out["점수변화(안정화)"] = deltas
-    return out.sort_values("AI수급점수", ascending=False)
+    return dict(zip(prev_df["종목명"].astype(str), prev_df["AI수급점수"]))
+
+
+def _score_stability_stage(out, order, ctx, today_date, max_daily_delta=8.0, smooth_alpha=0.7):
+    """전일 점수와 EMA 블렌딩 후 ±max_daily_delta로 제한합니다. 전일 점수가 없는 종목은 그대로 둡니다."""
+    if "AI수급점수" not in out.columns or "종목명" not in out.columns:
+        return order
+    prev_map = _load_prev_score_map(today_date)
+    if prev_map is None:
+        return order
+
+    cur = pd.to_numeric(out["AI수급점수"], errors="coerce").astype(float).to_numpy()
+    prev = pd.to_numeric(out["종목명"].astype(str).map(prev_map), errors="coerce").astype(float).to_numpy()
+    has_prev = ~np.isnan(prev)
+    ema_score = (smooth_alpha * cur) + ((1.0 - smooth_alpha) * prev)
+    low = prev - max_daily_delta
+    high = prev + max_daily_delta
+    # 파이썬 max(low, min(high, ema))와 같은 비교 순서(NaN 처리 포함)
+    capped = np.where(ema_score < high, ema_score, high)
+    capped = np.where(capped > low, capped, low)
+    new_score = np.where(has_prev, capped, cur)
+    delta = np.where(has_prev, new_score - prev, 0.0)
+    out["AI수급점수"] = pd.Series(new_score, index=out.index).map(lambda v: round(v, 2))
+    out["점수변화(안정화)"] = pd.Series(delta, index=out.index).map(lambda v: round(v, 2))
+    return sorted_order(out["AI수급점수"], order)
 
-def add_signal_confidence(df_final, current_vix=20.0):
+
+def apply_score_stability(df_final, today_date, max_daily_delta=8.0, smooth_alpha=0.7):
     """
-    2) 신호 신뢰도 계층화:
-    Quant/정성/점수모드/뉴스톤 정보를 합쳐 0~100 신뢰도 산출 및 등급 부여.
+    1) 점수 변동성 관리:
+    - 전일 점수와 EMA 블렌딩(smooth_alpha)
+    - 일일 점수 변화 상한(max_daily_delta) 적용
     """
-    if df_final.empty:
+    if df_final.empty or "AI수급점수" not in df_final.columns or "종목명" not in df_final.columns:
         return df_final
-    out = df_final.copy()
-    conf_scores = []
+    return run_single_stage(
+        df_final, _score_stability_stage, today_date=today_date, max_daily_delta=max_daily_delta, smooth_alpha=smooth_alpha
+    )[0]
+
+
+def _numeric_or(out, col, default):
+    """행별 float(to_numeric(값) or default)와 같은 규칙: 0이면 default, NaN(컬럼 없음 포함)은 그대로 둡니다."""
+    if col not in out.columns:
+        return np.full(len(out), np.nan)
+    values = pd.to_numeric(out[col], errors="coerce").astype(float).to_numpy()
+    return np.where(values == 0, float(default), values)
+
+
+def _signal_confidence_stage(out, order, ctx, current_vix=20.0):
+    """Quant/AI/정성 점수 가중합에서 레짐·하락장·부정 뉴스 감점을 빼 0~100 신뢰도와 횡단면 분위 등급을 붙입니다."""
     if current_vix >= 28:
         high_cut, mid_cut = 72.0, 52.0
         regime_penalty = 2.0
@@ -1164,21 +1578,23 @@ def add_signal_confidence(df_final, current_vix=20.0):
         regime_penalty = 0.0
         regime_label = "RiskOn"
 
-    for _, row in out.iterrows():
-        q = float(pd.to_numeric(row.get("Quant점수"), errors="coerce") or 0.0)
-        qual = float(pd.to_numeric(row.get("정성점수"), errors="coerce") or 50.0)
-        ai = float(pd.to_numeric(row.get("AI수급점수"), errors="coerce") or 0.0)
-        tone_neg = float(pd.to_numeric(row.get("뉴스부정키워드수"), errors="coerce") or 0.0)
-        mode = str(row.get("점수모드", ""))
-
-        score = 0.45 * q + 0.35 * ai + 0.2 * qual
-        if "하락장" in mode:
-            score -= 3.0
-        score -= regime_penalty
-        score -= min(8.0, tone_neg * 1.5)
-        score = max(0.0, min(100.0, score))
-        conf_scores.append(round(score, 2))
-    score_s = pd.Series(conf_scores, dtype=float)
+    q = _numeric_or(out, "Quant점수", 0.0)
+    qual = _numeric_or(out, "정성점수", 50.0)
+    ai = _numeric_or(out, "AI수급점수", 0.0)
+    tone_neg = _numeric_or(out, "뉴스부정키워드수", 0.0)
+    if "점수모드" in out.columns:
+        bear_mode = out["점수모드"].astype(str).str.contains("하락장", regex=False).to_numpy()
+    else:
+        bear_mode = np.zeros(len(out), dtype=bool)
+
+    score = 0.45 * q + 0.35 * ai + 0.2 * qual
+    score = np.where(bear_mode, score - 3.0, score)
+    score = score - regime_penalty
+    tone_penalty = tone_neg * 1.5
+    score = score - np.where(tone_penalty < 8.0, tone_penalty, 8.0)
+    score = np.where(score < 100.0, score, 100.0)
+    score = np.where(score > 0.0, score, 0.0)
+    score_s = pd.Series(score, index=out.index).map(lambda v: round(v, 2))
     # 당일 횡단면 기반 임계치(등급 분별력 확보) + 레짐별 가산
     q_high = float(score_s.quantile(0.88)) if len(score_s) else high_cut
     q_mid = float(score_s.quantile(0.62)) if len(score_s) else mid_cut
@@ -1192,33 +1608,33 @@ def add_signal_confidence(df_final, current_vix=20.0):
     eff_mid = q_mid + mid_bias
     if eff_mid >= eff_high:
         eff_mid = eff_high - 4.0
-    conf_labels = []
-    for s in score_s:
-        if s >= eff_high:
-            conf_labels.append("High")
-        elif s >= eff_mid:
-            conf_labels.append("Medium")
-        else:
-            conf_labels.append("Low")
     out["신호신뢰도"] = score_s.round(2)
-    out["신호등급"] = conf_labels
+    out["신호등급"] = np.select([score_s >= eff_high, score_s >= eff_mid], ["High", "Medium"], default="Low")
     out["신호레짐"] = regime_label
-    return out
+    return order
 
-def apply_theme_contribution_guard(df_final, today_date, current_vix=20.0, top_n=40):
+
+def add_signal_confidence(df_final, current_vix=20.0):
     """
-    4) 테마/뉴스 품질 모니터링 자동화:
-    - 상위권 뉴스테마가점 분포를 기록(theme_quality_trend.csv)
-    - 과도 기여 시 자동 완화(가점 과열 구간만 부분 감점)
+    2) 신호 신뢰도 계층화:
+    Quant/정성/점수모드/뉴스톤 정보를 합쳐 0~100 신뢰도 산출 및 등급 부여.
     """
-    if df_final.empty or "뉴스테마가점" not in df_final.columns:
-        return df_final, {}
+    if df_final.empty:
+        return df_final
+    return run_single_stage(df_final, _signal_confidence_stage, current_vix=current_vix)[0]
+
+
+def _theme_contribution_stage(out, order, ctx, today_date, current_vix=20.0, top_n=40):
+    """상위권 뉴스테마가점 분포를 기록하고 과열 시 가점 상위 종목을 부분 감점합니다. 지표는 ctx["theme_quality_metric"]."""
+    ctx["theme_quality_metric"] = {}
+    if "뉴스테마가점" not in out.columns:
+        return order
 
-    out = df_final.copy()
     out["뉴스테마가점"] = pd.to_numeric(out["뉴스테마가점"], errors="coerce").fillna(0.0)
-    top_slice = out.sort_values("AI수급점수", ascending=False).head(top_n).copy()
-    if top_slice.empty:
-        return out, {}
+    top_index = sorted_order(out["AI수급점수"], order)[:top_n]
+    if not len(top_index):
+        return order
+    top_slice = out.loc[top_index]
 
     avg_bonus = float(top_slice["뉴스테마가점"].mean())
     p90_bonus = float(top_slice["뉴스테마가점"].quantile(0.9))
@@ -1269,32 +1685,33 @@ def apply_theme_contribution_guard(df_final, today_date, current_vix=20.0, top_n
         "완화종목수": int(affected),
         "VIX": round(float(current_vix), 2),
     }
-    trend_path = "theme_quality_trend.csv"
     try:
-        if os.path.exists(trend_path):
-            tr = read_table_prefer_db(trend_path, on_bad_lines="skip")
-        else:
-            tr = pd.DataFrame(columns=list(metric.keys()))
-        if not tr.empty and "날짜" in tr.columns:
-            tr = tr[tr["날짜"].astype(str) != str(today_date)]
-        tr_concat = pd.concat([tr, pd.DataFrame([metric])], ignore_index=True)
-        write_table_dual(tr_concat, trend_path, index=False, encoding="utf-8-sig")
+        append_table_by_date(pd.DataFrame([metric]), "theme_quality_trend.csv", date_col="날짜", index=False, encoding="utf-8-sig")
     except Exception as e:
         print(f"[WARN] theme_quality_trend.csv 저장 실패: {e}")
 
-    return out.sort_values("AI수급점수", ascending=False), metric
+    ctx["theme_quality_metric"] = metric
+    return sorted_order(out["AI수급점수"], order)
 
-def apply_pullback_trade_rules(df_final, current_vix=20.0):
+
+def apply_theme_contribution_guard(df_final, today_date, current_vix=20.0, top_n=40):
     """
-    눌림목 매매용 미세 조정(과최적화 방지 목적의 소폭 가감):
-    1) 정상 눌림 진입 우대
-    2) 추세 유지 + 유동성 확인 시 우대
-    3) 과열 추격 구간 감점
-    4) 약세 붕괴 구간 감점
+    4) 테마/뉴스 품질 모니터링 자동화:
+    - 상위권 뉴스테마가점 분포를 기록(theme_quality_trend.csv)
+    - 과도 기여 시 자동 완화(가점 과열 구간만 부분 감점)
     """
-    if df_final.empty or "AI수급점수" not in df_final.columns:
-        return df_final
-    out = df_final.copy()
+    if df_final.empty or "뉴스테마가점" not in df_final.columns:
+        return df_final, {}
+    out, ctx = run_single_stage(
+        df_final, _theme_contribution_stage, today_date=today_date, current_vix=current_vix, top_n=top_n
+    )
+    return out, ctx["theme_quality_metric"]
+
+
+def _pullback_stage(out, order, ctx, current_vix=20.0):
+    """정상 눌림/추세·유동성 우대, 과열 추격/붕괴 구간 감점을 -2.6~+1.8 범위로 반영합니다."""
+    if "AI수급점수" not in out.columns:
+        return order
     ai = pd.to_numeric(out.get("AI수급점수"), errors="coerce").fillna(0.0)
     gap = pd.to_numeric(out.get("이격도(%)"), errors="coerce").fillna(100.0)
     rsi = pd.to_numeric(out.get("RSI"), errors="coerce").fillna(50.0)
@@ -1324,18 +1741,24 @@ def apply_pullback_trade_rules(df_final, current_vix=20.0):
     signal_series.loc[good_pullback & trend_liquidity_ok] = "관심"
     signal_series.loc[breakdown] = "회피"
     out["눌림목신호"] = signal_series
-    return out.sort_values("AI수급점수", ascending=False)
+    return sorted_order(out["AI수급점수"], order)
 
 
-def apply_swing_strategy_overlay(df_final, current_vix=20.0, max_buy_candidates=2, as_of_date=None):
+def apply_pullback_trade_rules(df_final, current_vix=20.0):
     """
-    사용자의 1~2주 스윙 성향에 맞춰 연기금 중심 수급, 눌림목/돌파 진입유형,
-    후보 수 제한, 보유 점검 신호를 한 번 더 입힙니다.
+    눌림목 매매용 미세 조정(과최적화 방지 목적의 소폭 가감):
+    1) 정상 눌림 진입 우대
+    2) 추세 유지 + 유동성 확인 시 우대
+    3) 과열 추격 구간 감점
+    4) 약세 붕괴 구간 감점
     """
-    if df_final.empty:
+    if df_final.empty or "AI수급점수" not in df_final.columns:
         return df_final
-    out = df_final.copy()
+    return run_single_stage(df_final, _pullback_stage, current_vix=current_vix)[0]
+
 
+def _swing_overlay_stage(out, order, ctx, current_vix=20.0, max_buy_candidates=2, as_of_date=None):
+    """스윙 수급/주도주/진입유형/매수후보를 입히고 (매수후보, 스윙우선순위, AI수급점수) 순서를 돌려줍니다."""
     def _num(col, default=0.0):
         if col in out.columns:
             return pd.to_numeric(out[col], errors="coerce").fillna(default)
@@ -1380,51 +1803,29 @@ def apply_swing_strategy_overlay(df_final, current_vix=20.0, max_buy_candidates=
     out["수급지속일수"] = 0
     try:
         hist = _load_history_prices()
-        if not hist.empty and csv_exists("history.csv"):
-            raw_hist = read_table_prefer_db("history.csv")
-            if not raw_hist.empty and {"종목명", "일자", "연기금", "투신", "사모", "외인"}.issubset(raw_hist.columns):
-                raw_hist = raw_hist.copy()
-                raw_hist["일자_dt"] = pd.to_datetime(raw_hist["일자"].astype(str).str.replace("-", "", regex=False), format="%Y%m%d", errors="coerce")
-                if as_of_date is not None:
-                    cutoff_dt = pd.to_datetime(as_of_date, errors="coerce")
-                    if pd.notna(cutoff_dt):
-                        raw_hist = raw_hist[raw_hist["일자_dt"].dt.normalize() <= cutoff_dt.normalize()]
-                raw_hist = raw_hist.dropna(subset=["일자_dt"]).sort_values(["종목명", "일자_dt"])
-                marcap_map = dict(zip(out["종목명"].astype(str), _num("시가총액").replace(0, pd.NA)))
-                avg_value_map = dict(zip(out["종목명"].astype(str), avg_value_20d.replace(0, pd.NA)))
-                p5_map, p10_map, inst10_map, absorb_map, days_map = {}, {}, {}, {}, {}
-                for name, grp in raw_hist.groupby("종목명"):
-                    denom = marcap_map.get(str(name), None)
-                    if denom is None or pd.isna(denom) or float(denom) <= 0:
-                        continue
-                    g = grp.tail(10)
-                    g5 = g.tail(5).copy()
-                    p5 = pd.to_numeric(g5["연기금"], errors="coerce").fillna(0.0).sum()
-                    p10 = pd.to_numeric(g["연기금"], errors="coerce").fillna(0.0).sum()
-                    inst10 = (
-                        pd.to_numeric(g["연기금"], errors="coerce").fillna(0.0).sum()
-                        + pd.to_numeric(g["투신"], errors="coerce").fillna(0.0).sum()
-                        + pd.to_numeric(g["사모"], errors="coerce").fillna(0.0).sum()
-                    )
-                    smart5 = (
-                        pd.to_numeric(g5["연기금"], errors="coerce").fillna(0.0)
-                        + pd.to_numeric(g5["투신"], errors="coerce").fillna(0.0)
-                        + pd.to_numeric(g5["사모"], errors="coerce").fillna(0.0)
-                        + pd.to_numeric(g5["외인"], errors="coerce").fillna(0.0) * 0.5
-                    )
-                    avg_value = avg_value_map.get(str(name), None)
-                    if avg_value is not None and not pd.isna(avg_value) and float(avg_value) > 0:
-                        absorb_map[str(name)] = round(float(smart5.sum()) / (float(avg_value) * 100.0), 4)
-                    days_map[str(name)] = int((smart5 > 0).sum())
-                    p5_map[str(name)] = round(float(p5) / float(denom), 4)
-                    p10_map[str(name)] = round(float(p10) / float(denom), 4)
-                    inst10_map[str(name)] = round(float(inst10) / float(denom), 4)
+        if not hist.empty:
+            flow = _load_flow_aggregates().as_of(as_of_date)
+            if not flow.empty:
+                ordered_names = out["종목명"].loc[order].astype(str)
+                per_name = pd.DataFrame(
+                    {"denom": _num("시가총액").loc[order].to_numpy(), "avg_value": avg_value_20d.loc[order].to_numpy()},
+                    index=ordered_names.to_numpy(),
+                )
+                # 같은 종목명이 여러 행이면 마지막 행 값을 씁니다(기존 dict(zip(...)) 규칙).
+                per_name = per_name[~per_name.index.duplicated(keep="last")]
+                flow = flow.join(per_name, how="inner")
+                flow = flow[flow["denom"] > 0]
+                absorb = flow[flow["avg_value"] > 0]
+
+                def _ratio(num, den):
+                    return (num.astype(float) / den.astype(float)).map(lambda v: round(v, 4))
+
                 names = out["종목명"].astype(str)
-                out["연기금5일강도(%)"] = names.map(p5_map).fillna(0.0)
-                out["연기금10일강도(%)"] = names.map(p10_map).fillna(0.0)
-                out["기관10일동행강도(%)"] = names.map(inst10_map).fillna(0.0)
-                out["수급흡수율"] = names.map(absorb_map).fillna(0.0)
-                out["수급지속일수"] = names.map(days_map).fillna(0).astype(int)
+                out["연기금5일강도(%)"] = names.map(_ratio(flow["연기금5일합"], flow["denom"])).fillna(0.0)
+                out["연기금10일강도(%)"] = names.map(_ratio(flow["연기금10일합"], flow["denom"])).fillna(0.0)
+                out["기관10일동행강도(%)"] = names.map(_ratio(flow["기관10일합"], flow["denom"])).fillna(0.0)
+                out["수급흡수율"] = names.map(_ratio(absorb["스마트5일합"], absorb["avg_value"] * 100.0)).fillna(0.0)
+                out["수급지속일수"] = names.map(flow["스마트5일양수일수"]).fillna(0).astype(int)
     except Exception as e:
         print(f"[WARN] 최근 기관 수급 지표 계산 실패: {e}")
 
@@ -1587,61 +1988,62 @@ def apply_swing_strategy_overlay(df_final, current_vix=20.0, max_buy_candidates=
         - risk_penalty
     ).clip(0, 100).round(2)
 
-    comments = []
-    sell_checks = []
-    for _, row in out.iterrows():
-        et = str(row.get("진입유형", "관찰"))
-        parts = []
-        if float(row.get("연기금10일강도(%)", 0.0)) > 0:
-            parts.append("연기금 10일 순매수")
-        if float(row.get("수급품질점수", 0.0)) >= 30:
-            parts.append("거래대금 대비 수급 양호")
-        if float(row.get("주도주점수", 0.0)) >= 60:
-            parts.append("대형 주도주 조건")
-        if float(row.get("기관동행점수", 0.0)) >= 8:
-            parts.append("기관 동행")
-        if et == "눌림목":
-            parts.append("20일선 부근 눌림")
-        elif et == "돌파":
-            parts.append("거래량 동반 돌파")
-        elif et == "주도눌림":
-            parts.append("대형 주도주 눌림")
-        elif et == "주도돌파":
-            parts.append("대형 주도주 돌파")
-        elif et == "과열주의":
-            parts.append("이격/RSI 과열")
-        elif et == "회피":
-            parts.append("역배열/추세 훼손")
-        elif not bool(row.get("정배열", True)) or float(row.get("추세품질점수", 50.0)) < 55:
-            parts.append("정배열 확인 전")
-        comments.append(" · ".join(parts) if parts else "추가 확인 필요")
-
-        if et == "회피":
-            sell_checks.append("매도/제외")
-        elif float(row.get("연기금5일강도(%)", 0.0)) < 0 and float(row.get("연기금10일강도(%)", 0.0)) < 0:
-            sell_checks.append("수급훼손")
-        elif not bool(row.get("정배열", True)) or float(row.get("추세품질점수", 50.0)) < 45:
-            sell_checks.append("추세훼손")
-        elif float(row.get("이격도(%)", 100.0)) < 97:
-            sell_checks.append("추세점검")
-        elif et == "과열주의":
-            sell_checks.append("익절/추격주의")
-        else:
-            sell_checks.append("보유/관찰")
-    out["진입코멘트"] = comments
-    out["매도점검"] = sell_checks
+    def _raw(col, default):
+        # 행 값을 그대로 float 비교하던 규칙과 같게 NaN은 채우지 않습니다(컬럼이 없을 때만 default).
+        if col in out.columns:
+            return pd.to_numeric(out[col], errors="coerce")
+        return pd.Series(default, index=out.index, dtype=float)
+
+    entry_type = out["진입유형"].astype(str)
+    trend_quality_raw = _raw("추세품질점수", 50.0)
+    p5_raw = _raw("연기금5일강도(%)", 0.0)
+    p10_raw = _raw("연기금10일강도(%)", 0.0)
+    comment = np.full(len(out), "", dtype=object)
+    comment_parts = [
+        (p10_raw > 0, "연기금 10일 순매수"),
+        (_raw("수급품질점수", 0.0) >= 30, "거래대금 대비 수급 양호"),
+        (_raw("주도주점수", 0.0) >= 60, "대형 주도주 조건"),
+        (_raw("기관동행점수", 0.0) >= 8, "기관 동행"),
+        (entry_type == "눌림목", "20일선 부근 눌림"),
+        (entry_type == "돌파", "거래량 동반 돌파"),
+        (entry_type == "주도눌림", "대형 주도주 눌림"),
+        (entry_type == "주도돌파", "대형 주도주 돌파"),
+        (entry_type == "과열주의", "이격/RSI 과열"),
+        (entry_type == "회피", "역배열/추세 훼손"),
+        (
+            ~entry_type.isin(["눌림목", "돌파", "주도눌림", "주도돌파", "과열주의", "회피"])
+            & (~aligned_trend | (trend_quality_raw < 55)),
+            "정배열 확인 전",
+        ),
+    ]
+    for mask, text in comment_parts:
+        joined = np.where(comment == "", text, comment + " · " + text)
+        comment = np.where(mask.to_numpy(dtype=bool), joined, comment)
+    out["진입코멘트"] = np.where(comment == "", "추가 확인 필요", comment)
+    out["매도점검"] = np.select(
+        [
+            entry_type == "회피",
+            (p5_raw < 0) & (p10_raw < 0),
+            ~aligned_trend | (trend_quality_raw < 45),
+            _raw("이격도(%)", 100.0) < 97,
+            entry_type == "과열주의",
+        ],
+        ["매도/제외", "수급훼손", "추세훼손", "추세점검", "익절/추격주의"],
+        default="보유/관찰",
+    )
 
     out["매수후보"] = "관찰"
-    eligible = out[out["진입유형"].isin(["눌림목", "돌파", "주도눌림", "주도돌파"]) & (out["스윙우선순위"] >= 42)].copy()
-    eligible = eligible.sort_values("스윙우선순위", ascending=False)
+    eligible_mask = out["진입유형"].isin(["눌림목", "돌파", "주도눌림", "주도돌파"]) & (out["스윙우선순위"] >= 42)
+    eligible = sorted_order(out["스윙우선순위"], order[eligible_mask.loc[order].to_numpy()])
+    theme_src = out["테마"] if "테마" in out.columns else (out["섹터"] if "섹터" in out.columns else pd.Series("", index=out.index))
+    theme_key = theme_src.loc[eligible].map(lambda v: str(v or "").split(";")[0].strip())
     picked = []
     used_themes = set()
-    def _try_pick(frame, limit=1):
-        nonlocal picked, used_themes
-        for idx, row in frame.iterrows():
+    def _try_pick(labels, limit=1):
+        for idx in labels:
             if idx in picked:
                 continue
-            theme = str(row.get("테마", row.get("섹터", "")) or "").split(";")[0].strip()
+            theme = theme_key.at[idx]
             if theme and theme in used_themes:
                 continue
             picked.append(idx)
@@ -1651,35 +2053,38 @@ def apply_swing_strategy_overlay(df_final, current_vix=20.0, max_buy_candidates=
                 break
 
     if int(max_buy_candidates) >= 2:
-        leader_pool = eligible[eligible["진입유형"].isin(["주도눌림", "주도돌파"])].sort_values(
-            ["주도주점수", "스윙우선순위"], ascending=[False, False]
-        )
-        supply_pool = eligible[~eligible["진입유형"].isin(["주도눌림", "주도돌파"])].sort_values(
-            ["스윙우선순위", "수급품질점수"], ascending=[False, False]
-        )
+        is_leader = out.loc[eligible, "진입유형"].isin(["주도눌림", "주도돌파"]).to_numpy()
+        leader_pool = sorted_order_by(out, ["주도주점수", "스윙우선순위"], eligible[is_leader], [False, False])
+        supply_pool = sorted_order_by(out, ["스윙우선순위", "수급품질점수"], eligible[~is_leader], [False, False])
         _try_pick(leader_pool, limit=1)
         if len(picked) < int(max_buy_candidates):
             _try_pick(supply_pool, limit=int(max_buy_candidates))
-    for idx, row in eligible.iterrows():
-        if len(picked) >= int(max_buy_candidates):
-            break
-        if idx in picked:
-            continue
-        theme = str(row.get("테마", row.get("섹터", "")) or "").split(";")[0].strip()
-        if theme and theme in used_themes:
-            continue
-        picked.append(idx)
-        if theme:
-            used_themes.add(theme)
-        if len(picked) >= int(max_buy_candidates):
-            break
+    if len(picked) < int(max_buy_candidates):
+        _try_pick(eligible, limit=int(max_buy_candidates))
     if picked:
         out.loc[picked, "매수후보"] = "신규후보"
     out.loc[out["진입유형"] == "회피", "매수후보"] = "제외"
     order_map = {"신규후보": 0, "관찰": 1, "제외": 2}
     out["_swing_candidate_order"] = out["매수후보"].map(order_map).fillna(1)
-    out = out.sort_values(["_swing_candidate_order", "스윙우선순위", "AI수급점수"], ascending=[True, False, False])
-    return out.drop(columns=["_swing_candidate_order"], errors="ignore")
+    order = sorted_order_by(out, ["_swing_candidate_order", "스윙우선순위", "AI수급점수"], order, [True, False, False])
+    out.drop(columns=["_swing_candidate_order"], inplace=True)
+    return order
+
+
+def apply_swing_strategy_overlay(df_final, current_vix=20.0, max_buy_candidates=2, as_of_date=None):
+    """
+    사용자의 1~2주 스윙 성향에 맞춰 연기금 중심 수급, 눌림목/돌파 진입유형,
+    후보 수 제한, 보유 점검 신호를 한 번 더 입힙니다.
+    """
+    if df_final.empty:
+        return df_final
+    return run_single_stage(
+        df_final,
+        _swing_overlay_stage,
+        current_vix=current_vix,
+        max_buy_candidates=max_buy_candidates,
+        as_of_date=as_of_date,
+    )[0]
 
 
 def resolve_max_buy_candidates(current_vix=20.0):
@@ -1694,6 +2099,35 @@ def resolve_max_buy_candidates(current_vix=20.0):
     return 2
 
 
+def build_post_scoring_stages(current_vix, today_date, max_buy_candidates, top_n=40):
+    """
+    점수 계산 이후 df_final 후처리 단계 목록. 각 단계는 컬럼만 갱신하고 정렬은 논리 순서로만 전달하며,
+    실제 행 재배치는 run_stage_pipeline 마지막에 한 번 합니다.
+    """
+    return [
+        # 상위 후보군 정성 심화(공시/리포트) 재보정
+        PipelineStage("정성심화", _enhanced_qual_stage, {"current_vix": current_vix, "top_n": top_n}),
+        # 상위권 특정 테마 쏠림 완화
+        PipelineStage("테마쏠림", _theme_crowding_stage, {"top_n": top_n, "crowd_ratio": 0.3}),
+        # 테마 가점 품질 모니터링 + 과열 자동 완화
+        PipelineStage(
+            "테마가점가드", _theme_contribution_stage, {"today_date": today_date, "current_vix": current_vix, "top_n": top_n}
+        ),
+        # 캐시 모드에서도 최근 종가 기준 정배열/추세품질을 다시 입혀 하락 추세 종목을 눌러줍니다.
+        PipelineStage("추세품질", _trend_quality_stage),
+        # 눌림목 전용 미세 룰(과열 추격 억제 + 정상 눌림 우대)
+        PipelineStage("눌림목", _pullback_stage, {"current_vix": current_vix}),
+        # 일별 점수 변동성 완화(스윙 관점 안정화)
+        PipelineStage(
+            "점수안정화", _score_stability_stage, {"today_date": today_date, "max_daily_delta": 8.0, "smooth_alpha": 0.7}
+        ),
+        # 신호 신뢰도 계층화(VIX 레짐별 임계치)
+        PipelineStage("신호신뢰도", _signal_confidence_stage, {"current_vix": current_vix}),
+        # 사용자 스윙 전략 오버레이: 연기금 중심 수급, 진입유형, 후보 수 제한, 매도 점검
+        PipelineStage("스윙오버레이", _swing_overlay_stage, {"current_vix": current_vix, "max_buy_candidates": max_buy_candidates}),
+    ]
+
+
 def write_daily_swing_candidates(df_final, today_date):
     cols = [
         "날짜", "종목명", "종목코드", "테마", "매수후보", "진입유형", "스윙우선순위",
@@ -1722,7 +2156,7 @@ def get_target_stock_list():
         for page in range(1, 7): 
             url = f"https://finance.naver.com/sise/sise_market_sum.naver?sosok={sosok}&page={page}"
             try:
-                res = requests.get(url, headers=custom_headers, timeout=10)
+                res = http_get(url, headers=custom_headers, timeout=10)
                 soup = BeautifulSoup(res.text, 'html.parser')
                 for tr in soup.select('table.type_2 tbody tr'):
                     tds = tr.select('td')
@@ -1744,10 +2178,13 @@ def get_target_stock_list():
             time.sleep(0.5) 
     return pd.DataFrame(target_list).sort_values('시가총액', ascending=False)
 
-def _request_html(url, headers, timeout=4, retries=2):
+def _request_html(url, headers, timeout=4, retries=2, use_cache=False):
+    """use_cache=True면 엔드포인트별 TTL 디스크 캐시(services.http_cache_service)를 거칩니다."""
     for attempt in range(retries + 1):
         try:
-            return requests.get(url, headers=headers, timeout=timeout)
+            if use_cache:
+                return cached_get(url, headers=headers, timeout=timeout, retry=False)
+            return http_get(url, headers=headers, timeout=timeout, retry=False)
         except Exception as e:
             if attempt == retries:
                 print(f"⚠️ 요청 실패: {url} ({e})")
@@ -1770,18 +2207,23 @@ def load_score_trend_safe():
         return pd.DataFrame(columns=base_cols)
 
     df.columns = [str(c).replace('\ufeff', '').strip() for c in df.columns]
-    bad_cols = [c for c in df.columns if any(x in str(c) for x in ["<<<<<<<", "=======", ">>>>>>>"])]
-    if bad_cols:
-        df = df.drop(columns=bad_cols, errors='ignore')
+    # append_table_by_date/write_table은 원자적으로 쓰므로 충돌 표식은 git 머지에서만 생깁니다.
+    # 원문에 표식이 있을 때만 걸러내고, 정리된 파일 재저장은 run_scraper의 백그라운드 정리가 맡습니다.
+    has_markers = csv_has_conflict_markers("score_trend.csv")
+    if has_markers:
+        bad_cols = [c for c in df.columns if any(x in str(c) for x in ["<<<<<<<", "=======", ">>>>>>>"])]
+        if bad_cols:
+            df = df.drop(columns=bad_cols, errors='ignore')
 
     if '날짜' not in df.columns:
         return pd.DataFrame(columns=base_cols)
 
-    marker_pat = r"^(?:<<<<<<<|=======|>>>>>>>)"
-    if '날짜' in df.columns:
-        df = df[~df['날짜'].astype(str).str.contains(marker_pat, regex=True, na=False)]
-    if '종목명' in df.columns:
-        df = df[~df['종목명'].astype(str).str.contains(marker_pat, regex=True, na=False)]
+    if has_markers:
+        marker_pat = r"^(?:<<<<<<<|=======|>>>>>>>)"
+        if '날짜' in df.columns:
+            df = df[~df['날짜'].astype(str).str.contains(marker_pat, regex=True, na=False)]
+        if '종목명' in df.columns:
+            df = df[~df['종목명'].astype(str).str.contains(marker_pat, regex=True, na=False)]
 
     for c in base_cols + optional_cols:
         if c not in df.columns:
@@ -1847,6 +2289,14 @@ def _normalize_stock_code_6(stock_code):
         return s.zfill(6)
     return s if len(s) == 6 else ""
 
+def _is_cacheable_dart_response(res):
+    """DART는 오류도 HTTP 200으로 내려오므로 정상(000)/조회없음(013)만 캐시합니다."""
+    try:
+        return str(res.json().get("status", "")) in {"000", "013"}
+    except Exception:
+        return False
+
+
 def _fetch_dart_list_json_pages(corp_code, api_key, bgn_de, end_de, pblntf_ty):
     """DART list.json 전체 페이지 수집. 실패 시 None."""
     url = "https://opendart.fss.or.kr/api/list.json"
@@ -1863,7 +2313,7 @@ def _fetch_dart_list_json_pages(corp_code, api_key, bgn_de, end_de, pblntf_ty):
             "pblntf_ty": pblntf_ty,
         }
         try:
-            r = requests.get(url, params=params, timeout=15)
+            r = cached_get(url, params=params, timeout=15, cacheable=_is_cacheable_dart_response)
             data = r.json()
         except Exception:
             return None
@@ -1895,7 +2345,7 @@ def _get_recent_disclosures_naver(stock_code, stock_name, max_items=3):
     """네이버 금융 공시 페이지에서 최근 공시 (기존 로직)."""
     headers = {'User-Agent': 'Mozilla/5.0'}
     url = f"https://finance.naver.com/item/news_notice.naver?code={stock_code}"
-    res = _request_html(url, headers=headers, timeout=4, retries=1)
+    res = _request_html(url, headers=headers, timeout=4, retries=1, use_cache=True)
     if res is None:
         return []
     try:
@@ -1976,7 +2426,7 @@ def get_recent_analyst_reports(stock_name, max_items=3):
     """네이버 증권 리서치에서 종목 키워드 리포트를 조회합니다."""
     headers = {'User-Agent': 'Mozilla/5.0'}
     url = f"https://finance.naver.com/research/company_list.naver?keyword={requests.utils.quote(stock_name)}"
-    res = _request_html(url, headers=headers, timeout=4, retries=1)
+    res = _request_html(url, headers=headers, timeout=4, retries=1, use_cache=True)
     if res is None:
         return []
     try:
@@ -2072,7 +2522,7 @@ def get_live_macro_and_news():
                 "tags": tags
             })
 
-        res = _request_html("https://finance.naver.com/news/mainnews.naver", headers=headers, timeout=4, retries=1)
+        res = _request_html("https://finance.naver.com/news/mainnews.naver", headers=headers, timeout=4, retries=1, use_cache=True)
         if res is not None:
             soup = BeautifulSoup(res.text, 'html.parser')
             subjects = soup.select('.articleSubject a')
@@ -2087,7 +2537,7 @@ def get_live_macro_and_news():
 
         # 네이버 금융 검색 fallback (최신성 필터)
         if not candidates:
-            fin_res = _request_html("https://finance.naver.com/news/news_search.naver?q=%EC%BD%94%EC%8A%A4%ED%94%BC", headers=headers, timeout=4, retries=1)
+            fin_res = _request_html("https://finance.naver.com/news/news_search.naver?q=%EC%BD%94%EC%8A%A4%ED%94%BC", headers=headers, timeout=4, retries=1, use_cache=True)
             if fin_res is not None:
                 soup_fin = BeautifulSoup(fin_res.text, "html.parser")
                 for tr in soup_fin.select("table.type5 tr"):
@@ -2110,7 +2560,7 @@ def get_live_macro_and_news():
         # 무료 RSS 확장 수집(반복 이슈 계산용)
         if len(candidates) < 40:
             rss_url = "https://news.google.com/rss/search?q=%EC%A6%9D%EC%8B%9C%20OR%20%EC%BD%94%EC%8A%A4%ED%94%BC%20OR%20%EA%B8%88%EB%A6%AC&hl=ko&gl=KR&ceid=KR:ko"
-            rss_res = _request_html(rss_url, headers=headers, timeout=5, retries=1)
+            rss_res = _request_html(rss_url, headers=headers, timeout=5, retries=1, use_cache=True)
             if rss_res is not None:
                 soup_rss = _parse_rss_soup(rss_res.text)
                 for item in soup_rss.select("item")[:40]:
@@ -2171,6 +2621,14 @@ def get_live_macro_and_news():
 
 
 def run_super_parse(months=SUPER_PARSE_DEFAULT_MONTHS, years=None, max_stocks=None):
+    metrics = RunMetrics("super-parse")
+    try:
+        _run_super_parse(metrics, months=months, years=years, max_stocks=max_stocks)
+    finally:
+        metrics.flush()
+
+
+def _run_super_parse(metrics, months=SUPER_PARSE_DEFAULT_MONTHS, years=None, max_stocks=None):
     months = int(years) * 12 if years else int(months or SUPER_PARSE_DEFAULT_MONTHS)
     months = max(SUPER_PARSE_DEFAULT_MONTHS, min(months, SUPER_PARSE_MAX_YEARS * 12))
     print(f"🧱 [super-parse] 최근 {months}개월 가격/수급 누적 수집을 시작합니다.")
@@ -2190,7 +2648,9 @@ def run_super_parse(months=SUPER_PARSE_DEFAULT_MONTHS, years=None, max_stocks=No
         print("❌ KIS 인증 정보가 유효하지 않아 super-parse를 중단합니다.")
         return
 
-    df_target = get_target_stock_list()
+    with metrics.span("대상종목") as span:
+        df_target = get_target_stock_list()
+        span["rows"] = len(df_target)
     if df_target.empty:
         print("❌ 수집 대상 종목이 없어 super-parse를 중단합니다.")
         return
@@ -2218,47 +2678,69 @@ def run_super_parse(months=SUPER_PARSE_DEFAULT_MONTHS, years=None, max_stocks=No
     }
     url_kis = f"{URL_BASE}/uapi/domestic-stock/v1/quotations/investor-trade-by-stock-daily"
 
+    targets = list(zip(df_target["종목명"], df_target["종목코드"]))
+    print(f"   - 병렬 수집: 워커 {KIS_MAX_WORKERS}개 / 초당 최대 {KIS_MAX_RPS:g}건")
+
+    def _report_progress(done, total):
+        if done % 25 == 0:
+            print(f"   - {done}/{total} 종목 수집 완료...")
+
+    metrics.begin("KIS백필")
+    results = collect_kis_history_backfill_many(
+        targets, url_kis, headers, input_date, cutoff, max_pages,
+        limiter=build_kis_rate_limiter(), progress=_report_progress,
+    )
     history_rows = []
     empty_response_count = 0
     failed_response_count = 0
     total_page_dates = 0
-    for idx, row in enumerate(df_target.itertuples(), start=1):
-        code = getattr(row, "종목코드")
-        name = getattr(row, "종목명")
-        try:
-            rows, empty_pages, failed_pages, page_dates = _collect_kis_history_backfill(
-                name, code, url_kis, headers, input_date, cutoff, max_pages
-            )
-            history_rows.extend(rows)
-            empty_response_count += empty_pages
-            failed_response_count += failed_pages
-            total_page_dates += page_dates
-            if idx % 25 == 0:
-                print(f"   - {idx}/{len(df_target)} 종목 수집 중... 누적 원천일자 {total_page_dates:,}개")
-            time.sleep(0.05)
-        except Exception as e:
-            print(f"[WARN] super-parse 수집 실패({name}/{code}): {e}")
+    for (name, code), result in zip(targets, results):
+        if isinstance(result, Exception):
+            print(f"[WARN] super-parse 수집 실패({name}/{code}): {result}")
+            continue
+        rows, empty_pages, failed_pages, page_dates = result
+        history_rows.extend(rows)
+        empty_response_count += empty_pages
+        failed_response_count += failed_pages
+        total_page_dates += page_dates
+    print(f"   - 누적 원천일자 {total_page_dates:,}개")
+    metrics.end("KIS백필", rows=len(history_rows))
 
     if not history_rows:
         print(f"[INFO] 빈 응답 종목 수: {empty_response_count}, 실패 응답 종목 수: {failed_response_count}")
         print("❌ super-parse로 추가 수집된 데이터가 없습니다.")
         return
 
-    merged_history = merge_history_snapshot(pd.DataFrame(history_rows))
-    write_table_dual(merged_history, "history.csv", index=False, encoding="utf-8-sig")
-    replay = build_replay_score_trend()
-    trades, perf = build_swing_backtest_files()
+    with metrics.span("history병합") as span:
+        history_total = upsert_history_snapshot(pd.DataFrame(history_rows))
+        span["rows"] = history_total
+    with metrics.span("리플레이") as span:
+        replay = build_replay_score_trend()
+        span["rows"] = len(replay)
+    with metrics.span("스윙백테스트") as span:
+        trades, perf = build_swing_backtest_files()
+        span["rows"] = len(trades)
     print(
-        f"✅ super-parse 완료: history {len(merged_history):,}행, "
+        f"✅ super-parse 완료: history {history_total:,}행, "
         f"replay {len(replay):,}행, trades {len(trades):,}행, performance {len(perf):,}행"
     )
 
 def run_scraper(manual_full_parse=False):
+    metrics = RunMetrics("scraper")
+    try:
+        _run_scraper(metrics, manual_full_parse=manual_full_parse)
+    finally:
+        metrics.flush()
+
+
+def _run_scraper(metrics, manual_full_parse=False):
     print("🚀 수집기 봇 가동 시작 (V40.4 기관 수급 눌림목 최적화 & 백테스트 방어)...")
     migrate_csv_to_sqlite_once([
         ("data", "data.csv"),
         ("history", "history.csv"),
         ("score_trend", "score_trend.csv"),
+        ("replay_score_trend", "replay_score_trend.csv"),
+        ("swing_trades", "swing_trades.csv"),
         ("performance_trend", "performance_trend.csv"),
         ("theme_suggestions", "theme_suggestions.csv"),
         ("theme_quality_trend", "theme_quality_trend.csv"),
@@ -2266,9 +2748,14 @@ def run_scraper(manual_full_parse=False):
         ("dart_map", "dart_map.csv"),
         ("theme_map", "theme_map.csv"),
     ])
+    # 머지 충돌 표식이 남은 score_trend.csv는 수집과 병행해 정리합니다(같은 테이블 쓰기는 정리가 끝난 뒤 진행).
+    compact_in_background(
+        "score_trend", "score_trend.csv", load_score_trend_safe, csv_kwargs={"index": False, "encoding": "utf-8-sig"}
+    )
     KST = timezone(timedelta(hours=9))
     now_kst = datetime.now(KST)
     
+    metrics.begin("매크로/뉴스")
     try:
         vix_hist = yf.Ticker("^VIX").history(period="1d")
         current_vix = float(vix_hist['Close'].iloc[-1])
@@ -2278,6 +2765,7 @@ def run_scraper(manual_full_parse=False):
     regime = "공포/하락장 (안전제일 눌림목 & 펀더멘털 방어)" if current_vix >= 25 else "평온/강세장 (핫섹터 폭발적 모멘텀)"
     print(f"🌍 실시간 VIX 지수: {current_vix:.2f} ➔ [{regime}] 가동")
     macro_str_for_scoring, news_str_for_scoring, macro_recency_score, repeated_topics_text = get_live_macro_and_news()
+    metrics.end("매크로/뉴스")
 
     is_eod_updated = (now_kst.hour > 15) or (now_kst.hour == 15 and now_kst.minute >= 40)
     ref_date = now_kst.date() if is_eod_updated else (now_kst - timedelta(days=1)).date()
@@ -2291,7 +2779,7 @@ def run_scraper(manual_full_parse=False):
     already_fetched_kis = False
     if csv_exists("history.csv"):
         try:
-            df_hist_check = read_table_prefer_db("history.csv")
+            df_hist_check = get_history_frame().raw()
             if not df_hist_check.empty and '일자' in df_hist_check.columns:
                 latest_kis_date = str(df_hist_check['일자'].max()).replace("-", "")
                 if latest_kis_date == target_kis_date:
@@ -2318,71 +2806,23 @@ def run_scraper(manual_full_parse=False):
     # ==========================================
     if already_fetched_kis and csv_exists("data.csv") and not force_full_parse:
         is_test_mode = True # KIS API를 스킵하는 테스트 워크플로우임을 확정
+        metrics.mode = "cache"
         print(f"⚡ [슈퍼 캐시 모드] 기준일({target_kis_date}) 수급 데이터 존재 확인. KIS API를 스킵합니다.")
         
-        df_target = get_target_stock_list()
+        with metrics.span("대상종목") as span:
+            df_target = get_target_stock_list()
+            span["rows"] = len(df_target)
+        metrics.begin("캐시재산출")
         df_final = read_table_prefer_db("data.csv")
         
-        updated_rows = []
-        for idx, row in df_final.iterrows():
-            row_dict = row.to_dict()
-            live_info = df_target[df_target['종목명'] == row_dict['종목명']]
-            
-            old_price = row_dict.get('현재가', 1)
-            old_gap = row_dict.get('이격도(%)', 100)
-            new_gap = old_gap
-            
-            if not live_info.empty:
-                new_price = live_info.iloc[0]['현재가']
-                new_gap = old_gap * (new_price / old_price) if old_price > 0 else old_gap
-                
-                row_dict['현재가'] = new_price
-                row_dict['등락률'] = live_info.iloc[0]['등락률']
-                row_dict['시가총액'] = live_info.iloc[0]['시가총액']
-                row_dict['PER'] = live_info.iloc[0]['PER']
-                row_dict['ROE'] = live_info.iloc[0]['ROE']
-                row_dict['이격도(%)'] = new_gap
-
-            is_ma20_rising_flag = row_dict.get('추세상승', True)
-            dip_buying_ratio = float(row_dict.get('음봉매집률', 0.0))
-
-            quant_score = calculate_dynamic_score(
-                f_str=row_dict.get('외인강도(%)', 0), p_str=row_dict.get('연기금강도(%)', 0),
-                t_str=row_dict.get('투신강도(%)', 0), pef_str=row_dict.get('사모강도(%)', 0),
-                vol_surge=row_dict.get('거래급증(%)', 0), rsi_val=row_dict.get('RSI', 50),
-                gap_20=new_gap, foreign_streak=row_dict.get('외인연속', 0),
-                pension_streak=row_dict.get('연기금연속', 0), 
-                turnover_rate=row_dict.get('손바뀜(%)', 0), 
-                is_ma20_rising=is_ma20_rising_flag, 
-                per_val=row_dict.get('PER', 0), roe_val=row_dict.get('ROE', 0), 
-                current_vix=current_vix,
-                dip_buying_ratio=dip_buying_ratio
-            )
-            theme_name = resolve_theme_label(row_dict.get('종목코드', ''), row_dict.get('종목명', ''), row_dict.get('섹터', '분류안됨'))
-            qual_score, qual_details = calculate_qualitative_score(
-                sector_name=theme_name,
-                per_val=row_dict.get('PER', 0),
-                roe_val=row_dict.get('ROE', 0),
-                foreign_streak=row_dict.get('외인연속', 0),
-                pension_streak=row_dict.get('연기금연속', 0),
-                macro_news_text=news_str_for_scoring,
-                macro_recency_score=macro_recency_score,
-                repeated_topics_text=repeated_topics_text,
-                return_details=True
-            )
-            final_score, qual_adj, score_mode = blend_quant_qual_score(quant_score, qual_score, current_vix)
-            row_dict['Quant점수'] = int(round(quant_score))
-            row_dict['정성점수'] = round(qual_score, 2)
-            row_dict['정성보정치'] = qual_adj
-            row_dict['점수모드'] = score_mode
-            row_dict['AI수급점수'] = final_score
-            row_dict['테마'] = theme_name
-            row_dict['뉴스테마가점'] = qual_details.get("theme_boost_applied", 0.0)
-            row_dict['뉴스톤계수'] = qual_details.get("theme_tone_mult", 0.0)
-            row_dict['뉴스부정키워드수'] = qual_details.get("negative_hits", 0)
-            updated_rows.append(row_dict)
-
-        df_final = pd.DataFrame(updated_rows).sort_values('AI수급점수', ascending=False)
+        df_final = apply_live_quotes(df_final, df_target)
+        if not df_final.empty:
+            score_inputs = cached_score_inputs(df_final)
+            scored = score_candidate_frame(score_inputs, current_vix, news_str_for_scoring, macro_recency_score, repeated_topics_text)
+            for col in scored.columns:
+                df_final[col] = scored[col]
+            df_final = df_final.sort_values('AI수급점수', ascending=False)
+        metrics.end("캐시재산출", rows=len(df_final))
         
         eval_msg = "⚡ (슈퍼 캐시 모드로 재산출된 랭킹입니다.)\n\n"
             
@@ -2390,8 +2830,11 @@ def run_scraper(manual_full_parse=False):
     # 2. 풀 파싱 모드 (정규 수집)
     # ==========================================
     else:
+        metrics.mode = "full-parse"
         print("📥 [풀 파싱 모드] 새로운 수급 데이터 및 추세 정보를 KIS API로부터 수집합니다.")
-        df_target = get_target_stock_list()
+        with metrics.span("대상종목") as span:
+            df_target = get_target_stock_list()
+            span["rows"] = len(df_target)
         token = get_kis_access_token()
         kis_app_key, kis_app_secret = resolve_kis_credentials()
         if not token or not kis_app_key or not kis_app_secret:
@@ -2400,23 +2843,30 @@ def run_scraper(manual_full_parse=False):
         headers = {"authorization": f"Bearer {token}", "appkey": kis_app_key, "appsecret": kis_app_secret, "tr_id": "FHPTJ04160001", "custtype": "P"}
         url_kis = f"{URL_BASE}/uapi/domestic-stock/v1/quotations/investor-trade-by-stock-daily"
 
-        data_list, history_list = [], []
+        data_list, history_list, score_rows = [], [], []
+        # KIS 일별 수급 응답은 토큰 버킷으로 속도를 맞춰 병렬 선수집하고, 아래 루프는 종목 순서대로 처리
+        with metrics.span("KIS수급수집") as span:
+            kis_responses = fetch_kis_investor_daily(
+                df_target["종목코드"].tolist(), url_kis, headers, target_kis_date, limiter=build_kis_rate_limiter()
+            )
+            span["rows"] = len(kis_responses)
 
+        metrics.begin("종목수집")
         for i, row in enumerate(df_target.itertuples()):
             code, name, prpr, marcap = row.종목코드, row.종목명, row.현재가, row.시가총액
             sector_name = "분류안됨"
             try:
-                res_nv = requests.get(f"https://finance.naver.com/item/main.naver?code={code}", headers={'User-Agent': 'Mozilla/5.0'}, timeout=5)
+                res_nv = cached_get(f"https://finance.naver.com/item/main.naver?code={code}", headers={'User-Agent': 'Mozilla/5.0'}, timeout=5)
                 sector_tag = BeautifulSoup(res_nv.text, 'html.parser').select_one('div.trade_compare h4.h_sub a')
                 if sector_tag: sector_name = sector_tag.text.strip()
             except Exception as e:
                 print(f"[WARN] 섹터 수집 실패({name}/{code}): {e}")
             theme_name = resolve_theme_label(code, name, sector_name)
 
-            params = {"FID_COND_MRKT_DIV_CODE": "J", "FID_INPUT_ISCD": code, "FID_INPUT_DATE_1": target_kis_date, "FID_ORG_ADJ_PRC": "0", "FID_ETC_CLS_CODE": "0"}
-            
             try:
-                res = requests.get(url_kis, headers=headers, params=params, timeout=5)
+                res = kis_responses[i]
+                if isinstance(res, Exception):
+                    raise res
                 f_amt_sum, p_amt_sum, t_amt_sum, pef_amt_sum = 0, 0, 0, 0
                 foreign_streak, pension_streak, f_buying, p_buying = 0, 0, True, True  
                 closes, volumes, trade_values, vol_tr_sum_5d = [], [], [], 0 
@@ -2495,28 +2945,9 @@ def run_scraper(manual_full_parse=False):
                     if total_pt > 0:
                         dip_buying_ratio = max(0.0, min(1.0, dip_pt / total_pt))
 
-                quant_score = calculate_dynamic_score(
-                    f_str, p_str, t_str, pef_str, vol_surge, rsi_val, gap_20,
-                    foreign_streak, pension_streak, turnover_rate, is_ma20_rising,
-                    row.PER, row.ROE, current_vix,
-                    dip_buying_ratio=dip_buying_ratio
-                )
-                qual_score, qual_details = calculate_qualitative_score(
-                    sector_name=theme_name,
-                    per_val=row.PER,
-                    roe_val=row.ROE,
-                    foreign_streak=foreign_streak,
-                    pension_streak=pension_streak,
-                    macro_news_text=news_str_for_scoring,
-                    macro_recency_score=macro_recency_score,
-                    repeated_topics_text=repeated_topics_text,
-                    return_details=True
-                )
-                final_score, qual_adj, score_mode = blend_quant_qual_score(quant_score, qual_score, current_vix)
-
                 data_list.append({
-                    '종목명': name, '종목코드': code, '소속': row.소속, '섹터': sector_name, '테마': theme_name, 'AI수급점수': final_score,
-                    'Quant점수': int(round(quant_score)), '정성점수': round(qual_score, 2), '정성보정치': qual_adj, '점수모드': score_mode,
+                    '종목명': name, '종목코드': code, '소속': row.소속, '섹터': sector_name, '테마': theme_name, 'AI수급점수': None,
+                    'Quant점수': None, '정성점수': None, '정성보정치': None, '점수모드': None,
                     '현재가': prpr, '등락률': row.등락률, '외인강도(%)': f_str, '연기금강도(%)': p_str, '투신강도(%)': t_str, '사모강도(%)': pef_str,
                     '외인연속': foreign_streak, '연기금연속': pension_streak, '이격도(%)': round(gap_20, 1), '손바뀜(%)': round(turnover_rate, 1),
                     'RSI': round(rsi_val, 1), '거래급증(%)': round(vol_surge, 1),
@@ -2532,51 +2963,57 @@ def run_scraper(manual_full_parse=False):
                     'MA20': trend_quality["ma20"],
                     '음봉매집률': round(dip_buying_ratio, 4),
                     '시가총액': marcap, 'PER': row.PER, 'ROE': row.ROE,
-                    '뉴스테마가점': qual_details.get("theme_boost_applied", 0.0),
-                    '뉴스톤계수': qual_details.get("theme_tone_mult", 0.0),
-                    '뉴스부정키워드수': qual_details.get("negative_hits", 0)
+                    '뉴스테마가점': None, '뉴스톤계수': None, '뉴스부정키워드수': None,
+                })
+                score_rows.append({
+                    "f_str": f_str, "p_str": p_str, "t_str": t_str, "pef_str": pef_str, "vol_surge": vol_surge,
+                    "rsi_val": rsi_val, "gap_20": gap_20, "foreign_streak": foreign_streak, "pension_streak": pension_streak,
+                    "turnover_rate": turnover_rate, "is_ma20_rising": is_ma20_rising, "per_val": row.PER, "roe_val": row.ROE,
+                    "dip_buying_ratio": dip_buying_ratio, "sector_name": theme_name,
                 })
             except Exception as e:
                 print(f"[WARN] 종목 처리 실패({name}/{code}): {e}")
-            time.sleep(0.2) 
+        metrics.end("종목수집", rows=len(data_list))
 
         if not data_list: return
 
-        df_final = pd.DataFrame(data_list).sort_values('AI수급점수', ascending=False)
+        # 점수는 수집 루프가 끝난 뒤 전 종목을 한 번에 계산합니다(data_list의 None 자리를 그대로 채워 컬럼 순서 유지).
+        with metrics.span("점수산출") as span:
+            df_final = pd.DataFrame(data_list)
+            scored = score_candidate_frame(pd.DataFrame(score_rows), current_vix, news_str_for_scoring, macro_recency_score, repeated_topics_text)
+            for col in scored.columns:
+                df_final[col] = scored[col].to_numpy()
+            df_final = df_final.sort_values('AI수급점수', ascending=False)
+            span["rows"] = len(df_final)
         
         df_history = pd.DataFrame(history_list)
         if not df_history.empty:
-            df_history_merged = merge_history_snapshot(df_history)
-            write_table_dual(df_history_merged, "history.csv", index=False, encoding='utf-8-sig')
-            print(f"📚 history.csv 누적 병합 완료: 신규 {len(df_history):,}행 → 누적 {len(df_history_merged):,}행")
+            with metrics.span("history병합") as span:
+                history_total = upsert_history_snapshot(df_history)
+                span["rows"] = history_total
+            print(f"📚 history.csv 누적 병합 완료: 신규 {len(df_history):,}행 → 누적 {history_total:,}행")
         else:
             # 빈 수집 결과로 기존 history.csv를 덮어써서 파일이 깨지는 상황 방지
             print("⚠️ history_list가 비어 있어 history.csv 갱신을 건너뜁니다. (기존 파일 유지)")
 
         eval_msg = ""
     
-    # 상위 후보군 정성 심화(공시/리포트) 재보정
-    df_final = apply_enhanced_qual_for_top_candidates(df_final, current_vix=current_vix, top_n=40)
-    # 상위권 특정 테마 쏠림 완화
-    df_final = apply_theme_crowding_penalty(df_final, top_n=40, crowd_ratio=0.3)
-    # 테마 가점 품질 모니터링 + 과열 자동 완화
-    df_final, theme_quality_metric = apply_theme_contribution_guard(
-        df_final, today_date=today_date, current_vix=current_vix, top_n=40
-    )
-    # 캐시 모드에서도 최근 종가 기준 정배열/추세품질을 다시 입혀 하락 추세 종목을 눌러줍니다.
-    df_final = enrich_trend_quality_from_history(df_final)
-    # 눌림목 전용 미세 룰(과열 추격 억제 + 정상 눌림 우대)
-    df_final = apply_pullback_trade_rules(df_final, current_vix=current_vix)
-    # 일별 점수 변동성 완화(스윙 관점 안정화)
-    df_final = apply_score_stability(df_final, today_date=today_date, max_daily_delta=8.0, smooth_alpha=0.7)
-    # 신호 신뢰도 계층화(VIX 레짐별 임계치)
-    df_final = add_signal_confidence(df_final, current_vix=current_vix)
     max_buy_candidates = resolve_max_buy_candidates(current_vix)
-    # 사용자 스윙 전략 오버레이: 연기금 중심 수급, 진입유형, 후보 수 제한, 매도 점검
-    df_final = apply_swing_strategy_overlay(df_final, current_vix=current_vix, max_buy_candidates=max_buy_candidates)
+    with metrics.span("후처리") as span:
+        df_final, stage_ctx, stage_timings = run_stage_pipeline(
+            df_final, build_post_scoring_stages(current_vix, today_date, max_buy_candidates, top_n=40)
+        )
+        span["rows"] = len(df_final)
+    metrics.add_stage_timings(stage_timings, parent="후처리")
+    theme_quality_metric = stage_ctx.get("theme_quality_metric", {})
+    if stage_timings:
+        print(format_stage_timings(stage_timings))
+    metrics.begin("후보저장")
     generate_theme_suggestions(df_final, today_date=today_date, top_n=40)
     write_daily_swing_candidates(df_final, today_date)
     write_table_dual(df_final, "data.csv", index=False, encoding='utf-8-sig')
+    # 장중 갱신(--intraday)은 이 data.csv 점수를 같은 VIX/뉴스 입력으로 재평가합니다.
+    save_scoring_context(today_date, current_vix, news_str_for_scoring, macro_recency_score, repeated_topics_text)
 
     trend_cols = [
         '종목명', '종목코드', 'AI수급점수', '매수후보', '진입유형', '스윙우선순위',
@@ -2593,23 +3030,29 @@ def run_scraper(manual_full_parse=False):
     df_trend_new['순위'] = range(1, len(df_trend_new) + 1)
     df_trend_new['날짜'] = today_date
 
-    trend_file = "score_trend.csv"
-    if csv_exists(trend_file):
-        df_trend_old = load_score_trend_safe()
-        df_trend_old = df_trend_old[df_trend_old['날짜'] != today_date]
-        trend_concat = pd.concat([df_trend_old, df_trend_new], ignore_index=True)
-        write_table_dual(trend_concat, trend_file, index=False, encoding='utf-8-sig')
-    else:
-        write_table_dual(df_trend_new, trend_file, index=False, encoding='utf-8-sig')
+    append_table_by_date(
+        df_trend_new, "score_trend.csv", date_col='날짜', load_existing=load_score_trend_safe,
+        index=False, encoding='utf-8-sig',
+    )
+    metrics.end("후보저장", rows=len(df_trend_new))
 
+    metrics.begin("스윙백테스트")
     try:
-        build_swing_backtest_files(top_n=3, horizons=SWING_HORIZONS, primary_horizon=PRIMARY_SWING_HORIZON)
+        swing_trades, _ = build_swing_backtest_files(
+            top_n=3,
+            horizons=SWING_HORIZONS,
+            primary_horizon=PRIMARY_SWING_HORIZON,
+            incremental=incremental_backtest_enabled(),
+        )
+        metrics.end("스윙백테스트", rows=len(swing_trades))
     except Exception as e:
+        metrics.end("스윙백테스트", status="error")
         print(f"[WARN] 스윙 백테스트 파일 생성 실패: {e}")
 
     # ==========================================
     # 레거시 Top3 정산 로직
     # ==========================================
+    metrics.begin("레거시정산")
     portfolio_file = resolve_csv_path("portfolio.csv")
     perf_file = "legacy_performance_trend.csv"
     top3_names = df_final.head(3)['종목명'].tolist() 
@@ -2670,7 +3113,11 @@ def run_scraper(manual_full_parse=False):
                 perf_concat['리스크상태'] = perf_concat['최대낙폭(%)'].apply(
                     lambda x: "High" if x <= -8 else ("Medium" if x <= -4 else "Low")
                 )
-                write_table_dual(perf_concat, perf_file, index=False, encoding='utf-8-sig')
+                # 재계산으로 과거 행이 바뀌지 않았으면(평소) 오늘 행만 덧붙이고, 복구가 일어났으면 전체를 다시 씁니다.
+                if _same_rows(perf_concat.iloc[:-1], df_perf) and str(perf_concat['날짜'].iloc[-1]) == str(today_date):
+                    append_table_by_date(perf_concat.tail(1), perf_file, date_col='날짜', index=False, encoding='utf-8-sig')
+                else:
+                    write_table_dual(perf_concat, perf_file, index=False, encoding='utf-8-sig')
 
             if is_eod_updated:
                 eval_msg += "📝 *[전일 추천 Top 3 최종 성적표]*\n" + "\n".join(eval_details) + f"\n➡️ *오늘 포트폴리오 최종 수익률: {daily_ret:+.2f}%*\n\n"
@@ -2688,11 +3135,13 @@ def run_scraper(manual_full_parse=False):
             top3_df = df_final.head(3)[['종목명', '현재가']].rename(columns={'현재가': '매수가'})
             top3_df['날짜'] = today_date
             write_table_dual(top3_df, "portfolio.csv", index=False, encoding='utf-8-sig')
+    metrics.end("레거시정산")
 
     # ==========================================
     # 텔레그램 발송 및 AI 리포트
     # ==========================================
     gemini_api_key = resolve_gemini_api_key()
+    metrics.begin("리포트")
     if gemini_api_key:
         try:
             client = genai.Client(api_key=gemini_api_key)
@@ -2701,7 +3150,7 @@ def run_scraper(manual_full_parse=False):
             top_N_names = df_final.head(20)['종목명'].tolist()
             if csv_exists("history.csv"):
                 try:
-                    df_history = read_table_prefer_db("history.csv")
+                    df_history = get_history_frame().raw()
                     required_cols = {"일자", "종목명", "외인", "연기금"}
                     if not df_history.empty and required_cols.issubset(df_history.columns):
                         latest_date = df_history['일자'].max()
@@ -2716,7 +3165,8 @@ def run_scraper(manual_full_parse=False):
                 df_merged = df_final.head(20)[['종목명', '섹터', 'AI수급점수', '손바뀜(%)', 'RSI', '거래급증(%)']]
             
             macro_str, news_str = macro_str_for_scoring, news_str_for_scoring
-            top3_event_context = build_top3_event_context(df_final)
+            with metrics.span("Top3공시/리포트", parent="리포트"):
+                top3_event_context = build_top3_event_context(df_final)
             print("📌 Top3 공시/리포트 컨텍스트 수집 완료")
             session_label = "장 마감" if is_eod_updated else "장중"
             
@@ -2751,15 +3201,18 @@ def run_scraper(manual_full_parse=False):
             [주의] 제공 텍스트 외의 외부 검색 없이 작성.
             """
             
-            response = client.models.generate_content(
-                model='gemma-4-31b-it',
-                contents=prompt
-            )
+            with metrics.span("Gemini", parent="리포트"):
+                response = client.models.generate_content(
+                    model='gemma-4-31b-it',
+                    contents=prompt
+                )
             
             with open("report.md", "w", encoding="utf-8") as f:
                 f.write(f"## 🌐 AlphaPulse 데일리 퀀트 리포트 ({now_kst.strftime('%Y-%m-%d %H:%M')})\n\n{response.text}")
 
-            send_telegram_message(build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod_updated))
+            metrics.end("리포트")
+            with metrics.span("텔레그램"):
+                send_telegram_message(build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod_updated))
         except Exception as e:
             print(f"⚠️ AI 리포트 생성 실패: {e}")
             fallback_report = f"""## 🌐 AlphaPulse 데일리 퀀트 리포트 ({now_kst.strftime('%Y-%m-%d %H:%M')})
@@ -2789,7 +3242,9 @@ AI 리포트 생성에 실패하여 자동 요약본으로 대체합니다.
 """
             with open("report.md", "w", encoding="utf-8") as f:
                 f.write(fallback_report)
-            send_telegram_message(build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod_updated))
+            metrics.end("리포트")
+            with metrics.span("텔레그램"):
+                send_telegram_message(build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod_updated))
     else:
         # API 키가 없더라도 report.md는 매 실행 최신화
         fallback_report = f"""## 🌐 AlphaPulse 데일리 퀀트 리포트 ({now_kst.strftime('%Y-%m-%d %H:%M')})
@@ -2819,10 +3274,77 @@ Gemini API 키가 없어 자동 요약본으로 생성했습니다.
 """
         with open("report.md", "w", encoding="utf-8") as f:
             f.write(fallback_report)
-        send_telegram_message(build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod_updated))
+        metrics.end("리포트")
+        with metrics.span("텔레그램"):
+            send_telegram_message(build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod_updated))
 
     # 주간 1회 용량 리포트 누적 + 매 실행 콘솔 요약
-    emit_weekly_storage_report()
+    with metrics.span("저장소리포트"):
+        emit_weekly_storage_report()
+
+def run_intraday_refresh():
+    metrics = RunMetrics("intraday")
+    try:
+        _run_intraday_refresh(metrics)
+    finally:
+        metrics.flush()
+
+
+def _run_intraday_refresh(metrics):
+    """
+    장중 경량 갱신: 시가총액/시세 페이지만 다시 읽어 data.csv 점수와 시그널 보유 포지션을 재평가하고 변화만 텔레그램으로 보냅니다.
+    KIS/뉴스/공시/리플레이/백테스트/Gemini는 건너뛰고 마지막 정규 수집 산출물(data.csv, swing_trades.csv, 점수 컨텍스트)을 그대로 씁니다.
+    """
+    print("⚡ [장중 갱신 모드] 시세 페이지만 수집해 점수와 보유 포지션을 재평가합니다.")
+    if not csv_exists("data.csv"):
+        print("❌ data.csv가 없어 장중 갱신을 건너뜁니다. 정규 수집을 먼저 실행하세요.")
+        return
+    context = load_scoring_context()
+    if context is None:
+        print("[WARN] 저장된 점수 컨텍스트가 없어 VIX 15.0 / 뉴스 없음 기준으로 재평가합니다.")
+        context = {"current_vix": 15.0, "news_text": "", "macro_recency_score": 50.0, "repeated_topics_text": ""}
+    current_vix = float(context["current_vix"])
+    now_kst = datetime.now(timezone(timedelta(hours=9)))
+
+    with metrics.span("대상종목") as span:
+        df_target = get_target_stock_list()
+        span["rows"] = len(df_target)
+    if df_target.empty:
+        print("❌ 시세 목록을 받지 못해 장중 갱신을 중단합니다. (기존 data.csv 유지)")
+        return
+
+    with metrics.span("장중재평가") as span:
+        df_cached = read_table_prefer_db("data.csv")
+        df_live = apply_live_quotes(df_cached, df_target)
+        df_final = remark_cached_scores(
+            df_cached, df_live, current_vix,
+            context.get("news_text", ""), context.get("macro_recency_score", 50.0), context.get("repeated_topics_text", ""),
+        )
+        write_table_dual(df_final, "data.csv", index=False, encoding='utf-8-sig')
+        span["rows"] = len(df_final)
+
+    with metrics.span("보유평가") as span:
+        trades = read_table_prefer_db("swing_trades.csv", on_bad_lines="skip") if csv_exists("swing_trades.csv") else pd.DataFrame()
+        marks = mark_open_positions(trades, df_target)
+        span["rows"] = len(marks)
+
+    today = now_kst.strftime("%Y-%m-%d")
+    prev_state = load_intraday_state()
+    if prev_state.get("date") != today:
+        prev_state = {}
+    top_names = df_final.head(INTRADAY_TOP_N)['종목명'].astype(str).tolist() if '종목명' in df_final.columns else []
+    delta = build_intraday_delta(prev_state, top_names, marks)
+    print(
+        f"📝 장중 재평가: {len(df_final):,}종목 / 보유 {len(marks)}건 / "
+        f"Top{INTRADAY_TOP_N} 신규 {len(delta['entered'])} · 이탈 {len(delta['exited'])} · 보유 변동 {len(delta['moved'])}"
+    )
+    if not delta["notify"]:
+        print("🔕 직전 알림 대비 변화가 없어 텔레그램 전송을 건너뜁니다.")
+        return
+    with metrics.span("텔레그램"):
+        send_telegram_message(build_intraday_delta_message(df_final, marks, delta, now_kst, current_vix, top_n=INTRADAY_TOP_N))
+    save_intraday_state({"date": today, **delta["state"]})
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="AlphaPulse scraper runner")
@@ -2831,8 +3353,16 @@ if __name__ == "__main__":
     parser.add_argument("--months", type=int, default=SUPER_PARSE_DEFAULT_MONTHS, help="super-parse 수집 기간(개월), 기본 6개월")
     parser.add_argument("--years", type=int, choices=[1, 2], help="super-parse 수집 기간(년), 최대 2년")
     parser.add_argument("--max-stocks", type=int, help="super-parse 테스트용 최대 수집 종목 수")
+    parser.add_argument("--intraday", action="store_true", help="시세 페이지만 수집해 점수/보유 포지션을 재평가하고 변화만 텔레그램 전송 (KIS/뉴스/백테스트 생략)")
     args = parser.parse_args()
-    if args.super_parse:
-        run_super_parse(months=args.months, years=args.years, max_stocks=args.max_stocks)
-    else:
-        run_scraper(manual_full_parse=args.full_parse)
+    try:
+        if args.intraday:
+            run_intraday_refresh()
+        elif args.super_parse:
+            run_super_parse(months=args.months, years=args.years, max_stocks=args.max_stocks)
+        else:
+            run_scraper(manual_full_parse=args.full_parse)
+    finally:
+        for summary in (format_http_metrics(), format_http_cache_metrics()):
+            if summary:
+                print(summary)
@@ -23,8 +23,8 @@ from services.portfolio_advisor_service import (
     enrich_portfolio_holdings,
     portfolio_assistant_verdict,
 )
-from services.portfolio_simulator_service import simulate_portfolio
 from services.recommendation_validation_service import build_recommendation_validation
+from services.sim_cache_service import cached_simulate_portfolio
 from services.strategy_evaluation_service import (
     build_adaptive_threshold_sensitivity,
     build_start_date_stability,
@@ -152,7 +152,7 @@ def simulate_portfolio_tool(
         _, df_history, df_trades, _ = _load_core_frames()
         available = _available_dates(df_trades, df_history)
         start_date = start_date or _default_start_date(available)
-        result = simulate_portfolio(
+        result = cached_simulate_portfolio(
             df_trades,
             df_history,
             initial_cash=initial_cash,
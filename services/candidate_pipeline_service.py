@@ -0,0 +1,66 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """
+    후처리 단계 하나. func(frame, order, ctx) -> order
+    - frame: 파이프라인이 소유한 사본. 단계는 컬럼을 제자리에서 갱신합니다(행 재배치 없음).
+    - order: 현재 논리적 행 순서(인덱스 라벨). 정렬이 필요한 단계는 새 순서를 돌려주고, 아니면 받은 순서를 그대로 돌려줍니다.
+    - ctx: 단계 간 공유 값(예: 테마 품질 지표)을 담는 dict.
+    """
+
+    name: str
+    func: Callable
+    params: dict = field(default_factory=dict)
+
+
+def sorted_order(values, order, ascending=False):
+    """
+    values를 order 순서로 놓고 정렬한 라벨 순서. frame.loc[order].sort_values(col)과 같은 순열이므로
+    (동점 처리까지) 매 단계 프레임 전체를 재정렬하던 기존 결과와 같습니다.
+    """
+    return values.loc[order].sort_values(ascending=ascending).index
+
+
+def sorted_order_by(frame, columns, order, ascending):
+    """여러 컬럼 기준 정렬 라벨 순서. 정렬 키 컬럼만 꺼내 정렬합니다."""
+    return frame.loc[order, list(columns)].sort_values(list(columns), ascending=ascending).index
+
+
+def run_stage_pipeline(frame, stages, ctx=None):
+    """
+    단계들을 순서대로 실행하고 마지막에 한 번만 행을 재배치합니다.
+    반환: (결과 프레임, ctx, 단계별 소요 [{"stage", "seconds", "rows"}])
+    """
+    ctx = {} if ctx is None else ctx
+    timings = []
+    if frame is None or frame.empty:
+        return frame, ctx, timings
+    out = frame.copy()
+    if not out.index.is_unique:
+        out = out.reset_index(drop=True)
+    order = out.index
+    for stage in stages:
+        started = time.perf_counter()
+        order = stage.func(out, order, ctx, **stage.params)
+        timings.append({"stage": stage.name, "seconds": round(time.perf_counter() - started, 4), "rows": len(order)})
+    if not order.equals(out.index):
+        out = out.loc[order]
+    return out, ctx, timings
+
+
+def run_single_stage(frame, stage_func, ctx=None, **params):
+    """단계 하나를 기존 함수처럼(사본 + 결과 순서로 재배치) 실행합니다."""
+    out, ctx, _ = run_stage_pipeline(frame, [PipelineStage(stage_func.__name__, stage_func, params)], ctx)
+    return out, ctx
+
+
+def format_stage_timings(timings):
+    if not timings:
+        return ""
+    total = sum(t["seconds"] for t in timings)
+    parts = ", ".join(f"{t['stage']} {t['seconds']:.3f}s" for t in timings)
+    return f"⏱️ 후처리 단계 {len(timings)}개 {total:.3f}s ({parts})"
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from services.indicator_service import window_sums
+
+
+FLOW_SHORT_WINDOW = 5
+FLOW_LONG_WINDOW = 10
+FLOW_AGG_COLS = ["연기금5일합", "연기금10일합", "기관10일합", "스마트5일합", "스마트5일양수일수"]
+
+
+class FlowAggregates:
+    """
+    종목×일자별 최근 5/10일 수급 합계 표. 이력(종목명, 일자_dt 정렬)의 각 행을 창 끝으로 한 번만 계산해 두고,
+    as_of(날짜)는 종목별로 그 날짜 이하 마지막 행만 골라 돌려줍니다. 날짜마다 이력을 다시 훑지 않습니다.
+    """
+
+    def __init__(self, names, days, table):
+        self.names = names
+        self.days = days
+        self.table = table
+        self.starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.zeros(0, dtype=int)
+
+    def as_of(self, as_of_date=None):
+        """as_of_date(포함) 시점 종목별 수급 합계(index=종목명). None 또는 해석 불가 날짜면 전체 이력 기준."""
+        if not len(self.names):
+            return pd.DataFrame(columns=FLOW_AGG_COLS)
+        cutoff = pd.to_datetime(as_of_date, errors="coerce") if as_of_date is not None else pd.NaT
+        if pd.isna(cutoff):
+            ends = np.r_[self.starts[1:], len(self.names)] - 1
+            has_rows = np.ones(len(self.starts), dtype=bool)
+        else:
+            # 종목 안에서 일자 오름차순이므로 기준일 이하 행은 종목별 앞부분(prefix)입니다.
+            within = (self.days <= np.datetime64(cutoff.normalize(), "ns")).astype(np.int64)
+            counts = np.add.reduceat(within, self.starts)
+            has_rows = counts > 0
+            ends = self.starts + counts - 1
+        ends = ends[has_rows]
+        return self.table.iloc[ends].set_axis(pd.Index(self.names[ends], name="종목명"))
+
+
+def build_flow_aggregates(flow):
+    """
+    flow: 종목명/일자_dt 정렬, 연기금/투신/사모/외인 컬럼을 가진 이력.
+    각 행 시점의 최근 5/10행 합계를 pandas Series.sum(창 구간)과 같은 합산 순서로 계산합니다.
+    """
+    if flow is None or flow.empty:
+        return FlowAggregates(np.array([], dtype=object), np.array([], dtype="datetime64[ns]"), pd.DataFrame(columns=FLOW_AGG_COLS))
+    flow = flow.reset_index(drop=True)
+    names = flow["종목명"].astype(str).to_numpy()
+    days = flow["일자_dt"].dt.normalize().to_numpy(dtype="datetime64[ns]")
+    lengths = flow.groupby(names, sort=False).cumcount().to_numpy() + 1
+    n5 = np.minimum(FLOW_SHORT_WINDOW, lengths)
+    n10 = np.minimum(FLOW_LONG_WINDOW, lengths)
+    end_idx = np.arange(len(flow))
+
+    def _col(name):
+        return pd.to_numeric(flow[name], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+    pension, trust, pef, foreign = _col("연기금"), _col("투신"), _col("사모"), _col("외인")
+    pension10 = window_sums(pension, end_idx, n10)
+    smart = pension + trust + pef + foreign * 0.5
+    table = pd.DataFrame({
+        "연기금5일합": window_sums(pension, end_idx, n5),
+        "연기금10일합": pension10,
+        "기관10일합": pension10 + window_sums(trust, end_idx, n10) + window_sums(pef, end_idx, n10),
+        "스마트5일합": window_sums(smart, end_idx, n5),
+        "스마트5일양수일수": window_sums((smart > 0).astype(float), end_idx, n5).astype(int),
+    })
+    return FlowAggregates(names, days, table)
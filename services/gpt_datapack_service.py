@@ -1,6 +1,6 @@
 import pandas as pd
 
-from db_utils import read_table
+from db_utils import parse_table_dates, read_table
 
 
 DATA_OPTIONS = {
@@ -35,20 +35,13 @@ def clip_text(text, max_chars=5000):
 
 
 def load_history_for_datapack():
-    df = read_table("history.csv", "history.csv", read_csv_kwargs={"encoding": "utf-8-sig", "on_bad_lines": "skip"})
-    if df.empty:
-        return df
-    df = df.copy()
-    df["일자_dt"] = pd.to_datetime(
-        df["일자"].astype(str).str.replace("-", "", regex=False),
-        format="%Y%m%d",
-        errors="coerce",
+    # 숫자 컬럼은 스키마로 파싱 시 변환되고, 종목명은 category로 받아 메모리를 줄입니다.
+    df = read_table(
+        "history.csv", "history.csv", read_csv_kwargs={"encoding": "utf-8-sig", "on_bad_lines": "skip"}, categories=True
     )
-    if df["일자_dt"].isna().all():
-        df["일자_dt"] = pd.to_datetime(df["일자"], errors="coerce")
-    for col in ["종가", "외인", "연기금", "투신", "사모", "거래량", "거래대금(억)"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if df.empty or "일자" not in df.columns:
+        return df
+    df = parse_table_dates(df, "history")
     return df.dropna(subset=["종목명", "일자_dt"]).sort_values(["종목명", "일자_dt"])
 
 
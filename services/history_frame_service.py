@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import pandas as pd
+
+from db_utils import columnar_table_dir, has_parsed_dates, parse_date_values, read_table, resolve_csv_path, table_version
+
+
+HISTORY_CSV = "history.csv"
+
+
+class HistoryFrame:
+    """
+    history 테이블을 프로세스 안에서 한 번만 읽고 파싱 결과(파생 뷰)를 공유합니다.
+    write_table로 같은 테이블이 갱신되거나 저장 파일이 바뀌면 다음 접근 때 다시 읽습니다.
+    반환 프레임은 공유 객체이므로 호출부에서 수정하지 말고 필요하면 copy()해서 쓰세요.
+    """
+
+    def __init__(self, csv_path=HISTORY_CSV):
+        self.csv_path = csv_path
+        self._signature = None
+        self._raw = None
+        self._views = {}
+
+    def _current_signature(self):
+        stamps = []
+        for path in (Path(resolve_csv_path(self.csv_path, migrate_legacy_root=False)), columnar_table_dir(self.csv_path)):
+            try:
+                stat = path.stat()
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return table_version(self.csv_path), tuple(stamps)
+
+    def _ensure_fresh(self):
+        signature = self._current_signature()
+        if signature != self._signature:
+            self._raw = None
+            self._views = {}
+            self._signature = signature
+
+    def invalidate(self):
+        self._signature = None
+        self._raw = None
+        self._views = {}
+
+    def raw(self):
+        """저장소에서 읽은 이력 + 파싱된 일자_dt (컬럼형 저장소면 저장된 값을 그대로 씀)."""
+        self._ensure_fresh()
+        if self._raw is None:
+            self._raw = read_table(
+                self.csv_path, csv_fallback=self.csv_path, read_csv_kwargs={"on_bad_lines": "skip"}, parse_dates=True
+            )
+        return self._raw
+
+    def view(self, key, builder):
+        """builder() 결과를 key로 캐시합니다. 이력이 바뀌면 함께 폐기됩니다."""
+        self._ensure_fresh()
+        if key not in self._views:
+            self._views[key] = builder()
+        return self._views[key]
+
+    def dated(self):
+        """종목명 공백 제거, 일자_dt 파싱을 마친 전체 이력 (원본 행 순서 유지, 결측 유지). 숫자 컬럼은 read_table 스키마로 이미 변환됨."""
+
+        def _build():
+            raw = self.raw()
+            if raw.empty or not {"종목명", "일자"}.issubset(raw.columns):
+                return pd.DataFrame()
+            out = raw.copy()
+            out["종목명"] = out["종목명"].astype(str).str.strip()
+            if not has_parsed_dates(out):
+                out["일자_dt"] = parse_date_values(out["일자"])
+            return out
+
+        return self.view("dated", _build)
+
+    def by_stock(self):
+        """종목명 -> 일자_dt 오름차순 이력 (날짜 파싱 실패 행 제외)."""
+
+        def _build():
+            hist = self.dated()
+            if hist.empty:
+                return {}
+            hist = hist.dropna(subset=["일자_dt"]).sort_values(["종목명", "일자_dt"])
+            return {name: grp.reset_index(drop=True) for name, grp in hist.groupby("종목명", sort=True)}
+
+        return self.view("by_stock", _build)
+
+
+_HISTORY_FRAME = HistoryFrame()
+
+
+def get_history_frame():
+    return _HISTORY_FRAME
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from services.http_client import http_get
+
+
+HTTP_CACHE_PATH = Path(os.environ.get("QUANTBOT_HTTP_CACHE_PATH", ".cache/http_cache.sqlite3"))
+# host+path 접두어별 TTL(초). 가장 긴 접두어가 우선합니다. 목록에 없는 URL은 캐시하지 않습니다.
+HTTP_CACHE_TTLS = {
+    "opendart.fss.or.kr/api/list.json": 30 * 60,
+    "finance.naver.com/item/news_notice.naver": 30 * 60,
+    "finance.naver.com/research/company_list.naver": 60 * 60,
+    "finance.naver.com/item/main.naver": 24 * 60 * 60,
+    "finance.naver.com/news/": 10 * 60,
+    "news.google.com/rss": 10 * 60,
+}
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+# 만료 후 이 시간(초)까지는 ETag/Last-Modified 재검증용으로 남겨 두고, 그보다 오래된 행은 정리합니다.
+HTTP_CACHE_STALE_GRACE = int(os.environ.get("QUANTBOT_HTTP_CACHE_STALE_GRACE", str(24 * 60 * 60)))
+# 응답 본문 합계 상한. 넘으면 오래 전에 받은 행부터 지웁니다.
+HTTP_CACHE_MAX_BYTES = int(float(os.environ.get("QUANTBOT_HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024)
+# 프로세스에서 처음 열 때와 이 건수만큼 저장할 때마다 정리합니다.
+HTTP_CACHE_PRUNE_EVERY = 500
+
+_metrics = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "offline_misses": 0, "evicted": 0}
+_metrics_lock = threading.Lock()
+_init_lock = threading.Lock()
+_initialized = False
+_local = threading.local()
+
+
+class HttpCacheMiss(RuntimeError):
+    """오프라인 모드에서 캐시에 없는 요청."""
+
+
+def http_cache_enabled():
+    return os.environ.get("QUANTBOT_HTTP_CACHE", "1").strip() != "0"
+
+
+def http_offline_mode():
+    """QUANTBOT_HTTP_OFFLINE=1 이면 TTL과 무관하게 캐시로만 응답합니다(결정적 재현용)."""
+    if getattr(_local, "cache_only", False):
+        return True
+    return os.environ.get("QUANTBOT_HTTP_OFFLINE", "0").strip() == "1"
+
+
+@contextmanager
+def http_cache_only():
+    """현재 스레드에서만 일시적으로 오프라인(캐시 전용) 모드로 동작합니다. 마감 초과 시 대체 응답용."""
+    previous = getattr(_local, "cache_only", False)
+    _local.cache_only = True
+    try:
+        yield
+    finally:
+        _local.cache_only = previous
+
+
+def resolve_cache_ttl(url):
+    parsed = urlparse(url)
+    target = f"{parsed.netloc}{parsed.path}"
+    matches = [prefix for prefix in HTTP_CACHE_TTLS if target.startswith(prefix)]
+    return HTTP_CACHE_TTLS[max(matches, key=len)] if matches else 0
+
+
+def _cache_key(url, params):
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return hashlib.sha256(json.dumps(["GET", url, items], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _connect():
+    global _initialized
+    HTTP_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(HTTP_CACHE_PATH), timeout=10)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, encoding TEXT, "
+                    "body BLOB, fetched_at REAL, expires_at REAL)"
+                )
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+                if "expires_at" not in columns:
+                    conn.execute("ALTER TABLE responses ADD COLUMN expires_at REAL")
+                conn.commit()
+                _initialized = True
+                _prune(conn)
+    return conn
+
+
+def _prune(conn):
+    """
+    만료 후 HTTP_CACHE_STALE_GRACE가 지난 행을 지우고, 본문 합계가 HTTP_CACHE_MAX_BYTES를 넘으면 오래된 행부터 지웁니다.
+    expires_at이 없는 예전 행은 가장 긴 TTL로 만료 시각을 잡습니다. 오프라인(캐시 전용) 모드에서는 지우지 않습니다.
+    """
+    if http_offline_mode():
+        return 0
+    cutoff = time.time() - HTTP_CACHE_STALE_GRACE
+    max_ttl = max(HTTP_CACHE_TTLS.values())
+    try:
+        with conn:
+            expired = conn.execute(
+                "DELETE FROM responses WHERE COALESCE(expires_at, fetched_at + ?) < ?", (max_ttl, cutoff)
+            ).rowcount
+            oversized = conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(LENGTH(body)) OVER (ORDER BY fetched_at DESC, key) AS kept FROM responses) "
+                "WHERE kept > ?)",
+                (HTTP_CACHE_MAX_BYTES,),
+            ).rowcount
+    except sqlite3.Error as e:
+        print(f"[WARN] HTTP 캐시 정리 실패: {e}")
+        return 0
+    evicted = max(expired, 0) + max(oversized, 0)
+    if evicted:
+        with _metrics_lock:
+            _metrics["evicted"] += evicted
+    return evicted
+
+
+def prune_http_cache():
+    """만료/용량 초과 캐시 행을 지금 정리하고 지운 행 수를 돌려줍니다."""
+    with closing(_connect()) as conn:
+        return _prune(conn)
+
+
+def _bump(name):
+    with _metrics_lock:
+        _metrics[name] += 1
+
+
+def _load(key):
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT url, status, headers, encoding, body, fetched_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+    if row is None:
+        return None
+    url, status, headers, encoding, body, fetched_at = row
+    return {"url": url, "status": status, "headers": json.loads(headers or "{}"), "encoding": encoding, "body": body, "fetched_at": fetched_at}
+
+
+def _store(key, url, res, ttl):
+    headers = {h: res.headers[h] for h in STORED_HEADERS if h in res.headers}
+    now = time.time()
+    with closing(_connect()) as conn:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, encoding, body, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, res.status_code, json.dumps(headers), res.encoding, res.content, now, now + ttl),
+            )
+        with _metrics_lock:
+            _metrics["stores"] += 1
+            prune_due = _metrics["stores"] % HTTP_CACHE_PRUNE_EVERY == 0
+        if prune_due:
+            _prune(conn)
+
+
+def _touch(key, ttl):
+    now = time.time()
+    with closing(_connect()) as conn, conn:
+        conn.execute("UPDATE responses SET fetched_at = ?, expires_at = ? WHERE key = ?", (now, now + ttl, key))
+
+
+def _to_response(entry):
+    res = requests.Response()
+    res.status_code = int(entry["status"])
+    res._content = entry["body"]
+    res.headers = CaseInsensitiveDict(entry["headers"])
+    res.encoding = entry["encoding"]
+    res.url = entry["url"]
+    return res
+
+
+def cached_get(url, params=None, headers=None, timeout=None, ttl=None, cacheable=None, retry=True):
+    """
+    http_get + 디스크 캐시. TTL 안이면 저장된 응답을 그대로 돌려주고, 만료됐으면 ETag/Last-Modified로 재검증(304면 재사용)합니다.
+    200 응답 중 cacheable(res)가 참인 것만 저장합니다. 반환값은 requests.Response와 같은 인터페이스입니다.
+    retry는 http_get에 그대로 넘깁니다(자체 재시도 루프가 있으면 False).
+    """
+    ttl = resolve_cache_ttl(url) if ttl is None else ttl
+    if not http_cache_enabled() or ttl <= 0:
+        return http_get(url, params=params, headers=headers, timeout=timeout, retry=retry)
+
+    key = _cache_key(url, params)
+    entry = _load(key)
+    if http_offline_mode():
+        if entry is None:
+            _bump("offline_misses")
+            raise HttpCacheMiss(f"오프라인 캐시에 없는 요청: {url}")
+        _bump("hits")
+        return _to_response(entry)
+    if entry is not None and time.time() - float(entry["fetched_at"] or 0) < ttl:
+        _bump("hits")
+        return _to_response(entry)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry["headers"].get("ETag"):
+            request_headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            request_headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+    res = http_get(url, params=params, headers=request_headers, timeout=timeout, retry=retry)
+    if res.status_code == 304 and entry is not None:
+        _touch(key, ttl)
+        _bump("revalidated")
+        return _to_response(entry)
+    _bump("misses")
+    if res.status_code == 200 and (cacheable is None or cacheable(res)):
+        _store(key, url, res, ttl)
+    return res
+
+
+def get_http_cache_metrics():
+    with _metrics_lock:
+        out = dict(_metrics)
+    served = out["hits"] + out["revalidated"]
+    total = served + out["misses"] + out["offline_misses"]
+    out["hit_rate"] = round(served / total, 4) if total else 0.0
+    return out
+
+
+def format_http_cache_metrics():
+    m = get_http_cache_metrics()
+    if not (m["hits"] or m["revalidated"] or m["misses"] or m["offline_misses"]):
+        return ""
+    return (
+        f"🗄️ HTTP 캐시: 적중 {m['hits']:,} / 재검증 {m['revalidated']:,} / 미스 {m['misses']:,} "
+        f"/ 저장 {m['stores']:,} / 정리 {m['evicted']:,} (적중률 {m['hit_rate'] * 100:.1f}%)"
+    )
@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_TIMEOUT = 10
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 16
+# 연결/읽기 오류만 어댑터에서 재시도합니다. 상태코드 기반 재시도(5xx/429)는 호출부 정책(kis_get 등)에 맡깁니다.
+# 자체 재시도 루프가 있는 호출부(kis_get, _request_html)는 retry=False로 NO_RETRY 세션을 써서 재시도가 겹치지 않게 합니다.
+DEFAULT_RETRY = Retry(
+    total=2,
+    connect=2,
+    read=1,
+    status=0,
+    backoff_factor=0.3,
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    raise_on_status=False,
+)
+NO_RETRY = Retry(total=0, read=False, raise_on_status=False)
+
+# 호스트별 동시 요청 상한. 병렬 수집 시 DART/네이버에 한꺼번에 몰리지 않도록 프로세스 전체에서 공유합니다.
+HOST_CONCURRENCY_LIMITS = {
+    "opendart.fss.or.kr": 3,
+    "finance.naver.com": 4,
+}
+# 호스트별 최소 요청 간격(초). 동시 요청 상한과 별개로 프로세스 전체의 요청 시작 시각을 이 간격 이상 벌립니다.
+# 네이버 종목별 섹터/공시 페이지는 예전 순차 루프의 0.2초 간격을 그대로 지킵니다.
+HOST_MIN_INTERVALS = {
+    "finance.naver.com": float(os.environ.get("QUANTBOT_NAVER_MIN_INTERVAL", "0.2")),
+}
+
+_sessions = {}
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+_host_next_slot = {}
+_host_pacing_lock = threading.Lock()
+_session_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_session(retry=True):
+    """
+    프로세스 공용 requests.Session. 호스트별 커넥션 풀/keep-alive를 재사용하고 gzip 응답을 받습니다.
+    retry=False면 어댑터 재시도가 없는 별도 세션을 돌려줍니다(재시도를 호출부가 직접 하는 경우).
+    """
+    retry = bool(retry)
+    session = _sessions.get(retry)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retry)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=DEFAULT_RETRY if retry else NO_RETRY,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept-Encoding": "gzip, deflate"})
+                _sessions[retry] = session
+    return session
+
+
+def _host_slot(host):
+    limit = HOST_CONCURRENCY_LIMITS.get(host)
+    if not limit:
+        return None
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(limit)
+        return _host_semaphores[host]
+
+
+@contextmanager
+def request_deadline(deadline):
+    """
+    현재 스레드의 요청을 time.monotonic() 기준 deadline까지로 묶습니다.
+    안에서는 타임아웃이 남은 시간으로 줄고 어댑터 재시도를 하지 않으며, 마감이 지나면 요청 없이 requests.Timeout을 냅니다.
+    """
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def _remaining_time(url):
+    deadline = getattr(_local, "deadline", None)
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout(f"요청 마감 초과: {url}")
+    return remaining
+
+
+def _wait_host_interval(host, remaining=None):
+    """HOST_MIN_INTERVALS에 있는 호스트면 다음 요청 시작 시각을 예약하고 그때까지 기다립니다(마감 안에 차례가 안 오면 Timeout)."""
+    interval = HOST_MIN_INTERVALS.get(host, 0.0)
+    if interval <= 0:
+        return
+    with _host_pacing_lock:
+        now = time.monotonic()
+        start = max(now, _host_next_slot.get(host, now))
+        if remaining is not None and start - now >= remaining:
+            raise requests.Timeout(f"요청 마감 전에 {host} 요청 차례가 오지 않음")
+        _host_next_slot[host] = start + interval
+    if start > now:
+        time.sleep(start - now)
+
+
+def _record(host, elapsed, failed):
+    with _metrics_lock:
+        stat = _metrics.setdefault(host, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stat["requests"] += 1
+        stat["errors"] += int(failed)
+        stat["total_ms"] += elapsed * 1000.0
+        stat["max_ms"] = max(stat["max_ms"], elapsed * 1000.0)
+
+
+def http_request(method, url, timeout=None, retry=True, **kwargs):
+    """
+    공용 세션으로 요청하고 호스트별 지연/오류(예외 또는 HTTP 4xx/5xx)를 집계합니다.
+    호스트별 최소 간격과 동시 요청 상한을 지키고, request_deadline 안이면 대기/타임아웃을 마감까지로 줄입니다.
+    """
+    host = urlparse(url).netloc or url
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    _wait_host_interval(host, _remaining_time(url))
+    slot = _host_slot(host)
+    if slot is not None and not slot.acquire(timeout=_remaining_time(url)):
+        raise requests.Timeout(f"요청 마감 전에 {host} 동시 요청 슬롯을 얻지 못함")
+    started = time.perf_counter()
+    try:
+        remaining = _remaining_time(url)
+        if remaining is not None:
+            timeout, retry = min(timeout, remaining), False
+        res = get_session(retry).request(method, url, timeout=timeout, **kwargs)
+    except Exception:
+        _record(host, time.perf_counter() - started, True)
+        raise
+    finally:
+        if slot is not None:
+            slot.release()
+    _record(host, time.perf_counter() - started, res.status_code >= 400)
+    return res
+
+
+def http_get(url, **kwargs):
+    return http_request("GET", url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return http_request("POST", url, **kwargs)
+
+
+def http_put(url, **kwargs):
+    return http_request("PUT", url, **kwargs)
+
+
+def get_http_metrics():
+    """호스트별 {requests, errors, avg_ms, max_ms} 스냅샷."""
+    with _metrics_lock:
+        return {
+            host: {
+                "requests": stat["requests"],
+                "errors": stat["errors"],
+                "avg_ms": round(stat["total_ms"] / stat["requests"], 1) if stat["requests"] else 0.0,
+                "max_ms": round(stat["max_ms"], 1),
+            }
+            for host, stat in _metrics.items()
+        }
+
+
+def reset_http_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def format_http_metrics():
+    metrics = get_http_metrics()
+    if not metrics:
+        return ""
+    lines = ["🌐 HTTP 호스트별 요청 통계"]
+    for host, stat in sorted(metrics.items(), key=lambda kv: -kv[1]["requests"]):
+        lines.append(
+            f"   - {host}: {stat['requests']:,}건 / 오류 {stat['errors']:,}건 / 평균 {stat['avg_ms']:.0f}ms / 최대 {stat['max_ms']:.0f}ms"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,225 @@
+from collections import deque
+
+import numpy as np
+
+
+RSI_PERIOD = 14
+TREND_WINDOW = 20
+TREND_SCORE_STEP = 20
+
+
+def newest_first_sum(values, end_idx, counts, offset=0):
+    """
+    values[end - offset], values[end - offset - 1], ... 순서로 counts개를 더합니다.
+    파이썬 sum(list[:n]) (최신일 우선 리스트) 누적 순서를 그대로 재현해 scalar 계산과 같은 부동소수 결과를 냅니다.
+    """
+    acc = np.zeros(len(end_idx), dtype=float)
+    max_count = int(counts.max()) if len(counts) else 0
+    for j in range(max_count):
+        take = counts > j
+        idx = np.maximum(end_idx - offset - j, 0)
+        acc = np.where(take, acc + values[idx], acc)
+    return acc
+
+
+def window_sums(values, end_idx, lengths):
+    """
+    종료 위치별 길이 lengths의 창(오래된 일자 우선)을 합산합니다.
+    창 길이별로 묶어 행 단위 numpy 합을 쓰므로 pandas Series.sum(창 구간)과 같은 부동소수 결과입니다.
+    """
+    out = np.zeros(len(end_idx), dtype=float)
+    for n in np.unique(lengths):
+        sel = np.flatnonzero(lengths == n)
+        idx = end_idx[sel, None] - np.arange(int(n) - 1, -1, -1)
+        out[sel] = values[idx].sum(axis=1)
+    return out
+
+
+def trend_quality_arrays(close, end_idx, lengths):
+    """
+    close[end - lengths + 1 .. end] 창(오래된 일자 → 최신일, 최대 20개)별 MA/기울기/추세품질 점수를 한 번에 계산합니다.
+    calculate_trend_quality(최신일 우선 종가 리스트)와 같은 규칙·같은 합산 순서이며, 반올림은 호출부가 합니다.
+    """
+    close = np.asarray(close, dtype=float)
+    end_idx = np.asarray(end_idx, dtype=int)
+    lengths = np.asarray(lengths, dtype=int)
+    n5 = np.minimum(5, lengths)
+    n10 = np.minimum(10, lengths)
+    ma5 = newest_first_sum(close, end_idx, n5) / n5
+    ma10 = newest_first_sum(close, end_idx, n10) / n10
+    ma20 = newest_first_sum(close, end_idx, lengths) / lengths
+    prev5 = np.where(
+        lengths >= 10,
+        newest_first_sum(close, end_idx, np.where(lengths >= 10, 5, 0), offset=5) / 5,
+        ma5,
+    )
+    prev10 = np.where(
+        lengths >= 20,
+        newest_first_sum(close, end_idx, np.where(lengths >= 20, 10, 0), offset=10) / 10,
+        ma10,
+    )
+    current = close[end_idx]
+    above20 = current >= ma20
+    short_above_mid = ma5 >= ma10
+    mid_above_long = ma10 >= ma20
+    short_slope = ma5 >= prev5
+    mid_slope = ma10 >= prev10
+    score = (
+        above20.astype(int) * TREND_SCORE_STEP
+        + short_above_mid.astype(int) * TREND_SCORE_STEP
+        + mid_above_long.astype(int) * TREND_SCORE_STEP
+        + short_slope.astype(int) * TREND_SCORE_STEP
+        + mid_slope.astype(int) * TREND_SCORE_STEP
+    )
+    return {
+        "current": current,
+        "ma5": ma5,
+        "ma10": ma10,
+        "ma20": ma20,
+        "aligned": above20 & short_above_mid & mid_above_long,
+        "short_slope": short_slope,
+        "mid_slope": mid_slope,
+        "score": score.astype(float),
+    }
+
+
+def wilder_rsi_arrays(close, end_idx, lengths, period=RSI_PERIOD):
+    """
+    close[end - lengths + 1 .. end] 창별 Wilder RSI. 앞 period개 diff 단순평균으로 시작해 나머지 diff를 재귀 평활합니다.
+    calculate_rsi(같은 창의 종가 리스트)와 같은 결과이며, 종가가 period+1개 미만이면 50입니다.
+    """
+    close = np.asarray(close, dtype=float)
+    end_idx = np.asarray(end_idx, dtype=int)
+    lengths = np.asarray(lengths, dtype=int)
+    start = end_idx - lengths + 1
+
+    def diff_at(step):
+        cur = np.clip(start + step, 0, max(len(close) - 1, 0))
+        prev = np.clip(start + step - 1, 0, max(len(close) - 1, 0))
+        return close[cur] - close[prev]
+
+    gain_sum = np.zeros(len(end_idx), dtype=float)
+    loss_sum = np.zeros(len(end_idx), dtype=float)
+    for step in range(1, period + 1):
+        diff = diff_at(step)
+        gain_sum = gain_sum + np.where(diff > 0, diff, 0.0)
+        loss_sum = loss_sum + np.where(diff < 0, -diff, 0.0)
+    avg_gain = gain_sum / period
+    avg_loss = loss_sum / period
+    max_len = int(lengths.max()) if len(lengths) else 0
+    for step in range(period + 1, max_len):
+        diff = diff_at(step)
+        take = lengths > step
+        avg_gain = np.where(take, (avg_gain * (period - 1) + np.where(diff > 0, diff, 0.0)) / period, avg_gain)
+        avg_loss = np.where(take, (avg_loss * (period - 1) + np.where(diff < 0, -diff, 0.0)) / period, avg_loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+    rsi = np.where(avg_loss == 0, 100.0, rsi)
+    return np.where(lengths >= period + 1, rsi, 50.0)
+
+
+def last_window_positions(group_codes, window=TREND_WINDOW):
+    """
+    그룹(종목) 코드 순으로 정렬된 긴 이력에서 그룹별 마지막 행 위치와 창 길이(최대 window)를 돌려줍니다.
+    반환: (그룹 시작 위치 배열, 마지막 행 위치 배열, 창 길이 배열)
+    """
+    group_codes = np.asarray(group_codes)
+    if not len(group_codes):
+        empty = np.zeros(0, dtype=int)
+        return empty, empty, empty
+    starts = np.flatnonzero(np.r_[True, group_codes[1:] != group_codes[:-1]])
+    ends = np.r_[starts[1:], len(group_codes)] - 1
+    return starts, ends, np.minimum(int(window), ends - starts + 1)
+
+
+class WilderRSI:
+    """
+    한 봉씩 갱신하는 Wilder RSI 상태. 갱신 비용은 봉 수와 무관한 O(1)입니다.
+    처음 period개 diff는 단순합으로 모으고, 이후 diff부터 (이전평균 × (period-1) + 현재) / period로 평활합니다.
+    """
+
+    def __init__(self, period=RSI_PERIOD):
+        self.period = int(period)
+        self.count = 0
+        self.prev_price = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, price):
+        if self.prev_price is not None:
+            diff = price - self.prev_price
+            gain = diff if diff > 0 else 0
+            loss = -diff if diff < 0 else 0
+            self.count += 1
+            if self.count < self.period:
+                self.avg_gain += gain
+                self.avg_loss += loss
+            elif self.count == self.period:
+                self.avg_gain = (self.avg_gain + gain) / self.period
+                self.avg_loss = (self.avg_loss + loss) / self.period
+            else:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        self.prev_price = price
+        return self.value
+
+    def extend(self, prices):
+        for price in prices:
+            self.update(price)
+        return self
+
+    @property
+    def value(self):
+        if self.count < self.period:
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + self.avg_gain / self.avg_loss))
+
+
+class TrendQualityState:
+    """
+    한 봉씩 갱신하는 추세품질 상태. 최근 window개 종가만 고리 버퍼로 보관하므로
+    갱신·조회 비용이 이력 길이와 무관합니다(창 길이 고정 상수).
+    MA 합산은 최신일부터 더해 calculate_trend_quality와 같은 부동소수 결과를 냅니다.
+    """
+
+    def __init__(self, window=TREND_WINDOW):
+        self.closes = deque(maxlen=int(window))
+
+    def update(self, price):
+        self.closes.append(float(price))
+        return self
+
+    def extend(self, prices):
+        for price in prices:
+            self.update(price)
+        return self
+
+    def snapshot(self):
+        """현재 창 기준 원시 지표(dict). 종가가 없으면 None."""
+        vals = list(reversed(self.closes))
+        if not vals:
+            return None
+        ma5 = sum(vals[:5]) / min(5, len(vals))
+        ma10 = sum(vals[:10]) / min(10, len(vals))
+        ma20 = sum(vals[:20]) / min(20, len(vals))
+        prev5 = sum(vals[5:10]) / len(vals[5:10]) if len(vals) >= 10 else ma5
+        prev10 = sum(vals[10:20]) / len(vals[10:20]) if len(vals) >= 20 else ma10
+        above20 = vals[0] >= ma20
+        short_above_mid = ma5 >= ma10
+        mid_above_long = ma10 >= ma20
+        short_slope = ma5 >= prev5
+        mid_slope = ma10 >= prev10
+        return {
+            "current": vals[0],
+            "ma5": ma5,
+            "ma10": ma10,
+            "ma20": ma20,
+            "aligned": bool(above20 and short_above_mid and mid_above_long),
+            "short_slope": short_slope,
+            "mid_slope": mid_slope,
+            "score": float(
+                TREND_SCORE_STEP * (int(above20) + int(short_above_mid) + int(mid_above_long) + int(short_slope) + int(mid_slope))
+            ),
+        }
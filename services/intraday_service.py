@@ -0,0 +1,127 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+SCORING_CONTEXT_PATH = Path("data") / "scoring_context.json"
+INTRADAY_STATE_PATH = Path("data") / "intraday_state.json"
+INTRADAY_TOP_N = 3
+POSITION_MARK_COLS = ["종목명", "진입일", "진입가", "현재가", "평가수익률"]
+
+
+def intraday_alert_move_pct():
+    """QUANTBOT_INTRADAY_ALERT_PCT: 직전 알림 대비 보유 종목 평가수익률이 이만큼(%p) 움직이면 다시 알립니다."""
+    try:
+        return float(os.environ.get("QUANTBOT_INTRADAY_ALERT_PCT", "2.0"))
+    except ValueError:
+        return 2.0
+
+
+def _load_json(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[WARN] {path.name} 로드 실패: {e}")
+        return None
+
+
+def _save_json(data, path):
+    path = Path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[WARN] {path.name} 저장 실패: {e}")
+
+
+def save_scoring_context(date, current_vix, news_text, macro_recency_score, repeated_topics_text, path=SCORING_CONTEXT_PATH):
+    """정규 수집에서 쓴 VIX/뉴스 점수 입력을 남겨 장중 갱신이 같은 기준으로 재평가하게 합니다."""
+    _save_json({
+        "date": str(date),
+        "current_vix": float(current_vix),
+        "news_text": news_text or "",
+        "macro_recency_score": macro_recency_score,
+        "repeated_topics_text": repeated_topics_text or "",
+    }, path)
+
+
+def load_scoring_context(path=SCORING_CONTEXT_PATH):
+    """마지막 정규 수집의 점수 입력. 없거나 손상됐으면 None."""
+    ctx = _load_json(path)
+    if not isinstance(ctx, dict) or "current_vix" not in ctx:
+        return None
+    return ctx
+
+
+def load_intraday_state(path=INTRADAY_STATE_PATH):
+    state = _load_json(path)
+    return state if isinstance(state, dict) else {}
+
+
+def save_intraday_state(state, path=INTRADAY_STATE_PATH):
+    _save_json(state, path)
+
+
+def mark_open_positions(trades, df_quotes):
+    """
+    시그널 청산 방식의 open 거래(텔레그램 보유 포지션과 같은 기준, 종목별 최신 진입)를
+    df_quotes의 현재가로 평가합니다. 시세가 없는 종목은 평가수익률이 NaN입니다.
+    """
+    if trades is None or trades.empty or not {"청산방식", "상태", "종목명", "진입일", "진입가"}.issubset(trades.columns):
+        return pd.DataFrame(columns=POSITION_MARK_COLS)
+    open_trades = trades[
+        trades["청산방식"].astype(str).eq("시그널") & trades["상태"].astype(str).str.lower().eq("open")
+    ].copy()
+    if open_trades.empty:
+        return pd.DataFrame(columns=POSITION_MARK_COLS)
+    open_trades["진입일_dt"] = pd.to_datetime(open_trades["진입일"], errors="coerce")
+    open_trades = open_trades.sort_values(["종목명", "진입일_dt"]).drop_duplicates("종목명", keep="last")
+
+    quotes = df_quotes.drop_duplicates("종목명").set_index("종목명")["현재가"] if "현재가" in df_quotes.columns else pd.Series(dtype=float)
+    entry = pd.to_numeric(open_trades["진입가"], errors="coerce").to_numpy(dtype=float)
+    price = pd.to_numeric(open_trades["종목명"].map(quotes), errors="coerce").to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.where(entry > 0, (price / entry - 1.0) * 100.0, np.nan)
+    out = open_trades[["종목명", "진입일", "진입가"]].copy()
+    out["현재가"] = price
+    out["평가수익률"] = np.round(ret, 2)
+    return out.sort_values("평가수익률", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def build_intraday_delta(prev_state, top_names, marks, move_pct=None):
+    """
+    직전 알림 상태 대비 변화: Top N 신규/이탈 종목과 평가수익률이 move_pct 이상 움직인 보유 종목.
+    알림할 변화가 없으면 "notify"가 False입니다(직전 상태가 없으면 항상 알림).
+    """
+    move_pct = intraday_alert_move_pct() if move_pct is None else move_pct
+    prev_top = list(prev_state.get("top", [])) if prev_state else []
+    prev_marks = dict(prev_state.get("marks", {})) if prev_state else {}
+    entered = [name for name in top_names if name not in prev_top]
+    exited = [name for name in prev_top if name not in top_names]
+
+    current_marks = {
+        str(name): float(ret) for name, ret in zip(marks["종목명"], marks["평가수익률"]) if pd.notna(ret)
+    } if not marks.empty else {}
+    moved = [
+        name for name, ret in current_marks.items()
+        if name not in prev_marks or abs(ret - float(prev_marks[name])) >= move_pct
+    ]
+    closed = [name for name in prev_marks if name not in current_marks]
+    return {
+        "entered": entered,
+        "exited": exited,
+        "moved": moved,
+        "closed": closed,
+        "notify": not prev_state or bool(entered or exited or moved or closed),
+        "state": {"top": list(top_names), "marks": current_marks},
+    }
@@ -1,14 +1,57 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
+import threading
 import time
 import tomllib
 
 import requests
 
+from services.http_client import http_get, http_post
 
-URL_BASE = "https://openapi.koreainvestment.com:9443"
+
+URL_BASE = os.environ.get("KIS_URL_BASE", "https://openapi.koreainvestment.com:9443")
+# KIS 실전 계좌 REST 한도(초당 20건)보다 약간 낮게 잡은 기본값. 모의투자 계좌는 KIS_MAX_RPS=2 정도로 낮춰야 합니다.
+KIS_MAX_RPS = float(os.environ.get("KIS_MAX_RPS", "15"))
+# 몰아서 보낼 수 있는 최대 건수. 1이면 호출 간격이 항상 1/KIS_MAX_RPS 이상입니다.
+KIS_RATE_BURST = float(os.environ.get("KIS_RATE_BURST", "1"))
+KIS_MAX_WORKERS = int(os.environ.get("KIS_MAX_WORKERS", "4"))
+KIS_MAX_RETRIES = 3
+KIS_RETRY_BACKOFF = 0.5
+# 초당 거래건수 초과 응답 코드
+KIS_RATE_LIMIT_MSG_CODES = {"EGW00201"}
+
+
+class TokenBucket:
+    """
+    초당 rate건, 최대 burst건까지 허용하는 토큰 버킷. 여러 스레드가 같은 인스턴스를 공유합니다.
+    빈 버킷으로 시작하므로 어떤 t초 구간에서도 호출 수가 burst + rate*t를 넘지 않습니다.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = max(float(rate), 0.001)
+        self.capacity = max(float(burst), 1.0)
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def build_kis_rate_limiter(rate=None, burst=None):
+    return TokenBucket(KIS_MAX_RPS if rate is None else rate, KIS_RATE_BURST if burst is None else burst)
 
 
 def resolve_kis_credentials():
@@ -48,7 +91,7 @@ def get_kis_access_token():
     url = f"{URL_BASE}/oauth2/tokenP"
     body = {"grant_type": "client_credentials", "appkey": kis_app_key, "appsecret": kis_app_secret}
     try:
-        res = requests.post(url, headers={"content-type": "application/json"}, data=json.dumps(body), timeout=10)
+        res = http_post(url, headers={"content-type": "application/json"}, data=json.dumps(body), timeout=10)
         return res.json().get("access_token")
     except Exception:
         return None
@@ -92,7 +135,84 @@ def previous_kis_cursor_date(oldest_raw_date):
     return cursor.strftime("%Y%m%d")
 
 
-def collect_kis_history_backfill(name, code, url_kis, headers, input_date, cutoff, max_pages):
+def _is_retryable_kis_response(res):
+    if res.status_code == 429 or res.status_code >= 500:
+        return True
+    try:
+        payload = res.json() if res.text else {}
+    except Exception:
+        return False
+    return str(payload.get("msg_cd", "")) in KIS_RATE_LIMIT_MSG_CODES
+
+
+def kis_get(url, headers, params, timeout=8, limiter=None, retries=KIS_MAX_RETRIES, backoff=KIS_RETRY_BACKOFF):
+    """
+    토큰 버킷으로 호출 간격을 맞춘 GET. 네트워크 오류/5xx/429/초당 한도 초과 응답은 지수 백오프로 재시도하고,
+    재시도를 모두 쓰면 마지막 응답(또는 예외)을 그대로 돌려줍니다.
+    """
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            res = http_get(url, headers=headers, params=params, timeout=timeout, retry=False)
+        except requests.RequestException:
+            if attempt >= retries:
+                raise
+        else:
+            if attempt >= retries or not _is_retryable_kis_response(res):
+                return res
+        time.sleep(backoff * (2 ** attempt))
+
+
+def fetch_ordered(items, fetch_fn, max_workers=None, progress=None):
+    """
+    items 각각에 fetch_fn을 병렬 적용하고 입력 순서대로 결과를 돌려줍니다.
+    개별 실패는 예외 객체를 결과 자리에 담아 호출부가 기존 순차 루프처럼 종목별로 처리하게 합니다.
+    progress(완료 건수, 전체 건수)는 항목이 끝날 때마다 호출됩니다.
+    """
+    items = list(items)
+    results = [None] * len(items)
+
+    def _safe(item):
+        try:
+            return fetch_fn(item)
+        except Exception as e:
+            return e
+
+    workers = max(1, int(max_workers or KIS_MAX_WORKERS))
+    if workers == 1 or len(items) <= 1:
+        for i, item in enumerate(items):
+            results[i] = _safe(item)
+            if progress:
+                progress(i + 1, len(items))
+        return results
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_safe, item): i for i, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress:
+                progress(done, len(items))
+    return results
+
+
+def fetch_kis_investor_daily(codes, url_kis, headers, input_date, limiter=None, max_workers=None, timeout=5, progress=None):
+    """종목코드별 투자자별 일별 매매 1페이지 응답을 병렬 수집합니다 (입력 순서 유지)."""
+    limiter = limiter or build_kis_rate_limiter()
+
+    def _fetch(code):
+        params = {
+            "FID_COND_MRKT_DIV_CODE": "J",
+            "FID_INPUT_ISCD": code,
+            "FID_INPUT_DATE_1": input_date,
+            "FID_ORG_ADJ_PRC": "0",
+            "FID_ETC_CLS_CODE": "0",
+        }
+        return kis_get(url_kis, headers, params, timeout=timeout, limiter=limiter)
+
+    return fetch_ordered(codes, _fetch, max_workers=max_workers, progress=progress)
+
+
+def collect_kis_history_backfill(name, code, url_kis, headers, input_date, cutoff, max_pages, limiter=None):
     rows = []
     seen_dates = set()
     cursor_date = input_date
@@ -107,7 +227,10 @@ def collect_kis_history_backfill(name, code, url_kis, headers, input_date, cutof
             "FID_ORG_ADJ_PRC": "0",
             "FID_ETC_CLS_CODE": "0",
         }
-        res = requests.get(url_kis, headers=headers, params=params, timeout=8)
+        if limiter is None:
+            res = http_get(url_kis, headers=headers, params=params, timeout=8)
+        else:
+            res = kis_get(url_kis, headers, params, timeout=8, limiter=limiter)
         payload = res.json() if res.text else {}
         if res.status_code != 200 or payload.get("rt_cd") != "0":
             failed_pages += 1
@@ -152,6 +275,23 @@ def collect_kis_history_backfill(name, code, url_kis, headers, input_date, cutof
         if not next_cursor_date or next_cursor_date >= cursor_date or added_on_page == 0:
             break
         cursor_date = next_cursor_date
-        time.sleep(0.03)
+        if limiter is None:
+            time.sleep(0.03)
 
     return rows, empty_pages, failed_pages, len(seen_dates)
+
+
+def collect_kis_history_backfill_many(targets, url_kis, headers, input_date, cutoff, max_pages, limiter=None, max_workers=None, progress=None):
+    """
+    (종목명, 종목코드) 목록을 병렬로 backfill합니다. 모든 워커가 limiter 하나를 공유해 전체 호출 속도를 KIS 한도 안에 묶고,
+    결과는 targets 순서대로 (rows, empty_pages, failed_pages, page_dates) 또는 예외 객체로 돌려줍니다.
+    """
+    limiter = limiter or build_kis_rate_limiter()
+    return fetch_ordered(
+        targets,
+        lambda target: collect_kis_history_backfill(
+            target[0], target[1], url_kis, headers, input_date, cutoff, max_pages, limiter=limiter
+        ),
+        max_workers=max_workers,
+        progress=progress,
+    )
@@ -1,5 +1,15 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
 import pandas as pd
 
+from db_utils import as_numeric
+from services.price_matrix_service import PriceMatrix
 from services.scoring_service import (
     ADAPTIVE_THRESHOLD_PROFILES,
     build_market_state_features,
@@ -11,6 +21,10 @@ PERF_COLS = ["날짜", "평가금액", "현금", "투자금액", "수익률(%)",
 POSITION_COLS = ["종목명", "진입일", "진입가", "수량", "매수금액", "현재가", "평가금액", "평가손익", "평가수익률", "보유일수", "상태"]
 CLOSED_COLS = ["진입일", "청산일", "종목명", "보유일수", "수량", "진입가", "청산가", "매수금액", "청산금액", "실현손익", "수익률", "청산사유"]
 
+# 스윕 병렬 실행. spawn은 Streamlit 같은 멀티스레드 프로세스에서도 안전하게 워커를 띄웁니다.
+SWEEP_MAX_WORKERS = int(os.environ.get("QUANTBOT_SWEEP_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+SWEEP_MP_CONTEXT = "spawn"
+
 
 def empty_capital_limited_result():
     return (
@@ -20,56 +34,130 @@ def empty_capital_limited_result():
     )
 
 
+@dataclass(frozen=True)
+class SwingSimConfig:
+    """파라미터 스윕 한 건의 설정."""
+    start_date: Any = None
+    adaptive_profile: str = "현재값"
+    max_positions: int = 3
+    score_mode: str = "swing"
+
+
+class SwingSimInputs:
+    """
+    설정과 무관한 시뮬레이션 입력(파싱된 이력, 가격 행렬, 시장 상태, 점수 기준별 정렬 시그널)을 한 번만 준비합니다.
+    여러 (시작일, 프로필, 보유종목수, 점수모드) 조합을 같은 입력으로 돌릴 때 재사용하며, 실행 중에는 수정하지 않습니다.
+    """
+
+    def __init__(self, df_trades, df_history):
+        self.ready = False
+        self._signals = {}
+        self._market = None
+        if df_trades.empty or df_history.empty:
+            return
+
+        trades = df_trades.copy()
+        if "진입일_dt" not in trades.columns and "진입일" in trades.columns:
+            trades["진입일_dt"] = pd.to_datetime(trades["진입일"], errors="coerce")
+        if "청산일_dt" not in trades.columns and "청산일" in trades.columns:
+            trades["청산일_dt"] = pd.to_datetime(trades["청산일"], errors="coerce")
+
+        hist = df_history.copy()
+        if not {"종목명", "일자", "종가"}.issubset(hist.columns):
+            return
+        raw_dates = hist["일자"].astype(str).str.replace("-", "", regex=False).str.strip()
+        hist["일자_dt"] = pd.to_datetime(raw_dates, format="%Y%m%d", errors="coerce")
+        if hist["일자_dt"].notna().sum() == 0:
+            hist["일자_dt"] = pd.to_datetime(hist["일자"], errors="coerce")
+        hist["종가"] = as_numeric(hist["종가"])
+        hist = hist.dropna(subset=["일자_dt", "종목명", "종가"]).sort_values(["종목명", "일자_dt"])
+        if hist.empty:
+            return
+
+        self.trades = trades
+        self.hist = hist
+        # 시각 단위 그대로(정규화 없이) 두어 "일자_dt <= 기준일" 조회 결과가 기존과 같도록 합니다.
+        self.price_matrix = PriceMatrix.from_history(hist.assign(종목명=hist["종목명"].astype(str)), normalize=False)
+        self.dates = sorted(hist["일자_dt"].dt.normalize().unique())
+        self.ready = True
+
+    @classmethod
+    def from_prepared(cls, trades, hist, price_matrix, dates, market=None):
+        """이미 파싱된 입력으로 만듭니다(프로세스 워커용). market=(market_state, entry_features)를 주면 hist는 None이어도 됩니다."""
+        inputs = cls.__new__(cls)
+        inputs._signals = {}
+        inputs._market = market
+        inputs.trades = trades
+        inputs.hist = hist
+        inputs.price_matrix = price_matrix
+        inputs.dates = list(dates)
+        inputs.ready = True
+        return inputs
+
+    def sim_dates(self, start_date=None):
+        if start_date is None:
+            return list(self.dates)
+        sim_start = pd.to_datetime(start_date).normalize()
+        return [d for d in self.dates if pd.to_datetime(d).normalize() >= sim_start]
+
+    def signals(self, score_mode):
+        """점수모드별 (정렬된 시그널, 점수 컬럼, 진입일 -> 행 위치) 캐시."""
+        score_col = "AI수급점수" if str(score_mode).lower() == "ai" else "스윙우선순위"
+        if score_col not in self._signals:
+            trades = self.trades
+            signal = trades[trades["청산방식"].astype(str).eq("시그널")].copy()
+            if signal.empty:
+                signal = trades[trades["보유일수"].eq(10)].copy()
+            resolved_col = score_col
+            fallback_score_col = "스윙우선순위" if resolved_col == "AI수급점수" else "AI수급점수"
+            if resolved_col not in signal.columns and fallback_score_col in signal.columns:
+                resolved_col = fallback_score_col
+            if resolved_col not in signal.columns:
+                signal[resolved_col] = 0.0
+            signal[resolved_col] = pd.to_numeric(signal[resolved_col], errors="coerce").fillna(0.0)
+            signal = signal.dropna(subset=["진입일_dt"]).sort_values(
+                ["진입일_dt", resolved_col, "진입순위"],
+                ascending=[True, False, True],
+            )
+            day_rows = signal.groupby(signal["진입일_dt"].dt.normalize(), sort=False).indices
+            self._signals[score_col] = (signal, resolved_col, day_rows)
+        return self._signals[score_col]
+
+    def market_features(self):
+        """(market_state, entry_features)"""
+        if self._market is None:
+            _, market_state, entry_features = build_market_state_features(self.hist)
+            self._market = (market_state, entry_features)
+        return self._market
+
+
 def build_capital_limited_swing_sim(df_trades, df_history, initial_cash=5_000_000, max_positions=3, start_date=None, score_mode="swing", adaptive_profile="현재값"):
     """초기자금과 동시보유 제한을 둔 실제 포트폴리오형 스윙 시뮬레이션."""
-    if df_trades.empty or df_history.empty:
-        return empty_capital_limited_result()
+    return run_swing_sim(
+        SwingSimInputs(df_trades, df_history),
+        initial_cash=initial_cash,
+        max_positions=max_positions,
+        start_date=start_date,
+        score_mode=score_mode,
+        adaptive_profile=adaptive_profile,
+    )
 
-    trades = df_trades.copy()
-    if "진입일_dt" not in trades.columns and "진입일" in trades.columns:
-        trades["진입일_dt"] = pd.to_datetime(trades["진입일"], errors="coerce")
-    if "청산일_dt" not in trades.columns and "청산일" in trades.columns:
-        trades["청산일_dt"] = pd.to_datetime(trades["청산일"], errors="coerce")
 
-    hist = df_history.copy()
-    if not {"종목명", "일자", "종가"}.issubset(hist.columns):
-        return empty_capital_limited_result()
-    raw_dates = hist["일자"].astype(str).str.replace("-", "", regex=False).str.strip()
-    hist["일자_dt"] = pd.to_datetime(raw_dates, format="%Y%m%d", errors="coerce")
-    if hist["일자_dt"].notna().sum() == 0:
-        hist["일자_dt"] = pd.to_datetime(hist["일자"], errors="coerce")
-    hist["종가"] = pd.to_numeric(hist["종가"], errors="coerce")
-    hist = hist.dropna(subset=["일자_dt", "종목명", "종가"]).sort_values(["종목명", "일자_dt"])
-    if hist.empty:
+def run_swing_sim(inputs, initial_cash=5_000_000, max_positions=3, start_date=None, score_mode="swing", adaptive_profile="현재값"):
+    """준비된 SwingSimInputs로 시뮬레이션 한 건을 실행합니다. 반환값은 build_capital_limited_swing_sim과 같습니다."""
+    if not inputs.ready:
         return empty_capital_limited_result()
-
-    prices = {str(name): grp.set_index("일자_dt")["종가"].sort_index() for name, grp in hist.groupby("종목명")}
-    dates = sorted(hist["일자_dt"].dt.normalize().unique())
-    if start_date is not None:
-        sim_start = pd.to_datetime(start_date).normalize()
-        dates = [d for d in dates if pd.to_datetime(d).normalize() >= sim_start]
+    dates = inputs.sim_dates(start_date)
     if not dates:
         return empty_capital_limited_result()
 
-    signal = trades[trades["청산방식"].astype(str).eq("시그널")].copy()
-    if signal.empty:
-        signal = trades[trades["보유일수"].eq(10)].copy()
+    price_matrix = inputs.price_matrix
+    signal, score_col, signal_day_rows = inputs.signals(score_mode)
     score_mode_key = str(score_mode).lower()
     adaptive_mode = score_mode_key in {"adaptive", "attack_defense", "dynamic"}
     adaptive_rules = ADAPTIVE_THRESHOLD_PROFILES.get(str(adaptive_profile), ADAPTIVE_THRESHOLD_PROFILES["현재값"])
-    score_col = "AI수급점수" if score_mode_key == "ai" else "스윙우선순위"
-    fallback_score_col = "스윙우선순위" if score_col == "AI수급점수" else "AI수급점수"
-    if score_col not in signal.columns and fallback_score_col in signal.columns:
-        score_col = fallback_score_col
-    if score_col not in signal.columns:
-        signal[score_col] = 0.0
-    signal[score_col] = pd.to_numeric(signal[score_col], errors="coerce").fillna(0.0)
-    signal = signal.dropna(subset=["진입일_dt"]).sort_values(
-        ["진입일_dt", score_col, "진입순위"],
-        ascending=[True, False, True],
-    )
 
-    _, market_state, entry_features = build_market_state_features(hist)
+    market_state, entry_features = inputs.market_features()
     relative_strength_mode = str(adaptive_profile) == "v3 상대강도"
 
     def _target_positions_for_day(cur_date, todays):
@@ -85,20 +173,18 @@ def build_capital_limited_swing_sim(df_trades, df_history, initial_cash=5_000_00
     prev_equity = float(initial_cash)
 
     def _last_price(name, cur_date, fallback):
-        px = prices.get(name)
-        if px is not None and not px.loc[px.index <= cur_date].empty:
-            return float(px.loc[px.index <= cur_date].iloc[-1])
-        return float(fallback)
+        return price_matrix.last_price(name, cur_date, fallback)
 
     def _holding_days(entry_date, cur_date, minimum=1):
         return max(minimum, len([d for d in dates if pd.to_datetime(entry_date).normalize() <= pd.to_datetime(d).normalize() <= cur_date]) - 1)
 
     def _mark_positions_value(cur_date):
-        total = 0.0
-        for pos in positions:
-            mark_price = _last_price(pos["종목명"], cur_date, pos["진입가"])
-            total += mark_price * pos["수량"]
-        return total
+        return price_matrix.mark_to_market(
+            [pos["종목명"] for pos in positions],
+            [pos["수량"] for pos in positions],
+            [pos["진입가"] for pos in positions],
+            cur_date,
+        )
 
     def _passes_relative_strength_filter(sig, cur_date, market_mode):
         if not relative_strength_mode:
@@ -138,7 +224,7 @@ def build_capital_limited_swing_sim(df_trades, df_history, initial_cash=5_000_00
                 remaining.append(pos)
         positions = remaining
 
-        todays = signal[signal["진입일_dt"].dt.normalize().eq(cur_date)].copy()
+        todays = signal.iloc[signal_day_rows.get(cur_date, [])].copy()
         if not todays.empty:
             todays[score_col] = pd.to_numeric(todays[score_col], errors="coerce").fillna(0.0)
             todays = todays.sort_values([score_col, "진입순위"], ascending=[False, True])
@@ -360,6 +446,10 @@ def simulate_portfolio(
         score_mode=score_mode,
         adaptive_profile=adaptive_profile,
     )
+    return build_portfolio_result(daily, open_positions, closed_trades, initial_cash)
+
+
+def build_portfolio_result(daily, open_positions, closed_trades, initial_cash):
     summary = build_portfolio_summary(daily, open_positions, closed_trades, initial_cash=initial_cash)
     return {
         "daily_performance": daily,
@@ -370,16 +460,146 @@ def simulate_portfolio(
     }
 
 
+def _run_config(inputs, config, initial_cash):
+    return run_swing_sim(
+        inputs,
+        initial_cash=initial_cash,
+        max_positions=config.max_positions,
+        start_date=config.start_date,
+        score_mode=config.score_mode,
+        adaptive_profile=config.adaptive_profile,
+    )
+
+
+_worker_inputs = None
+_worker_shm = None
+
+
+def _share_frames(frames):
+    """
+    DataFrame들의 숫자/일시 컬럼을 공유 메모리 한 블록에 모으고 워커가 복원할 배치 정보를 돌려줍니다.
+    피클로 넘어가는 것은 인덱스와 object/확장 dtype 컬럼뿐입니다.
+    """
+    layouts, chunks, offset = [], [], 0
+    for frame in frames:
+        cols = []
+        for pos in range(frame.shape[1]):
+            column = frame.iloc[:, pos]
+            if isinstance(column.dtype, np.dtype) and column.dtype.kind in "fiubM":
+                values = np.ascontiguousarray(column.to_numpy())
+                cols.append(("shm", offset, values.dtype.str, len(values)))
+                chunks.append((offset, values))
+                offset += -(-values.nbytes // 8) * 8
+            else:
+                cols.append(("obj", column.array))
+        layouts.append((frame.index, frame.columns, cols))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+    for start, values in chunks:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, offset=start)[:] = values
+    return shm, layouts
+
+
+def _restore_frame(buf, layout):
+    """_share_frames 배치 정보로 DataFrame을 복원합니다. 공유 메모리 값은 워커 메모리로 한 번 복사합니다."""
+    index, columns, cols = layout
+    data = {}
+    for pos, col in enumerate(cols):
+        if col[0] == "shm":
+            _, start, dtype, length = col
+            data[pos] = np.ndarray((length,), dtype=np.dtype(dtype), buffer=buf, offset=start).copy()
+        else:
+            data[pos] = col[1]
+    frame = pd.DataFrame(data, index=index)
+    frame.columns = columns
+    return frame
+
+
+def _init_sweep_worker(shm_name, shape, price_dates, price_names, frames_shm_name, frame_layouts, sim_dates):
+    """
+    워커마다 한 번: 공유 메모리의 가격 행렬을 복사 없이 붙이고, 부모가 준비한 거래/시장 상태 프레임을 복원합니다.
+    원본 이력(hist)은 넘겨받지 않고 시장 상태도 다시 계산하지 않습니다.
+    """
+    global _worker_inputs, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    values.flags.writeable = False
+    frames_shm = shared_memory.SharedMemory(name=frames_shm_name)
+    try:
+        trades, market_state, entry_features = (_restore_frame(frames_shm.buf, layout) for layout in frame_layouts)
+    finally:
+        frames_shm.close()
+    _worker_inputs = SwingSimInputs.from_prepared(
+        trades, None, PriceMatrix(price_dates, price_names, values), sim_dates, market=(market_state, entry_features)
+    )
+
+
+def _run_sweep_task(index, config, initial_cash):
+    return index, _run_config(_worker_inputs, config, initial_cash)
+
+
+def _run_sweep_processes(inputs, configs, initial_cash, max_workers, progress=None):
+    matrix = inputs.price_matrix
+    market_state, entry_features = inputs.market_features()
+    shm = shared_memory.SharedMemory(create=True, size=max(1, matrix.values.nbytes))
+    frames_shm = None
+    try:
+        np.ndarray(matrix.values.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix.values
+        frames_shm, frame_layouts = _share_frames([inputs.trades, market_state, entry_features])
+        results = [None] * len(configs)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(SWEEP_MP_CONTEXT),
+            initializer=_init_sweep_worker,
+            initargs=(shm.name, matrix.values.shape, matrix.dates, matrix.names, frames_shm.name, frame_layouts, inputs.dates),
+        ) as pool:
+            futures = [pool.submit(_run_sweep_task, i, config, initial_cash) for i, config in enumerate(configs)]
+            for done, future in enumerate(as_completed(futures), start=1):
+                index, result = future.result()
+                results[index] = result
+                if progress:
+                    progress(done, len(configs))
+        return results
+    finally:
+        for block in (shm, frames_shm):
+            if block is not None:
+                block.close()
+                block.unlink()
+
+
+def simulate_portfolio_sweep(candidate_trades, price_history, configs, initial_cash=5_000_000, max_workers=1, progress=None):
+    """
+    이력 파싱/가격 행렬/시장 상태/시그널 정렬을 한 번만 준비하고 configs(SwingSimConfig 목록)를 실행합니다.
+    max_workers > 1이면 프로세스 풀에서 나눠 돌리고(가격 행렬과 거래/시장 상태의 숫자 컬럼은 공유 메모리로 전달), 실패하면 단일 프로세스로 계속합니다.
+    결과는 실행 순서와 무관하게 configs 순서의 simulate_portfolio 결과 dict 목록이며, progress(완료 건수, 전체 건수)를 호출합니다.
+    """
+    configs = list(configs)
+    inputs = SwingSimInputs(candidate_trades, price_history)
+    max_workers = min(int(max_workers or SWEEP_MAX_WORKERS), len(configs))
+    raw_results = None
+    if inputs.ready and max_workers > 1:
+        try:
+            raw_results = _run_sweep_processes(inputs, configs, initial_cash, max_workers, progress=progress)
+        except Exception as e:
+            print(f"[WARN] 병렬 스윕 실패, 단일 프로세스로 진행: {e}")
+    if raw_results is None:
+        raw_results = []
+        for done, config in enumerate(configs, start=1):
+            raw_results.append(_run_config(inputs, config, initial_cash))
+            if progress:
+                progress(done, len(configs))
+    return [build_portfolio_result(daily, open_positions, closed_trades, initial_cash) for daily, open_positions, closed_trades in raw_results]
+
+
 def build_start_date_stability(df_trades, df_history, available_dates, selected_start_date, initial_cash, max_positions, limit=10, score_mode="swing", adaptive_profile="현재값"):
     date_series = pd.Series(pd.to_datetime(available_dates, errors="coerce")).dropna()
     start_candidates = pd.Series(date_series.dt.date.unique()).sort_values()
     start_candidates = [d for d in start_candidates.tolist() if d >= selected_start_date]
     start_candidates = start_candidates[: int(limit)]
+    inputs = SwingSimInputs(df_trades, df_history)
     rows = []
     for start_d in start_candidates:
-        sim_perf, _, sim_closed = build_capital_limited_swing_sim(
-            df_trades,
-            df_history,
+        sim_perf, _, sim_closed = run_swing_sim(
+            inputs,
             initial_cash=initial_cash,
             max_positions=max_positions,
             start_date=start_d,
@@ -416,13 +636,13 @@ def build_adaptive_threshold_sensitivity(df_trades, df_history, available_dates,
         ]))
         start_candidates = [start_candidates[i] for i in positions[: int(limit)]]
 
+    inputs = SwingSimInputs(df_trades, df_history)
     detail_rows = []
     profile_names = ["현재값", "v2 견고형", "v3 상대강도"]
     for profile_name in profile_names:
         for start_d in start_candidates:
-            sim_perf, _, sim_closed = build_capital_limited_swing_sim(
-                df_trades,
-                df_history,
+            sim_perf, _, sim_closed = run_swing_sim(
+                inputs,
                 initial_cash=initial_cash,
                 max_positions=max_positions,
                 start_date=start_d,
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+class PriceMatrix:
+    """
+    날짜 × 종목 종가 행렬(float64, 날짜 방향 forward-fill).
+    날짜/종목을 정수 인덱스로 바꿔 두므로 "해당 날짜 이전 마지막 종가" 조회가 O(1)(날짜는 이진탐색)입니다.
+    첫 거래일 이전이거나 이력이 없는 종목은 호출부가 넘긴 대체값(보통 진입가)을 돌려줍니다.
+    """
+
+    def __init__(self, dates, names, values):
+        self.dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=float)
+        self._stock_pos = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_history(cls, hist, name_col="종목명", date_col="일자_dt", price_col="종가", normalize=True):
+        """
+        이력 프레임에서 행렬을 만듭니다. 같은 종목·같은 날짜(normalize=True면 일 단위) 행이 여러 개면
+        시각 순서상 마지막 행의 종가를 씁니다. 종가/일자 결측 행은 제외합니다.
+        """
+        if hist is None or hist.empty or not {name_col, date_col, price_col}.issubset(hist.columns):
+            return cls([], [], np.empty((0, 0)))
+        df = hist[[name_col, date_col, price_col]].dropna(subset=[date_col, price_col])
+        df = df.sort_values([name_col, date_col], kind="mergesort")
+        days = pd.to_datetime(df[date_col])
+        if normalize:
+            days = days.dt.normalize()
+        df = df.assign(_day=days.to_numpy()).drop_duplicates([name_col, "_day"], keep="last")
+        dates = np.sort(df["_day"].unique()).astype("datetime64[ns]")
+        names = sorted(df[name_col].unique())
+        name_pos = {name: i for i, name in enumerate(names)}
+        values = np.full((len(dates), len(names)), np.nan, dtype=float)
+        values[
+            np.searchsorted(dates, df["_day"].to_numpy(dtype="datetime64[ns]")),
+            df[name_col].map(name_pos).to_numpy(dtype=int),
+        ] = df[price_col].to_numpy(dtype=float)
+        values = pd.DataFrame(values).ffill().to_numpy()
+        return cls(dates, names, values)
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    def date_index(self, date):
+        """date 이하 마지막 날짜 행 번호. 첫 날짜보다 이르면 -1."""
+        return int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date), "ns"), side="right")) - 1
+
+    def stock_index(self, name):
+        """종목 열 번호. 없는 종목이면 -1."""
+        return self._stock_pos.get(name, -1)
+
+    def last_price(self, name, date, default=np.nan):
+        row = self.date_index(date)
+        col = self.stock_index(name)
+        if row < 0 or col < 0:
+            return float(default)
+        value = self.values[row, col]
+        return float(default) if np.isnan(value) else float(value)
+
+    def last_prices(self, names, date, defaults):
+        """여러 종목의 date 시점 종가를 한 번에 조회합니다. 값이 없으면 같은 위치의 defaults를 씁니다."""
+        defaults = np.asarray(defaults, dtype=float)
+        if not len(defaults):
+            return defaults
+        row = self.date_index(date)
+        cols = np.array([self.stock_index(name) for name in names], dtype=int)
+        if row < 0:
+            return defaults.copy()
+        values = np.where(cols >= 0, self.values[row, np.maximum(cols, 0)], np.nan)
+        return np.where(np.isnan(values), defaults, values)
+
+    def mark_to_market(self, names, qtys, defaults, date):
+        """보유 종목 평가금액 합계. 포지션 순서대로 누적해 기존 반복 합산과 같은 부동소수 결과를 냅니다."""
+        total = 0.0
+        for price, qty in zip(self.last_prices(names, date, defaults).tolist(), qtys):
+            total += price * qty
+        return total
@@ -1,6 +1,6 @@
 import pandas as pd
 
-from db_utils import read_table
+from db_utils import as_numeric, read_table
 
 
 RISK_WORDS = ["매도", "제외", "훼손", "축소", "주의", "청산", "이탈"]
@@ -74,8 +74,8 @@ def build_recommendation_validation(score_trend=None, swing_trades=None, history
     trades = swing_trades.copy()
     trades["진입일_dt"] = _to_date(trades.get("진입일", pd.Series(dtype=str)))
     trades["청산일_dt"] = _to_date(trades.get("청산일", pd.Series(dtype=str)))
-    trades["진입가"] = pd.to_numeric(trades.get("진입가", 0.0), errors="coerce").fillna(0.0)
-    trades["수익률"] = pd.to_numeric(trades.get("수익률", 0.0), errors="coerce").fillna(0.0)
+    trades["진입가"] = as_numeric(trades.get("진입가", 0.0)).fillna(0.0)
+    trades["수익률"] = as_numeric(trades.get("수익률", 0.0)).fillna(0.0)
     hist = history.copy()
     hist["일자_dt"] = pd.to_datetime(
         hist.get("일자", pd.Series(dtype=str)).astype(str).str.replace("-", "", regex=False),
@@ -84,7 +84,7 @@ def build_recommendation_validation(score_trend=None, swing_trades=None, history
     ).dt.normalize()
     if hist["일자_dt"].isna().all():
         hist["일자_dt"] = _to_date(hist.get("일자", pd.Series(dtype=str)))
-    hist["종가"] = pd.to_numeric(hist.get("종가", 0.0), errors="coerce")
+    hist["종가"] = as_numeric(hist.get("종가", 0.0))
     hist = hist.dropna(subset=["종목명", "일자_dt", "종가"]).sort_values(["종목명", "일자_dt"])
     price_map = {str(name): grp.copy() for name, grp in hist.groupby("종목명")}
     market_state = build_market_state(hist)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from services.indicator_service import RSI_PERIOD, newest_first_sum, trend_quality_arrays, wilder_rsi_arrays, window_sums
+
+
+REPLAY_WINDOW = 20
+REPLAY_FLOW_COLS = ["외인", "연기금", "투신", "사모"]
+
+
+def _positive_streak(values, end_idx, lengths):
+    streak = np.zeros(len(end_idx), dtype=int)
+    alive = np.ones(len(end_idx), dtype=bool)
+    max_len = int(lengths.max()) if len(lengths) else 0
+    for j in range(max_len):
+        idx = np.maximum(end_idx - j, 0)
+        alive = alive & (lengths > j) & (values[idx] > 0)
+        streak += alive
+    return streak
+
+
+def _window_features(hist, end_idx, pos, window):
+    close = hist["종가"].to_numpy(dtype=float)
+    lengths = np.minimum(window, pos[end_idx] + 1)
+
+    n5 = np.minimum(5, lengths)
+    trend = trend_quality_arrays(close, end_idx, lengths)
+    # calculate_rsi(최근 15개 종가): 14개 diff의 단순평균(Wilder 재귀 구간 없음)
+    rsi = wilder_rsi_arrays(close, end_idx, np.minimum(lengths, RSI_PERIOD + 1), period=RSI_PERIOD)
+
+    out = {
+        "current_price": trend["current"],
+        "window_len": lengths,
+        "ma5_raw": trend["ma5"],
+        "ma10_raw": trend["ma10"],
+        "ma20_raw": trend["ma20"],
+        "aligned": trend["aligned"],
+        "trend_score": trend["score"],
+        "rsi": rsi,
+    }
+
+    for col in REPLAY_FLOW_COLS:
+        out[f"{col}_sum"] = window_sums(hist[col].to_numpy(dtype=float), end_idx, lengths)
+    trade_value = hist["거래대금(억)"].to_numpy(dtype=float)
+    out["trade_value_5d"] = window_sums(trade_value, end_idx, n5)
+    out["trade_value_20d"] = window_sums(trade_value, end_idx, lengths)
+    out["latest5_len"] = n5
+
+    volume = hist["거래량"].to_numpy(dtype=float)
+    past_n = np.minimum(5, lengths - 1)
+    past_sum = newest_first_sum(volume, end_idx, past_n, offset=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_surge = volume[end_idx] / (past_sum / past_n) * 100.0
+    out["vol_surge"] = np.where((lengths > 1) & (past_sum > 0), vol_surge, 100.0)
+
+    out["외인_streak"] = _positive_streak(hist["외인"].to_numpy(dtype=float), end_idx, lengths)
+    out["연기금_streak"] = _positive_streak(hist["연기금"].to_numpy(dtype=float), end_idx, lengths)
+    return out
+
+
+def build_replay_feature_panel(hist, dates, min_lookback=10, window=REPLAY_WINDOW):
+    """
+    replay 대상 날짜별로 각 종목의 최근 window일 가격/수급 지표를 한 번에 계산합니다.
+    hist는 _load_history_for_replay 결과(종목명/일자_dt 정렬, 중복 제거)를 전제로 하며,
+    종목별로 날짜 시점의 마지막 행을 찾아 같은 창 지표를 재사용하므로 날짜×종목 반복 필터가 없습니다.
+    반환 행은 날짜 오름차순, 같은 날짜 안에서는 종목명 groupby 순서와 같습니다.
+    """
+    if hist is None or hist.empty or not len(dates):
+        return pd.DataFrame()
+
+    hist = hist.reset_index(drop=True)
+    day_values = hist["일자_dt"].dt.normalize().to_numpy()
+    target_days = np.asarray(sorted(pd.to_datetime(pd.Index(dates)).normalize().unique()), dtype=day_values.dtype)
+    pos = hist.groupby("종목명", sort=False).cumcount().to_numpy()
+
+    date_parts, name_parts, end_parts = [], [], []
+    stock_indices = hist.groupby("종목명", sort=True).indices
+    for name in sorted(stock_indices):
+        idx = np.sort(stock_indices[name])
+        stock_days = day_values[idx]
+        last_pos = np.searchsorted(stock_days, target_days, side="right") - 1
+        ok = (last_pos + 1) >= int(min_lookback)
+        if not ok.any():
+            continue
+        date_parts.append(np.flatnonzero(ok))
+        name_parts.append(np.full(int(ok.sum()), name, dtype=object))
+        end_parts.append(idx[last_pos[ok]])
+    if not end_parts:
+        return pd.DataFrame()
+
+    date_order = np.concatenate(date_parts)
+    row_names = np.concatenate(name_parts)
+    row_end = np.concatenate(end_parts)
+    # 날짜 우선, 같은 날짜 안에서는 종목명 정렬 순서(stable)
+    order = np.argsort(date_order, kind="stable")
+    date_order, row_names, row_end = date_order[order], row_names[order], row_end[order]
+
+    unique_end, inverse = np.unique(row_end, return_inverse=True)
+    feats = _window_features(hist, unique_end, pos, int(window))
+    panel = pd.DataFrame({key: np.asarray(val)[inverse] for key, val in feats.items()})
+    panel.insert(0, "종목명", row_names)
+    panel.insert(0, "날짜_dt", pd.to_datetime(target_days[date_order]))
+    return panel
@@ -0,0 +1,189 @@
+import csv
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from services.http_cache_service import get_http_cache_metrics
+from services.http_client import get_http_metrics
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+RUN_METRICS_PATH = Path("data") / "run_metrics.csv"
+RUN_METRICS_MAX_BYTES = int(float(os.environ.get("QUANTBOT_RUN_METRICS_MAX_MB", "2")) * 1024 * 1024)
+RUN_METRICS_BACKUPS = 3
+RUN_METRICS_COLUMNS = [
+    "실행ID", "모드", "단계", "상위단계", "시작시각", "소요(초)", "요청수", "요청오류",
+    "캐시적중", "처리행수", "최대RSS(MB)", "상태", "호스트별요청",
+]
+
+
+def max_rss_mb():
+    """프로세스 최대 RSS(MB). resource 모듈이 없으면 None."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _http_snapshot():
+    hosts = {host: (stat["requests"], stat["errors"]) for host, stat in get_http_metrics().items()}
+    return hosts, get_http_cache_metrics()["hits"]
+
+
+def _host_delta(before, after):
+    delta = {}
+    for host, (requests, errors) in after.items():
+        prev_requests, prev_errors = before.get(host, (0, 0))
+        if requests > prev_requests:
+            delta[host] = (requests - prev_requests, errors - prev_errors)
+    return delta
+
+
+class RunMetrics:
+    """
+    한 번의 수집 실행을 단계(span)별로 기록합니다.
+    단계마다 소요 시간, HTTP 요청/오류 수(호스트별 증가분), 캐시 적중, 처리 행 수, 그 시점까지의 최대 RSS를 남기고
+    flush()에서 data/run_metrics.csv(크기 기준 순환)에 한 번에 덧붙입니다.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.records = []
+        self._open = {}
+
+    def begin(self, stage, parent=""):
+        hosts, cache_hits = _http_snapshot()
+        self._open[stage] = {
+            "parent": parent,
+            "started_at": datetime.now(),
+            "perf": time.perf_counter(),
+            "hosts": hosts,
+            "cache_hits": cache_hits,
+        }
+
+    def end(self, stage, rows=None, status="ok"):
+        span = self._open.pop(stage, None)
+        if span is None:
+            return
+        hosts, cache_hits = _http_snapshot()
+        delta = _host_delta(span["hosts"], hosts)
+        self.records.append({
+            "실행ID": self.run_id,
+            "단계": stage,
+            "상위단계": span["parent"],
+            "시작시각": span["started_at"].isoformat(timespec="seconds"),
+            "소요(초)": round(time.perf_counter() - span["perf"], 3),
+            "요청수": sum(v[0] for v in delta.values()),
+            "요청오류": sum(v[1] for v in delta.values()),
+            "캐시적중": cache_hits - span["cache_hits"],
+            "처리행수": "" if rows is None else int(rows),
+            "최대RSS(MB)": max_rss_mb(),
+            "상태": status,
+            "호스트별요청": ";".join(f"{host}={n}" for host, (n, _) in sorted(delta.items(), key=lambda kv: -kv[1][0])),
+        })
+
+    @contextmanager
+    def span(self, stage, parent=""):
+        """with metrics.span("단계") as info: ... info["rows"] = n"""
+        info = {"rows": None}
+        self.begin(stage, parent=parent)
+        try:
+            yield info
+        except Exception:
+            self.end(stage, rows=info["rows"], status="error")
+            raise
+        self.end(stage, rows=info["rows"])
+
+    def add_stage_timings(self, timings, parent):
+        """run_stage_pipeline이 돌려준 단계별 소요를 하위 단계로 덧붙입니다(요청/RSS는 상위 단계에만 기록)."""
+        started_at = datetime.now().isoformat(timespec="seconds")
+        for t in timings or []:
+            self.records.append({
+                "실행ID": self.run_id, "단계": t["stage"], "상위단계": parent,
+                "시작시각": started_at, "소요(초)": t["seconds"], "요청수": 0, "요청오류": 0, "캐시적중": 0,
+                "처리행수": t["rows"], "최대RSS(MB)": "", "상태": "ok", "호스트별요청": "",
+            })
+
+    def flush(self, path=None):
+        """열린 단계는 '중단'으로 닫고 로그에 덧붙입니다. 실패해도 수집 결과에는 영향을 주지 않습니다."""
+        for stage in list(self._open):
+            self.end(stage, status="중단")
+        if not self.records:
+            return None
+        path = Path(path or RUN_METRICS_PATH)
+        # 모드(캐시/풀 파싱 등)는 실행 중간에 정해지므로 기록 시점에 채웁니다.
+        for record in self.records:
+            record["모드"] = self.mode
+        try:
+            append_run_metrics(self.records, path)
+        except Exception as e:
+            print(f"[WARN] 실행 지표 기록 실패: {e}")
+            return None
+        print(format_run_metrics(self.records))
+        print(f"📝 실행 지표 {len(self.records)}건 기록 -> {path}")
+        self.records = []
+        return path
+
+
+def _rotate(path, max_bytes=None, backups=RUN_METRICS_BACKUPS):
+    max_bytes = RUN_METRICS_MAX_BYTES if max_bytes is None else max_bytes
+    if not path.exists() or path.stat().st_size < max_bytes:
+        return
+    for i in range(backups - 1, 0, -1):
+        src = path.with_suffix(f".{i}{path.suffix}")
+        if src.exists():
+            os.replace(src, path.with_suffix(f".{i + 1}{path.suffix}"))
+    os.replace(path, path.with_suffix(f".1{path.suffix}"))
+
+
+def append_run_metrics(records, path=RUN_METRICS_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _rotate(path)
+    write_header = not path.exists()
+    with path.open("a", encoding="utf-8-sig" if write_header else "utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RUN_METRICS_COLUMNS, extrasaction="ignore")
+        if write_header:
+            writer.writeheader()
+        writer.writerows(records)
+
+
+def load_run_metrics(path=RUN_METRICS_PATH, include_backups=True):
+    """순환된 백업까지 합쳐 시간순으로 읽습니다(대시보드용)."""
+    path = Path(path)
+    files = [path.with_suffix(f".{i}{path.suffix}") for i in range(RUN_METRICS_BACKUPS, 0, -1)] if include_backups else []
+    frames = []
+    for p in files + [path]:
+        if p.exists():
+            try:
+                frames.append(pd.read_csv(p, encoding="utf-8-sig", on_bad_lines="skip"))
+            except Exception as e:
+                print(f"[WARN] 실행 지표 로드 실패({p}): {e}")
+    if not frames:
+        return pd.DataFrame(columns=RUN_METRICS_COLUMNS)
+    out = pd.concat(frames, ignore_index=True)
+    out["시작시각_dt"] = pd.to_datetime(out["시작시각"], errors="coerce")
+    return out
+
+
+def format_run_metrics(records):
+    top = [r for r in records if not r["상위단계"]]
+    if not top:
+        return ""
+    total = sum(r["소요(초)"] for r in top)
+    lines = [f"⏱️ 실행 단계 {len(top)}개 {total:.1f}s (최대 RSS {top[-1]['최대RSS(MB)']}MB)"]
+    for r in sorted(top, key=lambda r: -r["소요(초)"])[:8]:
+        rows = f" / {r['처리행수']:,}행" if r["처리행수"] != "" else ""
+        lines.append(f"   - {r['단계']}: {r['소요(초)']:.2f}s / 요청 {r['요청수']:,}건{rows} [{r['상태']}]")
+    return "\n".join(lines)
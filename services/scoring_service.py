@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 
+from services.indicator_service import TREND_WINDOW, TrendQualityState, WilderRSI
+
 
 ADAPTIVE_THRESHOLD_PROFILES = {
     "현재값": {
@@ -45,20 +48,8 @@ ADAPTIVE_THRESHOLD_PROFILES = {
 
 
 def calculate_rsi(prices, period=14):
-    if len(prices) < period + 1:
-        return 50.0
-    diffs = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
-    gains = [d if d > 0 else 0 for d in diffs]
-    losses = [-d if d < 0 else 0 for d in diffs]
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
-    for i in range(period, len(diffs)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-    if avg_loss == 0:
-        return 100.0
-    rs = avg_gain / avg_loss
-    return 100.0 - (100.0 / (1.0 + rs))
+    """오래된 일자 → 최신일 순서 종가의 Wilder RSI. 종가가 period+1개 미만이면 50."""
+    return WilderRSI(period).extend(prices).value
 
 
 def calculate_trend_quality(closes):
@@ -70,40 +61,21 @@ def calculate_trend_quality(closes):
     if not vals:
         return {"ma5": 0.0, "ma10": 0.0, "ma20": 0.0, "aligned": False, "score": 0.0, "reason": "가격 데이터 부족"}
 
-    # 기존 scraper 호출은 최신일 역순 리스트를 넘기므로 내부 계산은 기존 방식 그대로 유지합니다.
-    current = vals[0]
-    ma5 = sum(vals[:5]) / min(5, len(vals))
-    ma10 = sum(vals[:10]) / min(10, len(vals))
-    ma20 = sum(vals[:20]) / min(20, len(vals))
-    prev5 = sum(vals[5:10]) / len(vals[5:10]) if len(vals) >= 10 else ma5
-    prev10 = sum(vals[10:20]) / len(vals[10:20]) if len(vals) >= 20 else ma10
-
-    above20 = current >= ma20
-    short_above_mid = ma5 >= ma10
-    mid_above_long = ma10 >= ma20
-    short_slope = ma5 >= prev5
-    mid_slope = ma10 >= prev10
-    aligned = bool(above20 and short_above_mid and mid_above_long)
-    score = (
-        (20 if above20 else 0)
-        + (20 if short_above_mid else 0)
-        + (20 if mid_above_long else 0)
-        + (20 if short_slope else 0)
-        + (20 if mid_slope else 0)
-    )
+    # 기존 scraper 호출은 최신일 역순 리스트를 넘기므로 vals[0]을 최신일로 보고 최근 20개만 씁니다.
+    trend = TrendQualityState(TREND_WINDOW).extend(reversed(vals[:TREND_WINDOW])).snapshot()
     reason_bits = []
-    if aligned:
+    if trend["aligned"]:
         reason_bits.append("정배열")
-    if short_slope:
+    if trend["short_slope"]:
         reason_bits.append("단기 상승")
-    if mid_slope:
+    if trend["mid_slope"]:
         reason_bits.append("중기 상승")
     return {
-        "ma5": round(ma5, 2),
-        "ma10": round(ma10, 2),
-        "ma20": round(ma20, 2),
-        "aligned": aligned,
-        "score": round(float(score), 2),
+        "ma5": round(trend["ma5"], 2),
+        "ma10": round(trend["ma10"], 2),
+        "ma20": round(trend["ma20"], 2),
+        "aligned": trend["aligned"],
+        "score": round(trend["score"], 2),
         "reason": ", ".join(reason_bits) if reason_bits else "추세 약함",
     }
 
@@ -187,6 +159,150 @@ def calculate_dynamic_score(
     }
 
 
+def _as_float_array(values, n):
+    return np.broadcast_to(np.asarray(values, dtype=float), (n,))
+
+
+def _builtin_min(a, b):
+    """내장 min(a, b)와 같은 규칙(b < a일 때만 b). NaN 입력 결과까지 scalar 버전과 맞춥니다."""
+    return np.where(b < a, b, a)
+
+
+def _builtin_max(a, b):
+    """내장 max(a, b)와 같은 규칙(b > a일 때만 b)."""
+    return np.where(b > a, b, a)
+
+
+def calculate_dynamic_scores(
+    f_str,
+    p_str,
+    t_str,
+    pef_str,
+    vol_surge,
+    rsi_val,
+    gap_20,
+    foreign_streak,
+    pension_streak,
+    turnover_rate,
+    is_ma20_rising,
+    per_val,
+    roe_val,
+    current_vix,
+    dip_buying_ratio=0.0,
+    return_details=False,
+):
+    """
+    calculate_dynamic_score의 열 단위 버전. 각 인자는 Series/ndarray/list(또는 전 종목 공통 스칼라)이고
+    current_vix만 스칼라입니다. 정수 점수 배열을, return_details=True면 scalar 상세 dict와 같은 컬럼의 DataFrame을 돌려줍니다.
+    """
+    n = len(f_str)
+    f_str, p_str, t_str, pef_str = (_as_float_array(v, n) for v in (f_str, p_str, t_str, pef_str))
+    vol_surge, rsi_val, gap_20 = (_as_float_array(v, n) for v in (vol_surge, rsi_val, gap_20))
+    foreign_streak, pension_streak, turnover_rate = (_as_float_array(v, n) for v in (foreign_streak, pension_streak, turnover_rate))
+    per_val, roe_val, dip_buying_ratio = (_as_float_array(v, n) for v in (per_val, roe_val, dip_buying_ratio))
+    # scalar 버전의 `if is_ma20_rising:` 진릿값 판정(문자열/NaN 포함)을 그대로 따릅니다.
+    rising_values = is_ma20_rising if hasattr(is_ma20_rising, "__len__") and not isinstance(is_ma20_rising, str) else [is_ma20_rising] * n
+    is_ma20_rising = np.array([bool(v) for v in rising_values], dtype=bool)
+
+    if current_vix < 25:
+        zombie_penalty = np.zeros(n)
+        fund_score = np.zeros(n)
+        raw_str_sum = (t_str * 4) + (pef_str * 4) + (p_str * 2) + (f_str * 0.5)
+        strength_score = _builtin_max(0, _builtin_min(20, raw_str_sum * 2))
+        streak_score = _builtin_max(0, _builtin_min(10, (pension_streak * 1.5) + (foreign_streak * 0.5)))
+        supply_score = strength_score + streak_score
+
+        turnover_score = np.where(turnover_rate >= 10, 20, np.where(turnover_rate >= 5, 10, 0))
+        v_score = np.where(vol_surge >= 150, 10, 0)
+        r_score = np.where((60 <= rsi_val) & (rsi_val <= 85), 15, np.where((50 <= rsi_val) & (rsi_val < 60), 5, 0))
+        momentum_score = turnover_score + v_score + r_score
+
+        dip_bonus = np.where(dip_buying_ratio >= 0.6, 15, 0)
+        tech_score = np.where(
+            (102 <= gap_20) & (gap_20 <= 108),
+            10 + dip_bonus,
+            np.where((98 <= gap_20) & (gap_20 < 102), 5 + dip_bonus, 0),
+        )
+        regime = "상승장"
+    else:
+        zombie_penalty = np.where(turnover_rate < 1.5, -30, 0)
+        raw_str_sum = (p_str * 5) + (t_str * 2) + (pef_str * 2) + (f_str * 0.5)
+        strength_score = _builtin_max(0, _builtin_min(20, raw_str_sum * 2))
+        streak_score = _builtin_max(0, _builtin_min(10, (pension_streak * 2.5) + (foreign_streak * 0.5)))
+        supply_score = strength_score + streak_score
+
+        turnover_score = np.where(turnover_rate >= 3, 5, 0)
+        v_score = np.where(vol_surge >= 100, 5, 0)
+        r_score = np.where((45 <= rsi_val) & (rsi_val <= 60), 10, 0)
+        momentum_score = turnover_score + v_score + r_score
+
+        tech_score = np.where(
+            is_ma20_rising,
+            np.where((98 <= gap_20) & (gap_20 <= 103), 20, np.where((103 < gap_20) & (gap_20 <= 108), 10, 0)),
+            -20,
+        )
+
+        fund_score = np.where(roe_val >= 15, 15, np.where(roe_val >= 8, 10, 0)) + np.where((0 < per_val) & (per_val <= 15), 15, 0)
+        fund_score = np.where(per_val <= 0, fund_score - 20, fund_score)
+        regime = "하락장"
+
+    total = supply_score + momentum_score + tech_score + fund_score + zombie_penalty
+    final = _builtin_max(0, _builtin_min(100, np.trunc(total).astype(int))).astype(int)
+    if not return_details:
+        return final
+    return pd.DataFrame({
+        "score": final,
+        "regime": regime,
+        "supply_score": [round(float(v), 2) for v in supply_score],
+        "momentum_score": [round(float(v), 2) for v in momentum_score],
+        "tech_score": [round(float(v), 2) for v in tech_score],
+        "fund_score": [round(float(v), 2) for v in fund_score],
+        "penalty": [round(float(v), 2) for v in zombie_penalty],
+        "reason": [
+            f"{regime}: 수급 {sup:.1f}, 모멘텀 {mom:.1f}, 기술 {tech:.1f}"
+            for sup, mom, tech in zip(supply_score.tolist(), momentum_score.tolist(), tech_score.tolist())
+        ],
+    })
+
+
+QUAL_SECTOR_THEME_MAP = {
+    "반도체": ["반도체", "ai", "hbm", "메모리"],
+    "전기": ["전력", "전기", "배터리", "2차전지", "ess"],
+    "건설": ["건설", "인프라", "플랜트", "수주"],
+    "화장품": ["화장품", "소비", "면세", "중국 소비"],
+    "제약": ["제약", "바이오", "임상", "허가"],
+    "방산": ["방산", "국방", "수출"],
+    "조선": ["조선", "선박", "해운", "lng"],
+    "기계": ["기계", "자동화", "설비투자"],
+    "증권": ["증권", "거래대금", "금리", "유동성"],
+}
+QUAL_POSITIVE_TONE_KEYS = ["호재", "상향", "증가", "개선", "수주", "체결", "흑자", "서프라이즈", "기대", "확대"]
+QUAL_NEUTRAL_TONE_KEYS = ["전망", "관측", "분석", "주목", "설명", "동향", "점검", "리포트", "이슈"]
+QUAL_NEGATIVE_TONE_KEYS = ["긴축", "관세", "하락", "리스크", "소송", "악재", "부진", "감소", "충격", "약세"]
+QUAL_TOPIC_POSITIVE_KEYS = ["실적", "수주", "정책", "수급"]
+QUAL_TOPIC_NEGATIVE_KEYS = ["리스크", "하락", "긴축", "관세"]
+
+
+def _qualitative_news_tone(text):
+    positive_hits = sum(1 for k in QUAL_POSITIVE_TONE_KEYS if k in text)
+    neutral_hits = sum(1 for k in QUAL_NEUTRAL_TONE_KEYS if k in text)
+    negative_hits = sum(1 for k in QUAL_NEGATIVE_TONE_KEYS if k in text)
+    if positive_hits > negative_hits:
+        theme_tone_mult = 1.0
+    elif neutral_hits >= max(1, positive_hits):
+        theme_tone_mult = 0.35
+    else:
+        theme_tone_mult = 0.55
+    return positive_hits, neutral_hits, negative_hits, theme_tone_mult
+
+
+def _qualitative_theme_boost(sector, text, decay_factor, theme_tone_mult):
+    for sector_key, keywords in QUAL_SECTOR_THEME_MAP.items():
+        if sector_key in sector and any(k.lower() in text for k in keywords):
+            return 8 * decay_factor * theme_tone_mult
+    return 0.0
+
+
 def calculate_qualitative_score(
     sector_name,
     per_val,
@@ -204,45 +320,16 @@ def calculate_qualitative_score(
     sector = (sector_name or "분류안됨").lower()
     decay_factor = max(0.35, min(1.0, float(macro_recency_score) / 100.0))
 
-    sector_theme_map = {
-        "반도체": ["반도체", "ai", "hbm", "메모리"],
-        "전기": ["전력", "전기", "배터리", "2차전지", "ess"],
-        "건설": ["건설", "인프라", "플랜트", "수주"],
-        "화장품": ["화장품", "소비", "면세", "중국 소비"],
-        "제약": ["제약", "바이오", "임상", "허가"],
-        "방산": ["방산", "국방", "수출"],
-        "조선": ["조선", "선박", "해운", "lng"],
-        "기계": ["기계", "자동화", "설비투자"],
-        "증권": ["증권", "거래대금", "금리", "유동성"],
-    }
-    positive_tone_keys = ["호재", "상향", "증가", "개선", "수주", "체결", "흑자", "서프라이즈", "기대", "확대"]
-    neutral_tone_keys = ["전망", "관측", "분석", "주목", "설명", "동향", "점검", "리포트", "이슈"]
-    negative_tone_keys = ["긴축", "관세", "하락", "리스크", "소송", "악재", "부진", "감소", "충격", "약세"]
-
-    positive_hits = sum(1 for k in positive_tone_keys if k in text)
-    neutral_hits = sum(1 for k in neutral_tone_keys if k in text)
-    negative_hits = sum(1 for k in negative_tone_keys if k in text)
-
-    if positive_hits > negative_hits:
-        theme_tone_mult = 1.0
-    elif neutral_hits >= max(1, positive_hits):
-        theme_tone_mult = 0.35
-    else:
-        theme_tone_mult = 0.55
-
-    theme_boost = 0.0
-    for sector_key, keywords in sector_theme_map.items():
-        if sector_key in sector and any(k.lower() in text for k in keywords):
-            theme_boost = 8 * decay_factor * theme_tone_mult
-            break
+    positive_hits, neutral_hits, negative_hits, theme_tone_mult = _qualitative_news_tone(text)
+    theme_boost = _qualitative_theme_boost(sector, text, decay_factor, theme_tone_mult)
     score += min(4.5, theme_boost)
 
     if negative_hits > 0:
         score -= 4 * decay_factor
 
-    if any(k in topic_text for k in ["실적", "수주", "정책", "수급"]):
+    if any(k in topic_text for k in QUAL_TOPIC_POSITIVE_KEYS):
         score += 3 * decay_factor
-    if any(k in topic_text for k in ["리스크", "하락", "긴축", "관세"]):
+    if any(k in topic_text for k in QUAL_TOPIC_NEGATIVE_KEYS):
         score -= 3 * decay_factor
 
     if roe_val >= 15:
@@ -276,6 +363,68 @@ def calculate_qualitative_score(
     return final_score, details
 
 
+def calculate_qualitative_scores(
+    sector_name,
+    per_val,
+    roe_val,
+    foreign_streak,
+    pension_streak,
+    macro_news_text,
+    macro_recency_score=50.0,
+    repeated_topics_text="",
+    return_details=False,
+):
+    """
+    calculate_qualitative_score의 열 단위 버전. 섹터/PER/ROE/연속매수는 종목별 배열, 뉴스·토픽·최신성은 전 종목 공통 스칼라입니다.
+    점수 배열을, return_details=True면 score + scalar 상세 dict 키를 컬럼으로 가진 DataFrame을 돌려줍니다.
+    """
+    sectors = list(sector_name)
+    n = len(sectors)
+    per_val, roe_val, foreign_streak, pension_streak = (_as_float_array(v, n) for v in (per_val, roe_val, foreign_streak, pension_streak))
+    text = (macro_news_text or "").lower()
+    topic_text = (repeated_topics_text or "").lower()
+    decay_factor = max(0.35, min(1.0, float(macro_recency_score) / 100.0))
+    positive_hits, neutral_hits, negative_hits, theme_tone_mult = _qualitative_news_tone(text)
+
+    boost_by_sector = {}
+    theme_boost = np.empty(n, dtype=float)
+    for i, raw_sector in enumerate(sectors):
+        sector = (raw_sector or "분류안됨").lower()
+        if sector not in boost_by_sector:
+            boost_by_sector[sector] = _qualitative_theme_boost(sector, text, decay_factor, theme_tone_mult)
+        theme_boost[i] = boost_by_sector[sector]
+    theme_applied = _builtin_min(4.5, theme_boost)
+
+    score = np.full(n, 50.0) + theme_applied
+    if negative_hits > 0:
+        score = score - 4 * decay_factor
+    if any(k in topic_text for k in QUAL_TOPIC_POSITIVE_KEYS):
+        score = score + 3 * decay_factor
+    if any(k in topic_text for k in QUAL_TOPIC_NEGATIVE_KEYS):
+        score = score - 3 * decay_factor
+    score = np.where(roe_val >= 15, score + 5, np.where(roe_val >= 8, score + 2, score - 2))
+    score = np.where((0 < per_val) & (per_val <= 15), score + 3, np.where(per_val <= 0, score - 5, score))
+    score = score + _builtin_min(5, pension_streak * 0.8)
+    score = score + _builtin_min(2, foreign_streak * 0.2)
+    final_score = _builtin_max(0, _builtin_min(100, score)).astype(float)
+    if not return_details:
+        return final_score
+    return pd.DataFrame({
+        "score": final_score,
+        "theme_boost_raw": [round(float(v), 3) for v in theme_boost],
+        "theme_boost_applied": [round(float(v), 3) for v in theme_applied],
+        "theme_tone_mult": round(float(theme_tone_mult), 3),
+        "positive_hits": int(positive_hits),
+        "neutral_hits": int(neutral_hits),
+        "negative_hits": int(negative_hits),
+        "decay_factor": round(float(decay_factor), 3),
+        "reason": [
+            f"뉴스톤 +{positive_hits}/중립 {neutral_hits}/부정 {negative_hits}, 섹터가점 {v:.1f}"
+            for v in theme_applied.tolist()
+        ],
+    })
+
+
 def blend_quant_qual_score(quant_score, qual_score, current_vix, return_details=False):
     if current_vix < 25:
         sensitivity = 0.4
@@ -300,6 +449,18 @@ def blend_quant_qual_score(quant_score, qual_score, current_vix, return_details=
     }
 
 
+def blend_quant_qual_scores(quant_scores, qual_scores, current_vix):
+    """blend_quant_qual_score의 열 단위 버전. (최종점수, 정성보정치, 모드 문자열)을 돌려줍니다."""
+    if current_vix < 25:
+        sensitivity, limit, mode = 0.4, 10, "상승장 (보수적 반영)"
+    else:
+        sensitivity, limit, mode = 0.6, 20, "하락장 (민감 반영)"
+    qual_adj = ((qual_scores - 50) * sensitivity).clip(lower=-limit, upper=limit)
+    final_score = (quant_scores + qual_adj).clip(lower=0, upper=100)
+    # numpy round(half-even, x*100 기준)와 내장 round 결과가 .xx5 경계에서 달라 scalar 버전과 맞추기 위해 내장 round 사용
+    return final_score.map(lambda v: round(v, 2)), qual_adj.map(lambda v: round(v, 2)), mode
+
+
 def score_disclosures_and_reports(disclosures, reports, return_details=False):
     score = 50.0
     positive_keys = ["실적", "수주", "계약", "자기주식", "소각", "기업설명회", "가이던스", "상향", "증가"]
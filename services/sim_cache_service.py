@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import db_utils
+from services import indicator_service, portfolio_simulator_service, price_matrix_service, scoring_service
+from services.portfolio_simulator_service import build_capital_limited_swing_sim, build_portfolio_result
+
+
+SIM_CACHE_MAX_ENTRIES = 32
+SIM_CACHE_DIR = Path(os.environ.get("QUANTBOT_SIM_CACHE_DIR", ".cache/sim_results"))
+SIM_DISK_CACHE_MAX_FILES = 256
+# 아래 모듈 밖의 변경(의존 모듈 추가, 입력 전처리 규칙 변경 등)이 시뮬 결과를 바꾸면 올려 디스크 캐시를 무효화합니다.
+SIM_RESULT_VERSION = 2
+# 시뮬 결과에 영향을 주는 모듈: 시뮬레이터 본체, 점수/지표, 가격 매트릭스(행렬 구성·전진 채움), as_numeric(db_utils)
+SIM_CODE_MODULES = (portfolio_simulator_service, scoring_service, indicator_service, price_matrix_service, db_utils)
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+_code_fingerprint = None
+
+
+def sim_cache_enabled():
+    return os.environ.get("QUANTBOT_SIM_CACHE", "1").strip() != "0"
+
+
+def sim_disk_cache_enabled():
+    return sim_cache_enabled() and os.environ.get("QUANTBOT_SIM_CACHE_DISK", "1").strip() != "0"
+
+
+def frame_fingerprint(df):
+    """컬럼/dtype/값 기준 DataFrame 내용 해시. 같은 파일을 다시 읽어도 같은 값이 나옵니다."""
+    if df is None:
+        return "none"
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()], ensure_ascii=False).encode("utf-8"))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    except Exception:
+        digest.update(df.to_csv(index=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _simulator_code_fingerprint():
+    """시뮬레이터/의존 모듈 코드나 pandas·numpy 버전이 바뀌면 디스크 캐시가 자연히 무효화되도록 키에 섞습니다."""
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        digest = hashlib.sha256()
+        digest.update(f"v{SIM_RESULT_VERSION}|pandas {pd.__version__}|numpy {np.__version__}".encode("utf-8"))
+        for module in SIM_CODE_MODULES:
+            try:
+                digest.update(Path(module.__file__).read_bytes())
+            except OSError:
+                digest.update(module.__name__.encode("utf-8"))
+        _code_fingerprint = digest.hexdigest()
+    return _code_fingerprint
+
+
+def sim_cache_key(df_trades, df_history, **params):
+    start_date = params.get("start_date")
+    if start_date is not None:
+        params["start_date"] = str(pd.to_datetime(start_date).normalize().date())
+    payload = [_simulator_code_fingerprint(), frame_fingerprint(df_trades), frame_fingerprint(df_history), sorted((k, str(v)) for k, v in params.items())]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _bump(name):
+    with _lock:
+        _metrics[name] += 1
+
+
+def _copy_frames(frames):
+    return tuple(frame.copy() for frame in frames)
+
+
+def _disk_path(key):
+    return SIM_CACHE_DIR / f"{key}.pkl"
+
+
+def _load_disk(key):
+    path = _disk_path(key)
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"[WARN] 시뮬레이션 캐시 파일 손상, 삭제: {path.name} ({e})")
+        path.unlink(missing_ok=True)
+        return None
+
+
+def _store_disk(key, frames):
+    try:
+        SIM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _disk_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(frames, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        files = sorted(SIM_CACHE_DIR.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        for stale in files[: max(0, len(files) - SIM_DISK_CACHE_MAX_FILES)]:
+            stale.unlink(missing_ok=True)
+    except Exception as e:
+        print(f"[WARN] 시뮬레이션 캐시 저장 실패: {e}")
+
+
+def _remember(key, frames):
+    with _lock:
+        _memory[key] = frames
+        _memory.move_to_end(key)
+        while len(_memory) > SIM_CACHE_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def cached_capital_limited_swing_sim(df_trades, df_history, initial_cash=5_000_000, max_positions=3, start_date=None, score_mode="swing", adaptive_profile="현재값"):
+    """
+    build_capital_limited_swing_sim 결과를 입력 내용 해시 + 파라미터로 캐시합니다(메모리 LRU, 선택적 디스크).
+    입력 파일이 다시 쓰이면 해시가 바뀌므로 별도 무효화가 필요 없습니다. 반환 프레임은 호출마다 새 복사본입니다.
+    """
+    params = {
+        "initial_cash": initial_cash,
+        "max_positions": max_positions,
+        "start_date": start_date,
+        "score_mode": score_mode,
+        "adaptive_profile": adaptive_profile,
+    }
+    if not sim_cache_enabled():
+        return build_capital_limited_swing_sim(df_trades, df_history, **params)
+
+    key = sim_cache_key(df_trades, df_history, **params)
+    with _lock:
+        frames = _memory.get(key)
+        if frames is not None:
+            _memory.move_to_end(key)
+    if frames is not None:
+        _bump("memory_hits")
+        return _copy_frames(frames)
+    frames = _load_disk(key) if sim_disk_cache_enabled() else None
+    if frames is not None:
+        _bump("disk_hits")
+        _remember(key, frames)
+        return _copy_frames(frames)
+
+    _bump("misses")
+    frames = build_capital_limited_swing_sim(df_trades, df_history, **params)
+    _remember(key, frames)
+    if sim_disk_cache_enabled():
+        _store_disk(key, frames)
+    return _copy_frames(frames)
+
+
+def cached_simulate_portfolio(candidate_trades, price_history, initial_cash=5_000_000, max_positions=3, start_date=None, score_mode="swing", adaptive_profile="현재값"):
+    """simulate_portfolio와 같은 결과 dict를 캐시된 시뮬레이션으로 만듭니다."""
+    daily, open_positions, closed_trades = cached_capital_limited_swing_sim(
+        candidate_trades,
+        price_history,
+        initial_cash=initial_cash,
+        max_positions=max_positions,
+        start_date=start_date,
+        score_mode=score_mode,
+        adaptive_profile=adaptive_profile,
+    )
+    return build_portfolio_result(daily, open_positions, closed_trades, initial_cash)
+
+
+def clear_sim_cache(disk=False):
+    with _lock:
+        _memory.clear()
+    if disk and SIM_CACHE_DIR.exists():
+        for path in SIM_CACHE_DIR.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+
+def get_sim_cache_metrics():
+    with _lock:
+        out = dict(_metrics)
+        out["entries"] = len(_memory)
+    return out
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+def _normalize_names(names):
+    """종목명 비교 규칙(str 변환 + 앞뒤 공백 제거)을 배열 단위로 적용합니다."""
+    return pd.Series(names, dtype=object).astype(str).str.strip().to_numpy(dtype=object)
+
+
+def _normalize_codes(codes):
+    codes = pd.Series(codes, dtype=object)
+    valid = codes.notna() & codes.astype(str).str.strip().ne("")
+    out = codes.astype(str).str.strip().str.replace(r"\.0$", "", regex=True).str.zfill(6)
+    return out.where(valid, None).to_numpy(dtype=object)
+
+
+class StockUniverse:
+    """
+    종목명 ↔ 조밀 정수 ID(0..n-1) 레지스트리. 종목코드(6자리)도 같은 ID로 연결합니다.
+    프로세스 안에서 한 번 부여된 ID는 바뀌지 않으므로, 프레임끼리의 조인/필터를 문자열 대신 정수 키로 할 수 있습니다.
+    ID는 실행마다 달라질 수 있으니 파일/상태(지문 등)에는 저장하지 마세요.
+    """
+
+    def __init__(self):
+        self._names = []
+        self._index = pd.Index([], dtype=object)
+        self._code_ids = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def register(self, names, codes=None):
+        """종목명(및 같은 길이의 종목코드)을 등록하고 행별 ID 배열(int64)을 돌려줍니다."""
+        names = _normalize_names(names)
+        ids = self._index.get_indexer(names)
+        if (ids < 0).any():
+            # 새 종목은 처음 등장한 순서대로 뒤에 붙여 기존 ID를 유지합니다.
+            self._names.extend(pd.unique(names[ids < 0]).tolist())
+            self._index = pd.Index(self._names, dtype=object)
+            ids = self._index.get_indexer(names)
+        if codes is not None:
+            for code, stock_id in zip(_normalize_codes(codes), ids):
+                if code is not None:
+                    self._code_ids.setdefault(code, int(stock_id))
+        return ids.astype(np.int64)
+
+    def ids(self, names):
+        """등록된 종목명의 ID 배열. 모르는 종목은 -1."""
+        return self._index.get_indexer(_normalize_names(names)).astype(np.int64)
+
+    def ids_of_codes(self, codes):
+        """종목코드별 ID 배열. 모르는 코드는 -1."""
+        return np.array([self._code_ids.get(code, -1) if code is not None else -1 for code in _normalize_codes(codes)], dtype=np.int64)
+
+    def names(self, ids):
+        """ID 배열 → 종목명 배열(-1은 None)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        table = np.array(self._names + [None], dtype=object)
+        return table[np.where(ids < 0, len(self._names), ids)]
+
+    def categorical(self, names):
+        """전체 유니버스를 범주로 하는 Categorical(코드 = 종목 ID). 프레임 사이 범주가 같아 정수 코드로 바로 비교할 수 있습니다."""
+        ids = self.register(names)
+        return pd.Categorical.from_codes(ids, categories=pd.Index(self._names, dtype=object))
+
+
+_STOCK_UNIVERSE = StockUniverse()
+
+
+def get_stock_universe():
+    return _STOCK_UNIVERSE
@@ -5,7 +5,7 @@ from typing import Any
 
 import pandas as pd
 
-from services.portfolio_simulator_service import simulate_portfolio
+from services.portfolio_simulator_service import SwingSimConfig, simulate_portfolio_sweep
 
 
 @dataclass(frozen=True)
@@ -132,10 +132,11 @@ def evaluate_strategy_modes(
     initial_cash=5_000_000,
     max_positions=3,
     modes=None,
+    max_workers=1,
+    progress=None,
 ):
     modes = modes or DEFAULT_STRATEGY_MODES
-    rows = []
-    runs = {}
+    strategies = []
     for mode in modes:
         if isinstance(mode, dict):
             strategy = StrategyMode(
@@ -145,15 +146,26 @@ def evaluate_strategy_modes(
             )
         else:
             strategy = mode
-        result = simulate_portfolio(
-            df_trades,
-            df_history,
-            initial_cash=initial_cash,
-            max_positions=max_positions,
-            start_date=selected_start_date,
-            score_mode=strategy.score_mode,
-            adaptive_profile=strategy.adaptive_profile,
-        )
+        strategies.append(strategy)
+    results = simulate_portfolio_sweep(
+        df_trades,
+        df_history,
+        [
+            SwingSimConfig(
+                start_date=selected_start_date,
+                adaptive_profile=strategy.adaptive_profile,
+                max_positions=max_positions,
+                score_mode=strategy.score_mode,
+            )
+            for strategy in strategies
+        ],
+        initial_cash=initial_cash,
+        max_workers=max_workers,
+        progress=progress,
+    )
+    rows = []
+    runs = {}
+    for strategy, result in zip(strategies, results):
         rows.append(summarize_simulation_result(
             result,
             label=strategy.label,
@@ -180,18 +192,23 @@ def build_start_date_stability(
     limit=10,
     score_mode="swing",
     adaptive_profile="현재값",
+    max_workers=1,
+    progress=None,
 ):
+    start_candidates = _date_candidates(available_dates, selected_start_date, limit=limit, sample_evenly=False)
+    results = simulate_portfolio_sweep(
+        df_trades,
+        df_history,
+        [
+            SwingSimConfig(start_date=start_d, adaptive_profile=adaptive_profile, max_positions=max_positions, score_mode=score_mode)
+            for start_d in start_candidates
+        ],
+        initial_cash=initial_cash,
+        max_workers=max_workers,
+        progress=progress,
+    )
     rows = []
-    for start_d in _date_candidates(available_dates, selected_start_date, limit=limit, sample_evenly=False):
-        result = simulate_portfolio(
-            df_trades,
-            df_history,
-            initial_cash=initial_cash,
-            max_positions=max_positions,
-            start_date=start_d,
-            score_mode=score_mode,
-            adaptive_profile=adaptive_profile,
-        )
+    for start_d, result in zip(start_candidates, results):
         daily = result.get("daily_performance", pd.DataFrame())
         if daily.empty:
             continue
@@ -227,6 +244,8 @@ def build_adaptive_threshold_sensitivity(
     max_positions,
     limit=5,
     profiles=None,
+    max_workers=1,
+    progress=None,
 ):
     start_candidates = _date_candidates(
         available_dates,
@@ -234,42 +253,44 @@ def build_adaptive_threshold_sensitivity(
         limit=limit,
         sample_evenly=True,
     )
+    grid = [(profile_name, start_d) for profile_name in profiles or DEFAULT_ADAPTIVE_PROFILES for start_d in start_candidates]
+    results = simulate_portfolio_sweep(
+        df_trades,
+        df_history,
+        [
+            SwingSimConfig(start_date=start_d, adaptive_profile=profile_name, max_positions=max_positions, score_mode="adaptive")
+            for profile_name, start_d in grid
+        ],
+        initial_cash=initial_cash,
+        max_workers=max_workers,
+        progress=progress,
+    )
     detail_rows = []
-    for profile_name in profiles or DEFAULT_ADAPTIVE_PROFILES:
-        for start_d in start_candidates:
-            result = simulate_portfolio(
-                df_trades,
-                df_history,
-                initial_cash=initial_cash,
-                max_positions=max_positions,
-                start_date=start_d,
-                score_mode="adaptive",
-                adaptive_profile=profile_name,
-            )
-            daily = result.get("daily_performance", pd.DataFrame())
-            if daily.empty:
-                continue
-            row = summarize_simulation_result(
-                result,
-                label=profile_name,
-                score_mode="adaptive",
-                adaptive_profile=profile_name,
-                start_date=start_d,
-            )
-            row["MDD(%)"] = _legacy_mdd_from_return_column(daily)
-            detail_rows.append({
-                "프로필": profile_name,
-                "시작일": row["시작일"],
-                "전략수익률(%)": row["전략수익률(%)"],
-                "MDD(%)": row["MDD(%)"],
-                "승률(%)": row["승률(%)"],
-                "거래당기대값(%)": row["거래당기대값(%)"],
-                "손익비": row["손익비"],
-                "평균보유종목수": row["평균보유종목수"],
-                "평균현금비중(%)": row["평균현금비중(%)"],
-                "평균보유일": row["평균보유일"],
-                "종료거래": row["종료거래"],
-            })
+    for (profile_name, start_d), result in zip(grid, results):
+        daily = result.get("daily_performance", pd.DataFrame())
+        if daily.empty:
+            continue
+        row = summarize_simulation_result(
+            result,
+            label=profile_name,
+            score_mode="adaptive",
+            adaptive_profile=profile_name,
+            start_date=start_d,
+        )
+        row["MDD(%)"] = _legacy_mdd_from_return_column(daily)
+        detail_rows.append({
+            "프로필": profile_name,
+            "시작일": row["시작일"],
+            "전략수익률(%)": row["전략수익률(%)"],
+            "MDD(%)": row["MDD(%)"],
+            "승률(%)": row["승률(%)"],
+            "거래당기대값(%)": row["거래당기대값(%)"],
+            "손익비": row["손익비"],
+            "평균보유종목수": row["평균보유종목수"],
+            "평균현금비중(%)": row["평균현금비중(%)"],
+            "평균보유일": row["평균보유일"],
+            "종료거래": row["종료거래"],
+        })
 
     detail = pd.DataFrame(detail_rows)
     if detail.empty:
@@ -0,0 +1,116 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+SWING_STATE_PATH = Path("data") / "swing_backtest_state.json"
+SWING_STATE_VERSION = 1
+# 청산/보유연장 판단과 진입 행 생성에 쓰이는 후보 스냅샷 컬럼. 이 값이 바뀌면 해당 종목 거래를 다시 계산합니다.
+SIGNAL_FINGERPRINT_COLS = [
+    "날짜", "종목명", "종목코드", "순위", "AI수급점수", "스윙우선순위", "진입유형", "진입코멘트",
+    "추천소스", "매도점검", "매수후보",
+]
+
+
+def incremental_backtest_enabled():
+    """QUANTBOT_INCREMENTAL_BACKTEST=0 이면 일일 실행에서도 매번 전체 재계산합니다."""
+    return os.environ.get("QUANTBOT_INCREMENTAL_BACKTEST", "1").strip() != "0"
+
+
+def settled_date(dates):
+    """
+    증분 기준일: 가장 최근 거래일 바로 전 거래일. 최신일 종가는 장중 재수집으로 바뀔 수 있어
+    상태 저장/재사용 대상에서 제외하고 매 실행 다시 계산합니다. 거래일이 2일 미만이면 None.
+    """
+    days = sorted(pd.to_datetime(pd.Index(dates)).normalize().unique())
+    return pd.Timestamp(days[-2]) if len(days) >= 2 else None
+
+
+def stock_fingerprints(df, until, cols, name_col="종목명", date_col="일자_dt"):
+    """
+    until 이하 날짜 행만으로 종목별 내용 해시를 만듭니다(행 해시의 uint64 합 + 행 수).
+    과거 행이 수정/추가/삭제된 종목만 골라 다시 계산하기 위한 값입니다.
+    """
+    if df is None or df.empty or until is None or date_col not in df.columns:
+        return {}
+    days = pd.to_datetime(df[date_col], errors="coerce").dt.normalize()
+    part = df[days <= pd.Timestamp(until)]
+    if part.empty:
+        return {}
+    use_cols = [c for c in cols if c in part.columns]
+    row_hash = pd.util.hash_pandas_object(part[use_cols].astype(str), index=False).to_numpy(dtype=np.uint64)
+    names = part[name_col].astype(str).str.strip().to_numpy()
+    out = {}
+    for name, idx in pd.Series(np.arange(len(part))).groupby(names, sort=True).indices.items():
+        total = int(row_hash[idx].sum(dtype=np.uint64))
+        out[str(name)] = f"{total:016x}:{len(idx)}"
+    return out
+
+
+def dirty_stocks(old_fingerprints, new_fingerprints):
+    """두 지문 중 한쪽에만 있거나 값이 다른 종목 집합."""
+    old_fingerprints = old_fingerprints or {}
+    new_fingerprints = new_fingerprints or {}
+    return {
+        name for name in set(old_fingerprints) | set(new_fingerprints)
+        if old_fingerprints.get(name) != new_fingerprints.get(name)
+    }
+
+
+def merge_fingerprints(*parts):
+    """가격/수급/후보 지문을 종목별 한 문자열로 합칩니다."""
+    names = set().union(*(set(part) for part in parts))
+    return {name: "|".join(part.get(name, "-") for part in parts) for name in sorted(names)}
+
+
+def load_swing_state(params, path=SWING_STATE_PATH):
+    """저장된 증분 상태. 파일이 없거나 손상됐거나 백테스트 파라미터가 다르면 None."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+    except Exception as e:
+        print(f"[WARN] 스윙 백테스트 증분 상태 로드 실패, 전체 재계산합니다: {e}")
+        return None
+    if state.get("version") != SWING_STATE_VERSION or state.get("params") != params:
+        return None
+    return state
+
+
+def save_swing_state(state, path=SWING_STATE_PATH):
+    path = Path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": SWING_STATE_VERSION, **state}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[WARN] 스윙 백테스트 증분 상태 저장 실패: {e}")
+
+
+def clear_swing_state(path=SWING_STATE_PATH):
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+
+
+def encode_positions(positions):
+    """시뮬레이션 보유 포지션을 JSON으로 저장 가능한 형태로 바꿉니다. 청산일/상태는 재개 시 최신 거래 파일에서 다시 채웁니다."""
+    return [
+        {
+            "거래ID": pos["거래ID"],
+            "종목명": pos["종목명"],
+            "진입가": float(pos["진입가"]),
+            "수량": int(pos["수량"]),
+            "매수금액": float(pos["매수금액"]),
+            "스윙우선순위": float(pos["스윙우선순위"]),
+            "진입유형": str(pos["진입유형"]),
+        }
+        for pos in positions
+    ]
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from services.indicator_service import window_sums
+
+
+HOLD_STATE_WINDOW = 20
+SIGNAL_LOOKAHEAD_DAYS = 25
+SELL_CHECK_KEYWORDS = ("축소", "주의", "청산", "이탈")
+# 같은 날 여러 규칙이 동시에 맞으면 앞선 규칙의 사유를 씁니다.
+SIGNAL_EXIT_REASONS = ["손절", "목표수익+", "목표수익", "지지이탈", "수급훼손", "매도점검", "후보제외", "스윙약화"]
+
+
+def _oldest_first_sum(values, end_idx, counts):
+    """values[end - count + 1] ... values[end] 순서로 누적합니다. 파이썬 sum(closes[-n:])과 같은 부동소수 결과입니다."""
+    acc = np.zeros(len(end_idx), dtype=float)
+    max_count = int(counts.max()) if len(counts) else 0
+    for j in range(max_count):
+        take = counts > j
+        idx = np.maximum(end_idx - counts + 1 + j, 0)
+        acc = np.where(take, acc + values[idx], acc)
+    return acc
+
+
+def build_hold_state_arrays(price_df, hist_grp=None, window=HOLD_STATE_WINDOW):
+    """
+    price_df 각 행 날짜 시점의 보유연장 판단(추세/지지/수급 유지)을 행 순서 배열로 계산합니다.
+    hist_grp(replay 이력)가 있으면 그 이력의 최근 window일로, 없으면 price_df 종가로만 판단합니다(수급은 유지로 간주).
+    두 이력 모두 종가 결측이 없는 _load_history_* 결과를 전제로 합니다.
+    """
+    days = price_df["일자_dt"].dt.normalize().to_numpy()
+    if hist_grp is not None and not hist_grp.empty:
+        src_days = hist_grp["일자_dt"].dt.normalize().to_numpy()
+        closes = pd.to_numeric(hist_grp["종가"], errors="coerce").to_numpy(dtype=float)
+        end_idx = np.searchsorted(src_days, days, side="right") - 1
+        # 기준일 이전 이력이 없으면 가장 최근 window일을 씁니다.
+        end_idx = np.where(end_idx < 0, len(hist_grp) - 1, end_idx)
+        smart = (
+            pd.to_numeric(hist_grp["연기금"], errors="coerce").fillna(0.0)
+            + pd.to_numeric(hist_grp["투신"], errors="coerce").fillna(0.0)
+            + pd.to_numeric(hist_grp["사모"], errors="coerce").fillna(0.0)
+            + pd.to_numeric(hist_grp["외인"], errors="coerce").fillna(0.0) * 0.5
+        ).to_numpy(dtype=float)
+    else:
+        closes = pd.to_numeric(price_df["종가"], errors="coerce").to_numpy(dtype=float)
+        end_idx = np.searchsorted(days, days, side="right") - 1
+        smart = None
+
+    lengths = np.minimum(int(window), end_idx + 1)
+    current = closes[end_idx]
+    n5 = np.minimum(5, lengths)
+    n10 = np.minimum(10, lengths)
+    ma5 = _oldest_first_sum(closes, end_idx, n5) / n5
+    ma10 = _oldest_first_sum(closes, end_idx, n10) / n10
+    ma20 = _oldest_first_sum(closes, end_idx, lengths) / lengths
+    supply = window_sums(smart, end_idx, n5) >= 0 if smart is not None else np.ones(len(days), dtype=bool)
+    return {
+        "trend_intact": (current >= ma10) & (ma5 >= ma10) & (ma10 >= ma20),
+        "support_intact": current >= ma20 * 0.985,
+        "supply_intact": supply,
+    }
+
+
+def build_signal_state_arrays(score_grp):
+    """
+    한 종목의 후보 스냅샷을 날짜순 배열(날짜, 정규화 날짜, 스윙우선순위, 매도점검 경고, 후보제외)로 정리합니다.
+    스윙우선순위 결측/미존재는 NaN이며 호출부에서 진입 시점 값으로 대체합니다.
+    """
+    grp = score_grp.sort_values("날짜_dt", kind="mergesort")
+    dates = pd.to_datetime(grp["날짜_dt"])
+    n = len(grp)
+    sell_text = grp["매도점검"].astype(str) if "매도점검" in grp.columns else pd.Series([""] * n, index=grp.index)
+    return {
+        "dates": dates.to_numpy(),
+        "days": dates.dt.normalize().to_numpy(),
+        "swing": pd.to_numeric(grp["스윙우선순위"], errors="coerce").to_numpy(dtype=float) if "스윙우선순위" in grp.columns else np.full(n, np.nan),
+        "sell_check": np.array([any(word in text for word in SELL_CHECK_KEYWORDS) for text in sell_text], dtype=bool),
+        "excluded": (grp["매수후보"].astype(str) == "제외").to_numpy() if "매수후보" in grp.columns else np.zeros(n, dtype=bool),
+    }
+
+
+def resolve_signal_exits(
+    price_df,
+    hold_state,
+    signal_state,
+    entry_idx,
+    entry_dates,
+    entry_swing,
+    max_horizon,
+    stop_loss,
+    soft_target,
+    hard_target,
+    lookahead_days=SIGNAL_LOOKAHEAD_DAYS,
+):
+    """
+    한 종목의 시그널 진입들을 (진입 × 보유일) 행렬로 펼쳐 청산 규칙별 첫 충족일을 한 번에 찾습니다.
+    보유일 d에서는 진입 후 lookahead_days 이내, d일 이하의 가장 최근 후보 스냅샷 상태를 씁니다.
+    반환: (청산 행 위치 배열, 상태 리스트, 청산사유 리스트). 규칙을 못 만나면 D+max_horizon 기준으로 닫거나 open 처리합니다.
+    """
+    entry_idx = np.asarray(entry_idx, dtype=int)
+    entry_swing = np.asarray(entry_swing, dtype=float)
+    n_rows = len(price_df)
+    max_horizon = int(max_horizon)
+    if not len(entry_idx):
+        return entry_idx, [], []
+
+    closes = pd.to_numeric(price_df["종가"], errors="coerce").to_numpy(dtype=float)
+    days = price_df["일자_dt"].dt.normalize().to_numpy()
+    entry_price = closes[entry_idx]
+
+    steps = np.arange(1, max_horizon + 1)
+    cur_idx = entry_idx[:, None] + steps[None, :]
+    valid = cur_idx < n_rows
+    cur_idx = np.minimum(cur_idx, n_rows - 1)
+    cur_ret = ((closes[cur_idx] - entry_price[:, None]) / entry_price[:, None]) * 100.0
+    trend = hold_state["trend_intact"][cur_idx]
+    support = hold_state["support_intact"][cur_idx]
+    supply = hold_state["supply_intact"][cur_idx]
+
+    entry_days = pd.to_datetime(pd.Index(entry_dates)).normalize()
+    first_sig = np.searchsorted(signal_state["dates"], entry_days.to_numpy(), side="right")
+    last_sig = np.searchsorted(signal_state["dates"], (entry_days + pd.Timedelta(days=int(lookahead_days))).to_numpy(), side="right") - 1
+    latest = np.minimum(last_sig[:, None], np.searchsorted(signal_state["days"], days[cur_idx], side="right") - 1)
+    has_sig = latest >= first_sig[:, None]
+    latest = np.maximum(latest, 0)
+    if len(signal_state["dates"]):
+        latest_swing = np.where(has_sig, signal_state["swing"][latest], np.nan)
+        sell_check = has_sig & signal_state["sell_check"][latest]
+        excluded = has_sig & signal_state["excluded"][latest]
+    else:
+        latest_swing = np.full(cur_idx.shape, np.nan)
+        sell_check = excluded = np.zeros(cur_idx.shape, dtype=bool)
+    base_swing = np.broadcast_to(entry_swing[:, None], cur_idx.shape)
+    latest_swing = np.where(np.isnan(latest_swing), base_swing, latest_swing)
+
+    late = steps[None, :] >= 5
+    rules = np.stack([
+        (steps[None, :] >= 3) & (cur_ret <= stop_loss),
+        late & (cur_ret >= hard_target),
+        late & (cur_ret >= soft_target) & ~(trend & support & supply),
+        late & ~support,
+        late & ~supply & (latest_swing <= base_swing),
+        late & sell_check,
+        late & excluded,
+        late & (latest_swing <= np.maximum(35.0, base_swing - 10.0)),
+    ], axis=-1) & valid[:, :, None]
+
+    hit_step = rules.any(axis=-1)
+    found = hit_step.any(axis=1)
+    first_step = hit_step.argmax(axis=1)
+    rows = np.arange(len(entry_idx))
+    first_rule = rules[rows, first_step].argmax(axis=1)
+
+    fallback_hit = entry_idx + max_horizon < n_rows
+    exit_idx = np.where(found, entry_idx + first_step + 1, np.minimum(entry_idx + max_horizon, n_rows - 1))
+    statuses = ["closed" if hit or fb else "open" for hit, fb in zip(found, fallback_hit)]
+    reasons = [SIGNAL_EXIT_REASONS[rule] if hit else f"D+{max_horizon}" for hit, rule in zip(found, first_rule)]
+    return exit_idx, statuses, reasons
@@ -9,8 +9,8 @@ except Exception:
     requests = None
 
 from db_utils import csv_exists
-from repositories.data_repository import read_table_prefer_db
-from services.portfolio_simulator_service import build_capital_limited_swing_sim
+from repositories.data_repository import load_history_table, load_swing_trades_safe, read_table_prefer_db
+from services.sim_cache_service import cached_capital_limited_swing_sim
 
 
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
@@ -86,11 +86,10 @@ def build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod
                 return
             settings = _load_strategy_settings()
             initial_cash = int(str(settings.get("initial_cash", 5_000_000)).replace(",", ""))
-            trades = read_table_prefer_db("swing_trades.csv", on_bad_lines="skip")
-            history = read_table_prefer_db("history.csv", on_bad_lines="skip")
-            perf, positions, closed = build_capital_limited_swing_sim(
-                trades,
-                history,
+            # 대시보드/에이전트 도구와 같은 로더로 읽어야 시뮬레이션 캐시를 함께 씁니다.
+            perf, positions, closed = cached_capital_limited_swing_sim(
+                load_swing_trades_safe(),
+                load_history_table(),
                 initial_cash=initial_cash,
                 max_positions=3,
                 start_date=CORE_BOOK_START_DATE,
@@ -278,3 +277,49 @@ def build_telegram_action_message(df_final, now_kst, current_vix, regime, is_eod
 
     lines.extend(["", f"📊 대시보드: {dashboard_url}"])
     return "\n".join(lines)
+
+
+def build_intraday_delta_message(df_final, marks, delta, now_kst, current_vix, top_n=3):
+    """장중 갱신(--intraday) 변화 알림. 직전 알림 대비 Top N 변동과 보유 포지션 평가수익률만 담습니다."""
+    lines = [
+        "⚡ AlphaPulse 장중 변화",
+        f"🗓 {now_kst.strftime('%Y-%m-%d %H:%M')} KST · VIX {current_vix:.2f} (정규 수집 기준)",
+        "",
+    ]
+
+    def _fmt_pct(v):
+        try:
+            return f"{float(v):+.2f}%"
+        except Exception:
+            return "-"
+
+    def _fmt_money(v):
+        try:
+            return f"{float(v):,.0f}원"
+        except Exception:
+            return "-"
+
+    lines.append(f"🏁 AI수급점수 Top {top_n}")
+    top = df_final.head(top_n) if df_final is not None else pd.DataFrame()
+    if top.empty:
+        lines.append("- 없음")
+    for i, (_, row) in enumerate(top.iterrows(), start=1):
+        tag = " 🆕" if row.get("종목명") in delta["entered"] else ""
+        lines.append(
+            f"{i}. {row.get('종목명', '-')}{tag} · {_fmt_money(row.get('현재가'))} ({_fmt_pct(row.get('등락률'))}) · 점수 {float(row.get('AI수급점수', 0) or 0):.1f}"
+        )
+    if delta["exited"]:
+        lines.append(f"- 이탈: {', '.join(delta['exited'])}")
+    lines.append("")
+
+    lines.append("💼 보유 포지션 평가")
+    if marks.empty:
+        lines.append("- 진행 중인 시그널 포지션 없음")
+    for _, row in marks.iterrows():
+        tag = " ⚠️" if row["종목명"] in delta["moved"] else ""
+        lines.append(
+            f"- {row['종목명']}{tag} · 진입 {_fmt_money(row['진입가'])} → {_fmt_money(row['현재가'])} · {_fmt_pct(row['평가수익률'])}"
+        )
+    if delta["closed"]:
+        lines.append(f"- 목록에서 빠짐: {', '.join(delta['closed'])}")
+    return "\n".join(lines)
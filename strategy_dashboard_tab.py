@@ -8,10 +8,12 @@ import yfinance as yf
 
 from backtest_utils import (
     build_adaptive_threshold_sensitivity,
-    build_capital_limited_swing_sim,
     build_start_date_stability,
     compute_trade_quality_metrics,
 )
+from services.portfolio_simulator_service import SWEEP_MAX_WORKERS
+from services.run_metrics_service import load_run_metrics
+from services.sim_cache_service import cached_capital_limited_swing_sim
 
 
 STRATEGY_SETTINGS_PATH = Path("data") / "strategy_settings.json"
@@ -71,6 +73,39 @@ def _mark_strategy_date_manual():
     st.session_state["strategy_quick_range"] = "직접 선택"
 
 
+def _sweep_progress_callback(bar, label):
+    def _update(done, total):
+        bar.progress(done / max(1, total), text=f"{label} {done}/{total}")
+    return _update
+
+
+def _render_run_metrics_panel(apply_altair_theme, max_runs=20):
+    """data/run_metrics.csv의 최근 실행별 단계 소요 시간을 누적 막대로 보여줍니다."""
+    df_metrics = load_run_metrics()
+    if df_metrics.empty:
+        return
+    top = df_metrics[df_metrics["상위단계"].isna() | df_metrics["상위단계"].eq("")].copy()
+    if top.empty:
+        return
+    top["실행ID"] = top["실행ID"].astype(str)
+    run_ids = top.sort_values("시작시각_dt")["실행ID"].drop_duplicates().tail(max_runs).tolist()
+    top = top[top["실행ID"].isin(run_ids)]
+    with st.expander("수집기 실행 지표", expanded=False):
+        chart = alt.Chart(top).mark_bar().encode(
+            x=alt.X("실행ID:N", sort=run_ids, title="실행"),
+            y=alt.Y(field="소요(초)", aggregate="sum", type="quantitative", title="소요(초)"),
+            color=alt.Color("단계:N", title="단계"),
+            tooltip=[
+                alt.Tooltip(field=c, type="nominal" if c in ("실행ID", "모드", "단계", "상태") else "quantitative")
+                for c in ["실행ID", "모드", "단계", "소요(초)", "요청수", "요청오류", "처리행수", "최대RSS(MB)", "상태"]
+            ],
+        )
+        st.altair_chart(apply_altair_theme(chart), width="stretch")
+        latest = top[top["실행ID"] == run_ids[-1]]
+        view_cols = ["단계", "소요(초)", "요청수", "요청오류", "캐시적중", "처리행수", "최대RSS(MB)", "상태", "호스트별요청"]
+        st.dataframe(latest[view_cols], hide_index=True, width="stretch")
+
+
 def render_strategy_dashboard_tab(
     app_name,
     is_vip,
@@ -228,7 +263,7 @@ def render_strategy_dashboard_tab(
                         ,
                         unsafe_allow_html=True,
                     )
-            portfolio_perf, portfolio_positions, portfolio_closed = build_capital_limited_swing_sim(
+            portfolio_perf, portfolio_positions, portfolio_closed = cached_capital_limited_swing_sim(
                 df_swing_trades,
                 df_history,
                 initial_cash=backtest_initial_cash,
@@ -464,6 +499,7 @@ def render_strategy_dashboard_tab(
                     st.caption("선택한 시작일 이후 가능한 시작일을 최대 10개까지 다시 돌려, 시작일에 따라 전략 성과가 얼마나 흔들리는지 확인합니다. 버튼을 눌렀을 때만 계산합니다.")
                     if st.button("최근 시작일 10개 안정성 분석 실행", use_container_width=True):
                         try:
+                            stability_progress = st.progress(0.0, text="시작일별 시뮬레이션 준비 중...")
                             stability_df = build_start_date_stability(
                                 df_swing_trades,
                                 df_history,
@@ -474,7 +510,10 @@ def render_strategy_dashboard_tab(
                                 limit=10,
                                 score_mode=score_mode,
                                 adaptive_profile=adaptive_profile,
+                                max_workers=SWEEP_MAX_WORKERS,
+                                progress=_sweep_progress_callback(stability_progress, "시작일별 시뮬레이션"),
                             )
+                            stability_progress.empty()
                             if stability_df.empty:
                                 st.info("분석 가능한 시작일 데이터가 부족합니다.")
                             else:
@@ -542,6 +581,7 @@ def render_strategy_dashboard_tab(
                     st.caption("v1, v2, v3를 같은 시작일 묶음으로 비교해 성과 편차와 과최적화 가능성을 확인합니다. 버튼을 눌렀을 때만 계산합니다.")
                     if st.button("공격/방어 임계값 민감도 분석 실행", use_container_width=True):
                         try:
+                            sensitivity_progress = st.progress(0.0, text="프로필별 시뮬레이션 준비 중...")
                             sensitivity_summary, sensitivity_detail = build_adaptive_threshold_sensitivity(
                                 df_swing_trades,
                                 df_history,
@@ -550,7 +590,10 @@ def render_strategy_dashboard_tab(
                                 backtest_initial_cash,
                                 backtest_max_positions,
                                 limit=5,
+                                max_workers=SWEEP_MAX_WORKERS,
+                                progress=_sweep_progress_callback(sensitivity_progress, "프로필별 시뮬레이션"),
                             )
+                            sensitivity_progress.empty()
                             if sensitivity_summary.empty:
                                 st.info("민감도 분석 가능한 데이터가 부족합니다.")
                             else:
@@ -790,4 +833,4 @@ def render_strategy_dashboard_tab(
                 render_empty_state("백테스트 데이터 없음", "선택하신 기간에 해당하는 스윙 성과 데이터가 없습니다.")
         else:
             render_empty_state("데이터 대기", "swing_performance.csv가 아직 생성되지 않았습니다. 다음 스크래퍼 실행 후 표시됩니다.")
-
+        _render_run_metrics_panel(apply_altair_theme)
@@ -0,0 +1,152 @@
+"""
+KIS 수급 수집기(kis_get / fetch_kis_investor_daily / collect_kis_history_backfill_many)를
+http.server 스텁과 KIS_URL_BASE로 확인합니다. 429와 초당 한도 초과(EGW00201) 응답은 재시도되고,
+응답이 늦게 오는 순서와 무관하게 결과는 입력 순서를 지켜야 합니다.
+"""
+import importlib
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from services import kis_client
+
+
+DAILY_PATH = "/uapi/domestic-stock/v1/quotations/investor-trade-by-stock-daily"
+RATE_LIMITED_CODE = "000429"
+EGW_CODE = "000201"
+
+
+class _KisStub:
+    """종목코드별 호출 수를 세고, 첫 호출만 429/EGW00201로 막는 스텁 서버 상태."""
+
+    def __init__(self):
+        self.hits = {}
+        self.lock = threading.Lock()
+
+    def respond(self, handler):
+        query = parse_qs(urlparse(handler.path).query)
+        code = query.get("FID_INPUT_ISCD", [""])[0]
+        with self.lock:
+            self.hits[code] = self.hits.get(code, 0) + 1
+            hit = self.hits[code]
+        # 종목코드가 작을수록 늦게 응답해 완료 순서를 입력 순서와 뒤집습니다.
+        time.sleep(max(0.0, 0.05 - int(code or 0) % 10 * 0.005))
+        if code == RATE_LIMITED_CODE and hit == 1:
+            return 429, {"rt_cd": "1", "msg_cd": "", "msg1": "too many requests"}
+        if code == EGW_CODE and hit == 1:
+            return 200, {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+        cursor = query.get("FID_INPUT_DATE_1", ["20250110"])[0]
+        days = [f"{cursor[:6]}{d:02d}" for d in range(int(cursor[6:]), max(int(cursor[6:]) - 3, 0), -1)]
+        return 200, {
+            "rt_cd": "0",
+            "msg_cd": "MCA00000",
+            "output2": [
+                {
+                    "stck_bsop_date": day,
+                    "stck_clpr": str(1000 + int(code or 0)),
+                    "acml_vol": "100",
+                    "frgn_ntby_qty": str(int(code or 0) % 7 - 3),
+                    "fund_ntby_qty": "2",
+                }
+                for day in days
+            ],
+        }
+
+
+@pytest.fixture
+def kis_stub(monkeypatch):
+    stub = _KisStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, payload = stub.respond(self)
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("KIS_URL_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    module = importlib.reload(kis_client)
+    try:
+        yield module, stub
+    finally:
+        server.shutdown()
+        server.server_close()
+        monkeypatch.delenv("KIS_URL_BASE")
+        importlib.reload(kis_client)
+
+
+def test_url_base_points_at_stub(kis_stub):
+    module, _ = kis_stub
+    assert module.URL_BASE.startswith("http://127.0.0.1:")
+
+
+def test_kis_get_retries_429_and_egw00201(kis_stub):
+    module, stub = kis_stub
+    url = f"{module.URL_BASE}{DAILY_PATH}"
+    for code in (RATE_LIMITED_CODE, EGW_CODE):
+        res = module.kis_get(url, {}, {"FID_INPUT_ISCD": code}, backoff=0.01)
+        assert res.status_code == 200
+        assert res.json()["rt_cd"] == "0"
+        assert stub.hits[code] == 2
+
+
+def test_kis_get_returns_last_response_when_retries_run_out(kis_stub):
+    module, stub = kis_stub
+    url = f"{module.URL_BASE}{DAILY_PATH}"
+    res = module.kis_get(url, {}, {"FID_INPUT_ISCD": RATE_LIMITED_CODE}, retries=0)
+    assert res.status_code == 429
+    assert stub.hits[RATE_LIMITED_CODE] == 1
+
+
+def test_fetch_investor_daily_keeps_input_order(kis_stub):
+    module, stub = kis_stub
+    codes = [f"{i:06d}" for i in range(1, 9)] + [RATE_LIMITED_CODE, EGW_CODE]
+    url = f"{module.URL_BASE}{DAILY_PATH}"
+    results = module.fetch_kis_investor_daily(
+        codes, url, {}, "20250110", limiter=module.TokenBucket(200), max_workers=4
+    )
+    assert all(not isinstance(res, Exception) for res in results)
+    closes = [res.json()["output2"][0]["stck_clpr"] for res in results]
+    assert closes == [str(1000 + int(code)) for code in codes]
+    assert stub.hits[RATE_LIMITED_CODE] == 2
+    assert stub.hits[EGW_CODE] == 2
+
+
+def test_backfill_many_is_deterministic(kis_stub):
+    module, _ = kis_stub
+    targets = [(f"종목{i}", f"{i:06d}") for i in range(1, 7)]
+    url = f"{module.URL_BASE}{DAILY_PATH}"
+
+    def _run(workers):
+        return module.collect_kis_history_backfill_many(
+            targets, url, {}, "20250110", date(2025, 1, 1), max_pages=3,
+            limiter=module.TokenBucket(200), max_workers=workers,
+        )
+
+    serial, parallel = _run(1), _run(4)
+    assert [res[0] for res in parallel] == [res[0] for res in serial]
+    assert [row["종목명"] for res in parallel for row in res[0][:1]] == [name for name, _ in targets]
+
+
+def test_token_bucket_does_not_burst_past_rate():
+    rate, calls = 40.0, 12
+    bucket = kis_client.TokenBucket(rate)
+    started = time.monotonic()
+    for _ in range(calls):
+        bucket.acquire()
+    # 빈 버킷에서 시작하므로 calls건에는 최소 calls/rate초가 걸립니다.
+    assert time.monotonic() - started >= 0.9 * calls / rate
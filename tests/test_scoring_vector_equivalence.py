@@ -0,0 +1,135 @@
+"""
+열 단위 점수 함수(calculate_dynamic_scores / calculate_qualitative_scores / blend_quant_qual_scores)가
+scalar 버전과 행마다 같은 점수·상세 컬럼을 내는지 시드 고정 난수 입력으로 확인합니다.
+입력은 각 분기 경계값을 섞어 뽑고, VIX 레짐과 뉴스/토픽/최신성 분기를 모두 돕니다.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.scoring_service import (
+    QUAL_SECTOR_THEME_MAP,
+    blend_quant_qual_score,
+    blend_quant_qual_scores,
+    calculate_dynamic_score,
+    calculate_dynamic_scores,
+    calculate_qualitative_score,
+    calculate_qualitative_scores,
+)
+
+
+N_ROWS = 400
+SEEDS = range(8)
+VIX_LEVELS = [9.5, 18.0, 24.99, 25.0, 31.0, 48.0]
+NEWS_TEXTS = [
+    "",
+    "반도체 HBM 수주 호재 상향 기대",          # 긍정 우세
+    "조선 LNG 선박 전망 분석 주목",            # 중립
+    "건설 인프라 리스크 하락 관세 충격",        # 부정
+    "제약 바이오 임상 호재 리스크",            # 긍정=부정
+    "증권 거래대금 금리 이슈 동향 점검 리포트",   # 중립 다수
+]
+TOPIC_TEXTS = ["", "실적 수급", "리스크 긴축", "정책 관세", "무관한 토픽"]
+RECENCY_SCORES = [0.0, 20.0, 35.0, 50.0, 99.9, 100.0, 180.0]
+SECTORS = list(QUAL_SECTOR_THEME_MAP) + ["분류안됨", "반도체 장비", "IT 전기장비", "기타", None, ""]
+
+
+def _pick(rng, boundaries, low, high, n):
+    """경계값과 구간 난수를 반반 섞습니다."""
+    values = rng.uniform(low, high, n)
+    use_boundary = rng.random(n) < 0.5
+    values[use_boundary] = rng.choice(np.asarray(boundaries, dtype=float), use_boundary.sum())
+    return values
+
+
+def _random_inputs(rng, n=N_ROWS):
+    return pd.DataFrame({
+        "f_str": _pick(rng, [0, -1, 2.5, 10], -5, 12, n),
+        "p_str": _pick(rng, [0, 1, 2, 4], -3, 8, n),
+        "t_str": _pick(rng, [0, 1.25, 2.5], -3, 6, n),
+        "pef_str": _pick(rng, [0, 1.25, 2.5], -3, 6, n),
+        "vol_surge": _pick(rng, [99.9, 100, 149.9, 150], 0, 400, n),
+        "rsi_val": _pick(rng, [45, 49.9, 50, 59.9, 60, 85, 85.1], 10, 95, n),
+        "gap_20": _pick(rng, [97.9, 98, 101.9, 102, 103, 103.1, 108, 108.1], 90, 115, n),
+        "foreign_streak": rng.integers(0, 15, n).astype(float),
+        "pension_streak": rng.integers(0, 10, n).astype(float),
+        "turnover_rate": _pick(rng, [1.49, 1.5, 2.99, 3, 4.99, 5, 9.99, 10], 0, 25, n),
+        "is_ma20_rising": rng.random(n) < 0.6,
+        "per_val": _pick(rng, [-3, 0, 0.1, 15, 15.1], -20, 60, n),
+        "roe_val": _pick(rng, [7.99, 8, 14.99, 15], -10, 30, n),
+        "dip_buying_ratio": _pick(rng, [0.59, 0.6], 0, 1, n),
+        "sector_name": rng.choice(np.array(SECTORS, dtype=object), n),
+    })
+
+
+def _same(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return (math.isnan(a) and math.isnan(b)) or a == b
+    return a == b
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("current_vix", VIX_LEVELS)
+def test_dynamic_scores_match_scalar(seed, current_vix):
+    inputs = _random_inputs(np.random.default_rng(seed))
+    cols = [
+        "f_str", "p_str", "t_str", "pef_str", "vol_surge", "rsi_val", "gap_20", "foreign_streak",
+        "pension_streak", "turnover_rate", "is_ma20_rising", "per_val", "roe_val",
+    ]
+    vector = calculate_dynamic_scores(
+        *(inputs[c] for c in cols), current_vix=current_vix, dip_buying_ratio=inputs["dip_buying_ratio"], return_details=True
+    )
+    scores = calculate_dynamic_scores(
+        *(inputs[c] for c in cols), current_vix=current_vix, dip_buying_ratio=inputs["dip_buying_ratio"]
+    )
+    assert list(scores) == vector["score"].tolist()
+    for i, row in enumerate(inputs.itertuples(index=False)):
+        args = [getattr(row, c) for c in cols]
+        expected = calculate_dynamic_score(*args, current_vix, dip_buying_ratio=row.dip_buying_ratio, return_details=True)
+        actual = vector.iloc[i].to_dict()
+        assert set(actual) == set(expected)
+        for key, value in expected.items():
+            assert _same(actual[key], value), (i, key, actual[key], value)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("news_text", NEWS_TEXTS, ids=[f"news{i}" for i in range(len(NEWS_TEXTS))])
+def test_qualitative_scores_match_scalar(seed, news_text):
+    rng = np.random.default_rng(1000 + seed)
+    inputs = _random_inputs(rng)
+    topic_text = TOPIC_TEXTS[seed % len(TOPIC_TEXTS)]
+    recency = RECENCY_SCORES[seed % len(RECENCY_SCORES)]
+    vector = calculate_qualitative_scores(
+        inputs["sector_name"], inputs["per_val"], inputs["roe_val"], inputs["foreign_streak"], inputs["pension_streak"],
+        macro_news_text=news_text, macro_recency_score=recency, repeated_topics_text=topic_text, return_details=True,
+    )
+    scores = calculate_qualitative_scores(
+        inputs["sector_name"], inputs["per_val"], inputs["roe_val"], inputs["foreign_streak"], inputs["pension_streak"],
+        macro_news_text=news_text, macro_recency_score=recency, repeated_topics_text=topic_text,
+    )
+    assert scores.tolist() == vector["score"].tolist()
+    for i, row in enumerate(inputs.itertuples(index=False)):
+        expected_score, expected_details = calculate_qualitative_score(
+            row.sector_name, row.per_val, row.roe_val, row.foreign_streak, row.pension_streak,
+            macro_news_text=news_text, macro_recency_score=recency, repeated_topics_text=topic_text, return_details=True,
+        )
+        actual = vector.iloc[i].to_dict()
+        assert set(actual) == {"score", *expected_details}
+        assert _same(actual["score"], expected_score), (i, actual["score"], expected_score)
+        for key, value in expected_details.items():
+            assert _same(actual[key], value), (i, key, actual[key], value)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("current_vix", VIX_LEVELS)
+def test_blend_scores_match_scalar(seed, current_vix):
+    rng = np.random.default_rng(2000 + seed)
+    quant = pd.Series(rng.integers(0, 101, N_ROWS))
+    # .xx5 반올림 경계와 보정 한도(±10/±20) 바깥 값을 함께 뽑습니다.
+    qual = pd.Series(np.where(rng.random(N_ROWS) < 0.3, rng.integers(0, 10001, N_ROWS) / 100 + 0.005, rng.uniform(0, 100, N_ROWS)))
+    final, qual_adj, mode = blend_quant_qual_scores(quant.astype(float), qual, current_vix)
+    for i in range(N_ROWS):
+        expected = blend_quant_qual_score(int(quant[i]), float(qual[i]), current_vix)
+        assert (final[i], qual_adj[i], mode) == expected, (i, quant[i], qual[i])